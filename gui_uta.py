@@ -39,12 +39,28 @@ DEFAULT_CONFIG = {
     "FCTD_CHANNEL_NAME_PREFIX": "Followers: ", "FCTD_CHANNEL_NAME_SUFFIX": "", "FCTD_FOLLOWER_DATA_FILE": "follower_counts.bin",
     "UTA_STREAM_DURATION_LOG_FILE": "stream_durations.bin", "UTA_ENABLED": False,
     "UTA_TWITCH_CHANNEL_NAME": "target_twitch_username_for_uta", "UTA_CLIP_MONITOR_ENABLED": False,
+    "UTA_ADDITIONAL_TWITCH_CHANNELS": "", "UTA_CHANNEL_LOG_DIR": "channel_logs",
+    "UTA_LOOKUP_CACHE_FILE": "twitch_lookup_cache.json", "UTA_LOOKUP_CACHE_MAX_ENTRIES": 500,
+    "UTA_LOOKUP_CACHE_ID_TTL_SECONDS": 604800, "UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS": 900,
+    "UTA_EVENTSUB_ENABLED": False, "UTA_EVENTSUB_WS_URL": "wss://eventsub.wss.twitch.tv/ws",
+    "UTA_EVENTSUB_SUBSCRIPTIONS_URL": "https://api.twitch.tv/helix/eventsub/subscriptions",
+    "UTA_EVENTSUB_USER_TOKEN": "", "UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS": 300, "UTA_EVENTSUB_RECORD_FILE": "",
+    "UTA_ADAPTIVE_POLLING_ENABLED": False, "UTA_ADAPTIVE_POLL_MIN_SECONDS": 10, "UTA_ADAPTIVE_POLL_MAX_SECONDS": 300,
+    "UTA_ADAPTIVE_POLL_HISTORY_DAYS": 56, "UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD": 0.25,
+    "UTA_ADAPTIVE_POLL_POST_END_SECONDS": 900, "UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS": 3,
+    "UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD": 5, "UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS": 60,
+    "UTA_WATCHDOG_ENABLED": True, "UTA_WATCHDOG_STALL_SECONDS": 300, "UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS": 600,
+    "UTA_WORKER_PROCESSES": 0, "UTA_WORKER_LEASE_DB_FILE": "uta_worker_leases.sqlite3",
+    "UTA_WORKER_LEASE_SECONDS": 30, "UTA_WORKER_MAX_CHANNELS": 0,
+    "UTA_TWITCH_API_BASE_URL": "https://api.twitch.tv/helix", "UTA_TWITCH_AUTH_URL": "https://id.twitch.tv/oauth2/token",
+    "UTA_YOUTUBE_API_ROOT_URL": "", "UTA_DISCORD_WEBHOOK_BASE_URL": "",
     "UTA_DISCORD_WEBHOOK_URL_CLIPS": "YOUR_DISCORD_WEBHOOK_URL_CLIPS", "UTA_CHECK_INTERVAL_SECONDS_CLIPS": 300,
     "UTA_CLIP_LOOKBACK_MINUTES": 5, "UTA_RESTREAMER_ENABLED": False,
     "UTA_DISCORD_WEBHOOK_URL_RESTREAMER": "YOUR_DISCORD_WEBHOOK_URL_RESTREAMER",
     "UTA_YOUTUBE_RTMP_URL_BASE": "rtmp://a.rtmp.youtube.com/live2", "UTA_YOUTUBE_STREAM_KEY": "YOUR_YOUTUBE_STREAM_KEY",
     "UTA_CHECK_INTERVAL_SECONDS_RESTREAMER": 60, "UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE": 300,
     "UTA_POST_RESTREAM_COOLDOWN_SECONDS": 60, "UTA_STREAMLINK_PATH": "streamlink", "UTA_FFMPEG_PATH": "ffmpeg",
+    "UTA_FFPROBE_PATH": "ffprobe",
     "UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED": False, "UTA_STREAM_STATUS_WEBHOOK_URL": "YOUR_DISCORD_WEBHOOK_URL_STATUS",
     "UTA_STREAM_STATUS_CHANNEL_ID": None, "UTA_STREAM_STATUS_POLL_INTERVAL_SECONDS": 60,
     "UTA_STREAM_ACTIVITY_LOG_FILE": "stream_activity.bin", "UTA_VIEWER_COUNT_LOGGING_ENABLED": False,
@@ -52,16 +68,31 @@ DEFAULT_CONFIG = {
     "BOT_SESSION_LOG_FILE": "bot_sessions.bin", "UTA_YOUTUBE_API_ENABLED": False,
     "UTA_YOUTUBE_CLIENT_SECRET_FILE": "client_secret.json", "UTA_YOUTUBE_TOKEN_FILE": "youtube_token.json",
     "UTA_YOUTUBE_PLAYLIST_ID": None, "UTA_YOUTUBE_DEFAULT_PRIVACY": "unlisted",
-    "UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM": False, "UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS": 0.0,
+    "UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM": False, "UTA_YOUTUBE_BATCH_REQUESTS_ENABLED": True, "UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS": 0.0,
+    "UTA_YOUTUBE_QUOTA_DAILY_LIMIT": 10000, "UTA_YOUTUBE_QUOTA_RESERVE_UNITS": 300,
+    "UTA_YOUTUBE_QUOTA_LEDGER_FILE": "youtube_quota_ledger.json", "UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED": True,
+    "UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED": False, "UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS": 120, "UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS": 30,
     "UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE": "{twitch_username} - {twitch_title} ({game_name}) - Part {part_num} [{date}]",
     "UTA_YOUTUBE_DYNAMIC_DESCRIPTION_TEMPLATE": "Originally streamed by {twitch_username} on Twitch: https://twitch.tv/{twitch_username}\nGame: {game_name}\nTitle: {twitch_title}\n\nArchived by UTA.",
     "UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES": 3, "UTA_RESTREAM_LONG_COOLDOWN_SECONDS": 300,
     "UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED": True, "UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES": 2,
     "UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS": 15, "UTA_FFMPEG_STARTUP_WAIT_SECONDS": 10,
+    "UTA_YOUTUBE_PLAYABILITY_CHECK_MODE": "health", "UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS": 1.0,
+    "UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS": 60, "UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS": 60,
     "UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED": True,
     "UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS": 60,
     "UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER": "## UTA Auto Chapters ##",
+    "UTA_CHAPTER_CHECKPOINT_FILE": "chapter_checkpoint.json",
     "UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE": "{game_name} - {twitch_title}",
+    "UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED": False, "UTA_RESTREAM_LOCAL_ARCHIVE_DIR": "restream_archive",
+    "UTA_RESTREAM_EXTRA_RTMP_TARGETS": "", "UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS": 60,
+    "UTA_RESTREAM_METRICS_LOG_FILE": "restream_metrics.bin", "UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS": 30,
+    "UTA_RESTREAM_STALL_DETECTION_ENABLED": True, "UTA_RESTREAM_STALL_MIN_SPEED": 0.9, "UTA_RESTREAM_STALL_SLOW_SECONDS": 60,
+    "UTA_RESTREAM_STALL_NO_DATA_SECONDS": 20, "UTA_RESTREAM_STALL_MAX_RESTARTS": 3, "UTA_RESTREAM_STALL_LOG_FILE": "restream_stalls.jsonl",
+    "UTA_RESTREAM_INGEST_MODE": "cli", "UTA_RESTREAM_INGEST_BUFFER_SECONDS": 8.0, "UTA_RESTREAM_INGEST_PREBUFFER_SECONDS": 2.0,
+    "UTA_RESTREAM_AUDIO_MODE": "auto", "UTA_RESTREAM_WARM_RESTART_ENABLED": True, "UTA_RESTREAM_STANDBY_INGEST_ENABLED": False,
+    "UTA_RECORDER_ENABLED": False, "UTA_RECORDER_DIR": "recordings", "UTA_RECORDER_SEGMENT_SECONDS": 60,
+    "UTA_RECORDER_SEGMENT_FORMAT": "mpegts", "UTA_RECORDER_RETENTION_MAX_GB": 50.0, "UTA_RECORDER_RETENTION_MAX_HOURS": 0.0,
     # New Twitch Chat Configs
     "TWITCH_CHAT_ENABLED": False,
     "TWITCH_CHAT_NICKNAME": "YourBotTwitchNickname", # Bot's Twitch username
@@ -190,6 +221,12 @@ class UtaBotGui(ctk.CTk):
         self.yt_playability_status_var = ctk.StringVar(value="N/A")
         self.consecutive_failures_var = ctk.StringVar(value="0/0") # e.g. "1/3"
         self.cooldown_status_var = ctk.StringVar(value="Inactive")
+        self.twitch_live_status_var = ctk.StringVar(value="N/A") # Fed by StreamStateHub edge logs
+        self.circuit_breakers_status_var = ctk.StringVar(value="N/A") # Fed by CircuitBreaker state-change logs
+        self.service_watchdog_status_var = ctk.StringVar(value="N/A") # Fed by the service watchdog's summary logs
+        self.restream_outputs_status_var = ctk.StringVar(value="N/A") # Fed by the restream pipe's per-output stats
+        self.restream_metrics_status_var = ctk.StringVar(value="N/A") # Fed by the restream pipe's FFmpeg -progress metrics
+        self.youtube_quota_status_var = ctk.StringVar(value="N/A") # Fed by the YouTube quota ledger on every API call
 
 
         self.setup_ui()
@@ -308,6 +345,26 @@ class UtaBotGui(ctk.CTk):
             "UTA General": [
                 ("UTA_ENABLED", "Enable UTA Features", {"is_switch": True}),
                 ("UTA_TWITCH_CHANNEL_NAME", "Target Twitch Channel (UTA & Chat):"), # Clarified usage
+                ("UTA_ADDITIONAL_TWITCH_CHANNELS", "Extra Channels (comma-separated):"),
+                ("UTA_CHANNEL_LOG_DIR", "Per-Channel Log Directory:"),
+                ("UTA_LOOKUP_CACHE_FILE", "Twitch Lookup Cache File:"),
+                ("UTA_LOOKUP_CACHE_MAX_ENTRIES", "Lookup Cache Max Entries:"),
+                ("UTA_LOOKUP_CACHE_ID_TTL_SECONDS", "Login->ID Cache TTL (s):"),
+                ("UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS", "User/Channel Info Cache TTL (s):"),
+                ("UTA_WORKER_LEASE_DB_FILE", "Worker Lease Database File:"),
+                ("UTA_EVENTSUB_ENABLED", "Enable EventSub Push Updates:"),
+                ("UTA_EVENTSUB_WS_URL", "EventSub WebSocket URL:"),
+                ("UTA_EVENTSUB_SUBSCRIPTIONS_URL", "EventSub Subscriptions URL:"),
+                ("UTA_EVENTSUB_USER_TOKEN", "EventSub User Token (blank = chat token):"),
+                ("UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS", "Poll Interval While EventSub Up (s):"),
+                ("UTA_EVENTSUB_RECORD_FILE", "EventSub Record File (optional):"),
+                ("UTA_ADAPTIVE_POLLING_ENABLED", "Enable Adaptive (History-Based) Polling:"),
+                ("UTA_ADAPTIVE_POLL_MIN_SECONDS", "Adaptive Poll Min Interval (s):"),
+                ("UTA_ADAPTIVE_POLL_MAX_SECONDS", "Adaptive Poll Max Interval (s):"),
+                ("UTA_ADAPTIVE_POLL_HISTORY_DAYS", "Adaptive Poll History (days):"),
+                ("UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD", "Likely Window Threshold (0-1):"),
+                ("UTA_ADAPTIVE_POLL_POST_END_SECONDS", "Fast Polling After Stream End (s):"),
+                ("UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS", "Min Recorded Starts Before Adapting:"),
                 ("UTA_STREAM_DURATION_LOG_FILE", "Stream Duration Log File:")
             ],
             "UTA Chat Monitor": [ # New Tab
@@ -334,7 +391,15 @@ class UtaBotGui(ctk.CTk):
                 ("UTA_YOUTUBE_PLAYLIST_ID", "YouTube Playlist ID (Optional):"),
                 ("UTA_YOUTUBE_DEFAULT_PRIVACY", "YouTube Default Privacy:", {"options": ["public", "unlisted", "private"]}),
                 ("UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM", "Make VOD Public After Stream", {"is_switch": True}),
+                ("UTA_YOUTUBE_BATCH_REQUESTS_ENABLED", "Batch YouTube Finalization Calls", {"is_switch": True}),
+                ("UTA_YOUTUBE_QUOTA_DAILY_LIMIT", "YT API Daily Quota (units):"),
+                ("UTA_YOUTUBE_QUOTA_RESERVE_UNITS", "YT Quota Reserve (units):"),
+                ("UTA_YOUTUBE_QUOTA_LEDGER_FILE", "YT Quota Ledger File:"),
+                ("UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED", "Legacy RTMP When Quota Runs Low", {"is_switch": True}),
                 ("UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS", "YT Rollover Hours (0=disable):"),
+                ("UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED", "Overlapped (Zero-Gap) Rollover", {"is_switch": True}),
+                ("UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS", "Rollover Prepare Lead (s):"),
+                ("UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS", "Rollover Overlap (s):"),
                 ("UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE", "YT Title Template:"),
                 ("UTA_YOUTUBE_DYNAMIC_DESCRIPTION_TEMPLATE", "YT Description Template:"),
                 ("UTA_YOUTUBE_RTMP_URL_BASE", "Legacy YT RTMP URL Base:"),
@@ -345,7 +410,32 @@ class UtaBotGui(ctk.CTk):
                 ("UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED", "Enable Auto YouTube Chapters", {"is_switch": True}),
                 ("UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS", "Min. Duration for YT Chapter (s):"),
                 ("UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER", "Description Marker for Chapters:"),
-                ("UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE", "YT Chapter Title Template:")
+                ("UTA_CHAPTER_CHECKPOINT_FILE", "Chapter Checkpoint File:"),
+                ("UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE", "YT Chapter Title Template:"),
+                ("UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED", "Also Archive to Local File", {"is_switch": True}),
+                ("UTA_RESTREAM_LOCAL_ARCHIVE_DIR", "Local Archive Directory:"),
+                ("UTA_RESTREAM_EXTRA_RTMP_TARGETS", "Extra RTMP Targets (comma-separated URLs):", {"is_password": True}),
+                ("UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS", "Output Stats Interval (s, 0=off):"),
+                ("UTA_RESTREAM_METRICS_LOG_FILE", "Restream Metrics Log File:"),
+                ("UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS", "Restream Metrics Interval (s, 0=off):"),
+                ("UTA_RESTREAM_STALL_DETECTION_ENABLED", "Restart Stalled Pipe Side", {"is_switch": True}),
+                ("UTA_RESTREAM_STALL_MIN_SPEED", "Stall: Min. FFmpeg Speed (x):"),
+                ("UTA_RESTREAM_STALL_SLOW_SECONDS", "Stall: Slow For (s):"),
+                ("UTA_RESTREAM_STALL_NO_DATA_SECONDS", "Stall: No Progress For (s):"),
+                ("UTA_RESTREAM_STALL_MAX_RESTARTS", "Stall: Max In-Place Restarts:"),
+                ("UTA_RESTREAM_STALL_LOG_FILE", "Stall Event Log File:"),
+                ("UTA_RESTREAM_INGEST_MODE", "Ingest Mode:", {"options": ["cli", "session"]}),
+                ("UTA_RESTREAM_INGEST_BUFFER_SECONDS", "Session Ingest Buffer (s):"),
+                ("UTA_RESTREAM_INGEST_PREBUFFER_SECONDS", "Session Ingest Prebuffer (s):"),
+                ("UTA_RESTREAM_AUDIO_MODE", "Restream Audio:", {"options": ["auto", "copy", "transcode"]}),
+                ("UTA_RESTREAM_WARM_RESTART_ENABLED", "Warm Restart (cached stream, no first cooldown)", {"is_switch": True}),
+                ("UTA_RESTREAM_STANDBY_INGEST_ENABLED", "Re-attach FFmpeg to Running Ingest", {"is_switch": True}),
+                ("UTA_RECORDER_ENABLED", "Enable Segmented Local Recorder", {"is_switch": True}),
+                ("UTA_RECORDER_DIR", "Recorder Directory:"),
+                ("UTA_RECORDER_SEGMENT_SECONDS", "Recorder Segment Length (s):"),
+                ("UTA_RECORDER_SEGMENT_FORMAT", "Recorder Segment Format:", {"options": ["mpegts", "fmp4"]}),
+                ("UTA_RECORDER_RETENTION_MAX_GB", "Recorder Max Size (GB, 0=off):"),
+                ("UTA_RECORDER_RETENTION_MAX_HOURS", "Recorder Max Age (h, 0=off):")
             ],
             "UTA Status Monitor": [
                 ("UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED", "Enable Stream Status Notifications", {"is_switch": True}),
@@ -363,11 +453,28 @@ class UtaBotGui(ctk.CTk):
                 ("UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED", "Enable YT Playability Check", {"is_switch":True}),
                 ("UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES", "Playability Retries:"),
                 ("UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS", "Playability Delay (s):"),
-                ("UTA_FFMPEG_STARTUP_WAIT_SECONDS", "FFmpeg Startup Wait (s):")
+                ("UTA_FFMPEG_STARTUP_WAIT_SECONDS", "FFmpeg Startup Wait (s):"),
+                ("UTA_YOUTUBE_PLAYABILITY_CHECK_MODE", "Playability Check Mode:", {"options": ["health", "streamlink"]}),
+                ("UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS", "Health Check First Poll (s):"),
+                ("UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS", "Health Check Timeout (s):"),
+                ("UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS", "Stream Health Monitor Interval (s, 0=off):"),
+                ("UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD", "API Breaker Failure Threshold (0=off):"),
+                ("UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS", "API Breaker Recovery Time (s):"),
+                ("UTA_WATCHDOG_ENABLED", "Enable Service Watchdog", {"is_switch":True}),
+                ("UTA_WATCHDOG_STALL_SECONDS", "Watchdog Stall Timeout (s, 0=off):"),
+                ("UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS", "Watchdog Alert Cooldown (s):"),
+                ("UTA_WORKER_PROCESSES", "Worker Processes (0 = in bot process):"),
+                ("UTA_WORKER_LEASE_SECONDS", "Worker Channel Lease (s):"),
+                ("UTA_WORKER_MAX_CHANNELS", "Max Channels per Worker (0 = even):")
             ],
             "Paths": [
                 ("UTA_STREAMLINK_PATH", "Streamlink Path:", {"is_browse": True}),
-                ("UTA_FFMPEG_PATH", "FFmpeg Path:", {"is_browse": True})
+                ("UTA_FFMPEG_PATH", "FFmpeg Path:", {"is_browse": True}),
+                ("UTA_FFPROBE_PATH", "FFprobe Path:", {"is_browse": True}),
+                ("UTA_TWITCH_API_BASE_URL", "Twitch Helix Base URL:"),
+                ("UTA_TWITCH_AUTH_URL", "Twitch OAuth Token URL:"),
+                ("UTA_YOUTUBE_API_ROOT_URL", "YouTube API Root URL (blank = Google):"),
+                ("UTA_DISCORD_WEBHOOK_BASE_URL", "Discord Webhook Base URL (blank = Discord):")
             ]
         }
 
@@ -405,6 +512,34 @@ class UtaBotGui(ctk.CTk):
         CTkLabel(status_section, text="Bot Status:", font=self.heading_font).pack(side="left", padx=(10,5), pady=10)
         self.status_label = CTkLabel(status_section, text="Inactive", text_color=self.status_inactive_color, font=self.label_font)
         self.status_label.pack(side="left", padx=5, pady=10)
+        self.twitch_live_label = CTkLabel(status_section, textvariable=self.twitch_live_status_var, font=self.small_label_font)
+        self.twitch_live_label.pack(side="right", padx=(5,10), pady=10)
+        CTkLabel(status_section, text="Twitch:", font=self.small_label_font).pack(side="right", padx=(5,0), pady=10)
+
+        breaker_section = CTkFrame(control_outer_frame, fg_color="transparent")
+        breaker_section.pack(fill="x", padx=10, pady=(0,5))
+        CTkLabel(breaker_section, text="API Breakers:", font=self.small_label_font).pack(side="left", padx=(10,5))
+        CTkLabel(breaker_section, textvariable=self.circuit_breakers_status_var, font=self.small_label_font, anchor="w", wraplength=320).pack(side="left", padx=5)
+
+        watchdog_section = CTkFrame(control_outer_frame, fg_color="transparent")
+        watchdog_section.pack(fill="x", padx=10, pady=(0,5))
+        CTkLabel(watchdog_section, text="Services:", font=self.small_label_font).pack(side="left", padx=(10,5))
+        CTkLabel(watchdog_section, textvariable=self.service_watchdog_status_var, font=self.small_label_font, anchor="w", wraplength=320).pack(side="left", padx=5)
+
+        outputs_section = CTkFrame(control_outer_frame, fg_color="transparent")
+        outputs_section.pack(fill="x", padx=10, pady=(0,5))
+        CTkLabel(outputs_section, text="Outputs:", font=self.small_label_font).pack(side="left", padx=(10,5))
+        CTkLabel(outputs_section, textvariable=self.restream_outputs_status_var, font=self.small_label_font, anchor="w", wraplength=320).pack(side="left", padx=5)
+
+        metrics_section = CTkFrame(control_outer_frame, fg_color="transparent")
+        metrics_section.pack(fill="x", padx=10, pady=(0,5))
+        CTkLabel(metrics_section, text="FFmpeg:", font=self.small_label_font).pack(side="left", padx=(10,5))
+        CTkLabel(metrics_section, textvariable=self.restream_metrics_status_var, font=self.small_label_font, anchor="w", wraplength=320).pack(side="left", padx=5)
+
+        quota_section = CTkFrame(control_outer_frame, fg_color="transparent")
+        quota_section.pack(fill="x", padx=10, pady=(0,5))
+        CTkLabel(quota_section, text="YT Quota:", font=self.small_label_font).pack(side="left", padx=(10,5))
+        CTkLabel(quota_section, textvariable=self.youtube_quota_status_var, font=self.small_label_font, anchor="w", wraplength=320).pack(side="left", padx=5)
 
         # Container for dynamic info (YT ID, playability, etc.)
         self.dynamic_info_container = CTkFrame(control_outer_frame, fg_color="transparent")
@@ -554,6 +689,30 @@ class UtaBotGui(ctk.CTk):
             max_fails = current_config.get('UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES', 3)
             self.after(0, self._update_detailed_restream_status_display, fails_str=f"{failures_match.group(1)}/{max_fails}")
 
+        twitch_live_match = re.search(r"UTA_GUI_LOG: TwitchLiveStatus=(Live|Offline)", message)
+        if twitch_live_match:
+            self.after(0, self.twitch_live_status_var.set, twitch_live_match.group(1))
+
+        breakers_match = re.search(r"UTA_GUI_LOG: CircuitBreakers=(.+)", message)
+        if breakers_match:
+            self.after(0, self.circuit_breakers_status_var.set, breakers_match.group(1).strip())
+
+        watchdog_match = re.search(r"UTA_GUI_LOG: ServiceWatchdog=(.+)", message)
+        if watchdog_match:
+            self.after(0, self.service_watchdog_status_var.set, watchdog_match.group(1).strip())
+
+        outputs_match = re.search(r"UTA_GUI_LOG: RestreamOutputs=(.+)", message)
+        if outputs_match:
+            self.after(0, self.restream_outputs_status_var.set, outputs_match.group(1).strip())
+
+        metrics_match = re.search(r"UTA_GUI_LOG: RestreamMetrics=(.+)", message)
+        if metrics_match:
+            self.after(0, self.restream_metrics_status_var.set, metrics_match.group(1).strip())
+
+        quota_match = re.search(r"UTA_GUI_LOG: YouTubeQuota=(.+)", message)
+        if quota_match:
+            self.after(0, self.youtube_quota_status_var.set, quota_match.group(1).strip())
+
         cooldown_match = re.search(r"UTA_GUI_LOG: CooldownStatus=([a-zA-Z0-9_()]+(\d+s)?)", message) # Updated regex for optional duration
         if cooldown_match:
              self.after(0, self._update_detailed_restream_status_display, cool_status=cooldown_match.group(1).strip())
@@ -802,6 +961,12 @@ class UtaBotGui(ctk.CTk):
         # Reset dynamic info display only if the bot was truly considered active and is now confirmed stopped
         if previous_active_state:
             self._update_youtube_info_display() # Clears YT info
+            self.twitch_live_status_var.set("N/A")
+            self.circuit_breakers_status_var.set("N/A")
+            self.service_watchdog_status_var.set("N/A")
+            self.restream_outputs_status_var.set("N/A")
+            self.restream_metrics_status_var.set("N/A")
+            self.youtube_quota_status_var.set("N/A")
             self._update_detailed_restream_status_display(play_status="N/A",
                                                           fails_str=f"0/{current_config.get('UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES',3)}",
                                                           cool_status="Inactive")
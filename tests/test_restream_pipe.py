@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+
+from uta_bot import config_manager
+from uta_bot.services.restream_pipe import RestreamPipe, PipeOutput
+from uta_bot.services.segment_recorder import SegmentRecorder
+
+# Stands in for FFmpeg: writes its PID into every output it was given (two segments for a segment pattern), then idles.
+FAKE_FFMPEG = r"""
+import os, sys, time
+args = sys.argv[1:]
+targets = [slave.rsplit("]", 1)[-1] for slave in args[-1].split("|")] if args[-2] == "tee" else [args[-1]]
+for target in targets:
+    for path in ([target % 0, target % 1] if "%06d" in target else [target]):
+        with open(path, "w") as f:
+            f.write(str(os.getpid()))
+while True:
+    time.sleep(1)
+"""
+IDLE_INGEST = "import time; time.sleep(60)"
+
+
+def _snapshot(directory: str) -> dict:
+    contents = {}
+    for dir_path, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            if file_name.endswith((".flv", ".ts")):
+                with open(os.path.join(dir_path, file_name)) as f:
+                    contents[os.path.join(dir_path, file_name)] = f.read()
+    return contents
+
+
+class RestreamPipeRespawnTest(unittest.IsolatedAsyncioTestCase):
+    async def _wait_for_files(self, directory: str, count: int):
+        for _ in range(100):
+            files = _snapshot(directory)
+            if len(files) >= count and all(files.values()):
+                return files
+            await asyncio.sleep(0.05)
+        self.fail(f"Stand-in FFmpeg wrote {len(_snapshot(directory))} of {count} files")
+
+    async def test_replacement_ffmpeg_never_rewrites_existing_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_manager.UTA_RECORDER_DIR = directory
+            config_manager.UTA_RECORDER_RETENTION_MAX_GB = 0
+            config_manager.UTA_RECORDER_RETENTION_MAX_HOURS = 0
+            config_manager.UTA_RESTREAM_STALL_MAX_RESTARTS = 3
+            config_manager.UTA_RESTREAM_STALL_LOG_FILE = ""
+            recorder = SegmentRecorder("channel", 10, "mpegts")
+            os.makedirs(recorder.channel_dir)
+            outputs = [PipeOutput("Archive", os.path.join(directory, "archive.flv"), kind="file"), recorder]
+            pipe = RestreamPipe(outputs)
+            try:
+                await pipe.start([sys.executable, "-c", IDLE_INGEST], [sys.executable, "-c", FAKE_FFMPEG])
+                first_spawn = await self._wait_for_files(directory, 3)
+
+                pipe.supervising_since = time.monotonic()
+                self.assertTrue(await pipe._recover_from_stall("ffmpeg", "test"))
+                second_spawn = await self._wait_for_files(directory, 6)
+            finally:
+                await pipe.stop()
+
+            for path, content in first_spawn.items():
+                self.assertEqual(second_spawn[path], content, f"{path} was rewritten by the replacement FFmpeg")
+            self.assertEqual(len(second_spawn), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,7 @@ import shutil
 import struct
 import asyncio
 import random
+import sqlite3
 import io # For mocking ctx.send output for command tests
 
 from uta_bot import config_manager
@@ -31,10 +32,17 @@ from uta_bot.utils.constants import (
     EVENT_TYPE_TITLE_CHANGE, EVENT_TYPE_TAGS_CHANGE,
     BOT_SESSION_RECORD_SIZE, BOT_SESSION_RECORD_FORMAT, BOT_EVENT_START, BOT_EVENT_STOP
 )
-from uta_bot.utils.formatters import format_duration_human
+from uta_bot.utils.formatters import format_duration_human, parse_duration_to_timedelta
 from uta_bot.services.threading_manager import start_all_services, stop_all_services
+from uta_bot.services.service_supervisor import service_supervisor
+from uta_bot.services.worker_pool import get_worker_pool_status
+from uta_bot.services.restream_service import wake_restream_pipe, describe_restream_outputs, describe_restream_metrics
+from uta_bot.services.segment_recorder import cut_local_vod, find_stream_session_window
+from uta_bot.services.live_reconfig import plan_reconfiguration, apply_live_changes, describe_plan, RECONFIG_SERVICE_RESTART
 from uta_bot.services.twitch_api_handler import get_uta_twitch_access_token, get_uta_broadcaster_id
 from uta_bot.services.youtube_api_handler import get_youtube_service
+from uta_bot.services.youtube_quota import youtube_quota_ledger
+from uta_bot.utils.circuit_breaker import api_breakers, BREAKER_CLOSED, BREAKER_OPEN
 from uta_bot.core.background_tasks import update_channel_name_and_log_followers
 
 # Import the TWITCHIO_AVAILABLE flag from the cogs package's __init__.py
@@ -197,27 +205,11 @@ class AdminCog(commands.Cog, name="Admin Commands"):
 
         new_uta_enabled_overall = new_loaded_data_dict.get('UTA_ENABLED', False)
         new_twitch_chat_enabled = new_loaded_data_dict.get('TWITCH_CHAT_ENABLED', False)
-        uta_config_changed_structurally = False
-        if new_uta_enabled_overall:
-            uta_structural_keys = [
-                "UTA_TWITCH_CHANNEL_NAME", "UTA_STREAMLINK_PATH", "UTA_FFMPEG_PATH",
-                "UTA_YOUTUBE_API_ENABLED", "UTA_YOUTUBE_CLIENT_SECRET_FILE", "UTA_YOUTUBE_TOKEN_FILE",
-                "UTA_YOUTUBE_RTMP_URL_BASE", "UTA_YOUTUBE_STREAM_KEY",
-                "UTA_CLIP_MONITOR_ENABLED", "UTA_RESTREAMER_ENABLED", "UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED",
-                "UTA_CHECK_INTERVAL_SECONDS_CLIPS", "UTA_CHECK_INTERVAL_SECONDS_RESTREAMER",
-                "UTA_STREAM_STATUS_POLL_INTERVAL_SECONDS",
-                "UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS",
-                "UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES", "UTA_RESTREAM_LONG_COOLDOWN_SECONDS",
-                "UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED", "UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES",
-                "UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS", "UTA_FFMPEG_STARTUP_WAIT_SECONDS",
-                "UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED", "UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS",
-                "UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER", "UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE"
-            ]
-            for key in uta_structural_keys:
-                if old_config_data_copy.get(key) != new_loaded_data_dict.get(key):
-                    uta_config_changed_structurally = True
-                    config_manager.logger.info(f"Reload: UTA structural key '{key}' changed.")
-                    break
+        # Only keys that decide which services exist restart them; intervals, templates etc. are pushed into the running ones.
+        uta_reconfig_plan = plan_reconfiguration(old_config_data_copy, new_loaded_data_dict)
+        uta_config_changed_structurally = bool(uta_reconfig_plan[RECONFIG_SERVICE_RESTART])
+        for key in uta_reconfig_plan[RECONFIG_SERVICE_RESTART]:
+            config_manager.logger.info(f"Reload: UTA key '{key}' changed and needs a service restart.")
         
         twitch_chat_config_changed_structurally = False
         if new_twitch_chat_enabled: # Only check if the feature is enabled in the new config
@@ -344,10 +336,15 @@ class AdminCog(commands.Cog, name="Admin Commands"):
         if needs_uta_thread_restart and new_uta_enabled_overall:
             config_manager.logger.info("Reload: UTA is active and its config necessitates a thread (re)start for UTA services (Clip/Restream/Status).")
             start_all_services(self.bot)
+        elif new_uta_enabled_overall:
+            await apply_live_changes(uta_reconfig_plan)
         elif not new_uta_enabled_overall and old_uta_enabled_overall:
             config_manager.logger.info("Reload: UTA is now disabled. UTA service threads were already stopped (or stop_all_services handled it if running).")
 
-        final_message = f"Configuration reloaded successfully.\n**Changes:**\n{diff_summary if len(diff_summary) < 1800 else 'Too many changes to display, see logs.'}"
+        final_message = f"Configuration reloaded successfully.\n**Changes:**\n{diff_summary if len(diff_summary) < 1500 else 'Too many changes to display, see logs.'}"
+        reconfig_summary = describe_plan(uta_reconfig_plan) if new_uta_enabled_overall else ""
+        if reconfig_summary:
+            final_message += f"\n**UTA:**\n{reconfig_summary if len(reconfig_summary) < 300 else 'See logs.'}"
         await ctx.send(final_message)
 
 
@@ -622,6 +619,10 @@ class AdminCog(commands.Cog, name="Admin Commands"):
                     pipe_uptime_delta = datetime.now(timezone.utc) - config_manager.UTA_PIPE_START_TIME_UTC
                     pipe_uptime_str = format_duration_human(int(pipe_uptime_delta.total_seconds()))
                     restream_status_parts.append(f"  Current Pipe Uptime: {pipe_uptime_str}")
+                output_lines = describe_restream_outputs()
+                if output_lines:
+                    restream_status_parts.append("  Outputs:")
+                    restream_status_parts.extend(f"    {line}" for line in output_lines)
 
             if config_manager.effective_youtube_api_enabled():
                 restream_status_parts.append("  Mode: YouTube API")
@@ -641,9 +642,11 @@ class AdminCog(commands.Cog, name="Admin Commands"):
             restream_status_parts.append(f"  Consecutive Pipe Failures: {config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}/{config_manager.UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES}")
             if config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED:
                 restream_status_parts.append(f"  Last YT Playability Check: {config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
+                if config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_MODE == "health":
+                    restream_status_parts.append(f"  YT Stream Health: {config_manager.UTA_LAST_YT_STREAM_HEALTH}")
         else:
             restream_status_parts.append("Disabled in Config")
-        embed.add_field(name="Restreamer", value="\n".join(restream_status_parts), inline=False)
+        embed.add_field(name="Restreamer", value="\n".join(restream_status_parts)[:1024], inline=False)
 
         status_mon_text_parts = []
         if config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED:
@@ -659,6 +662,34 @@ class AdminCog(commands.Cog, name="Admin Commands"):
             status_mon_text_parts.append("Disabled in Config")
         embed.add_field(name="Stream Status Monitor & Activity Logger", value="\n".join(status_mon_text_parts), inline=False)
 
+        service_states = service_supervisor.get_service_states()
+        if service_states:
+            watchdog_parts = [f"Watchdog: {'Enabled' if config_manager.UTA_WATCHDOG_ENABLED else 'Disabled'} (stall timeout {config_manager.UTA_WATCHDOG_STALL_SECONDS}s)"]
+            for service_state in service_states:
+                line = f"  **{service_state['name']}**: {service_state['state']}"
+                if service_state["heartbeat_age_seconds"] is not None:
+                    line += f", heartbeat {int(service_state['heartbeat_age_seconds'])}s ago{' (waiting)' if service_state['idle'] else ''}"
+                if service_state["iterations"]:
+                    line += f", iteration p50 ≤{service_state['p50_ms']:.0f}ms / p95 ≤{service_state['p95_ms']:.0f}ms ({service_state['iterations']} runs)"
+                if service_state["restart_count"]:
+                    line += f", {service_state['restart_count']} restart(s), {service_state['stall_count']} stall(s), last: {service_state['last_error']}"
+                watchdog_parts.append(line)
+            embed.add_field(name="Service Watchdog", value="\n".join(watchdog_parts)[:1024], inline=False)
+
+        if config_manager.UTA_WORKER_PROCESSES > 0:
+            try:
+                pool_status = await asyncio.to_thread(get_worker_pool_status)
+                pool_parts = [f"Coordinator mode: {config_manager.UTA_WORKER_PROCESSES} worker(s), lease {config_manager.UTA_WORKER_LEASE_SECONDS}s"]
+                for worker_id, worker_status in sorted(pool_status.items()):
+                    heartbeat_text = f"heartbeat {int(time.time() - worker_status['heartbeat_at'])}s ago" if worker_status["heartbeat_at"] else "no heartbeat"
+                    pool_parts.append(f"  **{worker_id}** (PID {worker_status['pid'] or 'N/A'}, {heartbeat_text}): {', '.join(worker_status['channels']) or 'no channels'}")
+                unleased = [c for c in config_manager.get_uta_configured_channels() if not any(c.lower() in w["channels"] for w in pool_status.values())]
+                if unleased:
+                    pool_parts.append(f"  ⚠️ Unleased: {', '.join(unleased)}")
+            except sqlite3.Error as e:
+                pool_parts = [f"Could not read lease table `{config_manager.UTA_WORKER_LEASE_DB_FILE}`: {e}"]
+            embed.add_field(name="Worker Pool", value="\n".join(pool_parts)[:1024], inline=False)
+
         token_status = "No Token or Error"
         if config_manager.uta_shared_access_token and config_manager.uta_token_expiry_time > 0:
             expiry_dt = datetime.fromtimestamp(config_manager.uta_token_expiry_time, tz=timezone.utc)
@@ -686,8 +717,9 @@ class AdminCog(commands.Cog, name="Admin Commands"):
             return
 
         config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED = True
+        wake_restream_pipe()
         config_manager.logger.info(f"Discord command: Manual FFmpeg/Streamlink restart requested by {ctx.author}.")
-        await ctx.send("Request to restart FFmpeg/Streamlink pipe has been sent. It will be processed by the restreamer loop shortly if a restream is active.")
+        await ctx.send("Request to restart FFmpeg/Streamlink pipe has been sent. The restreamer will act on it within a few seconds if a restream is active.")
 
     @commands.command(name="utastartnewpart", help="Requests UTA to start a new YouTube broadcast part (API mode only). Owner only.")
     @commands.is_owner()
@@ -703,8 +735,9 @@ class AdminCog(commands.Cog, name="Admin Commands"):
              return
 
         config_manager.UTA_MANUAL_NEW_PART_REQUESTED = True
+        wake_restream_pipe()
         config_manager.logger.info(f"Discord command: Manual new YouTube broadcast part requested by {ctx.author}.")
-        await ctx.send("Request to start a new YouTube broadcast part has been sent. It will be processed by the restreamer loop shortly if applicable.")
+        await ctx.send("Request to start a new YouTube broadcast part has been sent. The restreamer will act on it within a few seconds if applicable.")
 
     @commands.command(name="utaytstatus", help="Shows current YouTube restream status (API mode). Owner only.")
     @commands.is_owner()
@@ -712,11 +745,13 @@ class AdminCog(commands.Cog, name="Admin Commands"):
         if not (config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED and config_manager.effective_youtube_api_enabled()):
             await ctx.send("YouTube API restreaming is not active or not configured correctly.")
             return
+        quota_text = youtube_quota_ledger.describe()
         if not config_manager.twitch_session_active_global: 
-            await ctx.send("Not currently in an active Twitch restream session according to UTA's StatusService.")
+            await ctx.send(f"Not currently in an active Twitch restream session according to UTA's StatusService.\n**YouTube API Quota**\n{quota_text}")
             return
         if not config_manager.youtube_api_session_active_global: 
-            await ctx.send("Currently in a Twitch session, but no active YouTube API broadcast part is reported by RestreamService (possibly using legacy RTMP or an API error occurred).")
+            await ctx.send("Currently in a Twitch session, but no active YouTube API broadcast part is reported by RestreamService (possibly using legacy RTMP or an API error occurred)."
+                           f"\n**YouTube API Quota**\n{quota_text}")
             return
 
         if config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING: 
@@ -732,11 +767,50 @@ class AdminCog(commands.Cog, name="Admin Commands"):
             else:
                 embed.add_field(name="Scheduled Rollover", value="Disabled or not applicable for current part", inline=False)
 
+            embed.add_field(name="FFmpeg Pipe Metrics", value=describe_restream_metrics() or "No -progress data yet (pipe starting or not running).", inline=False)
+            embed.add_field(name="YouTube API Quota", value=quota_text, inline=False)
+
             embed.set_footer(text="This status reflects the current YouTube 'part' of the ongoing Twitch stream.")
             await ctx.send(embed=embed)
         else:
             await ctx.send("Twitch session is active, but no active YouTube video/broadcast ID found for the current session (API mode).")
 
+    @commands.command(name="utalocalvod", help="Cuts a local VOD from the recorder's segments. Usage: !utalocalvod [session [N]|<duration>|<start_unix> <end_unix>]. Owner only.")
+    @commands.is_owner()
+    async def uta_local_vod_command(self, ctx: commands.Context, window: str = "session", extra: str = None):
+        channel = config_manager.UTA_TWITCH_CHANNEL_NAME
+        if not channel:
+            await ctx.send("UTA Twitch channel is not set.")
+            return
+
+        if window.isdigit() and extra and extra.isdigit():
+            start_unix, end_unix = int(window), int(extra)
+            window_text = f"{discord.utils.format_dt(datetime.fromtimestamp(start_unix, tz=timezone.utc), 'f')} to {discord.utils.format_dt(datetime.fromtimestamp(end_unix, tz=timezone.utc), 'f')}"
+        elif window.lower() == "session":
+            sessions_back = int(extra) if extra and extra.isdigit() else 0
+            session_window = await asyncio.to_thread(find_stream_session_window, sessions_back)
+            if not session_window:
+                await ctx.send(f"No stream session #{sessions_back} found in `{config_manager.UTA_STREAM_ACTIVITY_LOG_FILE}`.")
+                return
+            start_unix, end_unix = session_window
+            window_text = f"stream session starting {discord.utils.format_dt(datetime.fromtimestamp(start_unix, tz=timezone.utc), 'f')}"
+        else:
+            delta, period_name = parse_duration_to_timedelta(window)
+            if not delta:
+                await ctx.send(period_name)
+                return
+            end_unix = int(time.time())
+            start_unix = end_unix - int(delta.total_seconds())
+            window_text = period_name
+
+        if end_unix <= start_unix:
+            await ctx.send("The end of the window must be after its start.")
+            return
+
+        async with ctx.typing():
+            output_path, message = await cut_local_vod(channel, start_unix, end_unix)
+        await ctx.send(f"{'✅' if output_path else '❌'} Local VOD for {channel} ({window_text}): {message}")
+
     async def _run_test(self, test_name: str, test_func, *args):
         start_time = time.monotonic()
         try:
@@ -965,6 +1039,18 @@ class AdminCog(commands.Cog, name="Admin Commands"):
             results.append(await self._run_test("Executable Paths (Streamlink/FFmpeg)", self._test_executable_paths))
             results.append(await self._run_test("UTA Service Thread Status (Clip/Restream/Status)", self._test_service_thread_status))
 
+            results.append("\n🔌 **API Circuit Breakers** (error rate over last 100 calls, latency p50/p95):")
+            for breaker_stats in (breaker.snapshot() for breaker in api_breakers.all()):
+                state_icon = "✅" if breaker_stats["state"] == BREAKER_CLOSED else ("❌" if breaker_stats["state"] == BREAKER_OPEN else "⚠️")
+                if breaker_stats["total_calls"]:
+                    detail_text = (f"{breaker_stats['total_calls']} calls, {breaker_stats['error_rate']:.0%} errors, "
+                                   f"p50 ≤{breaker_stats['p50_ms']:.0f}ms / p95 ≤{breaker_stats['p95_ms']:.0f}ms")
+                else:
+                    detail_text = "no calls yet"
+                if breaker_stats["state"] == BREAKER_OPEN:
+                    detail_text += f" · retry in {breaker_stats['retry_in_seconds']:.0f}s, {breaker_stats['short_circuited_calls']} call(s) short-circuited, last error: {breaker_stats['last_error']}"
+                results.append(f"   {state_icon} **{breaker_stats['name']}** ({breaker_stats['state']}): {detail_text}")
+
             data_file_checks_header = "\n📄 **Data File Status**:"
             results.append(data_file_checks_header)
             log_files_to_check = {
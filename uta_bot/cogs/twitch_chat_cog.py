@@ -9,6 +9,7 @@ from uta_bot import config_manager
 from uta_bot.utils.data_logging import log_chat_activity_binary, read_chat_activity_for_period
 from uta_bot.utils.formatters import format_duration_human, parse_duration_to_timedelta
 from uta_bot.utils.constants import CHAT_ACTIVITY_RECORD_SIZE, CHAT_ACTIVITY_RECORD_FORMAT, EVENT_TYPE_STREAM_START, EVENT_TYPE_STREAM_END
+from uta_bot.services.stream_state_hub import stream_state_hub
 
 
 TWITCHIO_COG_ENABLED = False
@@ -71,6 +72,8 @@ class TwitchChatCog(commands.Cog, name="Twitch Chat Monitor"):
     def __init__(self, discord_bot: commands.Bot): 
         self.discord_bot = discord_bot 
         self.twitch_irc_bot_instance = None 
+        self.stream_state_queue = None
+        self.stream_state_listener_task = None
 
         if not TWITCHIO_COG_ENABLED:
             config_manager.logger.error("TwitchChatCog disabled because TwitchIO is not installed.")
@@ -99,8 +102,17 @@ class TwitchChatCog(commands.Cog, name="Twitch Chat Monitor"):
         self.discord_bot.loop.create_task(self.twitch_irc_bot_instance.connect(), name="TwitchIRC_Connect_Task")
         config_manager.logger.info("TwitchChatCog: Queued Twitch IRC bot connection.")
 
+        self.stream_state_queue = stream_state_hub.subscribe_async_queue(self.discord_bot.loop)
+        self.stream_state_listener_task = self.discord_bot.loop.create_task(self._stream_state_listener(), name="TwitchChat_StreamState_Task")
+
     async def cog_unload(self):
         self.log_chat_metrics_task.cancel()
+        if self.stream_state_listener_task:
+            self.stream_state_listener_task.cancel()
+            self.stream_state_listener_task = None
+        if self.stream_state_queue:
+            stream_state_hub.unsubscribe_queue(self.stream_state_queue)
+            self.stream_state_queue = None
         if self.twitch_irc_bot_instance and self.is_connected_to_twitch_chat: 
             config_manager.logger.info("TwitchChatCog: Closing Twitch IRC connection...")
             try:
@@ -141,16 +153,19 @@ class TwitchChatCog(commands.Cog, name="Twitch Chat Monitor"):
                     config_manager.logger.error(f"Twitch Chat Mirror: Unexpected error sending message: {e}", exc_info=True)
 
 
-    @tasks.loop(seconds=10) 
-    async def log_chat_metrics_task(self):
-        if not TWITCHIO_COG_ENABLED or not config_manager.TWITCH_CHAT_ENABLED:
-            if self.log_chat_metrics_task.is_running(): self.log_chat_metrics_task.cancel()
-            return
-        
-        if not self.is_connected_to_twitch_chat: 
-            config_manager.logger.debug("TwitchChatCog: Not connected to Twitch chat, skipping metrics log cycle.")
-            return
-        
+    async def _stream_state_listener(self):
+        last_seen_live = None
+        while True:
+            snapshot = await self.stream_state_queue.get()
+            if not config_manager.is_primary_uta_channel(snapshot.channel_name):
+                continue # Chat only follows UTA_TWITCH_CHANNEL_NAME
+            if last_seen_live is not None and snapshot.is_live != last_seen_live and self.is_connected_to_twitch_chat:
+                # Close the running interval on a live/offline edge so chat intervals line up with stream sessions.
+                config_manager.logger.info(f"TwitchChatCog: Stream went {'live' if snapshot.is_live else 'offline'}, flushing current chat interval.")
+                await self._flush_chat_metrics()
+            last_seen_live = snapshot.is_live
+
+    async def _flush_chat_metrics(self):
         if self.current_interval_message_count > 0:
             await log_chat_activity_binary(
                 self.current_interval_start_time_utc,
@@ -162,6 +177,18 @@ class TwitchChatCog(commands.Cog, name="Twitch Chat Monitor"):
         self.current_interval_message_count = 0
         self.current_interval_unique_chatters.clear()
 
+    @tasks.loop(seconds=10) 
+    async def log_chat_metrics_task(self):
+        if not TWITCHIO_COG_ENABLED or not config_manager.TWITCH_CHAT_ENABLED:
+            if self.log_chat_metrics_task.is_running(): self.log_chat_metrics_task.cancel()
+            return
+        
+        if not self.is_connected_to_twitch_chat: 
+            config_manager.logger.debug("TwitchChatCog: Not connected to Twitch chat, skipping metrics log cycle.")
+            return
+        
+        await self._flush_chat_metrics()
+
     @log_chat_metrics_task.before_loop
     async def before_log_chat_metrics_task(self):
         if not TWITCHIO_COG_ENABLED or not config_manager.TWITCH_CHAT_ENABLED:
@@ -196,18 +223,25 @@ class TwitchChatCog(commands.Cog, name="Twitch Chat Monitor"):
         period_name_display = ""
 
         if period_input.lower() == "live":
-            if not config_manager.twitch_session_active_global : 
-                await ctx.send("Cannot fetch 'live' chat stats: Bot is not aware of an active stream session via StatusService.")
+            hub_snapshot = stream_state_hub.get_snapshot()
+            if not hub_snapshot or not hub_snapshot.is_live:
+                await ctx.send("Cannot fetch 'live' chat stats: Bot is not aware of an active stream session via StreamStateHub.")
                 return
 
-            session_start_ts_from_status_service = getattr(config_manager, 'current_twitch_session_start_ts_global', None)
+            session_start_ts_from_hub = None
+            started_at_str = hub_snapshot.stream_data.get("started_at")
+            if started_at_str:
+                try:
+                    session_start_ts_from_hub = int(datetime.fromisoformat(started_at_str.replace('Z', '+00:00')).timestamp())
+                except ValueError:
+                    config_manager.logger.warning(f"!chatstats live: Could not parse started_at '{started_at_str}' from StreamStateHub snapshot.")
 
-            if session_start_ts_from_status_service:
-                query_start_unix = session_start_ts_from_status_service
+            if session_start_ts_from_hub:
+                query_start_unix = session_start_ts_from_hub
                 period_name_display = "current live session"
-                config_manager.logger.info(f"!chatstats live: Using session start time from StatusService: {datetime.fromtimestamp(query_start_unix, tz=timezone.utc)}")
+                config_manager.logger.info(f"!chatstats live: Using session start time from StreamStateHub: {datetime.fromtimestamp(query_start_unix, tz=timezone.utc)}")
             else:
-                config_manager.logger.warning("!chatstats live: Precise live session start time not available from StatusService. Using last 1 hour as approximation.")
+                config_manager.logger.warning("!chatstats live: Precise live session start time not available from StreamStateHub. Using last 1 hour as approximation.")
                 delta, parsed_name = parse_duration_to_timedelta("1h")
                 if delta: 
                     query_start_unix = int((now_utc - delta).timestamp())
@@ -6,7 +6,7 @@ import struct
 import io 
 import asyncio # For to_thread
 import json # For twitchinfo response parsing (if needed, handled by requests.json())
-# requests is now handled by twitch_api_handler
+import requests # twitchinfo still issues its own Helix calls through the fctd token
 
 from uta_bot import config_manager
 from uta_bot.core.bot_instance import bot
@@ -22,7 +22,13 @@ from uta_bot.utils.constants import (
     EVENT_TYPE_STREAM_START, EVENT_TYPE_STREAM_END, EVENT_TYPE_GAME_CHANGE, EVENT_TYPE_TITLE_CHANGE
 )
 # Import the centralized API request function
-from uta_bot.services.twitch_api_handler import make_uta_twitch_api_request # For UTA features
+from uta_bot.services.twitch_api_handler import ( # For UTA features
+    make_uta_twitch_api_request, uta_helix_batcher, get_cached_twitch_user_async, get_cached_twitch_channel_async
+)
+from uta_bot.utils.lookup_cache import LOOKUP_NOT_FOUND
+from uta_bot.services.stream_state_hub import stream_state_hub, get_hub_poll_interval_async
+from uta_bot.services.poll_scheduler import adaptive_poll_scheduler
+from uta_bot.services.channel_state import get_channel_state, split_channel_argument
 # For twitchinfo, we can use the fctd_twitch_api for general public data if suitable,
 # or use make_uta_twitch_api_request if UTA specific token/handling is desired.
 # The original used a local _uta_make_twitch_api_request_local based on fctd_twitch_api.
@@ -38,21 +44,24 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
             return False
         return True
 
-    @commands.command(name="streamtime", help="Total stream time for UTA_TWITCH_CHANNEL_NAME over a period (from restream or activity logs). Usage: !streamtime <period>")
+    @commands.command(name="streamtime", help="Total stream time for a monitored channel over a period (from restream or activity logs). Usage: !streamtime [channel] <period>")
     async def stream_time_command(self, ctx: commands.Context, *, duration_input: str = None):
         if not config_manager.UTA_ENABLED or not config_manager.UTA_TWITCH_CHANNEL_NAME:
             await ctx.send("UTA module or UTA_TWITCH_CHANNEL_NAME is not configured/enabled.")
             return
 
+        target_channel, duration_input = split_channel_argument(duration_input)
+        channel_state = get_channel_state(target_channel)
+        activity_log_file = channel_state.stream_activity_log_file
         log_file_to_use = None
         source_description = ""
         is_activity_log_source = False
 
-        if config_manager.UTA_STREAM_ACTIVITY_LOG_FILE and os.path.exists(config_manager.UTA_STREAM_ACTIVITY_LOG_FILE) and config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED:
-            log_file_to_use = config_manager.UTA_STREAM_ACTIVITY_LOG_FILE
+        if activity_log_file and os.path.exists(activity_log_file) and config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED:
+            log_file_to_use = activity_log_file
             source_description = "Twitch live sessions (from activity log)"
             is_activity_log_source = True
-        elif config_manager.UTA_STREAM_DURATION_LOG_FILE and os.path.exists(config_manager.UTA_STREAM_DURATION_LOG_FILE) and config_manager.UTA_RESTREAMER_ENABLED:
+        elif channel_state.is_primary and config_manager.UTA_STREAM_DURATION_LOG_FILE and os.path.exists(config_manager.UTA_STREAM_DURATION_LOG_FILE) and config_manager.UTA_RESTREAMER_ENABLED:
             log_file_to_use = config_manager.UTA_STREAM_DURATION_LOG_FILE
             source_description = "YouTube restream durations (from restream log)"
         else:
@@ -98,8 +107,8 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
                 )
 
         human_readable_duration = format_duration_human(total_duration_seconds)
-        embed_title = f"Stream Time for {config_manager.UTA_TWITCH_CHANNEL_NAME} ({period_name_display})"
-        embed_desc = (f"{config_manager.UTA_TWITCH_CHANNEL_NAME} was live for **{human_readable_duration}** "
+        embed_title = f"Stream Time for {target_channel} ({period_name_display})"
+        embed_desc = (f"{target_channel} was live for **{human_readable_duration}** "
                       f"across {num_sessions} session(s) in the {period_name_display}.\n"
                       f"*Data sourced from: {source_description}*")
         
@@ -144,23 +153,37 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
             headers = {"Client-ID": config_manager.TWITCH_CLIENT_ID, "Authorization": f"Bearer {token}"}
 
             async def _make_request(endpoint, params=None):
-                url = f"https://api.twitch.tv/helix/{endpoint.lstrip('/')}"
+                url = f"{config_manager.UTA_TWITCH_API_BASE_URL}/{endpoint.lstrip('/')}"
                 response = await asyncio.to_thread(requests.get, url, headers=headers, params=params, timeout=10)
                 response.raise_for_status() # Will raise for 4xx/5xx
                 return response.json()
 
             try:
-                user_data_response = await _make_request("users", params={"login": twitch_username_to_check})
-                if not user_data_response or not user_data_response.get("data"):
+                # users/channels come from the persistent lookup cache (batched Helix calls on a miss); followers isn't batchable.
+                user_info = await get_cached_twitch_user_async(twitch_username_to_check)
+                if user_info is None:
+                    await ctx.send("Failed to fetch Twitch user data. Please try again later.")
+                    return
+                if user_info is LOOKUP_NOT_FOUND:
                     await ctx.send(f"Could not find Twitch user: `{twitch_username_to_check}`. Please check the username.")
                     return
                 
-                user_info = user_data_response["data"][0]
                 broadcaster_id = user_info["id"]
 
-                channel_task = _make_request("channels", params={"broadcaster_id": broadcaster_id})
-                stream_task = _make_request("streams", params={"user_id": broadcaster_id}) 
+                async def _cached_channel_as_response():
+                    channel_entry = await get_cached_twitch_channel_async(broadcaster_id)
+                    return {"data": [channel_entry]} if isinstance(channel_entry, dict) else {}
+                channel_task = _cached_channel_as_response()
                 followers_task = _make_request("channels/followers", params={"broadcaster_id": broadcaster_id})
+
+                # For our own channel the StreamStateHub already holds a recent /streams result.
+                hub_snapshot = stream_state_hub.get_fresh_snapshot(twitch_username_to_check, max_age_seconds=await get_hub_poll_interval_async() * 2)
+                if hub_snapshot:
+                    async def _snapshot_as_response():
+                        return {"data": [hub_snapshot.stream_data]} if hub_snapshot.is_live else {"data": []}
+                    stream_task = _snapshot_as_response()
+                else:
+                    stream_task = uta_helix_batcher.lookup_async("streams", "user_id", broadcaster_id)
                 
                 channel_data_response, stream_data_response, followers_data_response = await asyncio.gather(
                     channel_task, stream_task, followers_task, return_exceptions=True
@@ -250,12 +273,18 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
         
         await ctx.send(embed=embed)
 
-    @commands.command(name="gamestats", help="Game stats with optional viewer histogram. Usage: !gamestats \"<Game Name>\" [period|all]")
+    @commands.command(name="gamestats", help="Game stats with optional viewer histogram. Usage: !gamestats \"<Game Name>\" [channel] [period|all]")
     async def game_stats_command(self, ctx: commands.Context, game_name_input: str, *, duration_input: str = "all"):
         if not (config_manager.UTA_ENABLED and config_manager.UTA_TWITCH_CHANNEL_NAME and config_manager.UTA_STREAM_ACTIVITY_LOG_FILE):
             await ctx.send("UTA module, target Twitch channel for UTA, or stream activity log is not configured/enabled. This command relies on activity logs.")
             return
 
+        target_channel, duration_input = split_channel_argument(duration_input)
+        duration_input = duration_input or "all"
+        channel_state = get_channel_state(target_channel)
+        activity_log_file = channel_state.stream_activity_log_file
+        viewer_log_file = channel_state.viewer_count_log_file
+
         target_game_name = game_name_input.strip()
         if not target_game_name:
             await ctx.send("Please provide a game name. Usage: `!gamestats \"Exact Game Name From Twitch\" [period|all]`")
@@ -278,7 +307,7 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
         async with ctx.typing():
             game_segments_all = await asyncio.to_thread(
                 parse_stream_activity_for_game_segments, 
-                config_manager.UTA_STREAM_ACTIVITY_LOG_FILE, 
+                activity_log_file, 
                 query_start_unix, 
                 query_end_unix
             )
@@ -298,7 +327,7 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
             viewer_counts_for_game = [] # For calculating avg viewers
             total_viewer_datapoints_for_game_stat = 0
 
-            if config_manager.UTA_VIEWER_COUNT_LOGGING_ENABLED and config_manager.UTA_VIEWER_COUNT_LOG_FILE and os.path.exists(config_manager.UTA_VIEWER_COUNT_LOG_FILE):
+            if config_manager.UTA_VIEWER_COUNT_LOGGING_ENABLED and viewer_log_file and os.path.exists(viewer_log_file):
                 min_segment_start_ts = min(s['start_ts'] for s in target_game_segments_found) if target_game_segments_found else 0
                 max_segment_end_ts = max(s['end_ts'] for s in target_game_segments_found) if target_game_segments_found else 0
                 
@@ -309,7 +338,7 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
                     # We need to iterate over segments and call it, or read once and filter.
                     # Reverting to a more direct read similar to the original:
                     try:
-                        with open(config_manager.UTA_VIEWER_COUNT_LOG_FILE, 'rb') as vf:
+                        with open(viewer_log_file, 'rb') as vf:
                             while True:
                                 chunk = vf.read(BINARY_RECORD_SIZE)
                                 if not chunk: break
@@ -332,7 +361,7 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
 
             if config_manager.FCTD_FOLLOWER_DATA_FILE and os.path.exists(config_manager.FCTD_FOLLOWER_DATA_FILE) and \
                config_manager.FCTD_TWITCH_USERNAME and \
-               config_manager.FCTD_TWITCH_USERNAME.lower() == (config_manager.UTA_TWITCH_CHANNEL_NAME or "").lower():
+               config_manager.FCTD_TWITCH_USERNAME.lower() == (target_channel or "").lower():
                 
                 current_total_follower_gain = 0
                 for seg in target_game_segments_found:
@@ -349,7 +378,7 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
 
             embed = discord.Embed(
                 title=f"Game Stats for: {target_game_name}",
-                description=f"Channel: {config_manager.UTA_TWITCH_CHANNEL_NAME}\nPeriod: {period_name_display}",
+                description=f"Channel: {target_channel}\nPeriod: {period_name_display}",
                 color=discord.Color.blue()
             )
             embed.add_field(name="Total Time Streamed", value=format_duration_human(total_time_streamed_for_game_sec), inline=False)
@@ -364,7 +393,7 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
                 gain_str = f"{total_follower_gain_for_game_stat:+,}" if total_follower_gain_for_game_stat != 0 else "0"
                 foll_gain_val = f"{gain_str} followers (across {sessions_with_follower_data_count} sessions with data)"
                 embed.add_field(name="Follower Change During Game", value=foll_gain_val, inline=True)
-            elif config_manager.FCTD_TWITCH_USERNAME == config_manager.UTA_TWITCH_CHANNEL_NAME: 
+            elif config_manager.FCTD_TWITCH_USERNAME == target_channel: 
                  embed.add_field(name="Follower Change During Game", value="Follower logging not enabled or no relevant data.", inline=True)
 
             embed.set_footer(text=f"{len(target_game_segments_found)} play session(s) found for '{target_game_name}'.")
@@ -372,5 +401,32 @@ class UTAInfoCog(commands.Cog, name="UTA Informational Commands"):
             
         await ctx.send(embed=embed) # No file sent from here
 
+    @commands.command(name="utachannels", help="Lists the Twitch channels UTA is monitoring and their live status.")
+    async def uta_channels_command(self, ctx: commands.Context):
+        monitored_channels = config_manager.get_uta_monitored_channels()
+        if not config_manager.UTA_ENABLED or not monitored_channels:
+            await ctx.send("UTA module or UTA_TWITCH_CHANNEL_NAME is not configured/enabled.")
+            return
+
+        lines = []
+        for channel_name in monitored_channels[:40]: # Keep well under the embed description limit
+            snapshot = stream_state_hub.get_snapshot(channel_name)
+            if snapshot is None:
+                status_text = "❔ Unknown"
+            elif snapshot.is_live:
+                status_text = f"🔴 Live ({snapshot.stream_data.get('viewer_count', 0):,} viewers, {snapshot.stream_data.get('game_name', 'N/A')})"
+            else:
+                status_text = "⚫ Offline"
+            primary_marker = " (primary)" if config_manager.is_primary_uta_channel(channel_name) else ""
+            poll_mode = adaptive_poll_scheduler.get_mode(channel_name) if config_manager.UTA_ADAPTIVE_POLLING_ENABLED else None
+            poll_mode_text = f" · polling: {poll_mode.replace('_', ' ')}" if poll_mode else ""
+            lines.append(f"**{channel_name}**{primary_marker}: {status_text}{poll_mode_text}")
+        if len(monitored_channels) > 40:
+            lines.append(f"...and {len(monitored_channels) - 40} more.")
+
+        embed = discord.Embed(title=f"UTA Monitored Channels ({len(monitored_channels)})", description="\n".join(lines), color=discord.Color.purple())
+        embed.set_footer(text=f"Pass a channel name to !streamtime or !gamestats to query it. Logs for extra channels live in '{config_manager.UTA_CHANNEL_LOG_DIR}/<channel>/'.")
+        await ctx.send(embed=embed)
+
 async def setup(bot_instance):
     await bot_instance.add_cog(UTAInfoCog(bot_instance))
\ No newline at end of file
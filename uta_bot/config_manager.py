@@ -14,12 +14,15 @@ try:
     from google.auth.transport.requests import Request as GoogleAuthRequest
     from googleapiclient.discovery import build as google_build
     from googleapiclient.errors import HttpError as GoogleHttpError
+    from googleapiclient.http import BatchHttpRequest as GoogleBatchHttpRequest, build_http as google_build_http
+    from google_auth_httplib2 import AuthorizedHttp as GoogleAuthorizedHttp
     GOOGLE_API_AVAILABLE = True
     logger_google_api_client = logging.getLogger('googleapiclient.discovery_cache')
     logger_google_api_client.setLevel(logging.ERROR)
 except ImportError:
     GOOGLE_API_AVAILABLE = False
     GoogleCredentials, InstalledAppFlow, GoogleAuthRequest, google_build, GoogleHttpError = None, None, None, None, None
+    GoogleBatchHttpRequest, google_build_http, GoogleAuthorizedHttp = None, None, None
 
 try:
     import streamlink
@@ -41,6 +44,20 @@ except ImportError:
     plt = None
     mdates = None
 
+try:
+    import aiohttp # Ships with discord.py; used for the EventSub WebSocket transport
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    aiohttp = None
+
+try:
+    import psutil # Per-process CPU/IO for restream output stats; /proc is read instead on Linux without it
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+    psutil = None
+
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s:[%(threadName)s]: %(message)s')
 logger = logging.getLogger('discord_twitch_bot')
@@ -68,6 +85,38 @@ owner_id_from_config: str = None # Stored as string from config, converted by bo
 UTA_STREAM_DURATION_LOG_FILE: str = "stream_durations.bin"
 UTA_ENABLED: bool = False
 UTA_TWITCH_CHANNEL_NAME: str = None
+UTA_ADDITIONAL_TWITCH_CHANNELS: list = [] # Extra channels for status/clip monitoring; restreamer and chat stay on UTA_TWITCH_CHANNEL_NAME
+UTA_CHANNEL_LOG_DIR: str = "channel_logs" # Additional channels log under <dir>/<channel>/
+UTA_LOOKUP_CACHE_FILE: str = "twitch_lookup_cache.json" # Persisted login->id and user/channel metadata
+UTA_LOOKUP_CACHE_MAX_ENTRIES: int = 500
+UTA_LOOKUP_CACHE_ID_TTL_SECONDS: int = 604800 # Login->id only changes on a rename
+UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS: int = 900
+UTA_EVENTSUB_ENABLED: bool = False # Push stream.online/offline/channel.update over WebSocket; /streams polling stays as fallback
+UTA_EVENTSUB_WS_URL: str = "wss://eventsub.wss.twitch.tv/ws"
+UTA_EVENTSUB_SUBSCRIPTIONS_URL: str = "https://api.twitch.tv/helix/eventsub/subscriptions"
+UTA_EVENTSUB_USER_TOKEN: str = "" # WebSocket subscriptions need a user token; falls back to TWITCH_CHAT_OAUTH_TOKEN
+UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS: int = 300 # /streams poll interval while EventSub is connected
+UTA_EVENTSUB_RECORD_FILE: str = "" # If set, received notifications are appended here (JSONL) for the stand-in server to replay
+UTA_ADAPTIVE_POLLING_ENABLED: bool = False # Poll fast in historically likely start windows, slow otherwise
+UTA_ADAPTIVE_POLL_MIN_SECONDS: int = 10
+UTA_ADAPTIVE_POLL_MAX_SECONDS: int = 300
+UTA_ADAPTIVE_POLL_HISTORY_DAYS: int = 56 # How far back STREAM_START events shape the profile
+UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD: float = 0.25 # Fraction of past weeks with a start in an hour-of-week slot to call it likely
+UTA_ADAPTIVE_POLL_POST_END_SECONDS: int = 900 # Keep polling fast this long after a stream ends
+UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS: int = 3 # Fewer recorded starts than this = fixed intervals
+UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5 # Consecutive failures that open an endpoint's breaker; 0 = never short-circuit
+UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS: int = 60 # How long a breaker stays open before a single probe call is let through
+UTA_WATCHDOG_ENABLED: bool = True # Restart a service task that stops heartbeating
+UTA_WATCHDOG_STALL_SECONDS: int = 300 # Busy time without a heartbeat (or overrun of an expected wait) before a service counts as stalled; 0 = off
+UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS: int = 600 # Min time between watchdog alerts for the same service on the restreamer webhook
+UTA_WORKER_PROCESSES: int = 0 # >0 = coordinator mode: channel services run in this many worker processes, the bot process only serves commands
+UTA_WORKER_LEASE_DB_FILE: str = "uta_worker_leases.sqlite3" # Shared channel lease table for the workers
+UTA_WORKER_LEASE_SECONDS: int = 30 # A worker's channels fail over this long after its last heartbeat
+UTA_WORKER_MAX_CHANNELS: int = 0 # Channels per worker; 0 = spread evenly across live workers
+UTA_TWITCH_API_BASE_URL: str = "https://api.twitch.tv/helix" # Base URLs are overridable so the services can run against uta_bot.services.api_standin
+UTA_TWITCH_AUTH_URL: str = "https://id.twitch.tv/oauth2/token"
+UTA_YOUTUBE_API_ROOT_URL: str = "" # Replaces https://youtube.googleapis.com/; empty = Google
+UTA_DISCORD_WEBHOOK_BASE_URL: str = "" # If set, replaces the https://discord.com/api part of every webhook URL
 UTA_CLIP_MONITOR_ENABLED: bool = False
 UTA_DISCORD_WEBHOOK_URL_CLIPS: str = None
 UTA_CHECK_INTERVAL_SECONDS_CLIPS: int = 300
@@ -81,6 +130,7 @@ UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE: int = 300
 UTA_POST_RESTREAM_COOLDOWN_SECONDS: int = 60
 UTA_STREAMLINK_PATH: str = "streamlink"
 UTA_FFMPEG_PATH: str = "ffmpeg"
+UTA_FFPROBE_PATH: str = "ffprobe" # Probes the ingest's codecs so audio can be copied instead of re-encoded
 UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED: bool = False
 UTA_STREAM_STATUS_WEBHOOK_URL: str = None
 UTA_STREAM_STATUS_CHANNEL_ID: int = None
@@ -97,7 +147,15 @@ UTA_YOUTUBE_TOKEN_FILE: str = "youtube_token.json"
 UTA_YOUTUBE_PLAYLIST_ID: str = None
 UTA_YOUTUBE_DEFAULT_PRIVACY: str = "unlisted"
 UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM: bool = False
+UTA_YOUTUBE_BATCH_REQUESTS_ENABLED: bool = True # Independent finalization calls share one batch HTTP request (falls back to concurrent calls)
+UTA_YOUTUBE_QUOTA_DAILY_LIMIT: int = 10000 # The project's YouTube Data API quota per day (10,000 unless Google granted more)
+UTA_YOUTUBE_QUOTA_RESERVE_UNITS: int = 300 # Kept back for finishing parts already started; new parts and optional calls stop above it
+UTA_YOUTUBE_QUOTA_LEDGER_FILE: str = "youtube_quota_ledger.json" # Today's quota usage, so a restart keeps counting
+UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED: bool = True # Stream over legacy RTMP (UTA_YOUTUBE_STREAM_KEY) when the quota can't cover a new part
 UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS: float = 0.0
+UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED: bool = False
+UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS: int = 120
+UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS: int = 30
 UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE: str = "{twitch_username} - {twitch_title} ({game_name}) - Part {part_num} [{date}]"
 UTA_YOUTUBE_DYNAMIC_DESCRIPTION_TEMPLATE: str = "Originally streamed by {twitch_username} on Twitch: https://twitch.tv/{twitch_username}\nGame: {game_name}\nTitle: {twitch_title}\n\nArchived by UTA."
 UTA_YOUTUBE_API_SCOPES: list = ["https://www.googleapis.com/auth/youtube.force-ssl"]
@@ -107,10 +165,39 @@ UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED: bool = True
 UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES: int = 2
 UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS: int = 15
 UTA_FFMPEG_STARTUP_WAIT_SECONDS: int = 10
+UTA_YOUTUBE_PLAYABILITY_CHECK_MODE: str = "health" # "health" (liveStreams.list streamStatus, streamlink probe as fallback) or "streamlink"
+UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS: float = 1.0 # Health mode: first poll delay, doubled after each poll (capped at 16s)
+UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS: int = 60 # Health mode: how long to wait for "active" before falling back to the streamlink probe
+UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS: int = 60 # Health mode: re-check stream health while the pipe runs (0 = off; 1 quota unit per check)
 UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED: bool = True
 UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS: int = 60
 UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER: str = "## UTA Auto Chapters ##"
+UTA_CHAPTER_CHECKPOINT_FILE: str = "chapter_checkpoint.json" # Live game segments of the current session, so a restart keeps them
 UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE: str = "{game_name} - {twitch_title}"
+UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED: bool = False # Also write the restream to a local FLV file, fed by the same Streamlink ingest
+UTA_RESTREAM_LOCAL_ARCHIVE_DIR: str = "restream_archive"
+UTA_RESTREAM_EXTRA_RTMP_TARGETS: list = [] # Full RTMP URLs (incl. key) that get the same stream as YouTube
+UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS: int = 60 # 0 disables the per-output bandwidth/CPU report
+UTA_RESTREAM_METRICS_LOG_FILE: str = "restream_metrics.bin" # FFmpeg -progress snapshots (bitrate, fps, speed, drop/dup frames)
+UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS: int = 30 # 0 disables the metrics log and the GUI line
+UTA_RESTREAM_STALL_DETECTION_ENABLED: bool = True # Restart a frozen/slow side of the pipe in place instead of waiting for FFmpeg to exit
+UTA_RESTREAM_STALL_MIN_SPEED: float = 0.9 # FFmpeg speed below this for UTA_RESTREAM_STALL_SLOW_SECONDS counts as a stall
+UTA_RESTREAM_STALL_SLOW_SECONDS: int = 60
+UTA_RESTREAM_STALL_NO_DATA_SECONDS: int = 20 # No FFmpeg progress for this long counts as a stall
+UTA_RESTREAM_STALL_MAX_RESTARTS: int = 3 # In-place restarts per pipe before it's treated as failed
+UTA_RESTREAM_STALL_LOG_FILE: str = "restream_stalls.jsonl" # One line per stall: cause, side restarted, recovery time
+UTA_RESTREAM_INGEST_MODE: str = "cli" # "cli" (streamlink executable) or "session" (in-process via the streamlink library, with a jitter buffer)
+UTA_RESTREAM_INGEST_BUFFER_SECONDS: float = 8.0 # Session mode: jitter buffer size (sized for 8 Mbps)
+UTA_RESTREAM_INGEST_PREBUFFER_SECONDS: float = 2.0 # Session mode: buffered before FFmpeg is fed, at start and after an underrun
+UTA_RESTREAM_AUDIO_MODE: str = "auto" # "auto" (copy if the ingest's audio is YouTube-compatible), "copy" or "transcode"
+UTA_RESTREAM_WARM_RESTART_ENABLED: bool = True # Reuse the resolved stream URL while its token is valid, and skip the cooldown after a first failure
+UTA_RESTREAM_STANDBY_INGEST_ENABLED: bool = False # If FFmpeg dies while the ingest is still up, re-attach a new FFmpeg to it
+UTA_RECORDER_ENABLED: bool = False # Segmented local recording of the restream ingest, indexed for !utalocalvod
+UTA_RECORDER_DIR: str = "recordings"
+UTA_RECORDER_SEGMENT_SECONDS: int = 60
+UTA_RECORDER_SEGMENT_FORMAT: str = "mpegts" # "mpegts" or "fmp4"
+UTA_RECORDER_RETENTION_MAX_GB: float = 50.0 # 0 = no size limit
+UTA_RECORDER_RETENTION_MAX_HOURS: float = 0.0 # 0 = no age limit
 
 # New Twitch Chat Configs
 TWITCH_CHAT_ENABLED: bool = False
@@ -127,6 +214,8 @@ uta_broadcaster_id_cache: str = None
 uta_shared_access_token: str = None
 uta_token_expiry_time: float = 0.0 # Unix timestamp
 _are_uta_threads_active: bool = False # For internal tracking within config_manager, primarily used by services to know thread status
+UTA_WORKER_ID: str = None # Set only inside a coordinator-mode worker process
+uta_worker_channel_scope: set = None # Lowercased channels this worker holds leases for; None = every configured channel
 
 uta_is_restreaming_active: bool = False
 twitch_session_active_global: bool = False # Tracks if the target Twitch channel is live (updated by StatusService)
@@ -143,6 +232,7 @@ UTA_STREAMLINK_PID: int = None
 UTA_PIPE_START_TIME_UTC: datetime = None # Stores the UTC datetime of when the current VOD part's ffmpeg pipe started
 UTA_RESTREAM_CONSECUTIVE_FAILURES: int = 0
 UTA_LAST_PLAYABILITY_CHECK_STATUS: str = "N/A"
+UTA_LAST_YT_STREAM_HEALTH: str = "N/A" # Latest liveStreams.list status/health of the bound stream, health mode only
 
 uta_yt_service = None # YouTube API service object
 
@@ -185,6 +275,22 @@ def load_config(initial_load=False):
         if initial_load: print(err_msg); sys.exit(1)
         logger.error(f"Reload Attempt: {err_msg}"); return False, err_msg
 
+def _parse_channel_list(raw_value) -> list:
+    # Accepts a JSON list or the comma-separated string the GUI saves.
+    if not raw_value:
+        return []
+    if isinstance(raw_value, str):
+        raw_value = raw_value.split(',')
+    return [str(name).strip().lstrip('#').lower() for name in raw_value if str(name).strip().lstrip('#')]
+
+def _parse_url_list(raw_value) -> list:
+    # Same input forms as _parse_channel_list, but URLs keep their case (stream keys are case-sensitive).
+    if not raw_value:
+        return []
+    if isinstance(raw_value, str):
+        raw_value = raw_value.split(',')
+    return [str(url).strip() for url in raw_value if str(url).strip()]
+
 def apply_config_globally(source_config_dict):
     logger.info("Applying configuration dictionary to global variables...")
     global DISCORD_TOKEN, FCTD_TWITCH_USERNAME, TWITCH_CLIENT_ID, TWITCH_CLIENT_SECRET, \
@@ -192,12 +298,24 @@ def apply_config_globally(source_config_dict):
            FCTD_UPDATE_INTERVAL_MINUTES, FCTD_CHANNEL_NAME_PREFIX, FCTD_CHANNEL_NAME_SUFFIX, \
            FCTD_FOLLOWER_DATA_FILE, owner_id_from_config, \
            UTA_STREAM_DURATION_LOG_FILE, UTA_ENABLED, UTA_TWITCH_CHANNEL_NAME, \
+           UTA_ADDITIONAL_TWITCH_CHANNELS, UTA_CHANNEL_LOG_DIR, \
+           UTA_LOOKUP_CACHE_FILE, UTA_LOOKUP_CACHE_MAX_ENTRIES, \
+           UTA_LOOKUP_CACHE_ID_TTL_SECONDS, UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS, \
+           UTA_EVENTSUB_ENABLED, UTA_EVENTSUB_WS_URL, UTA_EVENTSUB_SUBSCRIPTIONS_URL, \
+           UTA_EVENTSUB_USER_TOKEN, UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS, UTA_EVENTSUB_RECORD_FILE, \
+           UTA_ADAPTIVE_POLLING_ENABLED, UTA_ADAPTIVE_POLL_MIN_SECONDS, UTA_ADAPTIVE_POLL_MAX_SECONDS, \
+           UTA_ADAPTIVE_POLL_HISTORY_DAYS, UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD, \
+           UTA_ADAPTIVE_POLL_POST_END_SECONDS, UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS, \
+           UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD, UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS, \
+           UTA_WATCHDOG_ENABLED, UTA_WATCHDOG_STALL_SECONDS, UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS, \
+           UTA_WORKER_PROCESSES, UTA_WORKER_LEASE_DB_FILE, UTA_WORKER_LEASE_SECONDS, UTA_WORKER_MAX_CHANNELS, \
+           UTA_TWITCH_API_BASE_URL, UTA_TWITCH_AUTH_URL, UTA_YOUTUBE_API_ROOT_URL, UTA_DISCORD_WEBHOOK_BASE_URL, \
            UTA_CLIP_MONITOR_ENABLED, UTA_DISCORD_WEBHOOK_URL_CLIPS, \
            UTA_CHECK_INTERVAL_SECONDS_CLIPS, UTA_CLIP_LOOKBACK_MINUTES, \
            UTA_RESTREAMER_ENABLED, UTA_DISCORD_WEBHOOK_URL_RESTREAMER, \
            UTA_YOUTUBE_RTMP_URL_BASE, UTA_YOUTUBE_STREAM_KEY, \
            UTA_CHECK_INTERVAL_SECONDS_RESTREAMER, UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE, \
-           UTA_POST_RESTREAM_COOLDOWN_SECONDS, UTA_STREAMLINK_PATH, UTA_FFMPEG_PATH, \
+           UTA_POST_RESTREAM_COOLDOWN_SECONDS, UTA_STREAMLINK_PATH, UTA_FFMPEG_PATH, UTA_FFPROBE_PATH, \
            UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED, UTA_STREAM_STATUS_WEBHOOK_URL, \
            UTA_STREAM_STATUS_CHANNEL_ID, UTA_STREAM_STATUS_POLL_INTERVAL_SECONDS, \
            UTA_STREAM_ACTIVITY_LOG_FILE, UTA_VIEWER_COUNT_LOGGING_ENABLED, \
@@ -205,13 +323,27 @@ def apply_config_globally(source_config_dict):
            BOT_SESSION_LOG_FILE_PATH, \
            UTA_YOUTUBE_API_ENABLED, UTA_YOUTUBE_CLIENT_SECRET_FILE, UTA_YOUTUBE_TOKEN_FILE, \
            UTA_YOUTUBE_PLAYLIST_ID, UTA_YOUTUBE_DEFAULT_PRIVACY, \
-           UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM, UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS, \
+           UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM, UTA_YOUTUBE_BATCH_REQUESTS_ENABLED, UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS, \
+           UTA_YOUTUBE_QUOTA_DAILY_LIMIT, UTA_YOUTUBE_QUOTA_RESERVE_UNITS, UTA_YOUTUBE_QUOTA_LEDGER_FILE, \
+           UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED, \
+           UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED, UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS, UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS, \
            UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE, UTA_YOUTUBE_DYNAMIC_DESCRIPTION_TEMPLATE, \
            UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES, UTA_RESTREAM_LONG_COOLDOWN_SECONDS, \
            UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED, UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES, \
            UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS, UTA_FFMPEG_STARTUP_WAIT_SECONDS, \
+           UTA_YOUTUBE_PLAYABILITY_CHECK_MODE, UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS, \
+           UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS, UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS, \
            UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED, UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS, \
-           UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER, UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE, \
+           UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER, UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE, UTA_CHAPTER_CHECKPOINT_FILE, \
+           UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED, UTA_RESTREAM_LOCAL_ARCHIVE_DIR, \
+           UTA_RESTREAM_EXTRA_RTMP_TARGETS, UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS, \
+           UTA_RESTREAM_METRICS_LOG_FILE, UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS, \
+           UTA_RESTREAM_STALL_DETECTION_ENABLED, UTA_RESTREAM_STALL_MIN_SPEED, UTA_RESTREAM_STALL_SLOW_SECONDS, \
+           UTA_RESTREAM_STALL_NO_DATA_SECONDS, UTA_RESTREAM_STALL_MAX_RESTARTS, UTA_RESTREAM_STALL_LOG_FILE, \
+           UTA_RESTREAM_INGEST_MODE, UTA_RESTREAM_INGEST_BUFFER_SECONDS, UTA_RESTREAM_INGEST_PREBUFFER_SECONDS, \
+           UTA_RESTREAM_AUDIO_MODE, UTA_RESTREAM_WARM_RESTART_ENABLED, UTA_RESTREAM_STANDBY_INGEST_ENABLED, \
+           UTA_RECORDER_ENABLED, UTA_RECORDER_DIR, UTA_RECORDER_SEGMENT_SECONDS, UTA_RECORDER_SEGMENT_FORMAT, \
+           UTA_RECORDER_RETENTION_MAX_GB, UTA_RECORDER_RETENTION_MAX_HOURS, \
            TWITCH_CHAT_ENABLED, TWITCH_CHAT_NICKNAME, TWITCH_CHAT_OAUTH_TOKEN, \
            TWITCH_CHAT_LOG_INTERVAL_SECONDS, TWITCH_CHAT_ACTIVITY_LOG_FILE, \
            DISCORD_TWITCH_CHAT_MIRROR_ENABLED, DISCORD_TWITCH_CHAT_MIRROR_CHANNEL_ID, \
@@ -237,6 +369,38 @@ def apply_config_globally(source_config_dict):
     if old_uta_twitch_channel_name != UTA_TWITCH_CHANNEL_NAME and UTA_TWITCH_CHANNEL_NAME is not None:
         logger.info(f"UTA Twitch channel name changed from '{old_uta_twitch_channel_name}' to '{UTA_TWITCH_CHANNEL_NAME}'. Clearing broadcaster ID cache.")
         uta_broadcaster_id_cache = None
+    UTA_ADDITIONAL_TWITCH_CHANNELS = _parse_channel_list(source_config_dict.get('UTA_ADDITIONAL_TWITCH_CHANNELS', []))
+    UTA_CHANNEL_LOG_DIR = source_config_dict.get('UTA_CHANNEL_LOG_DIR', "channel_logs")
+    UTA_LOOKUP_CACHE_FILE = source_config_dict.get('UTA_LOOKUP_CACHE_FILE', "twitch_lookup_cache.json")
+    UTA_LOOKUP_CACHE_MAX_ENTRIES = source_config_dict.get('UTA_LOOKUP_CACHE_MAX_ENTRIES', 500)
+    UTA_LOOKUP_CACHE_ID_TTL_SECONDS = source_config_dict.get('UTA_LOOKUP_CACHE_ID_TTL_SECONDS', 604800)
+    UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS = source_config_dict.get('UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS', 900)
+    UTA_EVENTSUB_ENABLED = source_config_dict.get('UTA_EVENTSUB_ENABLED', False)
+    UTA_EVENTSUB_WS_URL = source_config_dict.get('UTA_EVENTSUB_WS_URL', "wss://eventsub.wss.twitch.tv/ws")
+    UTA_EVENTSUB_SUBSCRIPTIONS_URL = source_config_dict.get('UTA_EVENTSUB_SUBSCRIPTIONS_URL', "https://api.twitch.tv/helix/eventsub/subscriptions")
+    UTA_EVENTSUB_USER_TOKEN = source_config_dict.get('UTA_EVENTSUB_USER_TOKEN', "")
+    UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS = source_config_dict.get('UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS', 300)
+    UTA_EVENTSUB_RECORD_FILE = source_config_dict.get('UTA_EVENTSUB_RECORD_FILE', "")
+    UTA_ADAPTIVE_POLLING_ENABLED = source_config_dict.get('UTA_ADAPTIVE_POLLING_ENABLED', False)
+    UTA_ADAPTIVE_POLL_MIN_SECONDS = source_config_dict.get('UTA_ADAPTIVE_POLL_MIN_SECONDS', 10)
+    UTA_ADAPTIVE_POLL_MAX_SECONDS = source_config_dict.get('UTA_ADAPTIVE_POLL_MAX_SECONDS', 300)
+    UTA_ADAPTIVE_POLL_HISTORY_DAYS = source_config_dict.get('UTA_ADAPTIVE_POLL_HISTORY_DAYS', 56)
+    UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD = float(source_config_dict.get('UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD', 0.25))
+    UTA_ADAPTIVE_POLL_POST_END_SECONDS = source_config_dict.get('UTA_ADAPTIVE_POLL_POST_END_SECONDS', 900)
+    UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS = source_config_dict.get('UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS', 3)
+    UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD = source_config_dict.get('UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5)
+    UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS = source_config_dict.get('UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS', 60)
+    UTA_WATCHDOG_ENABLED = source_config_dict.get('UTA_WATCHDOG_ENABLED', True)
+    UTA_WATCHDOG_STALL_SECONDS = source_config_dict.get('UTA_WATCHDOG_STALL_SECONDS', 300)
+    UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS = source_config_dict.get('UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS', 600)
+    UTA_WORKER_PROCESSES = source_config_dict.get('UTA_WORKER_PROCESSES', 0)
+    UTA_WORKER_LEASE_DB_FILE = source_config_dict.get('UTA_WORKER_LEASE_DB_FILE', "uta_worker_leases.sqlite3")
+    UTA_WORKER_LEASE_SECONDS = source_config_dict.get('UTA_WORKER_LEASE_SECONDS', 30)
+    UTA_WORKER_MAX_CHANNELS = source_config_dict.get('UTA_WORKER_MAX_CHANNELS', 0)
+    UTA_TWITCH_API_BASE_URL = (source_config_dict.get('UTA_TWITCH_API_BASE_URL') or "https://api.twitch.tv/helix").rstrip('/')
+    UTA_TWITCH_AUTH_URL = source_config_dict.get('UTA_TWITCH_AUTH_URL') or "https://id.twitch.tv/oauth2/token"
+    UTA_YOUTUBE_API_ROOT_URL = source_config_dict.get('UTA_YOUTUBE_API_ROOT_URL', "")
+    UTA_DISCORD_WEBHOOK_BASE_URL = source_config_dict.get('UTA_DISCORD_WEBHOOK_BASE_URL', "")
     UTA_CLIP_MONITOR_ENABLED = source_config_dict.get('UTA_CLIP_MONITOR_ENABLED', False)
     UTA_DISCORD_WEBHOOK_URL_CLIPS = source_config_dict.get('UTA_DISCORD_WEBHOOK_URL_CLIPS')
     UTA_CHECK_INTERVAL_SECONDS_CLIPS = source_config_dict.get('UTA_CHECK_INTERVAL_SECONDS_CLIPS', 300)
@@ -250,6 +414,7 @@ def apply_config_globally(source_config_dict):
     UTA_POST_RESTREAM_COOLDOWN_SECONDS = source_config_dict.get('UTA_POST_RESTREAM_COOLDOWN_SECONDS', 60)
     UTA_STREAMLINK_PATH = source_config_dict.get('UTA_STREAMLINK_PATH', "streamlink")
     UTA_FFMPEG_PATH = source_config_dict.get('UTA_FFMPEG_PATH', "ffmpeg")
+    UTA_FFPROBE_PATH = source_config_dict.get('UTA_FFPROBE_PATH', "ffprobe")
     UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED = source_config_dict.get('UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED', False)
     UTA_STREAM_STATUS_WEBHOOK_URL = source_config_dict.get('UTA_STREAM_STATUS_WEBHOOK_URL')
     UTA_STREAM_STATUS_CHANNEL_ID = int(source_config_dict.get('UTA_STREAM_STATUS_CHANNEL_ID')) if source_config_dict.get('UTA_STREAM_STATUS_CHANNEL_ID') else None
@@ -265,7 +430,15 @@ def apply_config_globally(source_config_dict):
     UTA_YOUTUBE_PLAYLIST_ID = source_config_dict.get('UTA_YOUTUBE_PLAYLIST_ID')
     UTA_YOUTUBE_DEFAULT_PRIVACY = source_config_dict.get('UTA_YOUTUBE_DEFAULT_PRIVACY', "unlisted").lower()
     UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM = source_config_dict.get('UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM', False)
+    UTA_YOUTUBE_BATCH_REQUESTS_ENABLED = source_config_dict.get('UTA_YOUTUBE_BATCH_REQUESTS_ENABLED', True)
+    UTA_YOUTUBE_QUOTA_DAILY_LIMIT = source_config_dict.get('UTA_YOUTUBE_QUOTA_DAILY_LIMIT', 10000)
+    UTA_YOUTUBE_QUOTA_RESERVE_UNITS = source_config_dict.get('UTA_YOUTUBE_QUOTA_RESERVE_UNITS', 300)
+    UTA_YOUTUBE_QUOTA_LEDGER_FILE = source_config_dict.get('UTA_YOUTUBE_QUOTA_LEDGER_FILE', "youtube_quota_ledger.json")
+    UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED = source_config_dict.get('UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED', True)
     UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS = source_config_dict.get('UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS', 0.0)
+    UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED = source_config_dict.get('UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED', False)
+    UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS = source_config_dict.get('UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS', 120)
+    UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS = source_config_dict.get('UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS', 30)
     UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE = source_config_dict.get('UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE', "{twitch_username} - {twitch_title} ({game_name}) - Part {part_num} [{date}]")
     UTA_YOUTUBE_DYNAMIC_DESCRIPTION_TEMPLATE = source_config_dict.get('UTA_YOUTUBE_DYNAMIC_DESCRIPTION_TEMPLATE', "Originally streamed by {twitch_username} on Twitch: https://twitch.tv/{twitch_username}\nGame: {game_name}\nTitle: {twitch_title}\n\nArchived by UTA.")
     UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES = source_config_dict.get('UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES', 3)
@@ -274,10 +447,39 @@ def apply_config_globally(source_config_dict):
     UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES = source_config_dict.get('UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES', 2)
     UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS = source_config_dict.get('UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS', 15)
     UTA_FFMPEG_STARTUP_WAIT_SECONDS = source_config_dict.get('UTA_FFMPEG_STARTUP_WAIT_SECONDS', 10)
+    UTA_YOUTUBE_PLAYABILITY_CHECK_MODE = source_config_dict.get('UTA_YOUTUBE_PLAYABILITY_CHECK_MODE', "health")
+    UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS = source_config_dict.get('UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS', 1.0)
+    UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS = source_config_dict.get('UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS', 60)
+    UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS = source_config_dict.get('UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS', 60)
     UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED = source_config_dict.get('UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED', True)
     UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS = source_config_dict.get('UTA_YOUTUBE_MIN_CHAPTER_DURATION_SECONDS', 60)
     UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER = source_config_dict.get('UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER', "## UTA Auto Chapters ##")
+    UTA_CHAPTER_CHECKPOINT_FILE = source_config_dict.get('UTA_CHAPTER_CHECKPOINT_FILE', "chapter_checkpoint.json")
     UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE = source_config_dict.get('UTA_YOUTUBE_CHAPTER_TITLE_TEMPLATE', "{game_name} - {twitch_title}")
+    UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED = source_config_dict.get('UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED', False)
+    UTA_RESTREAM_LOCAL_ARCHIVE_DIR = source_config_dict.get('UTA_RESTREAM_LOCAL_ARCHIVE_DIR', "restream_archive")
+    UTA_RESTREAM_EXTRA_RTMP_TARGETS = _parse_url_list(source_config_dict.get('UTA_RESTREAM_EXTRA_RTMP_TARGETS', []))
+    UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS = source_config_dict.get('UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS', 60)
+    UTA_RESTREAM_METRICS_LOG_FILE = source_config_dict.get('UTA_RESTREAM_METRICS_LOG_FILE', "restream_metrics.bin")
+    UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS = source_config_dict.get('UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS', 30)
+    UTA_RESTREAM_STALL_DETECTION_ENABLED = source_config_dict.get('UTA_RESTREAM_STALL_DETECTION_ENABLED', True)
+    UTA_RESTREAM_STALL_MIN_SPEED = source_config_dict.get('UTA_RESTREAM_STALL_MIN_SPEED', 0.9)
+    UTA_RESTREAM_STALL_SLOW_SECONDS = source_config_dict.get('UTA_RESTREAM_STALL_SLOW_SECONDS', 60)
+    UTA_RESTREAM_STALL_NO_DATA_SECONDS = source_config_dict.get('UTA_RESTREAM_STALL_NO_DATA_SECONDS', 20)
+    UTA_RESTREAM_STALL_MAX_RESTARTS = source_config_dict.get('UTA_RESTREAM_STALL_MAX_RESTARTS', 3)
+    UTA_RESTREAM_STALL_LOG_FILE = source_config_dict.get('UTA_RESTREAM_STALL_LOG_FILE', "restream_stalls.jsonl")
+    UTA_RESTREAM_INGEST_MODE = source_config_dict.get('UTA_RESTREAM_INGEST_MODE', "cli")
+    UTA_RESTREAM_INGEST_BUFFER_SECONDS = source_config_dict.get('UTA_RESTREAM_INGEST_BUFFER_SECONDS', 8.0)
+    UTA_RESTREAM_INGEST_PREBUFFER_SECONDS = source_config_dict.get('UTA_RESTREAM_INGEST_PREBUFFER_SECONDS', 2.0)
+    UTA_RESTREAM_AUDIO_MODE = source_config_dict.get('UTA_RESTREAM_AUDIO_MODE', "auto")
+    UTA_RESTREAM_WARM_RESTART_ENABLED = source_config_dict.get('UTA_RESTREAM_WARM_RESTART_ENABLED', True)
+    UTA_RESTREAM_STANDBY_INGEST_ENABLED = source_config_dict.get('UTA_RESTREAM_STANDBY_INGEST_ENABLED', False)
+    UTA_RECORDER_ENABLED = source_config_dict.get('UTA_RECORDER_ENABLED', False)
+    UTA_RECORDER_DIR = source_config_dict.get('UTA_RECORDER_DIR', "recordings")
+    UTA_RECORDER_SEGMENT_SECONDS = source_config_dict.get('UTA_RECORDER_SEGMENT_SECONDS', 60)
+    UTA_RECORDER_SEGMENT_FORMAT = source_config_dict.get('UTA_RECORDER_SEGMENT_FORMAT', "mpegts")
+    UTA_RECORDER_RETENTION_MAX_GB = source_config_dict.get('UTA_RECORDER_RETENTION_MAX_GB', 50.0)
+    UTA_RECORDER_RETENTION_MAX_HOURS = source_config_dict.get('UTA_RECORDER_RETENTION_MAX_HOURS', 0.0)
 
     # Apply Twitch Chat Monitor Configs
     TWITCH_CHAT_ENABLED = source_config_dict.get('TWITCH_CHAT_ENABLED', False)
@@ -306,6 +508,28 @@ def apply_config_globally(source_config_dict):
 def effective_youtube_api_enabled():
     return UTA_YOUTUBE_API_ENABLED and GOOGLE_API_AVAILABLE
 
+def effective_streamlink_session_ingest():
+    # Session ingest needs the streamlink library; without it the CLI is used.
+    return UTA_RESTREAM_INGEST_MODE == "session" and STREAMLINK_LIB_AVAILABLE
+
+def get_uta_configured_channels() -> list:
+    """UTA_TWITCH_CHANNEL_NAME first, then UTA_ADDITIONAL_TWITCH_CHANNELS, de-duplicated case-insensitively."""
+    channels = []
+    for name in [UTA_TWITCH_CHANNEL_NAME] + list(UTA_ADDITIONAL_TWITCH_CHANNELS or []):
+        if name and name.lower() not in [c.lower() for c in channels]:
+            channels.append(name)
+    return channels
+
+def get_uta_monitored_channels() -> list:
+    # In a worker process only the leased channels are monitored here; everywhere else this is every configured channel.
+    channels = get_uta_configured_channels()
+    if uta_worker_channel_scope is None:
+        return channels
+    return [c for c in channels if c.lower() in uta_worker_channel_scope]
+
+def is_primary_uta_channel(channel_name: str) -> bool:
+    return bool(channel_name and UTA_TWITCH_CHANNEL_NAME and channel_name.lower() == UTA_TWITCH_CHANNEL_NAME.lower())
+
 _initial_success, _initial_config_data_dict = load_config(initial_load=True)
 if not _initial_success:
     sys.exit(1)
@@ -9,6 +9,7 @@ from uta_bot import config_manager
 from uta_bot.utils.data_logging import log_bot_session_event, BOT_EVENT_START, BOT_EVENT_STOP
 from uta_bot.core.background_tasks import update_channel_name_and_log_followers 
 from uta_bot.services.threading_manager import start_all_services, stop_all_services # shutdown_event is also there
+from uta_bot.services.twitch_api_handler import get_fctd_user_id_cached
 
 
 @bot.event
@@ -28,7 +29,7 @@ async def on_ready():
 
     if config_manager.FCTD_TWITCH_USERNAME and config_manager.fctd_twitch_api:
         config_manager.logger.info(f'fctd: Targeting Twitch User for followers: {config_manager.FCTD_TWITCH_USERNAME}')
-        config_manager.fctd_current_twitch_user_id = await config_manager.fctd_twitch_api.get_user_id(config_manager.FCTD_TWITCH_USERNAME)
+        config_manager.fctd_current_twitch_user_id = await get_fctd_user_id_cached(config_manager.FCTD_TWITCH_USERNAME)
         if not config_manager.fctd_current_twitch_user_id:
             config_manager.logger.error(f"fctd: CRITICAL: Could not get Twitch User ID for {config_manager.FCTD_TWITCH_USERNAME}. Follower features will FAIL.")
         else:
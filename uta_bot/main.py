@@ -62,7 +62,8 @@ if __name__ == "__main__":
         if config_manager.UTA_ENABLED: 
             config_manager.logger.info("Main Shutdown: Initiating stop for UTA services.")
             
-            if bot.loop and not bot.loop.is_closed() and bot.loop.is_running():
+            # Service tasks live on this loop, so they have to be cancelled and awaited on it rather than on a fresh one.
+            if not loop.is_closed():
                  try:
                     loop.run_until_complete(stop_all_services())
                  except RuntimeError as rerr: 
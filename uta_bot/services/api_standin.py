@@ -0,0 +1,618 @@
+"""
+Local stand-in for the Twitch Helix/OAuth, YouTube Data API and Discord webhook endpoints UTA calls,
+for running the services and load/regression benchmarks without live credentials.
+
+    python -m uta_bot.services.api_standin --port 8780 --live somechannel --latency-ms 80 --error-rate 0.02
+
+then point the bot at it:
+    "UTA_TWITCH_API_BASE_URL": "http://127.0.0.1:8780/helix",
+    "UTA_TWITCH_AUTH_URL": "http://127.0.0.1:8780/oauth2/token",
+    "UTA_YOUTUBE_API_ROOT_URL": "http://127.0.0.1:8780/",
+    "UTA_DISCORD_WEBHOOK_BASE_URL": "http://127.0.0.1:8780/api"
+
+Fault injection (--latency-ms, --jitter-ms, --error-rate, --rate-limit) applies per service group
+(twitch/youtube/discord) and can be changed at runtime with POST /_mock/faults {"group": "twitch", "error_rate": 0.5}.
+Rate-limited groups send the platform's rate-limit headers and answer 429 once the per-minute budget is spent.
+
+Record/replay: --record traffic.jsonl --proxy forwards every call to the real upstream and appends the
+(sanitised) responses; --replay traffic.jsonl serves them back in order per route, falling through to the
+synthetic handlers for anything not recorded.
+
+Control endpoints: GET /_mock/stats, POST /_mock/stats/reset, POST /_mock/faults,
+POST /_mock/channels/{login} {"live": true, "title": ..., "viewer_count": ...}, POST /_mock/channels/{login}/clips.
+
+Benchmark the bot's own request path against a running stand-in:
+    python -m uta_bot.services.api_standin --bench http://127.0.0.1:8780 --requests 2000 --concurrency 16
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone, timedelta
+
+from aiohttp import web, ClientSession, ClientTimeout, ClientError
+
+logger = logging.getLogger("api_standin")
+
+SERVICE_GROUPS = ("twitch", "youtube", "discord")
+# Path prefix -> (service group, real upstream origin used by --proxy)
+ROUTE_PREFIXES = (
+    ("/oauth2/", "twitch", "https://id.twitch.tv"),
+    ("/helix/", "twitch", "https://api.twitch.tv"),
+    ("/youtube/v3/", "youtube", "https://youtube.googleapis.com"),
+    ("/upload/youtube/v3/", "youtube", "https://youtube.googleapis.com"),
+    ("/api/", "discord", "https://discord.com"),
+)
+SECRET_QUERY_PARAMS = ("client_secret", "client_id", "key", "access_token", "refresh_token", "code")
+VOLATILE_QUERY_PARAMS = ("started_at", "ended_at", "alt") # Differ on every call; ignored when matching replays
+RECORDED_RESPONSE_HEADERS = ("content-type", "ratelimit-limit", "ratelimit-remaining", "ratelimit-reset",
+                             "x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset-after", "retry-after")
+
+
+def _now_iso(offset_seconds: float = 0) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _group_for_path(path: str):
+    for prefix, group, upstream in ROUTE_PREFIXES:
+        if path.startswith(prefix):
+            return group, upstream
+    return None, None
+
+
+def _route_key(path: str) -> str:
+    # Webhook paths carry the webhook's secret token (and optionally an API version); collapse them to one route.
+    parts = path.split('/')
+    if path.startswith("/api/") and "webhooks" in parts:
+        return "/api/webhooks/{id}/{token}"
+    return path
+
+
+def _canonical_query(query_items) -> str:
+    kept = sorted((k, v) for k, v in query_items if k not in SECRET_QUERY_PARAMS and k not in VOLATILE_QUERY_PARAMS)
+    return "&".join(f"{k}={v}" for k, v in kept)
+
+
+def _sanitize_query(query_items) -> list:
+    return [[k, "REDACTED" if k in SECRET_QUERY_PARAMS else v] for k, v in query_items]
+
+
+def _google_error(status: int, reason: str, message: str) -> web.Response:
+    return web.json_response({"error": {"code": status, "message": message,
+                                        "errors": [{"message": message, "domain": "youtube.api", "reason": reason}]}}, status=status)
+
+
+class FaultProfile:
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0, rate_limit_per_minute: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self._window_started_at = time.time()
+        self._window_used = 0
+
+    def update(self, changes: dict):
+        for field in ("latency_ms", "jitter_ms", "error_rate", "rate_limit_per_minute"):
+            if field in changes:
+                setattr(self, field, type(getattr(self, field))(changes[field]))
+
+    def consume_rate_limit(self):
+        """Returns (allowed, remaining, reset_unix) for a fixed one-minute window, or None when unlimited."""
+        if self.rate_limit_per_minute <= 0:
+            return None
+        now = time.time()
+        if now - self._window_started_at >= 60:
+            self._window_started_at, self._window_used = now, 0
+        allowed = self._window_used < self.rate_limit_per_minute
+        if allowed:
+            self._window_used += 1
+        return allowed, self.rate_limit_per_minute - self._window_used, self._window_started_at + 60
+
+    def injected_delay_seconds(self) -> float:
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def as_dict(self) -> dict:
+        return {"latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms, "error_rate": self.error_rate,
+                "rate_limit_per_minute": self.rate_limit_per_minute}
+
+
+class MockChannel:
+    def __init__(self, login: str, **overrides):
+        self.login = login.lower()
+        self.user_id = overrides.get("id") or str(10000000 + int(hashlib.md5(self.login.encode()).hexdigest()[:8], 16) % 89999999)
+        self.display_name = overrides.get("display_name", login)
+        self.title = overrides.get("title", f"{login} mock stream")
+        self.game_id = str(overrides.get("game_id", "509658"))
+        self.game_name = overrides.get("game_name", "Just Chatting")
+        self.tags = list(overrides.get("tags", ["English"]))
+        self.viewer_count = int(overrides.get("viewer_count", 100))
+        self.followers = int(overrides.get("followers", 1000))
+        self.stream_id = None
+        self.started_at = None
+        self.clips = [] # Helix clip entries, newest last
+        if overrides.get("live"):
+            self.go_live()
+
+    def go_live(self):
+        if not self.stream_id:
+            self.stream_id = str(random.randint(10 ** 10, 10 ** 11 - 1))
+            self.started_at = _now_iso()
+
+    def go_offline(self):
+        self.stream_id, self.started_at = None, None
+
+    def apply(self, changes: dict):
+        for field in ("display_name", "title", "game_id", "game_name", "tags", "viewer_count", "followers"):
+            if field in changes:
+                setattr(self, field, changes[field])
+        if "live" in changes:
+            self.go_live() if changes["live"] else self.go_offline()
+
+    def add_clip(self, title: str = None) -> dict:
+        clip_id = f"MockClip{uuid.uuid4().hex[:12]}"
+        clip = {"id": clip_id, "url": f"https://clips.twitch.tv/{clip_id}", "embed_url": f"https://clips.twitch.tv/embed?clip={clip_id}",
+                "broadcaster_id": self.user_id, "broadcaster_name": self.display_name, "creator_id": "1", "creator_name": "mockclipper",
+                "video_id": "", "game_id": self.game_id, "language": "en", "title": title or f"Clip of {self.title}",
+                "view_count": 1, "created_at": _now_iso(), "thumbnail_url": "", "duration": 30.0, "vod_offset": None}
+        self.clips.append(clip)
+        return clip
+
+    def user_entry(self) -> dict:
+        return {"id": self.user_id, "login": self.login, "display_name": self.display_name, "type": "", "broadcaster_type": "",
+                "description": f"Mock channel {self.login}", "profile_image_url": "", "offline_image_url": "", "view_count": 0,
+                "created_at": "2016-01-01T00:00:00Z"}
+
+    def stream_entry(self) -> dict:
+        return {"id": self.stream_id, "user_id": self.user_id, "user_login": self.login, "user_name": self.display_name,
+                "game_id": self.game_id, "game_name": self.game_name, "type": "live", "title": self.title,
+                "viewer_count": self.viewer_count, "started_at": self.started_at, "language": "en",
+                "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/live_user_{self.login}-{{width}}x{{height}}.jpg",
+                "tag_ids": [], "tags": self.tags, "is_mature": False}
+
+    def channel_entry(self) -> dict:
+        return {"broadcaster_id": self.user_id, "broadcaster_login": self.login, "broadcaster_name": self.display_name,
+                "broadcaster_language": "en", "game_id": self.game_id, "game_name": self.game_name, "title": self.title,
+                "delay": 0, "tags": self.tags, "content_classification_labels": [], "is_branded_content": False}
+
+
+class RecordedTraffic:
+    """Responses from a --record file, served in order per (method, route, query) and repeating the last one."""
+
+    def __init__(self, filepath: str):
+        self.responses = {} # (method, route, canonical query) -> deque of records
+        self.responses_by_route = {} # (method, route) -> deque, used when the exact query was never recorded
+        self.record_count = 0
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    logger.warning(f"Skipping line {line_number} of {filepath}: {e}")
+                    continue
+                route = _route_key(record["path"])
+                self.responses.setdefault((record["method"], route, _canonical_query(record.get("query", []))), deque()).append(record)
+                self.responses_by_route.setdefault((record["method"], route), deque()).append(record)
+                self.record_count += 1
+
+    def match(self, method: str, path: str, query_items):
+        route = _route_key(path)
+        queue = self.responses.get((method, route, _canonical_query(query_items))) or self.responses_by_route.get((method, route))
+        if not queue:
+            return None
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+
+class ApiStandinServer:
+    def __init__(self, channels: dict = None, default_faults: dict = None, replay: RecordedTraffic = None,
+                 record_file: str = None, proxy: bool = False, rtmp_ingest_url: str = "rtmp://127.0.0.1:1935/live2",
+                 upstream_override: str = None):
+        self.channels = channels or {} # login -> MockChannel
+        self.fault_profiles = {group: FaultProfile(**(default_faults or {})) for group in SERVICE_GROUPS}
+        self.replay = replay
+        self.record_file = record_file
+        self.proxy = proxy
+        self.upstream_override = upstream_override.rstrip('/') if upstream_override else None
+        self.rtmp_ingest_url = rtmp_ingest_url
+        self.youtube_streams = {}
+        self.youtube_stream_created_at = {}
+        self.youtube_videos = {} # Broadcast ids double as video ids, as on YouTube
+        self.youtube_playlist_items = set()
+        self.issued_tokens = set()
+        self._http_session = None
+        self.reset_stats()
+
+    # --- Stats ---
+    def reset_stats(self):
+        self.stats_started_at = time.time()
+        self.route_stats = {} # "GROUP METHOD route" -> {"count", "statuses", "injected_delay_ms", "source"}
+
+    def _note_request(self, group: str, method: str, route: str, status: int, injected_delay_seconds: float, source: str):
+        entry = self.route_stats.setdefault(f"{group} {method} {route}", {"count": 0, "statuses": {}, "injected_delay_ms": 0.0, "sources": {}})
+        entry["count"] += 1
+        entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+        entry["sources"][source] = entry["sources"].get(source, 0) + 1
+        entry["injected_delay_ms"] += injected_delay_seconds * 1000
+
+    def stats(self) -> dict:
+        elapsed = max(0.001, time.time() - self.stats_started_at)
+        total = sum(entry["count"] for entry in self.route_stats.values())
+        routes = {}
+        for name, entry in sorted(self.route_stats.items()):
+            routes[name] = dict(entry, mean_injected_delay_ms=round(entry["injected_delay_ms"] / entry["count"], 1))
+        return {"elapsed_seconds": round(elapsed, 1), "total_requests": total, "requests_per_second": round(total / elapsed, 2),
+                "faults": {group: profile.as_dict() for group, profile in self.fault_profiles.items()}, "routes": routes}
+
+    # --- Channels ---
+    def get_channel(self, login: str = None, user_id: str = None) -> MockChannel:
+        if login:
+            login = login.lower()
+            if login not in self.channels:
+                self.channels[login] = MockChannel(login) # Any login exists, offline, so whatever the bot is configured for works
+            return self.channels[login]
+        return next((c for c in self.channels.values() if c.user_id == str(user_id)), None)
+
+    # --- Request pipeline ---
+    def _rate_limit_headers(self, group: str, rate_state) -> dict:
+        if rate_state is None:
+            return {}
+        _, remaining, reset_at = rate_state
+        limit = self.fault_profiles[group].rate_limit_per_minute
+        if group == "discord":
+            return {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(max(0, remaining)),
+                    "X-RateLimit-Reset-After": f"{max(0.0, reset_at - time.time()):.3f}"}
+        return {"Ratelimit-Limit": str(limit), "Ratelimit-Remaining": str(max(0, remaining)), "Ratelimit-Reset": str(int(reset_at))}
+
+    def _rate_limited_response(self, group: str, rate_state) -> web.Response:
+        retry_after = max(0.0, rate_state[2] - time.time())
+        headers = dict(self._rate_limit_headers(group, rate_state), **{"Retry-After": str(int(retry_after) + 1)})
+        if group == "discord":
+            return web.json_response({"message": "You are being rate limited.", "retry_after": round(retry_after, 3), "global": False},
+                                     status=429, headers=headers)
+        if group == "youtube":
+            response = _google_error(429, "rateLimitExceeded", "The request cannot be completed because you have exceeded your quota.")
+            response.headers.update(headers)
+            return response
+        return web.json_response({"error": "Too Many Requests", "status": 429, "message": "Rate limit exceeded"}, status=429, headers=headers)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        path = request.path
+        if path.startswith("/_mock/"):
+            return await self.handle_control(request)
+        group, upstream = _group_for_path(path)
+        if group is None:
+            return web.json_response({"error": "Not Found", "status": 404, "message": f"No stand-in for {path}"}, status=404)
+        query_items = list(request.query.items())
+
+        if self.proxy:
+            response, latency_seconds = await self._proxy(request, self.upstream_override or upstream)
+            self._note_request(group, request.method, _route_key(path), response.status, 0, "proxy")
+            return response
+
+        profile = self.fault_profiles[group]
+        rate_state = profile.consume_rate_limit()
+        if rate_state is not None and not rate_state[0]:
+            self._note_request(group, request.method, _route_key(path), 429, 0, "rate_limit")
+            return self._rate_limited_response(group, rate_state)
+
+        delay_seconds = profile.injected_delay_seconds()
+        if delay_seconds:
+            await asyncio.sleep(delay_seconds)
+
+        source = "synthetic"
+        if profile.error_rate > 0 and random.random() < profile.error_rate:
+            response, source = web.json_response({"error": "Service Unavailable", "status": 503, "message": "Injected fault"}, status=503), "fault"
+        else:
+            recorded = self.replay.match(request.method, path, query_items) if self.replay else None
+            if recorded:
+                response, source = web.Response(status=recorded["status"], text=recorded.get("body", ""), headers={
+                    k: v for k, v in recorded.get("headers", {}).items() if k.lower() != "content-length"}), "replay"
+            else:
+                response = await self._dispatch(group, request)
+        response.headers.update(self._rate_limit_headers(group, rate_state))
+        self._note_request(group, request.method, _route_key(path), response.status, delay_seconds, source)
+        return response
+
+    async def _proxy(self, request: web.Request, upstream: str):
+        if self._http_session is None:
+            self._http_session = ClientSession(timeout=ClientTimeout(total=30))
+        body = await request.read()
+        forward_headers = {k: v for k, v in request.headers.items() if k.lower() not in ("host", "content-length", "accept-encoding")}
+        started_at = time.monotonic()
+        try:
+            async with self._http_session.request(request.method, f"{upstream}{request.path_qs}", headers=forward_headers, data=body or None) as upstream_response:
+                response_body = await upstream_response.text()
+                latency_seconds = time.monotonic() - started_at
+                kept_headers = {k: v for k, v in upstream_response.headers.items() if k.lower() in RECORDED_RESPONSE_HEADERS}
+                status = upstream_response.status
+        except (ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Proxy to {upstream}{request.path} failed: {e!r}") # Not recorded; a replay should reflect the API, not our network
+            return web.json_response({"error": "Bad Gateway", "status": 502, "message": str(e)}, status=502), time.monotonic() - started_at
+        if self.record_file:
+            self._append_record(request, status, kept_headers, response_body, latency_seconds)
+        return web.Response(status=status, text=response_body, headers=kept_headers), latency_seconds
+
+    def _append_record(self, request: web.Request, status: int, headers: dict, body: str, latency_seconds: float):
+        if request.path.startswith("/oauth2/"):
+            try: # Never write live tokens to disk
+                token_data = json.loads(body)
+                for field in ("access_token", "refresh_token"):
+                    if field in token_data:
+                        token_data[field] = "recorded-token"
+                body = json.dumps(token_data)
+            except ValueError:
+                pass
+        record = {"recorded_at": time.time(), "method": request.method, "path": _route_key(request.path) if request.path.startswith("/api/") else request.path,
+                  "query": _sanitize_query(request.query.items()), "status": status, "headers": headers, "body": body,
+                  "latency_ms": round(latency_seconds * 1000, 1)}
+        with open(self.record_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+
+    async def _dispatch(self, group: str, request: web.Request) -> web.Response:
+        path, method = request.path, request.method
+        if group == "twitch":
+            if path.startswith("/oauth2/token") and method == "POST":
+                return self._oauth_token()
+            if not request.headers.get("Authorization", "").startswith("Bearer ") or not request.headers.get("Client-ID"):
+                return web.json_response({"error": "Unauthorized", "status": 401, "message": "OAuth token is missing"}, status=401)
+            token = request.headers["Authorization"][len("Bearer "):]
+            if self.issued_tokens and token not in self.issued_tokens and not token.startswith("recorded-"):
+                return web.json_response({"error": "Unauthorized", "status": 401, "message": "Invalid OAuth token"}, status=401)
+            handler = {"/helix/users": self._helix_users, "/helix/streams": self._helix_streams, "/helix/channels": self._helix_channels,
+                       "/helix/channels/followers": self._helix_followers, "/helix/clips": self._helix_clips}.get(path.rstrip('/'))
+            if handler and method == "GET":
+                return handler(request.query)
+        elif group == "youtube":
+            return await self._youtube(request)
+        elif group == "discord" and _route_key(path) == "/api/webhooks/{id}/{token}" and method == "POST":
+            await request.read() # JSON or multipart with an attachment; content isn't checked
+            if request.query.get("wait", "").lower() == "true":
+                return web.json_response({"id": str(random.randint(10 ** 17, 10 ** 18 - 1)), "type": 0, "timestamp": _now_iso()})
+            return web.Response(status=204)
+        return web.json_response({"error": "Not Found", "status": 404, "message": f"{method} {path} is not implemented by the stand-in"}, status=404)
+
+    # --- Twitch ---
+    def _oauth_token(self) -> web.Response:
+        token = f"mock{uuid.uuid4().hex}"
+        self.issued_tokens.add(token)
+        return web.json_response({"access_token": token, "expires_in": 5011271, "token_type": "bearer"})
+
+    def _channels_for_query(self, query, login_param: str, id_param: str) -> list:
+        channels = [self.get_channel(login=login) for login in query.getall(login_param, [])]
+        channels += [c for c in (self.get_channel(user_id=user_id) for user_id in query.getall(id_param, [])) if c]
+        return list({c.login: c for c in channels}.values())
+
+    def _helix_users(self, query) -> web.Response:
+        return web.json_response({"data": [c.user_entry() for c in self._channels_for_query(query, "login", "id")]})
+
+    def _helix_streams(self, query) -> web.Response:
+        live_channels = [c for c in self._channels_for_query(query, "user_login", "user_id") if c.stream_id]
+        first = int(query.get("first", 20))
+        return web.json_response({"data": [c.stream_entry() for c in live_channels[:first]], "pagination": {}})
+
+    def _helix_channels(self, query) -> web.Response:
+        return web.json_response({"data": [c.channel_entry() for c in self._channels_for_query(query, "broadcaster_login", "broadcaster_id")]})
+
+    def _helix_followers(self, query) -> web.Response:
+        channel = self.get_channel(user_id=query.get("broadcaster_id"))
+        return web.json_response({"total": channel.followers if channel else 0, "data": [], "pagination": {}})
+
+    def _helix_clips(self, query) -> web.Response:
+        channel = self.get_channel(user_id=query.get("broadcaster_id"))
+        if not channel:
+            return web.json_response({"data": [], "pagination": {}})
+        started_at = _parse_iso(query["started_at"]) if query.get("started_at") else None
+        clips = [clip for clip in channel.clips if not started_at or _parse_iso(clip["created_at"]) >= started_at]
+        return web.json_response({"data": list(reversed(clips))[:int(query.get("first", 20))], "pagination": {}})
+
+    # --- YouTube ---
+    async def _youtube(self, request: web.Request) -> web.Response:
+        resource = request.path[len("/youtube/v3/"):].rstrip('/') if request.path.startswith("/youtube/v3/") else None
+        query, method = request.query, request.method
+        body = await request.json() if request.can_read_body else {}
+
+        if resource == "liveStreams" and method == "POST":
+            stream_id = f"mockStream{uuid.uuid4().hex[:10]}"
+            resource_body = dict(body, id=stream_id, kind="youtube#liveStream",
+                                 cdn=dict(body.get("cdn", {}), ingestionInfo={"ingestionAddress": self.rtmp_ingest_url,
+                                                                              "streamName": uuid.uuid4().hex[:20]}))
+            resource_body["status"] = dict(body.get("status", {}), streamStatus="ready")
+            self.youtube_streams[stream_id] = resource_body
+            self.youtube_stream_created_at[stream_id] = time.monotonic()
+            return web.json_response(resource_body)
+        if resource == "liveStreams" and method == "GET":
+            # No RTMP server here, so a stream counts as receiving data a couple of seconds after it was created.
+            items = []
+            for stream_id in query.get("id", "").split(','):
+                if stream_id in self.youtube_streams:
+                    active = time.monotonic() - self.youtube_stream_created_at[stream_id] >= 2
+                    status = {"streamStatus": "active" if active else "ready",
+                              "healthStatus": {"status": "good" if active else "noData", "configurationIssues": []}}
+                    items.append(dict(self.youtube_streams[stream_id], status=status))
+            return web.json_response({"kind": "youtube#liveStreamListResponse", "items": items})
+        if resource == "liveBroadcasts" and method == "POST":
+            broadcast_id = uuid.uuid4().hex[:11]
+            broadcast = dict(body, id=broadcast_id, kind="youtube#liveBroadcast",
+                             status=dict(body.get("status", {}), lifeCycleStatus="ready"))
+            broadcast["snippet"] = dict(broadcast.get("snippet", {}), categoryId="20")
+            self.youtube_videos[broadcast_id] = broadcast
+            return web.json_response(broadcast)
+        if resource in ("liveBroadcasts/bind", "liveBroadcasts/transition") and method == "POST":
+            broadcast = self.youtube_videos.get(query.get("id"))
+            if not broadcast:
+                return _google_error(404, "liveBroadcastNotFound", "Broadcast not found")
+            if resource.endswith("bind"):
+                if query.get("streamId") not in self.youtube_streams:
+                    return _google_error(404, "liveStreamNotFound", "Stream not found")
+                broadcast.setdefault("contentDetails", {})["boundStreamId"] = query.get("streamId")
+            else:
+                broadcast["status"]["lifeCycleStatus"] = {"live": "live", "testing": "testing", "complete": "complete"}.get(query.get("broadcastStatus"), "ready")
+            return web.json_response(broadcast)
+        if resource == "videos" and method == "GET":
+            ids = query.get("id", "").split(',')
+            return web.json_response({"kind": "youtube#videoListResponse", "items": [self.youtube_videos[i] for i in ids if i in self.youtube_videos]})
+        if resource == "videos" and method == "PUT":
+            video = self.youtube_videos.get(body.get("id"))
+            if not video:
+                return _google_error(404, "videoNotFound", "Video not found")
+            for part in ("snippet", "status"):
+                if part in body:
+                    video[part] = dict(video.get(part, {}), **body[part])
+            return web.json_response(video)
+        if resource == "playlistItems" and method == "POST":
+            snippet = body.get("snippet", {})
+            item_key = (snippet.get("playlistId"), snippet.get("resourceId", {}).get("videoId"))
+            if item_key in self.youtube_playlist_items:
+                return _google_error(409, "playlistItemNotUnique", "Playlist item not unique")
+            self.youtube_playlist_items.add(item_key)
+            return web.json_response(dict(body, id=uuid.uuid4().hex, kind="youtube#playlistItem"))
+        return _google_error(404, "notFound", f"{method} {request.path} is not implemented by the stand-in")
+
+    # --- Control ---
+    async def handle_control(self, request: web.Request) -> web.Response:
+        path, method = request.path.rstrip('/'), request.method
+        if path == "/_mock/stats" and method == "GET":
+            return web.json_response(self.stats())
+        if path == "/_mock/stats/reset" and method == "POST":
+            self.reset_stats()
+            return web.json_response({"ok": True})
+        if path == "/_mock/faults" and method == "POST":
+            changes = await request.json()
+            groups = [changes["group"]] if changes.get("group") else SERVICE_GROUPS
+            for group in groups:
+                if group not in self.fault_profiles:
+                    return web.json_response({"error": f"Unknown group '{group}'"}, status=400)
+                self.fault_profiles[group].update(changes)
+            return web.json_response({group: self.fault_profiles[group].as_dict() for group in groups})
+        parts = path.split('/') # ['', '_mock', 'channels', login, ('clips')]
+        if len(parts) >= 4 and parts[2] == "channels" and method == "POST":
+            channel = self.get_channel(login=parts[3])
+            changes = await request.json() if request.can_read_body else {}
+            if len(parts) == 5 and parts[4] == "clips":
+                return web.json_response(channel.add_clip(changes.get("title")))
+            channel.apply(changes)
+            logger.info(f"Channel {channel.login}: {'live' if channel.stream_id else 'offline'}, '{channel.title}'.")
+            return web.json_response(dict(channel.channel_entry(), live=bool(channel.stream_id)))
+        return web.json_response({"error": f"Unknown control endpoint {method} {path}"}, status=404)
+
+    async def _close_http_session(self, app):
+        if self._http_session is not None:
+            await self._http_session.close()
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=32 * 1024 * 1024) # Status notifications can attach a graph image
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        app.on_cleanup.append(self._close_http_session)
+        return app
+
+
+def load_scenario(filepath: str) -> dict:
+    """{"channels": {"login": {"live": true, "title": ..., "followers": ..., "clips": ["title", ...]}}} -> {login: MockChannel}"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        scenario = json.load(f)
+    channels = {}
+    for login, overrides in scenario.get("channels", {}).items():
+        channel = MockChannel(login, **overrides)
+        for clip_title in overrides.get("clips", []):
+            channel.add_clip(clip_title)
+        channels[channel.login] = channel
+    return channels
+
+
+def run_benchmark(base_url: str, total_requests: int, concurrency: int, channel_logins: list):
+    """Drives the bot's own Helix request path (token handling, batching, circuit breakers) against a running stand-in."""
+    from concurrent.futures import ThreadPoolExecutor
+    from uta_bot import config_manager
+    from uta_bot.services import twitch_api_handler
+    from uta_bot.utils.circuit_breaker import api_breakers
+
+    base_url = base_url.rstrip('/')
+    config_manager.UTA_TWITCH_API_BASE_URL = f"{base_url}/helix"
+    config_manager.UTA_TWITCH_AUTH_URL = f"{base_url}/oauth2/token"
+    config_manager.TWITCH_CLIENT_ID = config_manager.TWITCH_CLIENT_ID or "standin-client-id"
+    config_manager.TWITCH_CLIENT_SECRET = config_manager.TWITCH_CLIENT_SECRET or "standin-client-secret"
+    config_manager.uta_shared_access_token, config_manager.uta_token_expiry_time = None, 0
+
+    def one_call(call_index: int):
+        login = channel_logins[call_index % len(channel_logins)]
+        kind = call_index % 3
+        if kind == 0:
+            return twitch_api_handler.uta_helix_batcher.lookup("streams", "user_login", login)
+        if kind == 1:
+            return twitch_api_handler.uta_helix_batcher.lookup("users", "login", login)
+        user_data = twitch_api_handler.uta_helix_batcher.lookup("users", "login", login)
+        user_id = user_data["data"][0]["id"] if user_data and user_data.get("data") else None
+        return twitch_api_handler.make_uta_twitch_api_request("channels/followers", params={"broadcaster_id": user_id}) if user_id else None
+
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_call, range(total_requests)))
+    elapsed = time.monotonic() - started_at
+    failed = sum(1 for result in results if result is None)
+
+    print(f"{total_requests} logical lookups in {elapsed:.2f}s ({total_requests / elapsed:.1f}/s), {failed} failed, concurrency {concurrency}.")
+    for breaker in api_breakers.all():
+        snapshot = breaker.snapshot()
+        if not snapshot["total_calls"]:
+            continue
+        print(f"  {snapshot['name']:<30} calls={snapshot['total_calls']:<6} errors={snapshot['error_rate']:.1%} "
+              f"p50={snapshot['p50_ms']}ms p95={snapshot['p95_ms']}ms mean={snapshot['mean_ms']:.1f}ms state={snapshot['state']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Helix/YouTube/Discord stand-in with fault injection and record/replay.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--scenario", help="JSON file describing channels, live state, followers and clips")
+    parser.add_argument("--live", default="", help="Comma-separated logins that start live")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random +/- spread on the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per minute per service group before 429s (0 = unlimited)")
+    parser.add_argument("--record", help="Append proxied responses to this JSONL file (use with --proxy)")
+    parser.add_argument("--proxy", action="store_true", help="Forward every call to the real upstream APIs")
+    parser.add_argument("--upstream", help="--proxy: send everything to this origin instead (e.g. another stand-in or an egress proxy)")
+    parser.add_argument("--replay", help="JSONL file written by --record to serve back")
+    parser.add_argument("--rtmp-ingest-url", default="rtmp://127.0.0.1:1935/live2", help="ingestionAddress returned for new YouTube liveStreams")
+    parser.add_argument("--bench", metavar="STANDIN_URL", help="Instead of serving, benchmark the bot's Helix client against a running stand-in")
+    parser.add_argument("--requests", type=int, default=1000, help="--bench: number of lookups")
+    parser.add_argument("--concurrency", type=int, default=8, help="--bench: worker threads")
+    parser.add_argument("--channels", default="benchchannel", help="--bench: comma-separated logins to look up")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    if args.bench:
+        run_benchmark(args.bench, args.requests, max(1, args.concurrency), [c.strip() for c in args.channels.split(',') if c.strip()])
+        return
+    if args.record and not args.proxy:
+        parser.error("--record captures real traffic and needs --proxy")
+
+    channels = load_scenario(args.scenario) if args.scenario else {}
+    for login in filter(None, (name.strip().lower() for name in args.live.split(','))):
+        channels.setdefault(login, MockChannel(login)).go_live()
+    replay = RecordedTraffic(args.replay) if args.replay else None
+    if replay:
+        logger.info(f"Loaded {replay.record_count} recorded response(s) to replay.")
+    server = ApiStandinServer(channels, {"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+                                         "rate_limit_per_minute": args.rate_limit},
+                              replay=replay, record_file=args.record, proxy=args.proxy, rtmp_ingest_url=args.rtmp_ingest_url,
+                              upstream_override=args.upstream)
+    try:
+        web.run_app(server.build_app(), host=args.host, port=args.port)
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+
+from uta_bot import config_manager
+
+logger = logging.getLogger(__name__)
+
+
+def channel_log_path(channel_name: str, base_log_path: str) -> str:
+    """The primary channel keeps the configured path; other channels get <UTA_CHANNEL_LOG_DIR>/<channel>/<file>."""
+    if not base_log_path or not channel_name or config_manager.is_primary_uta_channel(channel_name):
+        return base_log_path
+    channel_dir = os.path.join(config_manager.UTA_CHANNEL_LOG_DIR or "channel_logs", channel_name.lower())
+    try:
+        os.makedirs(channel_dir, exist_ok=True)
+    except OSError as e:
+        logger.error(f"UTA ChannelState: Could not create log directory {channel_dir}: {e}")
+    return os.path.join(channel_dir, os.path.basename(base_log_path))
+
+
+class ChannelState:
+    """Per-channel monitoring state. The primary channel mirrors its broadcaster ID into the legacy config_manager global."""
+
+    def __init__(self, channel_name: str):
+        self.channel_name = channel_name
+        self._broadcaster_id = None
+        self.is_live = False
+        self.session_start_ts = None # Unix ts of the current Twitch session, None while offline
+        self.last_known_title = None
+        self.last_known_game = None
+        self.session_peak_viewers = 0
+
+    @property
+    def is_primary(self) -> bool:
+        return config_manager.is_primary_uta_channel(self.channel_name)
+
+    @property
+    def broadcaster_id(self) -> str:
+        if self.is_primary:
+            return config_manager.uta_broadcaster_id_cache
+        return self._broadcaster_id
+
+    @broadcaster_id.setter
+    def broadcaster_id(self, value: str):
+        if self.is_primary:
+            config_manager.uta_broadcaster_id_cache = value
+        self._broadcaster_id = value
+
+    @property
+    def stream_activity_log_file(self) -> str:
+        return channel_log_path(self.channel_name, config_manager.UTA_STREAM_ACTIVITY_LOG_FILE)
+
+    @property
+    def viewer_count_log_file(self) -> str:
+        return channel_log_path(self.channel_name, config_manager.UTA_VIEWER_COUNT_LOG_FILE)
+
+
+_channel_states = {} # lowercased channel name -> ChannelState
+_channel_states_lock = threading.Lock()
+
+def get_channel_state(channel_name: str = None) -> ChannelState:
+    channel_name = channel_name or config_manager.UTA_TWITCH_CHANNEL_NAME
+    if not channel_name:
+        return None
+    with _channel_states_lock:
+        state = _channel_states.get(channel_name.lower())
+        if state is None:
+            state = ChannelState(channel_name)
+            _channel_states[channel_name.lower()] = state
+        return state
+
+def all_channel_states() -> list:
+    return [get_channel_state(name) for name in config_manager.get_uta_monitored_channels()]
+
+def reset_channel_states():
+    with _channel_states_lock:
+        _channel_states.clear()
+
+def resolve_monitored_channel(channel_arg: str) -> str:
+    """Returns the configured spelling of a monitored channel matching channel_arg, or None."""
+    if not channel_arg:
+        return None
+    wanted = channel_arg.strip().lstrip('#@').lower()
+    for name in config_manager.get_uta_monitored_channels():
+        if name.lower() == wanted:
+            return name
+    return None
+
+def split_channel_argument(text: str):
+    # Commands accept an optional leading channel name: "!streamtime somechannel 7d".
+    if text:
+        first_word, _, rest = text.strip().partition(' ')
+        matched_channel = resolve_monitored_channel(first_word)
+        if matched_channel:
+            return matched_channel, (rest.strip() or None)
+    return config_manager.UTA_TWITCH_CHANNEL_NAME, text
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from uta_bot import config_manager
+from .service_supervisor import service_supervisor
+
+logger = logging.getLogger(__name__)
+
+
+def _session_start_unix(stream_data: dict, fallback_ts: int) -> int:
+    started_at = stream_data.get("started_at")
+    if started_at:
+        try:
+            return int(datetime.fromisoformat(started_at.replace("Z", "+00:00")).timestamp())
+        except ValueError:
+            pass
+    return fallback_ts
+
+
+class SessionChapterBuilder:
+    """Game segments of the primary channel's current Twitch session, built from StreamStateHub snapshots as they
+    arrive, so rollover and stream end get a part's chapters from memory instead of re-parsing stream_activity.bin.
+    Checkpointed to UTA_CHAPTER_CHECKPOINT_FILE on every change; a restart picks the session back up if it's still live."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock() # Orders checkpoint writes; taken without self._lock held
+        self._checkpoint_path = None
+        self._checkpoint_version = 0 # Bumped per change; a write older than the last one written is dropped
+        self._written_version = 0
+        self.session_id = None # Twitch started_at of the tracked session
+        self.current_title = None
+        self.segments = [] # {'game', 'start_ts', 'end_ts' (None for the current one), 'title_at_start'}, oldest first
+
+    def configure(self, checkpoint_path: str):
+        # Loads the checkpoint the first time (or when the path changes). Safe to call repeatedly.
+        with self._lock:
+            if checkpoint_path == self._checkpoint_path:
+                return
+            self._checkpoint_path = checkpoint_path
+            self.session_id, self.current_title, self.segments = None, None, []
+            if not checkpoint_path or not os.path.exists(checkpoint_path):
+                return
+            try:
+                with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+                self.session_id = checkpoint["session_id"]
+                self.current_title = checkpoint.get("current_title")
+                self.segments = checkpoint["segments"]
+                logger.info(f"UTA Chapter Builder: Restored {len(self.segments)} game segment(s) of session {self.session_id} from {checkpoint_path}.")
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"UTA Chapter Builder: Could not load {checkpoint_path}, starting empty: {e}")
+                self.session_id, self.current_title, self.segments = None, None, []
+
+    def _checkpoint_payload(self):
+        # Caller holds the lock. Serialized here so the write can happen after the lock is released.
+        if not self._checkpoint_path:
+            return None
+        self._checkpoint_version += 1
+        payload = json.dumps({"session_id": self.session_id, "current_title": self.current_title, "segments": self.segments})
+        return self._checkpoint_path, payload, self._checkpoint_version
+
+    def _write_checkpoint(self, checkpoint_path: str, payload: str, version: int):
+        # A few hundred bytes, written only when a segment changes.
+        with self._write_lock:
+            if version <= self._written_version:
+                return # A newer checkpoint already landed
+            temp_path = f"{checkpoint_path}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(temp_path, checkpoint_path)
+                self._written_version = version
+            except OSError as e:
+                logger.error(f"UTA Chapter Builder: Failed to write checkpoint {checkpoint_path}: {e}")
+
+    def _save_checkpoint(self, checkpoint):
+        if checkpoint is None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError: # Published from a plain thread, which can take the write itself
+            self._write_checkpoint(*checkpoint)
+            return
+        service_supervisor.spawn(asyncio.to_thread(self._write_checkpoint, *checkpoint), name="UTA-ChapterCheckpoint")
+
+    def on_snapshot(self, snapshot, previous_snapshot):
+        # StreamStateHub callback, runs on the publisher (usually the bot loop): in-memory updates only, the checkpoint is written off-thread.
+        if not config_manager.is_primary_uta_channel(snapshot.channel_name):
+            return
+        now_ts = int(snapshot.fetched_at)
+        with self._lock:
+            open_segment = self.segments[-1] if self.segments and self.segments[-1]["end_ts"] is None else None
+            if not snapshot.is_live:
+                if not open_segment:
+                    return
+                open_segment["end_ts"] = now_ts
+            else:
+                stream_data = snapshot.stream_data
+                game = stream_data.get("game_name") or "N/A"
+                title = stream_data.get("title") or "N/A"
+                session_id = stream_data.get("started_at") or f"unknown-{now_ts}"
+                if session_id != self.session_id:
+                    # Backdated to Twitch's started_at only if the start was seen (offline or another session before).
+                    # A session picked up mid-stream without a checkpoint begins now, so segments_between() leaves the
+                    # part before it to stream_activity.bin instead of claiming it for the current game.
+                    previous_session = previous_snapshot.stream_data.get("started_at") if previous_snapshot is not None and previous_snapshot.is_live else None
+                    start_seen = previous_snapshot is not None and previous_session != stream_data.get("started_at")
+                    start_ts = _session_start_unix(stream_data, now_ts) if start_seen else now_ts
+                    self.session_id, self.current_title = session_id, title
+                    self.segments = [{"game": game, "start_ts": start_ts, "end_ts": None, "title_at_start": title}]
+                elif open_segment and open_segment["game"] == "N/A" and game != "N/A":
+                    open_segment["game"] = game # EventSub's online event can arrive before the game is known; not a real change
+                elif not open_segment or open_segment["game"] != game:
+                    if open_segment:
+                        open_segment["end_ts"] = now_ts
+                    self.current_title = title
+                    self.segments.append({"game": game, "start_ts": now_ts, "end_ts": None, "title_at_start": title})
+                elif title != self.current_title:
+                    self.current_title = title # Titles label the next segment; they don't start one
+                else:
+                    return
+            checkpoint = self._checkpoint_payload()
+        self._save_checkpoint(checkpoint)
+
+    def segments_between(self, start_unix: int, end_unix: int):
+        """The session's game segments clipped to [start_unix, end_unix], in the format of
+        parse_stream_activity_for_game_segments(). None if the tracked session doesn't cover the window's start."""
+        with self._lock:
+            if not self.segments or self.segments[0]["start_ts"] > start_unix:
+                return None
+            last_end = self.segments[-1]["end_ts"]
+            if last_end is not None and last_end < start_unix:
+                return None # An earlier session's segments
+            clipped = []
+            for segment in self.segments:
+                segment_start = max(segment["start_ts"], start_unix)
+                segment_end = min(segment["end_ts"] if segment["end_ts"] is not None else max(end_unix, int(time.time())), end_unix)
+                if segment_end > segment_start:
+                    clipped.append({"game": segment["game"], "start_ts": segment_start, "end_ts": segment_end,
+                                    "title_at_start": segment["title_at_start"]})
+            return clipped
+
+
+session_chapter_builder = SessionChapterBuilder()
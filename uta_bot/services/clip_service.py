@@ -1,17 +1,20 @@
 import logging
 import time
 import asyncio
-import threading # Added threading for current_thread access
 from datetime import datetime, timedelta, timezone
 import requests 
 
 from uta_bot import config_manager
-from uta_bot.services.twitch_api_handler import make_uta_twitch_api_request, get_uta_broadcaster_id 
+from uta_bot.services.twitch_api_handler import make_uta_twitch_api_request, get_uta_broadcaster_id, prime_uta_broadcaster_ids
 from .threading_manager import shutdown_event 
+from .service_supervisor import service_supervisor
+from uta_bot.utils.circuit_breaker import post_discord_webhook
+from .stream_state_hub import get_adaptive_wait_seconds_async
 
 logger = logging.getLogger(__name__)
 
 _uta_sent_clip_ids = set() 
+_uta_last_clip_check_at = {} # lowercased channel name -> time.time() of the last successful /clips check
 
 def _send_discord_clip_notification(clip_url: str, clip_title: str, channel_name: str):
     if not config_manager.UTA_DISCORD_WEBHOOK_URL_CLIPS or \
@@ -24,7 +27,7 @@ def _send_discord_clip_notification(clip_url: str, clip_title: str, channel_name
     }
     response_obj = None
     try:
-        response_obj = requests.post(config_manager.UTA_DISCORD_WEBHOOK_URL_CLIPS, json=payload, timeout=10)
+        response_obj = post_discord_webhook(config_manager.UTA_DISCORD_WEBHOOK_URL_CLIPS, json=payload, timeout=10)
         response_obj.raise_for_status()
         logger.info(f"UTA Clip Service: Sent clip notification to Discord: {clip_url}")
     except requests.exceptions.RequestException as e:
@@ -52,74 +55,87 @@ def _get_recent_clips(broadcaster_id: str, lookback_minutes: int):
     return data.get("data", []) if data else []
 
 
-def clip_monitor_loop(bot_instance): 
-    logger.info(f"UTA Clip Monitor Service thread ({threading.current_thread().name}) started.")
-    
-    if config_manager.UTA_TWITCH_CHANNEL_NAME:
-        current_broadcaster_id = get_uta_broadcaster_id(config_manager.UTA_TWITCH_CHANNEL_NAME)
-        
-        if current_broadcaster_id:
-            logger.info(f"UTA Clip Service: Initial scan for clips from the last {config_manager.UTA_CLIP_LOOKBACK_MINUTES} minutes...")
-            try:
-                initial_clips = _get_recent_clips(current_broadcaster_id, config_manager.UTA_CLIP_LOOKBACK_MINUTES)
-                for clip in initial_clips:
-                    _uta_sent_clip_ids.add(clip['id'])
-                logger.info(f"UTA Clip Service: Primed {len(_uta_sent_clip_ids)} clips. Monitoring for new ones.")
-            except Exception as e_init:
-                logger.error(f"UTA Clip Service: Error during initial clip priming: {e_init}", exc_info=True)
-        else:
-            logger.error(f"UTA Clip Service: Could not fetch broadcaster ID for {config_manager.UTA_TWITCH_CHANNEL_NAME} on startup. Clip monitoring may be impaired.")
-    else:
+def _prime_channel_clips(channel_name: str, broadcaster_id: str):
+    # Clips already in the lookback window when a channel starts being watched are not announced.
+    logger.info(f"UTA Clip Service: Initial scan for {channel_name} clips from the last {config_manager.UTA_CLIP_LOOKBACK_MINUTES} minutes...")
+    try:
+        initial_clips = _get_recent_clips(broadcaster_id, config_manager.UTA_CLIP_LOOKBACK_MINUTES)
+        for clip in initial_clips:
+            _uta_sent_clip_ids.add(clip['id'])
+        logger.info(f"UTA Clip Service: Primed {len(initial_clips)} clips for {channel_name}. Monitoring for new ones.")
+    except Exception as e_init:
+        logger.error(f"UTA Clip Service: Error during initial clip priming for {channel_name}: {e_init}", exc_info=True)
+
+async def _check_channel_for_new_clips(channel_name: str, broadcaster_id: str):
+    logger.debug(f"UTA Clip Service: Checking for new clips for {channel_name} (ID: {broadcaster_id}).")
+    # With adaptive polling the gap between checks can exceed the configured lookback; widen it so nothing falls through.
+    last_check_at = _uta_last_clip_check_at.get(channel_name.lower())
+    lookback_minutes = config_manager.UTA_CLIP_LOOKBACK_MINUTES
+    if last_check_at:
+        lookback_minutes = max(lookback_minutes, int((time.time() - last_check_at) // 60) + 1)
+    _uta_last_clip_check_at[channel_name.lower()] = time.time()
+    recent_clips = await asyncio.to_thread(_get_recent_clips, broadcaster_id, lookback_minutes)
+
+    if not recent_clips:
+        logger.debug(f"UTA Clip Service: No clips found in the lookback window for {channel_name}.")
+        return
+
+    new_clips_found_count = 0
+    for clip in reversed(recent_clips): 
+        if shutdown_event.is_set(): break 
+        if clip['id'] not in _uta_sent_clip_ids:
+            logger.info(f"UTA Clip Service: New clip found for {channel_name}: '{clip['title']}' - {clip['url']}")
+            _uta_sent_clip_ids.add(clip['id'])
+            await asyncio.to_thread(_send_discord_clip_notification, clip['url'], clip['title'], channel_name)
+            new_clips_found_count += 1
+            await asyncio.sleep(1) # Space out webhook posts when several clips land at once
+
+    if new_clips_found_count == 0:
+        logger.debug(f"UTA Clip Service: No *new* clips found for {channel_name} (all fetched clips were already known/sent).")
+
+
+async def clip_monitor_task(bot_instance): 
+    logger.info(f"UTA Clip Monitor Service task ({asyncio.current_task().get_name()}) started.")
+    primed_channels = set()
+
+    if not config_manager.get_uta_monitored_channels():
         logger.warning("UTA Clip Service: UTA_TWITCH_CHANNEL_NAME not set. Clip monitoring will not function.")
 
-    while not shutdown_event.is_set():
-        try:
-            if not config_manager.UTA_TWITCH_CHANNEL_NAME:
-                logger.debug("UTA Clip Service: UTA_TWITCH_CHANNEL_NAME not configured. Skipping clip check cycle.")
-                if shutdown_event.wait(timeout=config_manager.UTA_CHECK_INTERVAL_SECONDS_CLIPS): break
-                continue
-
-            broadcaster_id = get_uta_broadcaster_id(config_manager.UTA_TWITCH_CHANNEL_NAME)
-            if not broadcaster_id:
-                logger.warning(f"UTA Clip Service: Still unable to fetch broadcaster ID for {config_manager.UTA_TWITCH_CHANNEL_NAME}. Skipping cycle.")
-                if shutdown_event.wait(timeout=config_manager.UTA_CHECK_INTERVAL_SECONDS_CLIPS): break
-                continue
-            
-            logger.debug(f"UTA Clip Service: Checking for new clips for {config_manager.UTA_TWITCH_CHANNEL_NAME} (ID: {broadcaster_id}).")
-            recent_clips = _get_recent_clips(broadcaster_id, config_manager.UTA_CLIP_LOOKBACK_MINUTES)
-
-            if not recent_clips:
-                logger.debug("UTA Clip Service: No clips found in the lookback window.")
-            else:
-                new_clips_found_count = 0
-                for clip in reversed(recent_clips): 
-                    if shutdown_event.is_set(): break 
-                    if clip['id'] not in _uta_sent_clip_ids:
-                        logger.info(f"UTA Clip Service: New clip found: '{clip['title']}' - {clip['url']}")
-                        asyncio.run_coroutine_threadsafe(
-                            asyncio.to_thread(
-                                _send_discord_clip_notification,
-                                clip['url'], clip['title'], config_manager.UTA_TWITCH_CHANNEL_NAME
-                            ),
-                            bot_instance.loop
-                        )
-                        _uta_sent_clip_ids.add(clip['id'])
-                        new_clips_found_count += 1
-                        if shutdown_event.wait(timeout=1): break 
-                
-                if new_clips_found_count == 0 and recent_clips:
-                    logger.debug("UTA Clip Service: No *new* clips found (all fetched clips were already known/sent).")
-            
-            if shutdown_event.is_set(): break 
-
-            wait_interval = config_manager.UTA_CHECK_INTERVAL_SECONDS_CLIPS
-            logger.debug(f"UTA Clip Service: Waiting {wait_interval // 60} min ({wait_interval}s) for the next clip check.")
-            if shutdown_event.wait(timeout=wait_interval): 
-                break 
-
-        except Exception as e:
-            logger.error(f"UTA Clip Service: An unexpected error occurred in the monitor loop: {e}", exc_info=True)
-            if shutdown_event.wait(timeout=60): break 
-            
-    logger.info(f"UTA Clip Monitor Service thread ({threading.current_thread().name}) has finished.")
-    _uta_sent_clip_ids.clear() 
\ No newline at end of file
+    try:
+        while not shutdown_event.is_set():
+            service_supervisor.heartbeat()
+            try:
+                channel_names = config_manager.get_uta_monitored_channels()
+                if not channel_names:
+                    logger.debug("UTA Clip Service: UTA_TWITCH_CHANNEL_NAME not configured. Skipping clip check cycle.")
+                    await service_supervisor.sleep(config_manager.UTA_CHECK_INTERVAL_SECONDS_CLIPS, interval=True)
+                    continue
+
+                # Helix calls are still blocking requests; each one is a single hop to a worker thread.
+                await asyncio.to_thread(prime_uta_broadcaster_ids, channel_names)
+                for channel_name in channel_names:
+                    if shutdown_event.is_set(): break
+                    broadcaster_id = await asyncio.to_thread(get_uta_broadcaster_id, channel_name)
+                    if not broadcaster_id:
+                        logger.warning(f"UTA Clip Service: Still unable to fetch broadcaster ID for {channel_name}. Skipping it this cycle.")
+                        continue
+                    if channel_name.lower() not in primed_channels:
+                        await asyncio.to_thread(_prime_channel_clips, channel_name, broadcaster_id)
+                        _uta_last_clip_check_at[channel_name.lower()] = time.time()
+                        primed_channels.add(channel_name.lower())
+                        continue
+                    await _check_channel_for_new_clips(channel_name, broadcaster_id)
+
+                # Clips only appear around live sessions, so the scheduler may slow this down when a channel is quiet, never speed it up.
+                adaptive_waits = [await get_adaptive_wait_seconds_async(config_manager.UTA_CHECK_INTERVAL_SECONDS_CLIPS, name) for name in channel_names]
+                wait_interval = max(config_manager.UTA_CHECK_INTERVAL_SECONDS_CLIPS, min(adaptive_waits))
+                logger.debug(f"UTA Clip Service: Waiting {wait_interval // 60} min ({wait_interval}s) for the next clip check.")
+                await service_supervisor.sleep(wait_interval, interval=True)
+
+            except Exception as e:
+                logger.error(f"UTA Clip Service: An unexpected error occurred in the monitor loop: {e}", exc_info=True)
+                await service_supervisor.sleep(60)
+    finally:
+        logger.info(f"UTA Clip Monitor Service task ({asyncio.current_task().get_name()}) has finished.")
+        _uta_sent_clip_ids.clear()
+        _uta_last_clip_check_at.clear() 
\ No newline at end of file
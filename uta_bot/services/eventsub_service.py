@@ -0,0 +1,282 @@
+import logging
+import asyncio
+import json
+import time
+from collections import deque
+
+from uta_bot import config_manager
+from uta_bot.services.twitch_api_handler import get_uta_broadcaster_id, uta_lookup_cache, _ensure_lookup_cache_configured, get_cached_twitch_channel_async
+from uta_bot.services.channel_state import get_channel_state, resolve_monitored_channel
+from .stream_state_hub import stream_state_hub
+from .threading_manager import shutdown_event
+from .service_supervisor import service_supervisor
+
+logger = logging.getLogger(__name__)
+
+
+EVENTSUB_SUBSCRIPTION_TYPES = (("stream.online", "1"), ("stream.offline", "1"), ("channel.update", "2"))
+RECONNECT_BACKOFF_MAX_SECONDS = 60
+KEEPALIVE_GRACE_SECONDS = 5 # Twitch's keepalive_timeout_seconds is a promise, not a deadline; allow a little slack
+SEEN_MESSAGE_IDS_MAX = 500 # Twitch may redeliver a notification; message_id is stable across retries
+
+
+class EventSubAuthError(Exception):
+    """Subscriptions were rejected (bad/missing user token). Retrying won't help, so polling takes over for the session."""
+
+
+def get_eventsub_user_token() -> str:
+    # The WebSocket transport only accepts user access tokens. The chat token already belongs to a user, so reuse it by default.
+    token = config_manager.UTA_EVENTSUB_USER_TOKEN or config_manager.TWITCH_CHAT_OAUTH_TOKEN or ""
+    if token.lower().startswith("oauth:"):
+        token = token[6:]
+    if not token or token == "yourtwitchtoken":
+        return None
+    return token
+
+
+async def build_stream_data_from_online_event(event: dict) -> dict:
+    # stream.online carries no title/game/viewers; fill what we can from the cached /channels entry so consumers
+    # get a complete-looking /streams entry. The hub's follow-up poll replaces it with the real thing.
+    login = event.get("broadcaster_user_login", "")
+    channel_info = await get_cached_twitch_channel_async(event.get("broadcaster_user_id")) # A cache miss is a Helix call
+    if not isinstance(channel_info, dict):
+        channel_info = {}
+    return {
+        "id": event.get("id"),
+        "user_id": event.get("broadcaster_user_id"),
+        "user_login": login,
+        "user_name": event.get("broadcaster_user_name", login),
+        "type": "live",
+        "started_at": event.get("started_at"),
+        "title": channel_info.get("title", ""),
+        "game_id": channel_info.get("game_id", ""),
+        "game_name": channel_info.get("game_name", ""),
+        "tags": channel_info.get("tags", []),
+        "viewer_count": 0,
+        "thumbnail_url": f"https://static-cdn.jtvnw.net/previews-ttv/live_user_{login}-{{width}}x{{height}}.jpg",
+    }
+
+
+async def handle_eventsub_notification(subscription_type: str, event: dict):
+    """Feeds one EventSub event into the StreamStateHub, the same place the /streams poll publishes to."""
+    channel_name = resolve_monitored_channel(event.get("broadcaster_user_login"))
+    if not channel_name:
+        logger.debug(f"UTA EventSub: Ignoring {subscription_type} for unmonitored channel {event.get('broadcaster_user_login')}.")
+        return
+
+    if subscription_type == "stream.online":
+        if event.get("type") != "live": # Reruns/premieres don't count as live for /streams either
+            logger.info(f"UTA EventSub: {channel_name} went online with type '{event.get('type')}'. Ignoring.")
+            return
+        stream_state_hub.publish(channel_name, await build_stream_data_from_online_event(event), source="eventsub")
+        stream_state_hub.request_poll() # Pick up viewer count and tags straight away
+
+    elif subscription_type == "stream.offline":
+        stream_state_hub.publish(channel_name, None, source="eventsub")
+
+    elif subscription_type == "channel.update":
+        broadcaster_id = event.get("broadcaster_user_id")
+        _ensure_lookup_cache_configured()
+        cached_entry = uta_lookup_cache.get("channels", str(broadcaster_id))
+        channel_info = dict(cached_entry.value) if cached_entry and isinstance(cached_entry.value, dict) else {"broadcaster_id": broadcaster_id}
+        channel_info.update({
+            "broadcaster_login": event.get("broadcaster_user_login"),
+            "broadcaster_name": event.get("broadcaster_user_name"),
+            "title": event.get("title", ""),
+            "game_id": event.get("category_id", ""),
+            "game_name": event.get("category_name", ""),
+            "broadcaster_language": event.get("language", channel_info.get("broadcaster_language", "")),
+        })
+        await asyncio.to_thread(uta_lookup_cache.set, "channels", str(broadcaster_id), channel_info, config_manager.UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS)
+
+        snapshot = stream_state_hub.get_snapshot(channel_name)
+        if snapshot and snapshot.is_live:
+            stream_data = dict(snapshot.stream_data)
+            stream_data.update({"title": channel_info["title"], "game_id": channel_info["game_id"], "game_name": channel_info["game_name"]})
+            stream_state_hub.publish(channel_name, stream_data, source="eventsub")
+
+    else:
+        logger.debug(f"UTA EventSub: No handler for subscription type {subscription_type}.")
+
+
+def _append_notification_record(record_path: str, message: dict):
+    try:
+        with open(record_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"received_at": time.time(), "message": message}) + "\n")
+    except OSError as e:
+        logger.warning(f"UTA EventSub: Could not record notification to {record_path}: {e}")
+
+
+class EventSubWebSocketClient:
+    """One EventSub WebSocket session covering every monitored channel, reconnecting with backoff until shutdown."""
+
+    def __init__(self, ws_url: str, subscriptions_url: str):
+        self.ws_url = ws_url
+        self.subscriptions_url = subscriptions_url
+        self.session_id = None
+        self.keepalive_timeout_seconds = 10
+        self.last_message_time = 0.0
+        self.active_subscription_count = 0
+        self._seen_message_ids = deque(maxlen=SEEN_MESSAGE_IDS_MAX)
+        self._http_session = None
+        self._backoff_seconds = 1
+
+    def _set_healthy(self, healthy: bool):
+        if stream_state_hub.push_transport_healthy != healthy:
+            stream_state_hub.push_transport_healthy = healthy
+            logger.info(f"UTA EventSub: Push transport {'healthy, relaxing /streams polling' if healthy else 'down, /streams polling back to normal'}.")
+            if not healthy:
+                stream_state_hub.request_poll() # Don't sit out a relaxed interval with nothing watching
+
+    async def run(self):
+        import aiohttp # Guarded by config_manager.AIOHTTP_AVAILABLE before this task is started
+        async with aiohttp.ClientSession() as self._http_session:
+            while not shutdown_event.is_set():
+                service_supervisor.heartbeat()
+                try:
+                    await self._run_session(self.ws_url, subscribe=True)
+                except EventSubAuthError as e:
+                    logger.error(f"UTA EventSub: {e} Falling back to /streams polling only.")
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    logger.warning(f"UTA EventSub: Connection problem: {e}")
+                except Exception as e:
+                    logger.error(f"UTA EventSub: Unexpected error in WebSocket session: {e}", exc_info=True)
+                finally:
+                    self._set_healthy(False)
+
+                if shutdown_event.is_set(): break
+                logger.info(f"UTA EventSub: Reconnecting in {self._backoff_seconds}s.")
+                await service_supervisor.idle(self._sleep_unless_shutdown(self._backoff_seconds), self._backoff_seconds)
+                self._backoff_seconds = min(self._backoff_seconds * 2, RECONNECT_BACKOFF_MAX_SECONDS)
+        self._http_session = None
+
+    async def _sleep_unless_shutdown(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while not shutdown_event.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(min(1.0, deadline - time.monotonic()))
+
+    async def _connect_and_welcome(self, url: str):
+        ws = await self._http_session.ws_connect(url, heartbeat=None)
+        welcome = await self._receive_json(ws, timeout=15)
+        if not welcome or welcome.get("metadata", {}).get("message_type") != "session_welcome":
+            await ws.close()
+            raise ConnectionError(f"Expected session_welcome from {url}, got {welcome}")
+        session_info = welcome["payload"]["session"]
+        self.session_id = session_info["id"]
+        self.keepalive_timeout_seconds = session_info.get("keepalive_timeout_seconds") or self.keepalive_timeout_seconds # None on a migrated session
+        self.last_message_time = time.monotonic()
+        self._backoff_seconds = 1 # A welcomed session counts as recovered
+        logger.info(f"UTA EventSub: Connected, session {self.session_id} (keepalive {self.keepalive_timeout_seconds}s).")
+        return ws
+
+    async def _receive_json(self, ws, timeout: float):
+        import aiohttp
+        try:
+            msg = await ws.receive(timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        if msg.type == aiohttp.WSMsgType.TEXT:
+            return json.loads(msg.data)
+        if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+            raise ConnectionError(f"WebSocket closed (code {ws.close_code}).")
+        return None
+
+    async def _run_session(self, url: str, subscribe: bool):
+        ws = await self._connect_and_welcome(url)
+        try:
+            if subscribe:
+                await self._create_subscriptions()
+            self._set_healthy(self.active_subscription_count > 0)
+
+            while not shutdown_event.is_set():
+                service_supervisor.heartbeat()
+                if time.monotonic() - self.last_message_time > self.keepalive_timeout_seconds + KEEPALIVE_GRACE_SECONDS:
+                    raise ConnectionError("Keepalive timeout, no message from EventSub.")
+                message = await service_supervisor.idle(self._receive_json(ws, timeout=1.0), 1.0)
+                if message is None:
+                    continue
+                self.last_message_time = time.monotonic()
+                metadata = message.get("metadata", {})
+                message_type = metadata.get("message_type")
+
+                if message_type == "session_keepalive":
+                    continue
+                elif message_type == "notification":
+                    await self._handle_notification(message)
+                elif message_type == "session_reconnect":
+                    # Subscriptions follow the session to reconnect_url; connect there before dropping this socket.
+                    reconnect_url = message["payload"]["session"]["reconnect_url"]
+                    logger.info("UTA EventSub: Server asked us to reconnect. Migrating session.")
+                    new_ws = await self._connect_and_welcome(reconnect_url)
+                    await ws.close()
+                    ws = new_ws
+                elif message_type == "revocation":
+                    subscription = message.get("payload", {}).get("subscription", {})
+                    logger.warning(f"UTA EventSub: Subscription {subscription.get('type')} revoked ({subscription.get('status')}).")
+                    self.active_subscription_count = max(0, self.active_subscription_count - 1)
+                    if self.active_subscription_count == 0:
+                        self._set_healthy(False)
+                else:
+                    logger.debug(f"UTA EventSub: Ignoring message type {message_type}.")
+        finally:
+            if not ws.closed:
+                await ws.close()
+
+    async def _handle_notification(self, message: dict):
+        metadata = message.get("metadata", {})
+        message_id = metadata.get("message_id")
+        if message_id in self._seen_message_ids:
+            logger.debug(f"UTA EventSub: Duplicate notification {message_id}. Skipping.")
+            return
+        self._seen_message_ids.append(message_id)
+
+        if config_manager.UTA_EVENTSUB_RECORD_FILE:
+            await asyncio.to_thread(_append_notification_record, config_manager.UTA_EVENTSUB_RECORD_FILE, message)
+
+        subscription_type = metadata.get("subscription_type") or message.get("payload", {}).get("subscription", {}).get("type")
+        event = message.get("payload", {}).get("event", {})
+        logger.info(f"UTA EventSub: {subscription_type} for {event.get('broadcaster_user_login')}.")
+        try:
+            await handle_eventsub_notification(subscription_type, event)
+        except Exception as e:
+            logger.error(f"UTA EventSub: Handler for {subscription_type} failed: {e}", exc_info=True)
+
+    async def _create_subscriptions(self):
+        user_token = get_eventsub_user_token()
+        if not user_token:
+            raise EventSubAuthError("No user token configured (UTA_EVENTSUB_USER_TOKEN or TWITCH_CHAT_OAUTH_TOKEN).")
+        headers = {"Client-ID": config_manager.TWITCH_CLIENT_ID, "Authorization": f"Bearer {user_token}", "Content-Type": "application/json"}
+
+        self.active_subscription_count = 0
+        for channel_name in config_manager.get_uta_monitored_channels():
+            broadcaster_id = get_channel_state(channel_name).broadcaster_id or \
+                             await asyncio.to_thread(get_uta_broadcaster_id, channel_name)
+            if not broadcaster_id:
+                logger.warning(f"UTA EventSub: No broadcaster ID for {channel_name}. It stays on polling only.")
+                continue
+            for subscription_type, version in EVENTSUB_SUBSCRIPTION_TYPES:
+                body = {
+                    "type": subscription_type, "version": version,
+                    "condition": {"broadcaster_user_id": str(broadcaster_id)},
+                    "transport": {"method": "websocket", "session_id": self.session_id}
+                }
+                async with self._http_session.post(self.subscriptions_url, headers=headers, json=body) as resp:
+                    if resp.status in (200, 202, 409): # 409: already subscribed on this session
+                        self.active_subscription_count += 1
+                    elif resp.status in (401, 403):
+                        raise EventSubAuthError(f"Subscription request rejected with HTTP {resp.status}: {await resp.text()}")
+                    else:
+                        logger.error(f"UTA EventSub: Failed to subscribe to {subscription_type} for {channel_name}: HTTP {resp.status} {await resp.text()}")
+        logger.info(f"UTA EventSub: {self.active_subscription_count} subscription(s) active on session {self.session_id}.")
+
+
+async def eventsub_listener_task(bot_instance):
+    # Runs on the bot loop under the service supervisor, which restarts it if run() ever raises.
+    logger.info(f"UTA EventSub task ({asyncio.current_task().get_name()}) started.")
+    client = EventSubWebSocketClient(config_manager.UTA_EVENTSUB_WS_URL, config_manager.UTA_EVENTSUB_SUBSCRIPTIONS_URL)
+    try:
+        await client.run()
+    finally:
+        stream_state_hub.push_transport_healthy = False
+        logger.info(f"UTA EventSub task ({asyncio.current_task().get_name()}) has finished.")
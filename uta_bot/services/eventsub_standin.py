@@ -0,0 +1,231 @@
+"""
+Local stand-in for Twitch's EventSub WebSocket + subscriptions endpoints, for exercising the push path offline.
+
+    python -m uta_bot.services.eventsub_standin --replay events.jsonl --port 8765
+
+then point the bot at it:
+    "UTA_EVENTSUB_WS_URL": "ws://127.0.0.1:8765/ws",
+    "UTA_EVENTSUB_SUBSCRIPTIONS_URL": "http://127.0.0.1:8765/eventsub/subscriptions"
+
+Replay files are JSONL. Each line is either a record written by UTA_EVENTSUB_RECORD_FILE
+({"received_at": ..., "message": {...}}, replayed with the original spacing) or a hand-written
+{"subscription_type": "stream.online", "event": {...}, "delay": 5} (delay = seconds before sending).
+Extra endpoints: POST /inject with {"subscription_type", "event"} pushes an event now; POST /reconnect
+sends session_reconnect to every client.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import web, WSMsgType
+
+logger = logging.getLogger("eventsub_standin")
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def load_replay_records(filepath: str) -> list:
+    """Returns [(delay_seconds, subscription_type, event)] in file order."""
+    records = []
+    previous_received_at = None
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                raw_record = json.loads(line)
+            except ValueError as e:
+                logger.warning(f"Skipping line {line_number} of {filepath}: {e}")
+                continue
+            if "message" in raw_record:
+                message = raw_record["message"]
+                subscription_type = message.get("metadata", {}).get("subscription_type") or \
+                                    message.get("payload", {}).get("subscription", {}).get("type")
+                event = message.get("payload", {}).get("event", {})
+                received_at = raw_record.get("received_at")
+                delay = (received_at - previous_received_at) if (received_at and previous_received_at) else 0
+                previous_received_at = received_at
+            else:
+                subscription_type, event, delay = raw_record.get("subscription_type"), raw_record.get("event", {}), raw_record.get("delay", 0)
+            if subscription_type:
+                records.append((max(0.0, float(delay)), subscription_type, event))
+    return records
+
+
+class StandinSession:
+    def __init__(self, session_id: str, ws: web.WebSocketResponse):
+        self.session_id = session_id
+        self.ws = ws
+        self.subscriptions = {} # subscription type -> subscription dict (last one wins per type+condition is fine here)
+        self.subscribed = asyncio.Event()
+
+
+class EventSubStandinServer:
+    def __init__(self, replay_records: list, speed: float = 1.0, loop_replay: bool = False,
+                 keepalive_seconds: int = 10, as_channel: str = None, as_channel_id: str = None):
+        self.replay_records = replay_records
+        self.speed = speed if speed > 0 else 1.0
+        self.loop_replay = loop_replay
+        self.keepalive_seconds = keepalive_seconds
+        self.as_channel = as_channel
+        self.as_channel_id = as_channel_id
+        self.sessions = {} # session_id -> StandinSession
+        self.base_ws_url = None
+
+    def _rewrite_event(self, event: dict) -> dict:
+        # Lets a recording from one channel drive whichever channel the bot is configured for.
+        event = dict(event)
+        if self.as_channel:
+            event["broadcaster_user_login"] = self.as_channel.lower()
+            event["broadcaster_user_name"] = self.as_channel
+        if self.as_channel_id:
+            event["broadcaster_user_id"] = self.as_channel_id
+        return event
+
+    def _notification(self, session: StandinSession, subscription_type: str, event: dict) -> dict:
+        subscription = session.subscriptions.get(subscription_type) or {
+            "id": str(uuid.uuid4()), "type": subscription_type, "version": "1", "status": "enabled", "cost": 0,
+            "condition": {"broadcaster_user_id": event.get("broadcaster_user_id")},
+            "transport": {"method": "websocket", "session_id": session.session_id}, "created_at": _now_iso()
+        }
+        return {
+            "metadata": {"message_id": str(uuid.uuid4()), "message_type": "notification", "message_timestamp": _now_iso(),
+                         "subscription_type": subscription_type, "subscription_version": subscription.get("version", "1")},
+            "payload": {"subscription": subscription, "event": self._rewrite_event(event)}
+        }
+
+    async def _send(self, session: StandinSession, message: dict) -> bool:
+        if session.ws.closed:
+            return False
+        await session.ws.send_str(json.dumps(message))
+        return True
+
+    async def _replay(self, session: StandinSession):
+        try:
+            await asyncio.wait_for(session.subscribed.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            logger.info(f"Session {session.session_id}: no subscriptions after 10s, replaying anyway.")
+        while True:
+            for delay, subscription_type, event in self.replay_records:
+                await asyncio.sleep(delay / self.speed)
+                if not await self._send(session, self._notification(session, subscription_type, event)):
+                    return
+                logger.info(f"Session {session.session_id}: replayed {subscription_type}.")
+            if not self.loop_replay:
+                return
+
+    async def _keepalive(self, session: StandinSession):
+        while not session.ws.closed:
+            await asyncio.sleep(self.keepalive_seconds * 0.8)
+            await self._send(session, {
+                "metadata": {"message_id": str(uuid.uuid4()), "message_type": "session_keepalive", "message_timestamp": _now_iso()},
+                "payload": {}
+            })
+
+    async def handle_ws(self, request: web.Request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        migrating_session_id = request.query.get("reconnect")
+        session_id = migrating_session_id if migrating_session_id in self.sessions else str(uuid.uuid4())
+        previous_session = self.sessions.get(session_id)
+        session = StandinSession(session_id, ws)
+        if previous_session:
+            session.subscriptions = previous_session.subscriptions
+            session.subscribed.set()
+        self.sessions[session_id] = session
+
+        await self._send(session, {
+            "metadata": {"message_id": str(uuid.uuid4()), "message_type": "session_welcome", "message_timestamp": _now_iso()},
+            "payload": {"session": {"id": session_id, "status": "connected", "connected_at": _now_iso(),
+                                    "keepalive_timeout_seconds": None if previous_session else self.keepalive_seconds,
+                                    "reconnect_url": None}}
+        })
+        logger.info(f"Session {session_id}: {'migrated' if previous_session else 'connected'}.")
+
+        background_tasks = [asyncio.create_task(self._keepalive(session))]
+        if not previous_session and self.replay_records:
+            background_tasks.append(asyncio.create_task(self._replay(session)))
+        try:
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break # Clients never send anything meaningful; just drain until close
+        finally:
+            for task in background_tasks:
+                task.cancel()
+            if self.sessions.get(session_id) is session:
+                del self.sessions[session_id]
+            logger.info(f"Session {session_id}: closed.")
+        return ws
+
+    async def handle_subscribe(self, request: web.Request):
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"error": "Unauthorized", "status": 401, "message": "OAuth token is missing"}, status=401)
+        body = await request.json()
+        session = self.sessions.get(body.get("transport", {}).get("session_id"))
+        if session is None:
+            return web.json_response({"error": "Bad Request", "status": 400, "message": "websocket transport session does not exist"}, status=400)
+        subscription = {
+            "id": str(uuid.uuid4()), "status": "enabled", "type": body.get("type"), "version": body.get("version", "1"),
+            "condition": body.get("condition", {}), "transport": body.get("transport"), "created_at": _now_iso(), "cost": 0
+        }
+        session.subscriptions[body.get("type")] = subscription
+        session.subscribed.set()
+        return web.json_response({"data": [subscription], "total": len(session.subscriptions), "total_cost": 0, "max_total_cost": 10}, status=202)
+
+    async def handle_inject(self, request: web.Request):
+        body = await request.json()
+        sent_count = 0
+        for session in list(self.sessions.values()):
+            if await self._send(session, self._notification(session, body.get("subscription_type"), body.get("event", {}))):
+                sent_count += 1
+        return web.json_response({"sent": sent_count})
+
+    async def handle_reconnect(self, request: web.Request):
+        sent_count = 0
+        for session in list(self.sessions.values()):
+            reconnect_url = f"{self.base_ws_url}?reconnect={session.session_id}"
+            if await self._send(session, {
+                "metadata": {"message_id": str(uuid.uuid4()), "message_type": "session_reconnect", "message_timestamp": _now_iso()},
+                "payload": {"session": {"id": session.session_id, "status": "reconnecting", "keepalive_timeout_seconds": None,
+                                        "reconnect_url": reconnect_url, "connected_at": _now_iso()}}
+            }):
+                sent_count += 1
+        return web.json_response({"sent": sent_count})
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/ws", self.handle_ws)
+        app.router.add_post("/eventsub/subscriptions", self.handle_subscribe)
+        app.router.add_post("/inject", self.handle_inject)
+        app.router.add_post("/reconnect", self.handle_reconnect)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local EventSub WebSocket stand-in that replays recorded events.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replay", help="JSONL file of recorded or hand-written events")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--loop", action="store_true", help="Restart the replay when it ends")
+    parser.add_argument("--keepalive", type=int, default=10, help="keepalive_timeout_seconds sent in the welcome")
+    parser.add_argument("--as-channel", help="Rewrite broadcaster_user_login in replayed events")
+    parser.add_argument("--as-channel-id", help="Rewrite broadcaster_user_id in replayed events")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s:%(levelname)s:%(name)s: %(message)s')
+    replay_records = load_replay_records(args.replay) if args.replay else []
+    logger.info(f"Loaded {len(replay_records)} event(s) to replay.")
+    server = EventSubStandinServer(replay_records, args.speed, args.loop, args.keepalive, args.as_channel, args.as_channel_id)
+    server.base_ws_url = f"ws://{args.host}:{args.port}/ws"
+    web.run_app(server.build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Codec negotiation for the restream pipe.
+
+ffprobe looks at the Twitch ingest once per stream session (the result is cached per channel until the next session
+starts), and the restream FFmpeg copies the audio when it's already something YouTube takes over RTMP instead of
+always re-encoding it to AAC. UTA_RESTREAM_AUDIO_MODE can force either path."""
+import json
+import logging
+import asyncio
+
+from uta_bot import config_manager
+from .restream_pipe import _hidden_window_kwargs
+from .streamlink_ingest import resolve_stream_url, get_cached_stream_url, remember_stream_url
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT_SECONDS = 30
+YOUTUBE_COPY_AUDIO_CODECS = {"aac"}
+YOUTUBE_COPY_SAMPLE_RATES = {44100, 48000}
+YOUTUBE_COPY_AUDIO_CHANNELS = {1, 2}
+TRANSCODE_AUDIO_ARGS = ["-c:a", "aac", "-b:a", "160k"]
+# Twitch's MPEG-TS carries ADTS AAC; FLV wants it without the ADTS headers.
+COPY_AUDIO_ARGS = ["-c:a", "copy", "-bsf:a", "aac_adtstoasc"]
+
+_probe_cache = {} # channel -> probe dict, or None if probing failed this session
+_audio_copy_failed = set() # Channels whose pipe failed with audio copy this session
+
+
+async def _communicate(command: list) -> tuple:
+    # (returncode, stdout) of a short-lived helper process; kills it after PROBE_TIMEOUT_SECONDS.
+    process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                                                   **_hidden_window_kwargs())
+    try:
+        stdout_bytes, stderr_bytes = await asyncio.wait_for(process.communicate(), PROBE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    if process.returncode != 0:
+        logger.debug(f"UTA Ingest Probe: {command[0]} exited with {process.returncode}: {stderr_bytes.decode('utf-8', errors='ignore').strip()[-300:]}")
+    return process.returncode, stdout_bytes.decode('utf-8', errors='ignore')
+
+async def resolve_ingest_url(channel: str):
+    """The channel's HLS playlist URL, from the warm-restart cache while its token is good. None if it can't be resolved."""
+    if config_manager.effective_streamlink_session_ingest():
+        return await asyncio.to_thread(resolve_stream_url, channel, "best")
+    cached_url = get_cached_stream_url(channel)
+    if cached_url:
+        return cached_url
+    try:
+        returncode, stdout = await _communicate([config_manager.UTA_STREAMLINK_PATH, "--stream-url", f"twitch.tv/{channel}", "best"])
+    except (FileNotFoundError, asyncio.TimeoutError) as e:
+        logger.warning(f"UTA Ingest Probe: Resolving twitch.tv/{channel} with streamlink failed: {e or 'timed out'}")
+        return None
+    url = stdout.strip()
+    if returncode != 0 or not url.startswith("http"):
+        return None
+    remember_stream_url(channel, url)
+    return url
+
+async def _run_ffprobe(url: str):
+    returncode, stdout = await _communicate([
+        config_manager.UTA_FFPROBE_PATH, "-v", "error",
+        "-show_entries", "stream=codec_type,codec_name,profile,sample_rate,channels,bit_rate,width,height",
+        "-of", "json", url
+    ])
+    if returncode != 0:
+        return None
+    streams = json.loads(stdout or "{}").get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+    def _int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return {
+        "video_codec": video.get("codec_name"), "width": video.get("width"), "height": video.get("height"),
+        "audio_codec": audio.get("codec_name"), "audio_profile": audio.get("profile"),
+        "sample_rate": _int(audio.get("sample_rate")), "channels": audio.get("channels"),
+        "audio_kbps": _int(audio.get("bit_rate")) // 1000 if _int(audio.get("bit_rate")) else None, # Often absent for TS input
+    }
+
+async def probe_ingest(channel: str):
+    """Codec parameters of the channel's live ingest (video_codec, width, height, audio_codec, audio_profile, sample_rate,
+    channels, audio_kbps), or None if it couldn't be probed. Cached until forget_ingest_probe()."""
+    channel = channel.lower()
+    if channel in _probe_cache:
+        return _probe_cache[channel]
+    probe = None
+    try:
+        url = await resolve_ingest_url(channel)
+        if url:
+            probe = await _run_ffprobe(url)
+    except FileNotFoundError as e:
+        logger.warning(f"UTA Ingest Probe: ffprobe/streamlink not found ({e}). Audio will be transcoded.")
+    except (asyncio.TimeoutError, json.JSONDecodeError) as e:
+        logger.warning(f"UTA Ingest Probe: Probing twitch.tv/{channel} failed: {e or 'timed out'}")
+    except Exception as e:
+        logger.warning(f"UTA Ingest Probe: Probing twitch.tv/{channel} failed: {e}", exc_info=True)
+    if probe:
+        audio_kbps_text = f", {probe['audio_kbps']} kbps" if probe["audio_kbps"] else ""
+        logger.info(f"UTA Ingest Probe: twitch.tv/{channel}: video {probe['video_codec']} {probe['width']}x{probe['height']}, "
+                    f"audio {probe['audio_codec']} ({probe['audio_profile']}) {probe['sample_rate']} Hz {probe['channels']}ch{audio_kbps_text}")
+        if probe["video_codec"] not in (None, "h264"):
+            logger.warning(f"UTA Ingest Probe: Video is {probe['video_codec']}, but the pipe copies video into FLV, which needs H.264.")
+    _probe_cache[channel] = probe
+    return probe
+
+def forget_ingest_probe(channel: str):
+    # New stream session: the streamer may have changed encoder settings in between.
+    _probe_cache.pop(channel.lower(), None)
+    _audio_copy_failed.discard(channel.lower())
+
+def mark_audio_copy_failed(channel: str):
+    _audio_copy_failed.add(channel.lower())
+
+def choose_audio_args(channel: str, probe) -> tuple:
+    """(FFmpeg audio args, description of the chosen path). Copies when the source audio is AAC at 44.1/48 kHz in
+    mono or stereo, which YouTube ingests as is; everything else is transcoded to AAC 160k."""
+    audio_mode = config_manager.UTA_RESTREAM_AUDIO_MODE
+    if audio_mode == "copy":
+        return COPY_AUDIO_ARGS, "copy (forced by UTA_RESTREAM_AUDIO_MODE)"
+    if audio_mode == "transcode":
+        return TRANSCODE_AUDIO_ARGS, "transcode to AAC 160k (forced by UTA_RESTREAM_AUDIO_MODE)"
+    if channel.lower() in _audio_copy_failed:
+        return TRANSCODE_AUDIO_ARGS, "transcode to AAC 160k (a pipe with audio copy failed this session)"
+    if not probe:
+        return TRANSCODE_AUDIO_ARGS, "transcode to AAC 160k (ingest not probed)"
+    if not probe["audio_codec"]:
+        return TRANSCODE_AUDIO_ARGS, "transcode to AAC 160k (no audio track found)"
+
+    source = f"{probe['audio_codec']} {probe['sample_rate']} Hz {probe['channels']}ch"
+    mismatches = []
+    if probe["audio_codec"] not in YOUTUBE_COPY_AUDIO_CODECS:
+        mismatches.append("codec")
+    if probe["sample_rate"] not in YOUTUBE_COPY_SAMPLE_RATES:
+        mismatches.append("sample rate")
+    if probe["channels"] not in YOUTUBE_COPY_AUDIO_CHANNELS:
+        mismatches.append("channel layout")
+    if mismatches:
+        return TRANSCODE_AUDIO_ARGS, f"transcode to AAC 160k (source {source}; {', '.join(mismatches)} not YouTube-compatible)"
+    return COPY_AUDIO_ARGS, f"copy (source {source})"
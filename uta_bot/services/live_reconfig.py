@@ -0,0 +1,102 @@
+"""Live reconfiguration for !reloadconfig (and coordinator-mode workers picking up config.json edits).
+
+Changed UTA keys are sorted by what it takes to apply them: most are read from config_manager on every use and only
+need sleeping services woken up, a few are only read when Streamlink/FFmpeg are launched, and the rest decide which
+services/connections exist at all. Only that last group stops and restarts the services (and with them a running restream)."""
+import asyncio
+import logging
+
+from uta_bot import config_manager
+from .service_supervisor import service_supervisor
+
+logger = logging.getLogger(__name__)
+
+
+RECONFIG_HOT = "hot"
+RECONFIG_PIPE_RESTART = "pipe_restart"
+RECONFIG_SERVICE_RESTART = "service_restart"
+
+# Read once when the services start: which services run, what they connect to and with which credentials.
+SERVICE_RESTART_KEYS = frozenset({
+    "UTA_ENABLED", "UTA_TWITCH_CHANNEL_NAME", "UTA_ADDITIONAL_TWITCH_CHANNELS",
+    "UTA_CLIP_MONITOR_ENABLED", "UTA_RESTREAMER_ENABLED", "UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED",
+    "UTA_EVENTSUB_ENABLED", "UTA_EVENTSUB_WS_URL", "UTA_EVENTSUB_SUBSCRIPTIONS_URL", "UTA_EVENTSUB_USER_TOKEN",
+    "UTA_YOUTUBE_API_ENABLED", "UTA_YOUTUBE_CLIENT_SECRET_FILE", "UTA_YOUTUBE_TOKEN_FILE", "UTA_YOUTUBE_API_ROOT_URL",
+    "UTA_WORKER_PROCESSES", "UTA_WORKER_LEASE_DB_FILE",
+})
+
+# Only read when the Streamlink/FFmpeg pipe is launched; the restreamer relaunches it in place (same YouTube broadcast).
+PIPE_RESTART_KEYS = frozenset({
+    "UTA_STREAMLINK_PATH", "UTA_FFMPEG_PATH", "UTA_YOUTUBE_RTMP_URL_BASE", "UTA_YOUTUBE_STREAM_KEY",
+    "UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED", "UTA_RESTREAM_LOCAL_ARCHIVE_DIR", "UTA_RESTREAM_EXTRA_RTMP_TARGETS",
+    "UTA_RECORDER_ENABLED", "UTA_RECORDER_DIR", "UTA_RECORDER_SEGMENT_SECONDS", "UTA_RECORDER_SEGMENT_FORMAT",
+    "UTA_RESTREAM_INGEST_MODE", "UTA_RESTREAM_INGEST_BUFFER_SECONDS", "UTA_RESTREAM_INGEST_PREBUFFER_SECONDS",
+    "UTA_FFPROBE_PATH", "UTA_RESTREAM_AUDIO_MODE",
+})
+
+
+def classify_config_key(key: str) -> str:
+    # Anything not listed is read live (intervals, templates, webhooks, thresholds, log paths).
+    if key in SERVICE_RESTART_KEYS:
+        return RECONFIG_SERVICE_RESTART
+    if key in PIPE_RESTART_KEYS:
+        return RECONFIG_PIPE_RESTART
+    return RECONFIG_HOT
+
+def _owns_restreamer() -> bool:
+    # The coordinator process never runs the restreamer itself; its workers handle pipe changes.
+    return not (config_manager.UTA_WORKER_PROCESSES > 0 and not config_manager.UTA_WORKER_ID)
+
+def plan_reconfiguration(old_config: dict, new_config: dict) -> dict:
+    """Changed UTA_* keys grouped by classification: {RECONFIG_HOT: [...], RECONFIG_PIPE_RESTART: [...], RECONFIG_SERVICE_RESTART: [...]}."""
+    plan = {RECONFIG_HOT: [], RECONFIG_PIPE_RESTART: [], RECONFIG_SERVICE_RESTART: []}
+    for key in sorted(set(old_config) | set(new_config)):
+        if key.startswith("UTA_") and old_config.get(key) != new_config.get(key):
+            plan[classify_config_key(key)].append(key)
+
+    # A restreamer that never started (e.g. FFmpeg wasn't found) only gets its prerequisites re-checked on a service start.
+    if plan[RECONFIG_PIPE_RESTART] and new_config.get("UTA_RESTREAMER_ENABLED") and _owns_restreamer() and \
+       config_manager._are_uta_threads_active and not service_supervisor.is_running("Restreamer"):
+        plan[RECONFIG_SERVICE_RESTART].extend(plan[RECONFIG_PIPE_RESTART])
+        plan[RECONFIG_PIPE_RESTART] = []
+    return plan
+
+def describe_plan(plan: dict) -> str:
+    lines = []
+    if plan[RECONFIG_HOT]:
+        lines.append(f"Applied live: {', '.join(plan[RECONFIG_HOT])}")
+    if plan[RECONFIG_PIPE_RESTART]:
+        lines.append(f"Restream pipe restart: {', '.join(plan[RECONFIG_PIPE_RESTART])}")
+    if plan[RECONFIG_SERVICE_RESTART]:
+        lines.append(f"UTA service restart: {', '.join(plan[RECONFIG_SERVICE_RESTART])}")
+    return "\n".join(lines)
+
+async def apply_live_changes(plan: dict):
+    """Pushes hot and pipe-restart changes into the running services. Call after apply_config_globally;
+    service-restart keys are left to the caller (stop_all_services/start_all_services)."""
+    from .poll_scheduler import adaptive_poll_scheduler
+    from .stream_state_hub import stream_state_hub
+    from .restream_service import request_pipe_restart
+    from .chapter_builder import session_chapter_builder
+    from .youtube_quota import youtube_quota_ledger
+
+    hot_keys = plan[RECONFIG_HOT]
+    if hot_keys:
+        if any(key.startswith("UTA_ADAPTIVE_POLL") for key in hot_keys):
+            adaptive_poll_scheduler.reset() # Cached profiles were built with the old history window/thresholds
+        # Both reload from the new file, which is disk work, so it stays off the loop.
+        if "UTA_CHAPTER_CHECKPOINT_FILE" in hot_keys:
+            await asyncio.to_thread(session_chapter_builder.configure, config_manager.UTA_CHAPTER_CHECKPOINT_FILE)
+        if "UTA_YOUTUBE_QUOTA_LEDGER_FILE" in hot_keys:
+            await asyncio.to_thread(youtube_quota_ledger.configure, config_manager.UTA_YOUTUBE_QUOTA_LEDGER_FILE)
+        # Services parked in an interval sleep would otherwise keep the old interval until it runs out.
+        service_supervisor.wake_interval_sleeps()
+        stream_state_hub.request_poll()
+        logger.info(f"UTA Reconfig: Applied {len(hot_keys)} key(s) live: {', '.join(hot_keys)}")
+
+    pipe_keys = plan[RECONFIG_PIPE_RESTART]
+    if pipe_keys:
+        if config_manager.uta_is_restreaming_active:
+            request_pipe_restart(f"config change: {', '.join(pipe_keys)}")
+        else:
+            logger.info(f"UTA Reconfig: {', '.join(pipe_keys)} changed; applies the next time the restream pipe starts.")
@@ -0,0 +1,141 @@
+import logging
+import os
+import asyncio
+import threading
+import time
+
+from uta_bot import config_manager
+from uta_bot.utils.constants import EVENT_TYPE_STREAM_START, EVENT_TYPE_STREAM_END
+from uta_bot.utils.data_logging import read_stream_activity_event_times
+from uta_bot.services.channel_state import get_channel_state
+
+logger = logging.getLogger(__name__)
+
+
+HOURS_PER_WEEK = 168
+PROFILE_REBUILD_SECONDS = 3600 # The history window slides, so rebuild hourly even if the log hasn't changed
+WINDOW_PADDING_SECONDS = 1800 # Streams start a bit early/late; treat the neighbouring half hours as part of a window
+
+
+def _hour_of_week(unix_ts: float) -> int:
+    # UTC based; a DST shift moves a window by an hour, which WINDOW_PADDING_SECONDS absorbs.
+    return int((unix_ts // 3600 + 72) % HOURS_PER_WEEK) # Epoch was a Thursday, +72h makes 0 = Monday 00:00 UTC
+
+
+class StartTimeProfile:
+    """How often a channel has gone live in each hour of the week over the history window."""
+
+    def __init__(self, start_timestamps: list, last_end_ts: int, history_days: int, now: float):
+        self.start_count = len(start_timestamps)
+        self.last_end_ts = last_end_ts
+        self.built_at = now
+        weeks_with_start = [set() for _ in range(HOURS_PER_WEEK)]
+        for start_ts in start_timestamps:
+            weeks_with_start[_hour_of_week(start_ts)].add(int(start_ts // (86400 * 7)))
+        self.hour_counts = [len(weeks) for weeks in weeks_with_start] # Several starts in one hour of one week count once
+        covered_days = min(history_days, (now - min(start_timestamps)) / 86400) if start_timestamps else history_days
+        self.weeks_covered = max(1.0, covered_days / 7)
+
+    def probability_at(self, unix_ts: float) -> float:
+        return min(1.0, self.hour_counts[_hour_of_week(unix_ts)] / self.weeks_covered)
+
+    def window_probability(self, unix_ts: float, lookahead_seconds: float) -> float:
+        # Highest start probability from just before now until the next poll would happen.
+        return max(self.probability_at(unix_ts - WINDOW_PADDING_SECONDS),
+                   self.probability_at(unix_ts),
+                   self.probability_at(unix_ts + lookahead_seconds + WINDOW_PADDING_SECONDS))
+
+
+class AdaptivePollScheduler:
+    """Turns past STREAM_START/STREAM_END events into poll intervals: fast in likely windows and after a stream ends, slow otherwise."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = {} # activity log path -> (mtime, StartTimeProfile)
+        self._last_modes = {} # lowercased channel name -> last mode logged, so mode changes are logged once
+
+    def _cached_profile(self, channel_name: str, now: float) -> tuple:
+        # (log_path, log_mtime, profile); profile is None when it has to be (re)built from the activity log.
+        log_path = get_channel_state(channel_name).stream_activity_log_file
+        try:
+            log_mtime = os.path.getmtime(log_path) if log_path else None
+        except OSError:
+            log_mtime = None
+        with self._lock:
+            cached = self._profiles.get(log_path)
+        if cached and cached[0] == log_mtime and now - cached[1].built_at < PROFILE_REBUILD_SECONDS:
+            return log_path, log_mtime, cached[1]
+        return log_path, log_mtime, None
+
+    def get_profile(self, channel_name: str) -> StartTimeProfile:
+        # Blocking on a rebuild (up to UTA_ADAPTIVE_POLL_HISTORY_DAYS of the log); loop callers go through ensure_profile_async().
+        now = time.time()
+        log_path, log_mtime, profile = self._cached_profile(channel_name, now)
+        if profile:
+            return profile
+
+        history_days = config_manager.UTA_ADAPTIVE_POLL_HISTORY_DAYS
+        event_times = read_stream_activity_event_times(log_path, since_unix=int(now - history_days * 86400)) if log_mtime else []
+        start_timestamps = [ts for event_type, ts in event_times if event_type == EVENT_TYPE_STREAM_START]
+        end_timestamps = [ts for event_type, ts in event_times if event_type == EVENT_TYPE_STREAM_END]
+        profile = StartTimeProfile(start_timestamps, max(end_timestamps) if end_timestamps else 0, history_days, now)
+        with self._lock:
+            self._profiles[log_path] = (log_mtime, profile)
+        logger.debug(f"UTA PollScheduler: Built start-time profile for {channel_name} from {profile.start_count} stream start(s).")
+        return profile
+
+    async def ensure_profile_async(self, channel_name: str):
+        # Builds a missing or stale profile in a worker thread, so the get_interval() that follows only reads the cache.
+        if config_manager.UTA_ADAPTIVE_POLLING_ENABLED and channel_name and not self._cached_profile(channel_name, time.time())[2]:
+            await asyncio.to_thread(self.get_profile, channel_name)
+
+    async def get_interval_async(self, channel_name: str, base_interval: float, is_live: bool = False, last_end_ts: float = 0) -> int:
+        """get_interval() for callers on the event loop."""
+        if not is_live:
+            await self.ensure_profile_async(channel_name)
+        return self.get_interval(channel_name, base_interval, is_live, last_end_ts)
+
+    def get_interval(self, channel_name: str, base_interval: float, is_live: bool = False, last_end_ts: float = 0) -> int:
+        """
+        Seconds to wait before the next check of channel_name. base_interval is the caller's configured fixed interval,
+        used while live and whenever there isn't enough history to predict anything.
+        """
+        if not config_manager.UTA_ADAPTIVE_POLLING_ENABLED or not channel_name:
+            return base_interval
+        min_interval = max(1, config_manager.UTA_ADAPTIVE_POLL_MIN_SECONDS)
+        max_interval = max(min_interval, config_manager.UTA_ADAPTIVE_POLL_MAX_SECONDS)
+        if is_live:
+            return self._note_mode(channel_name, "live", base_interval)
+
+        now = time.time()
+        profile = self.get_profile(channel_name)
+        last_end_ts = max(last_end_ts or 0, profile.last_end_ts)
+        if last_end_ts and now - last_end_ts < config_manager.UTA_ADAPTIVE_POLL_POST_END_SECONDS:
+            return self._note_mode(channel_name, "post_end", min_interval) # Crashes and "brb" restarts come back quickly
+
+        if profile.start_count < config_manager.UTA_ADAPTIVE_POLL_MIN_HISTORY_STARTS:
+            return self._note_mode(channel_name, "no_history", base_interval)
+
+        if profile.window_probability(now, max_interval) >= config_manager.UTA_ADAPTIVE_POLL_LIKELY_THRESHOLD:
+            return self._note_mode(channel_name, "likely_window", min_interval)
+        return self._note_mode(channel_name, "quiet", max_interval)
+
+    def _note_mode(self, channel_name: str, mode: str, interval: float) -> int:
+        with self._lock:
+            previous_mode = self._last_modes.get(channel_name.lower())
+            self._last_modes[channel_name.lower()] = mode
+        if previous_mode != mode:
+            logger.info(f"UTA PollScheduler: {channel_name} switched to '{mode}' polling (next wait {interval}s).")
+        return interval
+
+    def get_mode(self, channel_name: str) -> str:
+        with self._lock:
+            return self._last_modes.get(channel_name.lower()) if channel_name else None
+
+    def reset(self):
+        with self._lock:
+            self._profiles.clear()
+            self._last_modes.clear()
+
+
+adaptive_poll_scheduler = AdaptivePollScheduler()
@@ -0,0 +1,637 @@
+"""Event-driven supervision of the Streamlink -> FFmpeg restream pipe.
+
+Both processes run as asyncio subprocesses on the service loop, connected by an OS pipe. RestreamPipe.supervise()
+multiplexes their stderr, their exits, a tick timer and wake-ups from control requests (manual restart/new part,
+rollover, config changes), so the restreamer acts on those within seconds instead of whenever FFmpeg happens to exit.
+
+With more than one destination (local archive, extra RTMP targets) FFmpeg feeds them all from the single Streamlink
+ingest through its tee muxer, each with onfail=ignore so one dead target doesn't take the others down.
+
+A throughput watchdog on the same tick catches a pipe that froze or fell behind without exiting. When Streamlink's data
+is piling up in the pipe only FFmpeg is replaced, and the ingest keeps its Twitch connection. When the pipe is empty
+Streamlink is at fault, but FFmpeg is replaced along with it: a new ingest starts a new MPEG-TS stream whose timestamps
+and continuity counters begin again, which a running FFmpeg copying video to FLV/RTMP would pass on as non-monotonic DTS.
+
+In session ingest mode the Streamlink side is a StreamlinkSessionIngest (streamlink_ingest.py) instead of a process."""
+import json
+import logging
+import os
+import re
+import time
+import struct
+import asyncio
+import subprocess
+import collections
+
+from datetime import datetime, timezone
+
+from uta_bot import config_manager
+from .service_supervisor import service_supervisor
+from uta_bot.utils.data_logging import log_restream_metrics_binary
+
+try:
+    import fcntl, termios # POSIX only, for peeking at how much is queued between Streamlink and FFmpeg
+except ImportError:
+    fcntl = termios = None
+
+logger = logging.getLogger(__name__)
+
+
+PIPE_TICK_SECONDS = 1 # stop_check() is re-evaluated at least this often, so timers (rollover) need no wake-up of their own
+PROCESS_TERMINATE_TIMEOUT_SECONDS = 10
+PIPE_DRAIN_SECONDS = 5 # After Streamlink exits, FFmpeg gets this long to flush what it buffered and exit on EOF
+FFMPEG_STDERR_TAIL_LINES = 20
+STREAMLINK_STDERR_TAIL_LINES = 50
+
+# FFmpeg's tee muxer reports a dropped output (at open or mid-stream) as e.g.
+# "[tee @ 0x...] Slave muxer #1 failed: Connection refused, continuing with 2/3 slaves."
+TEE_SLAVE_FAILURE_RE = re.compile(r"Slave muxer #(\d+) failed: (.*?), continuing with (\d+)/(\d+) slaves")
+# "-progress pipe:2" interleaves key=value blocks, each ending in progress=continue|end, with FFmpeg's log lines.
+FFMPEG_PROGRESS_LINE_RE = re.compile(r"^(frame|fps|stream_\d+_\d+_q|bitrate|total_size|out_time_us|out_time_ms|out_time|dup_frames|drop_frames|speed|progress)=(.*)$")
+
+
+class PipeOutput:
+    """One FFmpeg destination of the pipe. kind is "rtmp", "file" or "segments"; the stats fields are filled in by the pipe.
+    Subclasses can hook poll() (every supervise tick), reopen() (before a replacement FFmpeg starts) and close() (after
+    the processes are gone)."""
+
+    def __init__(self, name: str, url: str, kind: str = "rtmp"):
+        self.name = name
+        self.url = url
+        self.kind = kind
+        self.failed_reason = None
+        self.kbps = None
+        self._last_size = None
+        self._base_url = url
+        self._reopen_count = 0
+
+    @property
+    def display_target(self) -> str:
+        # RTMP URLs end in the stream key; never log or show that part.
+        if self.kind == "rtmp":
+            return f"{self.url.rsplit('/', 1)[0]}/<STREAM_KEY>"
+        return self.url
+
+    def tee_options(self) -> str:
+        if self.kind == "rtmp":
+            return "f=flv:flvflags=no_duration_filesize"
+        return "f=flv"
+
+    def tee_slave(self) -> str:
+        # The slave list is split on '|' with backslash escapes; the URL part itself needs nothing else.
+        escaped_url = self.url.replace("\\", "\\\\").replace("'", "\\'").replace("|", "\\|")
+        return f"[{self.tee_options()}:onfail=ignore]{escaped_url}"
+
+    def bytes_written(self):
+        # None where it can't be measured locally (network outputs).
+        if self.kind != "file":
+            return None
+        try:
+            return os.path.getsize(self.url)
+        except OSError:
+            return None
+
+    async def poll(self):
+        pass
+
+    async def reopen(self):
+        # A new FFmpeg retries every output. A file output moves on to a new file: FFmpeg would truncate the old one.
+        self.failed_reason = None
+        self._last_size = None
+        if self.kind == "file":
+            self._reopen_count += 1
+            root, extension = os.path.splitext(self._base_url)
+            self.url = f"{root}_r{self._reopen_count}{extension}"
+            logger.info(f"UTA Restream Pipe: Output '{self.name}' continues in {self.url}.")
+
+    async def close(self):
+        pass
+
+
+def build_output_args(outputs: list) -> list:
+    """FFmpeg output arguments for the pipe's destinations: plain FLV for a single one, the tee muxer otherwise."""
+    if len(outputs) == 1:
+        output = outputs[0]
+        flv_flags = ["-flvflags", "no_duration_filesize"] if output.kind == "rtmp" else []
+        return ["-f", "flv", *flv_flags, output.url]
+    return ["-f", "tee", "|".join(output.tee_slave() for output in outputs)]
+
+def _parse_progress_block(block: dict) -> dict:
+    def _number(raw_value, suffix="", cast=float):
+        raw_value = (raw_value or "").strip()
+        if raw_value.endswith(suffix):
+            raw_value = raw_value[:len(raw_value) - len(suffix)]
+        try:
+            return cast(raw_value)
+        except ValueError:
+            return None # "N/A", e.g. bitrate/total_size behind the tee muxer
+
+    out_time_us = _number(block.get("out_time_us"), cast=int)
+    return {
+        "bitrate_kbps": _number(block.get("bitrate"), "kbits/s"),
+        "fps": _number(block.get("fps")),
+        "speed": _number(block.get("speed"), "x"),
+        "frame": _number(block.get("frame"), cast=int) or 0,
+        "drop_frames": _number(block.get("drop_frames"), cast=int) or 0,
+        "dup_frames": _number(block.get("dup_frames"), cast=int) or 0,
+        "out_time_seconds": out_time_us / 1_000_000 if out_time_us is not None and out_time_us >= 0 else None,
+        "total_size": _number(block.get("total_size"), cast=int),
+    }
+
+def format_progress_metrics(metrics: dict) -> str:
+    if not metrics:
+        return "N/A"
+    def _fmt(value, pattern):
+        return "N/A" if value is None else pattern.format(value)
+    out_time = metrics.get("out_time_seconds")
+    out_time_text = "N/A" if out_time is None else f"{int(out_time // 3600):02d}:{int(out_time % 3600 // 60):02d}:{int(out_time % 60):02d}"
+    return (f"{_fmt(metrics.get('bitrate_kbps'), '{:.0f} kbps')}, {_fmt(metrics.get('fps'), '{:.1f} fps')}, "
+            f"speed {_fmt(metrics.get('speed'), '{:.2f}x')}, drop {metrics.get('drop_frames', 0)}, dup {metrics.get('dup_frames', 0)}, out {out_time_text}")
+
+def _process_usage(pid: int):
+    """(cpu_seconds, bytes_read) for a process; either is None where neither psutil nor /proc can tell."""
+    cpu_seconds, bytes_read = None, None
+    if pid is None: # In-process ingest, no process of its own
+        return cpu_seconds, bytes_read
+    if config_manager.PSUTIL_AVAILABLE:
+        try:
+            process = config_manager.psutil.Process(pid)
+            cpu_times = process.cpu_times()
+            cpu_seconds = cpu_times.user + cpu_times.system
+            io_counters = process.io_counters() # Not available on macOS
+            bytes_read = getattr(io_counters, "read_chars", io_counters.read_bytes) # read_chars includes pipe reads (Linux)
+        except (config_manager.psutil.Error, AttributeError):
+            pass
+        return cpu_seconds, bytes_read
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat_fields = f.read().rsplit(")", 1)[1].split()
+        cpu_seconds = (int(stat_fields[11]) + int(stat_fields[12])) / os.sysconf("SC_CLK_TCK") # utime + stime
+        with open(f"/proc/{pid}/io") as f:
+            io_fields = dict(line.split(": ", 1) for line in f.read().splitlines() if ": " in line)
+        bytes_read = int(io_fields["rchar"])
+    except (OSError, ValueError, KeyError, IndexError):
+        pass
+    return cpu_seconds, bytes_read
+
+
+def _hidden_window_kwargs() -> dict:
+    if os.name != 'nt':
+        return {}
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = subprocess.SW_HIDE
+    return {"startupinfo": startupinfo}
+
+def _pipe_bytes_queued(fd):
+    # Bytes Streamlink wrote that FFmpeg hasn't read yet; None where that can't be asked (Windows).
+    if fcntl is None or fd is None:
+        return None
+    try:
+        return struct.unpack("i", fcntl.ioctl(fd, termios.FIONREAD, b"\0\0\0\0"))[0]
+    except OSError:
+        return None
+
+def _append_stall_record(path: str, record: dict):
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logger.warning(f"UTA Restream Pipe: Could not record stall event to {path}: {e}")
+
+async def _terminate_process(process, name: str):
+    if not process or process.returncode is not None:
+        return
+    logger.info(f"UTA Restream Pipe: Terminating {name} (PID: {process.pid})...")
+    try:
+        process.terminate()
+        await asyncio.wait_for(process.wait(), PROCESS_TERMINATE_TIMEOUT_SECONDS)
+        logger.info(f"UTA Restream Pipe: {name} (PID: {process.pid}) terminated gracefully (Code: {process.returncode}).")
+    except asyncio.TimeoutError:
+        logger.warning(f"UTA Restream Pipe: {name} (PID: {process.pid}) did not terminate gracefully after {PROCESS_TERMINATE_TIMEOUT_SECONDS}s, killing...")
+        process.kill()
+        try:
+            await asyncio.wait_for(process.wait(), PROCESS_TERMINATE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.error(f"UTA Restream Pipe: {name} (PID: {process.pid}) still hasn't exited {PROCESS_TERMINATE_TIMEOUT_SECONDS}s after being killed. Leaving it behind.")
+            return
+        logger.info(f"UTA Restream Pipe: {name} (PID: {process.pid}) process killed (Code: {process.returncode}).")
+    except ProcessLookupError:
+        pass # Exited between the returncode check and terminate()
+    except Exception as e:
+        logger.error(f"UTA Restream Pipe: Error during termination of {name} (PID: {process.pid}): {e}")
+
+
+class RestreamPipe:
+    """One Streamlink -> FFmpeg pipe. start() launches it, supervise() runs it until it dies or stop_check() asks
+    for a stop, stop() tears it down (FFmpeg first so it can finalize its output)."""
+
+    def __init__(self, outputs: list = None, ingest_factory=None, restart_since: float = None, restart_label: str = None):
+        self.streamlink_process = None
+        self.ffmpeg_process = None
+        self.stop_reason = None # Set when supervise() ended the pipe on purpose
+        self.supervising_since = None # time.monotonic() once start-up checks passed and supervise() took over
+        self.ffmpeg_stderr_tail = collections.deque(maxlen=FFMPEG_STDERR_TAIL_LINES)
+        self.streamlink_stderr_tail = collections.deque(maxlen=STREAMLINK_STDERR_TAIL_LINES)
+        self._wake_event = asyncio.Event()
+        self._reader_tasks = []
+        self.outputs = outputs or []
+        self.cpu_percent = {} # "FFmpeg"/"Streamlink" -> CPU% over the last stats interval
+        self._cpu_totals = {} # name -> [sum of cpu_percent samples, sample count], for average_cpu_percent()
+        self._last_stats_sample = None # (monotonic, {name: (cpu_seconds, bytes_read)})
+        self.progress = None # Latest parsed -progress block (bitrate_kbps, fps, speed, frame, drop/dup_frames, out_time_seconds)
+        self.progress_updated_at = None
+        self._progress_block = {}
+        self._last_metrics_logged_at = None
+        self._streamlink_command = None
+        self._ingest_factory = ingest_factory # Builds an in-process ingest (StreamlinkSessionIngest) to use instead of the CLI
+        self.restart_since = restart_since # time.monotonic() of the failure this pipe replaces, for the restart latency log
+        self.restart_label = restart_label
+        self.first_progress_at = None
+        self._ffmpeg_command = None
+        self._pipe_read_fd = None
+        self._pipe_write_fd = None
+        self._stderr_readers = {} # "Streamlink"/"FFmpeg" -> reader task of the current process
+        self.stall_restarts = 0
+        self._stall_marks = {} # "progress"/"speed_ok" -> time.monotonic() FFmpeg last moved on / last ran at normal speed
+        self._last_progress_marker = None
+        self._pending_stall = None # Stall record waiting for the restarted pipe to make progress
+
+    async def start(self, streamlink_command: list, ffmpeg_command: list):
+        # ffmpeg_command stops before the outputs; their arguments are built per FFmpeg spawn (see _spawn_ffmpeg).
+        # Raises FileNotFoundError if an executable is missing; call stop() afterwards either way.
+        self._streamlink_command, self._ffmpeg_command = streamlink_command, ffmpeg_command
+        # We keep both ends open as well so FFmpeg can be replaced alone after a stall. That also means FFmpeg only sees
+        # EOF once _close_pipe_fds() drops them.
+        self._pipe_read_fd, self._pipe_write_fd = os.pipe()
+        await self._spawn_streamlink()
+        await self._spawn_ffmpeg()
+
+    async def _spawn_streamlink(self):
+        if self._ingest_factory:
+            self.streamlink_process = self._ingest_factory()
+            await self.streamlink_process.start(self._pipe_write_fd)
+            return
+        logger.info("UTA Restream Pipe: Starting Streamlink process...")
+        self.streamlink_process = await asyncio.create_subprocess_exec(
+            *self._streamlink_command, stdout=self._pipe_write_fd, stderr=asyncio.subprocess.PIPE, **_hidden_window_kwargs()
+        )
+        logger.info(f"UTA Restream Pipe: Streamlink process started (PID: {self.streamlink_process.pid})")
+        reader = asyncio.create_task(self._pump_stderr(self.streamlink_process, self.streamlink_stderr_tail, "UTA_STREAMLINK_LOG"),
+                                     name="UTA-StreamlinkStderr")
+        self._stderr_readers["Streamlink"] = reader
+        self._reader_tasks.append(reader)
+
+    async def _spawn_ffmpeg(self):
+        if self.ffmpeg_process is not None:
+            # Replacing an FFmpeg: the same arguments would reopen (and truncate) the files the old one wrote.
+            for output in self.outputs:
+                await output.reopen()
+        logger.info("UTA Restream Pipe: Starting FFmpeg process...")
+        self.ffmpeg_process = await asyncio.create_subprocess_exec(
+            *self._ffmpeg_command, *build_output_args(self.outputs), stdin=self._pipe_read_fd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE, **_hidden_window_kwargs()
+        )
+        logger.info(f"UTA Restream Pipe: FFmpeg process started (PID: {self.ffmpeg_process.pid})")
+        self.progress, self._progress_block = None, {}
+        reader = asyncio.create_task(self._pump_stderr(self.ffmpeg_process, self.ffmpeg_stderr_tail, "UTA_FFMPEG_LOG", self._handle_ffmpeg_line),
+                                     name="UTA-FFmpegStderr")
+        self._stderr_readers["FFmpeg"] = reader
+        self._reader_tasks.append(reader)
+
+    def _close_pipe_fds(self):
+        for fd in (self._pipe_read_fd, self._pipe_write_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._pipe_read_fd = self._pipe_write_fd = None
+
+    async def _pump_stderr(self, process, tail: collections.deque, log_tag: str, line_handler=None):
+        while True:
+            try:
+                line_bytes = await process.stderr.readline()
+            except ValueError: # Line longer than the stream buffer limit; the remainder was discarded
+                continue
+            if not line_bytes:
+                break
+            decoded_line = line_bytes.decode('utf-8', errors='ignore').strip()
+            if decoded_line and not (line_handler and line_handler(decoded_line)):
+                logger.debug(f"{log_tag}: {decoded_line}")
+                tail.append(decoded_line)
+
+    def _handle_ffmpeg_line(self, line: str) -> bool:
+        # True for -progress lines: they're metrics, not log output, and would flush the error tail within seconds.
+        progress_match = FFMPEG_PROGRESS_LINE_RE.match(line)
+        if progress_match:
+            key, value = progress_match.groups()
+            if key == "progress":
+                self.progress = _parse_progress_block(self._progress_block)
+                self.progress_updated_at = time.monotonic()
+                self._progress_block = {}
+                if self.first_progress_at is None:
+                    self.first_progress_at = self.progress_updated_at
+                    if self.restart_since is not None:
+                        logger.info(f"UTA Restream Pipe: Restart latency {self.first_progress_at - self.restart_since:.1f}s "
+                                    f"from the failed pipe to FFmpeg output ({self.restart_label}).")
+            else:
+                self._progress_block[key] = value
+            return True
+        self._check_tee_failure(line)
+        return False
+
+    def _check_tee_failure(self, line: str):
+        match = TEE_SLAVE_FAILURE_RE.search(line)
+        if not match or int(match.group(1)) >= len(self.outputs):
+            return
+        output = self.outputs[int(match.group(1))]
+        output.failed_reason = match.group(2)
+        output.kbps = 0
+        logger.warning(f"UTA Restream Pipe: Output '{output.name}' ({output.display_target}) failed: {output.failed_reason}. "
+                       f"{match.group(3)}/{match.group(4)} output(s) still running.")
+        config_manager.logger.info(f"UTA_GUI_LOG: RestreamOutputs={' | '.join(self.describe_outputs(compact=True))}")
+
+    def wake(self):
+        # Makes supervise() re-evaluate its stop_check now instead of on the next tick. Call from the loop thread.
+        self._wake_event.set()
+
+    async def supervise(self, stop_check=None) -> bool:
+        """Runs until the pipe dies or stop_check() returns a reason (e.g. "scheduled rollover"). Returns True if the pipe
+        ran cleanly or was stopped on purpose (stop_reason set), False if it failed. Leaves the processes to stop()."""
+        self.supervising_since = time.monotonic()
+        self._reset_stall_marks(self.supervising_since)
+        ffmpeg_exit = asyncio.ensure_future(self.ffmpeg_process.wait())
+        streamlink_exit = asyncio.ensure_future(self.streamlink_process.wait())
+        try:
+            while True:
+                self._wake_event.clear()
+                reason = stop_check() if stop_check else None
+                if reason:
+                    self.stop_reason = reason
+                    logger.info(f"UTA Restream Pipe: Stopping pipe ({reason}).")
+                    return True
+                if ffmpeg_exit.done() or streamlink_exit.done():
+                    if not (config_manager.UTA_RESTREAM_STANDBY_INGEST_ENABLED and ffmpeg_exit.done() and not streamlink_exit.done()):
+                        break
+                    # Standby ingest: the ingest is still connected, so a new FFmpeg can pick up from the pipe within seconds.
+                    for err_line in list(self.ffmpeg_stderr_tail)[-5:]:
+                        logger.warning(f"UTA Restream Pipe: FFmpeg (PID: {self.ffmpeg_process.pid}) before exit: {err_line}")
+                    stall = ("ffmpeg", f"FFmpeg exited (code {self.ffmpeg_process.returncode}) while the ingest was still running")
+                else:
+                    for output in self.outputs:
+                        await output.poll()
+                    self._maybe_report_output_stats()
+                    await self._maybe_log_progress_metrics()
+                    stall = await self._check_throughput()
+                if stall:
+                    if not await self._recover_from_stall(*stall):
+                        if ffmpeg_exit.done():
+                            break # Out of in-place restarts; judge the exit as usual
+                        return False
+                    # Old futures belong to the replaced process(es)
+                    ffmpeg_exit.cancel()
+                    streamlink_exit.cancel()
+                    ffmpeg_exit = asyncio.ensure_future(self.ffmpeg_process.wait())
+                    streamlink_exit = asyncio.ensure_future(self.streamlink_process.wait())
+                    continue
+                wake_waiter = asyncio.ensure_future(self._wake_event.wait())
+                try:
+                    # A healthy pipe runs for hours; the watchdog only needs each tick to come back.
+                    await service_supervisor.idle(asyncio.wait({ffmpeg_exit, streamlink_exit, wake_waiter}, timeout=PIPE_TICK_SECONDS,
+                                                               return_when=asyncio.FIRST_COMPLETED), PIPE_TICK_SECONDS)
+                finally:
+                    wake_waiter.cancel()
+            return await self._evaluate_exit(ffmpeg_exit)
+        finally:
+            ffmpeg_exit.cancel()
+            streamlink_exit.cancel()
+            if self._pending_stall:
+                await self._finish_stall_record(recovered=False)
+
+    def _progress_marker(self):
+        return (self.progress.get("frame"), self.progress.get("out_time_seconds")) if self.progress else None
+
+    def _reset_stall_marks(self, now: float):
+        self._stall_marks = {"progress": now, "speed_ok": now}
+        self._last_progress_marker = self._progress_marker() # A kept FFmpeg's last block isn't progress after the restart
+
+    async def _check_throughput(self):
+        """Watchdog tick. Returns (side, cause) when the pipe counts as stalled; side is "ffmpeg", "streamlink" or
+        "both" (can't tell which). Also closes the pending stall record once the pipe moves at normal speed again."""
+        now = time.monotonic()
+        progress = self.progress or {}
+        marker = self._progress_marker()
+        if marker is not None and marker != self._last_progress_marker:
+            self._last_progress_marker = marker
+            self._stall_marks["progress"] = now
+        speed = progress.get("speed")
+        min_speed = config_manager.UTA_RESTREAM_STALL_MIN_SPEED # Thresholds read live so !reloadconfig applies them
+        speed_ok = speed is None or speed >= min_speed
+        if speed_ok:
+            self._stall_marks["speed_ok"] = now
+
+        if self._pending_stall and speed_ok and self._stall_marks["progress"] > self._pending_stall["restarted_at"]:
+            await self._finish_stall_record(recovered=True)
+        if not config_manager.UTA_RESTREAM_STALL_DETECTION_ENABLED:
+            return None
+
+        no_data_seconds = config_manager.UTA_RESTREAM_STALL_NO_DATA_SECONDS
+        slow_seconds = config_manager.UTA_RESTREAM_STALL_SLOW_SECONDS
+        if no_data_seconds and now - self._stall_marks["progress"] >= no_data_seconds:
+            cause = f"no FFmpeg progress for {now - self._stall_marks['progress']:.0f}s"
+        elif slow_seconds and now - self._stall_marks["speed_ok"] >= slow_seconds:
+            cause = f"speed {speed:.2f}x below {min_speed}x for {now - self._stall_marks['speed_ok']:.0f}s"
+        else:
+            return None
+        # FFmpeg not keeping up leaves Streamlink's data queued in the pipe; an empty pipe means Streamlink isn't delivering.
+        queued_bytes = _pipe_bytes_queued(self._pipe_read_fd)
+        if queued_bytes is None:
+            return "both", cause
+        return ("ffmpeg" if queued_bytes > 0 else "streamlink"), f"{cause}, {queued_bytes} bytes queued in the pipe"
+
+    async def _recover_from_stall(self, side: str, cause: str) -> bool:
+        """Restarts the stalled (or, with a standby ingest, exited) side in place: FFmpeg alone, or Streamlink together
+        with FFmpeg (see the module docstring). False once UTA_RESTREAM_STALL_MAX_RESTARTS is used up; the caller then
+        ends the pipe as failed."""
+        if self._pending_stall:
+            await self._finish_stall_record(recovered=False) # Stalled again before it ever recovered
+        detected_at = time.monotonic()
+        record = {"detected_at": datetime.now(timezone.utc).isoformat(), "cause": cause, "side": side,
+                  "speed": (self.progress or {}).get("speed"), "restart_number": self.stall_restarts + 1,
+                  "pipe_uptime_seconds": round(detected_at - self.supervising_since, 1)}
+        if self.stall_restarts >= config_manager.UTA_RESTREAM_STALL_MAX_RESTARTS:
+            logger.error(f"UTA Restream Pipe: Pipe stalled ({cause}) after {self.stall_restarts} in-place restart(s). Giving up on this pipe.")
+            record.update(side="none", recovered=False, recovery_seconds=None)
+            await self._write_stall_record(record)
+            return False
+
+        self.stall_restarts += 1
+        names = ["FFmpeg"] if side == "ffmpeg" else ["FFmpeg", "Streamlink"] # A new ingest's stream needs a new FFmpeg too
+        logger.warning(f"UTA Restream Pipe: Pipe stalled ({cause}). Restarting {' and '.join(names)} in place "
+                       f"(stall restart {self.stall_restarts}/{config_manager.UTA_RESTREAM_STALL_MAX_RESTARTS})...")
+        for name in names:
+            process = self.ffmpeg_process if name == "FFmpeg" else self.streamlink_process
+            await _terminate_process(process, f"{name} (stalled)")
+            old_reader = self._stderr_readers.get(name)
+            if old_reader: # Let it drain, so a late progress block from the old FFmpeg doesn't land after the reset
+                await asyncio.wait({old_reader}, timeout=2)
+        self._reader_tasks = [task for task in self._reader_tasks if not task.done()]
+        if "Streamlink" in names:
+            # A new pipe: closing the old one unblocks an ingest writer stuck on it, and none of the old stream's bytes
+            # still queued in it reach the new FFmpeg.
+            self._close_pipe_fds()
+            self._pipe_read_fd, self._pipe_write_fd = os.pipe()
+            await self._spawn_streamlink()
+            config_manager.UTA_STREAMLINK_PID = self.streamlink_process.pid
+        if "FFmpeg" in names:
+            await self._spawn_ffmpeg()
+            config_manager.UTA_FFMPEG_PID = self.ffmpeg_process.pid
+
+        restarted_at = time.monotonic()
+        self._reset_stall_marks(restarted_at)
+        record["restart_seconds"] = round(restarted_at - detected_at, 2)
+        self._pending_stall = {"record": record, "detected_at": detected_at, "restarted_at": restarted_at}
+        return True
+
+    async def _finish_stall_record(self, recovered: bool):
+        pending, self._pending_stall = self._pending_stall, None
+        record = pending["record"]
+        record["recovered"] = recovered
+        record["recovery_seconds"] = round(time.monotonic() - pending["detected_at"], 2) if recovered else None
+        if recovered:
+            logger.info(f"UTA Restream Pipe: Recovered from stall ({record['cause']}) {record['recovery_seconds']:.1f}s after detecting it.")
+        await self._write_stall_record(record)
+
+    async def _write_stall_record(self, record: dict):
+        if config_manager.UTA_RESTREAM_STALL_LOG_FILE:
+            await asyncio.to_thread(_append_stall_record, config_manager.UTA_RESTREAM_STALL_LOG_FILE, record)
+
+    def _maybe_report_output_stats(self):
+        stats_interval_seconds = config_manager.UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS # Read live so !reloadconfig applies it
+        if not stats_interval_seconds or not self.outputs:
+            return
+        now = time.monotonic()
+        if self._last_stats_sample and now - self._last_stats_sample[0] < stats_interval_seconds:
+            return
+        usage = {"FFmpeg": _process_usage(self.ffmpeg_process.pid), "Streamlink": _process_usage(self.streamlink_process.pid)}
+        previous = self._last_stats_sample
+        self._last_stats_sample = (now, usage)
+        if previous is None:
+            for output in self.outputs:
+                output._last_size = output.bytes_written()
+            return # First sample is only the baseline
+
+        elapsed = now - previous[0]
+        for name, (cpu_seconds, _) in usage.items():
+            previous_cpu = previous[1][name][0]
+            percent = None if cpu_seconds is None or previous_cpu is None else 100 * (cpu_seconds - previous_cpu) / elapsed
+            self.cpu_percent[name] = percent if percent is None or percent >= 0 else None # Negative across a stall restart
+            if self.cpu_percent[name] is not None:
+                totals = self._cpu_totals.setdefault(name, [0.0, 0])
+                totals[0] += self.cpu_percent[name]
+                totals[1] += 1
+
+        # Every output gets the same muxed stream, so what FFmpeg reads from Streamlink is each network output's rate.
+        ingest_bytes, previous_ingest_bytes = usage["FFmpeg"][1], previous[1]["FFmpeg"][1]
+        ingest_kbps = None if ingest_bytes is None or previous_ingest_bytes is None else (ingest_bytes - previous_ingest_bytes) * 8 / 1000 / elapsed
+        for output in self.outputs:
+            if output.failed_reason:
+                output.kbps = 0
+            elif output.kind != "rtmp":
+                size = output.bytes_written()
+                output.kbps = None if size is None or output._last_size is None else (size - output._last_size) * 8 / 1000 / elapsed
+                output._last_size = size
+            else:
+                output.kbps = ingest_kbps
+
+        summary = " | ".join(self.describe_outputs(compact=True))
+        logger.info(f"UTA Restream Pipe: Output stats: {summary}")
+        config_manager.logger.info(f"UTA_GUI_LOG: RestreamOutputs={summary}")
+
+    async def _maybe_log_progress_metrics(self):
+        metrics_interval_seconds = config_manager.UTA_RESTREAM_METRICS_LOG_INTERVAL_SECONDS
+        if not metrics_interval_seconds or not self.progress:
+            return
+        now = time.monotonic()
+        if self._last_metrics_logged_at is not None and now - self._last_metrics_logged_at < metrics_interval_seconds:
+            return
+        self._last_metrics_logged_at = now
+        await log_restream_metrics_binary(datetime.now(timezone.utc), self.progress)
+        config_manager.logger.info(f"UTA_GUI_LOG: RestreamMetrics={format_progress_metrics(self.progress)}")
+
+    def average_cpu_percent(self, name: str = "FFmpeg"):
+        # Mean of the stats samples so far (needs UTA_RESTREAM_OUTPUT_STATS_INTERVAL_SECONDS); None without any.
+        totals = self._cpu_totals.get(name)
+        return totals[0] / totals[1] if totals else None
+
+    def describe_outputs(self, compact: bool = False) -> list:
+        """Per-output state and bandwidth, plus the shared CPU. compact=True leaves out the targets (for logs/the GUI)."""
+        lines = []
+        for output in self.outputs:
+            if output.failed_reason:
+                state = f"FAILED ({output.failed_reason})"
+            else:
+                state = "OK" if output.kbps is None else f"OK, {output.kbps:.0f} kbps"
+            lines.append(f"{output.name}: {state}" if compact else f"{output.name} (`{output.display_target}`): {state}")
+        describe_ingest = getattr(self.streamlink_process, "describe", None)
+        if describe_ingest:
+            lines.append(f"Ingest: {describe_ingest()}")
+        cpu_parts = [f"{name} {percent:.1f}%" for name, percent in self.cpu_percent.items() if percent is not None]
+        if cpu_parts:
+            # The tee muxer runs every output inside the one FFmpeg process, so CPU can't be split per output.
+            lines.append(f"CPU: {', '.join(cpu_parts)}" + ("" if compact else " (FFmpeg shared by all outputs)"))
+        return lines
+
+    async def _evaluate_exit(self, ffmpeg_exit) -> bool:
+        success = True
+        self._close_pipe_fds() # FFmpeg gets its EOF once Streamlink's end is gone
+        if not ffmpeg_exit.done():
+            # Streamlink went first. A clean exit is the stream ending; FFmpeg should follow once it reads EOF.
+            if self.streamlink_process.returncode != 0:
+                logger.warning(f"UTA Restream Pipe: Streamlink (PID: {self.streamlink_process.pid}) exited unexpectedly (Code: {self.streamlink_process.returncode}) while FFmpeg was running.")
+                success = False
+            try:
+                await service_supervisor.idle(asyncio.wait_for(asyncio.shield(ffmpeg_exit), PIPE_DRAIN_SECONDS), PIPE_DRAIN_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"UTA Restream Pipe: FFmpeg did not exit within {PIPE_DRAIN_SECONDS}s of Streamlink. Terminating it...")
+                await _terminate_process(self.ffmpeg_process, "FFmpeg (post-streamlink cleanup)")
+        elif self.streamlink_process.returncode is None:
+            logger.warning("UTA Restream Pipe: FFmpeg exited, but Streamlink is still running. Terminating Streamlink...")
+            await _terminate_process(self.streamlink_process, "Streamlink (post-ffmpeg cleanup)")
+        await self._finish_readers()
+
+        ffmpeg_exit_code = self.ffmpeg_process.returncode
+        logger.info(f"UTA Restream Pipe: FFmpeg (PID: {self.ffmpeg_process.pid}) exited with code: {ffmpeg_exit_code}")
+        if ffmpeg_exit_code not in (0, None):
+            success = False
+            logger.error(f"UTA Restream Pipe: --- FFmpeg Error Log (Last {FFMPEG_STDERR_TAIL_LINES} lines) ---")
+            for err_line in self.ffmpeg_stderr_tail:
+                logger.error(err_line)
+            logger.error("UTA Restream Pipe: --- End FFmpeg Error Log ---")
+
+        streamlink_exit_code = self.streamlink_process.returncode
+        logger.info(f"UTA Restream Pipe: Streamlink (PID: {self.streamlink_process.pid}) exited with code: {streamlink_exit_code}")
+        if streamlink_exit_code not in (0, None):
+            success = False
+        if self.streamlink_stderr_tail:
+            logger.info("UTA Restream Pipe: --- Streamlink Stderr Log ---\n" + "\n".join(self.streamlink_stderr_tail) + "\n--- End Streamlink Stderr Log ---")
+        return success
+
+    async def _finish_readers(self):
+        # The readers end on EOF once their process is gone; don't let a grandchild holding the pipe open keep us here.
+        if self._reader_tasks:
+            _, still_reading = await asyncio.wait(self._reader_tasks, timeout=2)
+            for task in still_reading:
+                task.cancel()
+        self._reader_tasks = []
+
+    async def stop(self):
+        await _terminate_process(self.ffmpeg_process, "FFmpeg")
+        await _terminate_process(self.streamlink_process, "Streamlink")
+        self._close_pipe_fds() # Also releases a session ingest's writer thread if it's still blocked on the full pipe
+        await self._finish_readers()
+        for output in self.outputs:
+            try:
+                await output.close()
+            except Exception as e:
+                logger.error(f"UTA Restream Pipe: Error closing output '{output.name}': {e}", exc_info=True)
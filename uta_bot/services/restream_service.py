@@ -1,30 +1,42 @@
 import logging
 import time
 import shutil
-import subprocess
 import os
 import asyncio
 from datetime import datetime, timedelta, timezone
 import requests # For Discord webhook status
 
 from uta_bot import config_manager
-from uta_bot.services.twitch_api_handler import make_uta_twitch_api_request
 from uta_bot.services.youtube_api_handler import (
     get_youtube_service, create_youtube_live_stream_resource, create_youtube_broadcast,
-    transition_youtube_broadcast, update_youtube_broadcast_metadata,
-    add_video_to_youtube_playlist, set_youtube_video_privacy,
-    get_youtube_video_details
+    transition_youtube_broadcast, add_video_to_youtube_playlist,
+    get_youtube_live_stream_status, finalize_youtube_part
 )
 from .threading_manager import shutdown_event
+from .service_supervisor import service_supervisor
+from .stream_state_hub import stream_state_hub, get_adaptive_wait_seconds_async
+from .restream_pipe import RestreamPipe, PipeOutput, format_progress_metrics
+from .segment_recorder import SegmentRecorder
+from .streamlink_ingest import StreamlinkSessionIngest, has_cached_stream, get_cached_stream_url, forget_resolved_stream
+from .chapter_builder import session_chapter_builder
+from .youtube_quota import youtube_quota_ledger, quota_cost, NEW_PART_COST
+from .ingest_probe import probe_ingest, choose_audio_args, forget_ingest_probe, mark_audio_copy_failed, COPY_AUDIO_ARGS
 from uta_bot.utils.data_logging import log_stream_duration_binary, parse_stream_activity_for_game_segments, get_viewer_stats_for_period
 from uta_bot.utils.formatters import format_duration_human, format_seconds_to_hhmmss # Added format_seconds_to_hhmmss
 from uta_bot.utils.chapter_utils import generate_chapter_text
-import threading
+from uta_bot.utils.circuit_breaker import post_discord_webhook
 
 logger = logging.getLogger(__name__)
 
-_streamlink_process = None
-_ffmpeg_process = None
+_active_pipe: RestreamPipe = None # The pipe the restreamer is currently supervising, if any
+_retiring_pipe: RestreamPipe = None # The previous part's pipe, kept running through an overlapped rollover until the new part is up
+_active_audio_path: str = None # choose_audio_args() description for _active_pipe
+_last_pipe_failed_at: float = None # time.monotonic() the last pipe failed, for the next pipe's restart latency log
+_stream_health: dict = {} # Last get_youtube_live_stream_status() result logged, plus its live_stream_id
+
+HEALTH_CHECK_MAX_INTERVAL_SECONDS = 16
+
+PIPE_STOP_OVERLAPPED_ROLLOVER = "overlapped rollover"
 
 def _send_discord_restream_status(status_type: str, username: str, stream_data=None, stream_duration_seconds=None):
     if not config_manager.UTA_DISCORD_WEBHOOK_URL_RESTREAMER or \
@@ -63,43 +75,46 @@ def _send_discord_restream_status(status_type: str, username: str, stream_data=N
     }
 
     try:
-        response = requests.post(config_manager.UTA_DISCORD_WEBHOOK_URL_RESTREAMER, json=payload, timeout=10)
+        response = post_discord_webhook(config_manager.UTA_DISCORD_WEBHOOK_URL_RESTREAMER, json=payload, timeout=10)
         response.raise_for_status()
         logger.info(f"UTA Restream Service: Sent Discord restream {status_type} notification for {username}.")
     except requests.exceptions.RequestException as e:
         logger.error(f"UTA Restream Service: Error sending restream status to Discord: {e}")
 
 
-def _terminate_process(process, name: str):
-    if process and process.poll() is None:
-        logger.info(f"UTA Restream Service: Terminating {name} (PID: {process.pid})...")
-        try:
-            process.terminate()
-            process.wait(timeout=10)
-            logger.info(f"UTA Restream Service: {name} (PID: {process.pid}) terminated gracefully (Code: {process.poll()}).")
-        except subprocess.TimeoutExpired:
-            logger.warning(f"UTA Restream Service: {name} (PID: {process.pid}) did not terminate gracefully after 10s, killing...")
-            process.kill()
-            process.wait()
-            logger.info(f"UTA Restream Service: {name} (PID: {process.pid}) process killed (Code: {process.poll()}).")
-        except Exception as e:
-            logger.error(f"UTA Restream Service: Error during termination of {name} (PID: {process.pid}): {e}")
+async def _wait_for_stream_state(last_version: int, timeout: float) -> bool:
+    # Wakes early when the StreamStateHub publishes, so live/offline edges match the status monitor. True means shutdown.
+    await service_supervisor.idle(stream_state_hub.wait_for_update_async(last_version, timeout), timeout)
+    return shutdown_event.is_set()
 
-def cleanup_restream_processes():
-    global _streamlink_process, _ffmpeg_process
+async def cleanup_restream_processes():
+    global _active_pipe
     logger.info("UTA Restream Service: Cleaning up active restream processes...")
-    _terminate_process(_ffmpeg_process, "FFmpeg")
-    _ffmpeg_process = None
+    global _retiring_pipe
+    pipe, _active_pipe = _active_pipe, None
+    if pipe:
+        await pipe.stop()
+    retiring_pipe, _retiring_pipe = _retiring_pipe, None
+    if retiring_pipe:
+        await retiring_pipe.stop()
     config_manager.UTA_FFMPEG_PID = None
-
-    _terminate_process(_streamlink_process, "Streamlink")
-    _streamlink_process = None
     config_manager.UTA_STREAMLINK_PID = None
 
     config_manager.uta_is_restreaming_active = False
     logger.info("UTA Restream Service: Restream process cleanup finished.")
 
-async def _check_youtube_playability(video_id: str, bot_loop) -> bool:
+def wake_restream_pipe():
+    # Lets the pipe supervisor act on a control flag (restart, new part) now rather than on its next tick.
+    if _active_pipe:
+        _active_pipe.wake()
+
+def request_pipe_restart(reason: str):
+    """Relaunches Streamlink/FFmpeg without ending the restream session (same YouTube broadcast/part)."""
+    logger.info(f"UTA Restream Service: Pipe restart requested ({reason}).")
+    config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED = True
+    wake_restream_pipe()
+
+async def _check_youtube_playability(video_id: str) -> bool:
     if not video_id or not config_manager.STREAMLINK_LIB_AVAILABLE or not config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED:
         if config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED and not config_manager.STREAMLINK_LIB_AVAILABLE:
             logger.warning("UTA YouTube Health Check: Streamlink library not available, skipping playability check.")
@@ -138,7 +153,8 @@ async def _check_youtube_playability(video_id: str, bot_loop) -> bool:
 
         if attempt < config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES - 1:
             logger.info(f"UTA YouTube Health Check: Retrying playability check in {config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS}s...")
-            if shutdown_event.wait(timeout=config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS):
+            await service_supervisor.sleep(config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS)
+            if shutdown_event.is_set():
                 config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = "Cancelled (Shutdown during retry)"
                 config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
                 logger.info("UTA YouTube Health Check: Shutdown during retry sleep.")
@@ -149,6 +165,80 @@ async def _check_youtube_playability(video_id: str, bot_loop) -> bool:
     config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
     return False
 
+def _record_stream_health(live_stream_id: str, health: dict):
+    # Logs only what changed since the last check: status/health transitions, and issues as they appear and clear.
+    global _stream_health
+    previous = _stream_health if _stream_health.get("live_stream_id") == live_stream_id else {}
+    _stream_health = dict(health, live_stream_id=live_stream_id)
+
+    if (health["stream_status"], health["health_status"]) != (previous.get("stream_status"), previous.get("health_status")):
+        bad_state = health["stream_status"] == "error" or health["health_status"] in ("bad", "noData")
+        (logger.warning if bad_state else logger.info)(
+            f"UTA YouTube Stream Health: liveStream {live_stream_id} is {health['stream_status']}, health {health['health_status'] or 'n/a'}.")
+    previous_issues = set(previous.get("issues", []))
+    for severity, issue_type, description in health["issues"]:
+        if (severity, issue_type, description) not in previous_issues:
+            log_method = {"error": logger.error, "warning": logger.warning}.get(severity, logger.info)
+            log_method(f"UTA YouTube Stream Health: [{severity}] {issue_type}: {description}")
+    for severity, issue_type, _ in previous_issues - set(health["issues"]):
+        logger.info(f"UTA YouTube Stream Health: Issue cleared: [{severity}] {issue_type}")
+
+    issue_text = f", {len(health['issues'])} issue(s)" if health["issues"] else ""
+    health_text = f"{health['stream_status']}, health {health['health_status'] or 'n/a'}{issue_text}"
+    if health_text != config_manager.UTA_LAST_YT_STREAM_HEALTH:
+        config_manager.UTA_LAST_YT_STREAM_HEALTH = health_text
+        config_manager.logger.info(f"UTA_GUI_LOG: YouTubeStreamHealth={health_text}")
+
+async def _wait_for_youtube_stream_active(live_stream_id: str, video_id: str) -> bool:
+    """Health mode: polls liveStreams.list(part=status) on an exponential schedule and confirms the pipe as soon as
+    YouTube reports the stream active. Falls back to the streamlink probe when the API can't be asked or the stream
+    isn't active within UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS."""
+    yt_service = await asyncio.to_thread(get_youtube_service)
+    if not yt_service or not live_stream_id:
+        logger.info("UTA YouTube Health Check: No YouTube service or liveStream ID; using the streamlink probe.")
+        return await _check_youtube_playability(video_id)
+
+    config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = f"Pending for {video_id}"
+    config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
+    started_at = time.monotonic()
+    poll_interval = max(0.5, config_manager.UTA_YOUTUBE_HEALTH_CHECK_INITIAL_INTERVAL_SECONDS)
+    polls = 0
+    while True:
+        await service_supervisor.sleep(poll_interval)
+        if shutdown_event.is_set():
+            config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = "Cancelled (Shutdown)"
+            config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
+            return False
+        health = await get_youtube_live_stream_status(yt_service, live_stream_id)
+        polls += 1
+        if health is None:
+            logger.warning("UTA YouTube Health Check: Couldn't read the liveStream status; falling back to the streamlink probe.")
+            return await _check_youtube_playability(video_id)
+        _record_stream_health(live_stream_id, health)
+        elapsed_seconds = time.monotonic() - started_at
+        if health["stream_status"] == "active":
+            logger.info(f"UTA YouTube Health Check: liveStream {live_stream_id} active {elapsed_seconds:.1f}s after FFmpeg start ({polls} poll(s)).")
+            config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = f"Passed for {video_id} (stream active)"
+            config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
+            return True
+        poll_interval = min(poll_interval * 2, HEALTH_CHECK_MAX_INTERVAL_SECONDS)
+        if elapsed_seconds + poll_interval > config_manager.UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS:
+            break
+    logger.warning(f"UTA YouTube Health Check: liveStream {live_stream_id} still '{health['stream_status']}' after {elapsed_seconds:.0f}s; "
+                   f"falling back to the streamlink probe.")
+    return await _check_youtube_playability(video_id)
+
+async def _monitor_youtube_stream_health(live_stream_id: str):
+    # Runs beside a confirmed pipe for the rest of its life; _record_stream_health() does the logging.
+    yt_service = await asyncio.to_thread(get_youtube_service)
+    while yt_service and config_manager.UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS > 0:
+        await asyncio.sleep(config_manager.UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS)
+        if not youtube_quota_ledger.allows_optional(quota_cost("liveStreams.list")):
+            continue # Health monitoring is optional; the pipe's own stall detection keeps running
+        health = await get_youtube_live_stream_status(yt_service, live_stream_id)
+        if health:
+            _record_stream_health(live_stream_id, health)
+
 def _generate_enhanced_youtube_description(
         twitch_username: str,
         twitch_title: str,
@@ -170,35 +260,36 @@ def _generate_enhanced_youtube_description(
     ]
 
     # Add list of games played in this VOD part
-    if config_manager.UTA_STREAM_ACTIVITY_LOG_FILE and os.path.exists(config_manager.UTA_STREAM_ACTIVITY_LOG_FILE):
-        part_start_unix = int(vod_part_start_utc.timestamp())
-        # If part is ongoing, use current time as temp end for parsing segments *within this part so far*
-        # If part has ended, use actual end time.
-        part_end_unix_for_segment_parsing = int((vod_part_end_utc or datetime.now(timezone.utc)).timestamp())
-
+    part_start_unix = int(vod_part_start_utc.timestamp())
+    # If part is ongoing, use current time as temp end for parsing segments *within this part so far*
+    # If part has ended, use actual end time.
+    part_end_unix_for_segment_parsing = int((vod_part_end_utc or datetime.now(timezone.utc)).timestamp())
+    # The chapter builder has them in memory; the activity log is only parsed if it didn't see the whole part.
+    game_segments_this_part = session_chapter_builder.segments_between(part_start_unix, part_end_unix_for_segment_parsing)
+    if game_segments_this_part is None and config_manager.UTA_STREAM_ACTIVITY_LOG_FILE and os.path.exists(config_manager.UTA_STREAM_ACTIVITY_LOG_FILE):
         game_segments_this_part = parse_stream_activity_for_game_segments(
             config_manager.UTA_STREAM_ACTIVITY_LOG_FILE,
             part_start_unix,
             part_end_unix_for_segment_parsing
         )
 
-        if game_segments_this_part:
-            description_parts.append("\n\nGames played in this part:")
-            unique_games_in_part = []
-            for seg in sorted(game_segments_this_part, key=lambda x: x['start_ts']):
-                game = seg.get('game', "Unknown Game")
-                # Create simple timestamped game changes if desired (like chapters but in description)
-                # relative_start_seconds = seg['start_ts'] - part_start_unix
-                # time_marker = format_seconds_to_hhmmss(relative_start_seconds) # Use imported helper
-                # description_parts.append(f"- {time_marker} {game}")
-                if game not in unique_games_in_part and game != "N/A": # Filter out "N/A" games for list
-                    unique_games_in_part.append(game)
-            if unique_games_in_part:
-                 description_parts.append("- " + "\n- ".join(unique_games_in_part))
-            elif not any(seg.get('game') and seg.get('game') != "N/A" for seg in game_segments_this_part): # If all games were N/A
-                 description_parts.append("- Game details not available for this part")
-            else: # Should not happen if game_segments_this_part is true and filtering logic above is complete
-                 description_parts.append("- Various games (see chapters if available)")
+    if game_segments_this_part:
+        description_parts.append("\n\nGames played in this part:")
+        unique_games_in_part = []
+        for seg in sorted(game_segments_this_part, key=lambda x: x['start_ts']):
+            game = seg.get('game', "Unknown Game")
+            # Create simple timestamped game changes if desired (like chapters but in description)
+            # relative_start_seconds = seg['start_ts'] - part_start_unix
+            # time_marker = format_seconds_to_hhmmss(relative_start_seconds) # Use imported helper
+            # description_parts.append(f"- {time_marker} {game}")
+            if game not in unique_games_in_part and game != "N/A": # Filter out "N/A" games for list
+                unique_games_in_part.append(game)
+        if unique_games_in_part:
+             description_parts.append("- " + "\n- ".join(unique_games_in_part))
+        elif not any(seg.get('game') and seg.get('game') != "N/A" for seg in game_segments_this_part): # If all games were N/A
+             description_parts.append("- Game details not available for this part")
+        else: # Should not happen if game_segments_this_part is true and filtering logic above is complete
+             description_parts.append("- Various games (see chapters if available)")
 
 
     # Placeholder for future: Top chatters or emotes (requires significant chat logging changes)
@@ -209,8 +300,204 @@ def _generate_enhanced_youtube_description(
 
     return "\n".join(description_parts)[:5000] # YouTube description limit
 
-def _start_restream_pipe(username: str, youtube_rtmp_url: str, youtube_stream_key: str, bot_loop):
-    global _streamlink_process, _ffmpeg_process
+async def _get_part_game_segments(part_start_unix: int, part_end_unix: int, log_label: str) -> list:
+    # From the chapter builder's memory when it saw the whole part, else parsed from the activity log off-loop.
+    game_segments = session_chapter_builder.segments_between(part_start_unix, part_end_unix)
+    if game_segments is not None:
+        return game_segments
+    logger.info(f"Chapter Gen ({log_label}): Chapter builder didn't track this whole part; parsing the activity log.")
+    return await asyncio.to_thread(
+        parse_stream_activity_for_game_segments,
+        config_manager.UTA_STREAM_ACTIVITY_LOG_FILE,
+        part_start_unix,
+        part_end_unix
+    )
+
+async def _build_part_final_description(part_num: int, part_start_utc: datetime, part_end_utc: datetime,
+                                        title: str, game: str, log_label: str):
+    # A finished part's description with its game list and chapters, or None if there are no chapters to add.
+    vod_part_start_unix = int(part_start_utc.timestamp())
+    vod_part_end_unix = int(part_end_utc.timestamp())
+    logger.info(f"Chapter Gen ({log_label}): VOD Part Time Window: {datetime.fromtimestamp(vod_part_start_unix, tz=timezone.utc)} to {datetime.fromtimestamp(vod_part_end_unix, tz=timezone.utc)}")
+
+    game_segments = await _get_part_game_segments(vod_part_start_unix, vod_part_end_unix, log_label)
+    if not game_segments:
+        logger.info(f"Chapter Gen ({log_label}): No game segments for this part.")
+        return None
+    chapter_str = generate_chapter_text(game_segments, vod_part_start_unix)
+    if not chapter_str:
+        logger.info(f"Chapter Gen ({log_label}): No valid chapter string generated.")
+        return None
+    # Regenerate enhanced part with game list (for the part just ended)
+    enhanced_desc_for_ended_part = await asyncio.to_thread(
+        _generate_enhanced_youtube_description,
+        twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
+        twitch_title=title,
+        current_game_name=game,
+        part_num=part_num,
+        vod_part_start_utc=datetime.fromtimestamp(vod_part_start_unix, tz=timezone.utc),
+        vod_part_end_utc=datetime.fromtimestamp(vod_part_end_unix, tz=timezone.utc)
+    )
+    return f"{enhanced_desc_for_ended_part}\n\n{config_manager.UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER}\n{chapter_str}"
+
+async def _finalize_youtube_part(yt_service_instance, ending_part: dict, part_end_utc: datetime, log_label: str):
+    """Completes a finished part's broadcast and sets its chapters and privacy. Spawned beside the restreamer, so
+    the next part (or the next stream) never waits on it. ending_part has part_num, broadcast_id, video_id,
+    part_start_utc, title and game."""
+    started_at = time.monotonic()
+    final_description = None
+    if config_manager.UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED and ending_part["video_id"] and ending_part["part_start_utc"]:
+        try:
+            final_description = await _build_part_final_description(ending_part["part_num"], ending_part["part_start_utc"], part_end_utc,
+                                                                     ending_part["title"], ending_part["game"], log_label)
+        except Exception as e_chap:
+            logger.error(f"Chapter Gen ({log_label}): Error building the final description, completing without chapters: {e_chap}", exc_info=True)
+    make_public = config_manager.UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM and config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY != "public"
+    # With a privacy change the description rides along in the same videos.update; on its own it's optional.
+    if final_description and not make_public and not youtube_quota_ledger.allows_optional(quota_cost("videos.list") + quota_cost("videos.update")):
+        logger.warning(f"Chapter Gen ({log_label}): Skipping the chapter update of Part {ending_part['part_num']} to save API quota.")
+        final_description = None
+    logger.info(f"UTA YouTube ({log_label}): Finalizing Part {ending_part['part_num']} (broadcast {ending_part['broadcast_id']}).")
+    try:
+        timings = await asyncio.wait_for(finalize_youtube_part(yt_service_instance, ending_part["broadcast_id"], ending_part["video_id"],
+                                                               final_description, "public" if make_public else None), timeout=60)
+    except asyncio.TimeoutError:
+        logger.error(f"UTA YouTube ({log_label}): Finalizing Part {ending_part['part_num']} timed out.")
+        return
+    timing_text = ", ".join(f"{name} {'failed' if ms is None else f'{ms:.0f} ms'}" for name, ms in timings.items())
+    logger.info(f"UTA YouTube ({log_label}): Part {ending_part['part_num']} finalized in {time.monotonic() - started_at:.1f}s ({timing_text}).")
+
+def _legacy_rtmp_configured() -> bool:
+    stream_key = config_manager.UTA_YOUTUBE_STREAM_KEY
+    return bool(config_manager.UTA_YOUTUBE_RTMP_URL_BASE and stream_key and "YOUR_YOUTUBE_STREAM_KEY" not in stream_key)
+
+def _quota_covers_new_part(purpose: str) -> bool:
+    # A part is only started if the quota also covers finishing it, on top of UTA_YOUTUBE_QUOTA_RESERVE_UNITS.
+    if youtube_quota_ledger.can_afford(NEW_PART_COST):
+        return True
+    logger.warning(f"UTA YouTube Quota: {youtube_quota_ledger.remaining()} unit(s) left today; {purpose} needs {NEW_PART_COST} "
+                   f"plus the {config_manager.UTA_YOUTUBE_QUOTA_RESERVE_UNITS}-unit reserve.")
+    return False
+
+def _use_legacy_rtmp_for_quota() -> bool:
+    # API mode session that the quota can't carry: stream to the legacy stream key instead of not streaming at all.
+    if not (config_manager.UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED and _legacy_rtmp_configured()):
+        return False
+    if _quota_covers_new_part("a new broadcast"):
+        return False
+    logger.warning("UTA YouTube Quota: Streaming this session over legacy RTMP (UTA_YOUTUBE_STREAM_KEY) instead of creating a broadcast.")
+    return True
+
+def _defer_rollover_for_quota(now_utc: datetime):
+    # A scheduled rollover the quota can't cover waits for the quota reset; the current part keeps streaming meanwhile.
+    next_rollover = config_manager.uta_youtube_next_rollover_time_utc
+    if not next_rollover:
+        return
+    lead_seconds = config_manager.UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS if config_manager.UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED else 0
+    if now_utc >= next_rollover - timedelta(seconds=lead_seconds) and not _quota_covers_new_part("the scheduled rollover"):
+        config_manager.uta_youtube_next_rollover_time_utc = youtube_quota_ledger.next_reset() + timedelta(minutes=5)
+        logger.warning(f"UTA YouTube Quota: Rollover postponed to {config_manager.uta_youtube_next_rollover_time_utc.strftime('%Y-%m-%d %H:%M UTC')}, after the quota resets.")
+
+async def _prepare_next_youtube_part(yt_service_instance, part_num: int, stream_data: dict) -> dict:
+    """Overlapped rollover: creates the next part's liveStream and broadcast while the current part is still streaming.
+    Returns the new part's ids/ingest, or None if YouTube refused (the rollover then falls back to the sequential path)."""
+    now_utc = datetime.now(timezone.utc)
+    stream_data = stream_data or {}
+    logger.info(f"UTA YouTube: Preparing Part {part_num} ahead of the rollover.")
+    live_stream_id, rtmp_url, stream_key = await asyncio.wait_for(create_youtube_live_stream_resource(yt_service_instance, config_manager.UTA_TWITCH_CHANNEL_NAME), timeout=30)
+    if not (live_stream_id and rtmp_url and stream_key):
+        logger.error(f"UTA YouTube: Could not create the liveStream for Part {part_num} ahead of the rollover.")
+        return None
+    title = config_manager.UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE.format(
+        twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
+        twitch_title=stream_data.get("title","N/A"),
+        game_name=stream_data.get("game_name","N/A"),
+        part_num=part_num,
+        date=now_utc.strftime("%Y-%m-%d"),
+        time=now_utc.strftime("%H:%M:%S UTC")
+    )
+    description = await asyncio.to_thread(
+        _generate_enhanced_youtube_description,
+        twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
+        twitch_title=stream_data.get("title","N/A"),
+        current_game_name=stream_data.get("game_name","N/A"),
+        part_num=part_num,
+        vod_part_start_utc=now_utc
+    )
+    broadcast_id = await asyncio.wait_for(create_youtube_broadcast(yt_service_instance, live_stream_id, title, description, config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY, now_utc.isoformat()), timeout=30)
+    if not broadcast_id:
+        logger.error(f"UTA YouTube: Could not create the broadcast for Part {part_num} ahead of the rollover.")
+        return None
+    logger.info(f"UTA YouTube: Part {part_num} is ready (broadcast {broadcast_id}); waiting for the rollover point.")
+    return {"part_num": part_num, "live_stream_id": live_stream_id, "rtmp_url": rtmp_url, "stream_key": stream_key, "broadcast_id": broadcast_id}
+
+async def _retire_overlapped_part(yt_service_instance, old_pipe: RestreamPipe, ending_part: dict):
+    """Overlapped rollover, second half: keeps the previous part streaming until the new part's pipe has been up for
+    UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS, then stops it and finalizes its broadcast. old_pipe is None if no pipe was
+    running at the rollover point (e.g. during a retry cooldown)."""
+    global _retiring_pipe
+    overlap_seconds = config_manager.UTA_YOUTUBE_ROLLOVER_OVERLAP_SECONDS
+    # Covers the new pipe's startup and playability check; past this the old part is ended regardless.
+    give_up_at = time.monotonic() + overlap_seconds + config_manager.UTA_FFMPEG_STARTUP_WAIT_SECONDS + \
+                 config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES * (config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS + 5) + 60
+    while True:
+        new_pipe = _active_pipe
+        if new_pipe and new_pipe is not old_pipe and new_pipe.supervising_since and time.monotonic() - new_pipe.supervising_since >= overlap_seconds:
+            logger.info(f"UTA YouTube: Part {ending_part['part_num'] + 1} has been streaming for {overlap_seconds}s. Ending Part {ending_part['part_num']}.")
+            break
+        if time.monotonic() >= give_up_at or shutdown_event.is_set():
+            logger.warning(f"UTA YouTube: The new part's pipe did not come up in time. Ending Part {ending_part['part_num']} anyway.")
+            break
+        await asyncio.sleep(1)
+
+    part_end_utc = datetime.now(timezone.utc)
+    if old_pipe:
+        if _retiring_pipe is old_pipe: _retiring_pipe = None
+        await old_pipe.stop()
+
+    await _finalize_youtube_part(yt_service_instance, ending_part, part_end_utc, "Rollover Part")
+
+def _build_pipe_outputs(username: str, full_youtube_destination_url: str) -> list:
+    # YouTube first: its tee slave index is 0. All of them are fed by the pipe's single Streamlink ingest.
+    outputs = [PipeOutput("YouTube", full_youtube_destination_url)]
+    if config_manager.UTA_RESTREAM_LOCAL_ARCHIVE_ENABLED:
+        try:
+            os.makedirs(config_manager.UTA_RESTREAM_LOCAL_ARCHIVE_DIR, exist_ok=True)
+            # One file per pipe, so restarts and overlapped rollovers never write into the same file.
+            archive_name = f"{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.flv"
+            outputs.append(PipeOutput("Archive", os.path.join(config_manager.UTA_RESTREAM_LOCAL_ARCHIVE_DIR, archive_name), kind="file"))
+        except OSError as e:
+            logger.error(f"UTA Restream Service: Could not create local archive directory '{config_manager.UTA_RESTREAM_LOCAL_ARCHIVE_DIR}': {e}. Restreaming without it.")
+    if config_manager.UTA_RECORDER_ENABLED:
+        recorder = SegmentRecorder(username, config_manager.UTA_RECORDER_SEGMENT_SECONDS, config_manager.UTA_RECORDER_SEGMENT_FORMAT)
+        try:
+            os.makedirs(recorder.channel_dir, exist_ok=True)
+            outputs.append(recorder)
+        except OSError as e:
+            logger.error(f"UTA Restream Service: Could not create recorder directory '{recorder.channel_dir}': {e}. Restreaming without it.")
+    for index, target_url in enumerate(config_manager.UTA_RESTREAM_EXTRA_RTMP_TARGETS, start=1):
+        outputs.append(PipeOutput(f"RTMP #{index}", target_url))
+    return outputs
+
+def describe_restream_outputs() -> list:
+    """Per-output lines for the running pipe (empty when there isn't one), for the status commands."""
+    return _active_pipe.describe_outputs() if _active_pipe else []
+
+def describe_restream_metrics() -> str:
+    """The running pipe's latest FFmpeg -progress metrics plus its audio path, or None without a pipe/metrics yet."""
+    if not _active_pipe or not _active_pipe.progress:
+        return None
+    age_seconds = time.monotonic() - _active_pipe.progress_updated_at
+    stall_text = f", {_active_pipe.stall_restarts} stall restart(s)" if _active_pipe.stall_restarts else ""
+    ffmpeg_cpu = _active_pipe.average_cpu_percent("FFmpeg")
+    cpu_text = f", avg FFmpeg CPU {ffmpeg_cpu:.1f}%" if ffmpeg_cpu is not None else ""
+    return (f"{format_progress_metrics(_active_pipe.progress)} (updated {age_seconds:.0f}s ago{stall_text})\n"
+            f"Audio: {_active_audio_path}{cpu_text}")
+
+async def _start_restream_pipe(username: str, youtube_rtmp_url: str, youtube_stream_key: str, stop_check=None):
+    """Runs one pipe until it dies or stop_check() returns a reason. Returns (success, stop_reason); stop_reason is set
+    when the pipe was ended on purpose (rollover, manual restart, channel offline) and is not a failure."""
+    global _active_pipe, _retiring_pipe, _active_audio_path, _last_pipe_failed_at
 
     config_manager.UTA_FFMPEG_PID, config_manager.UTA_STREAMLINK_PID = None, None
     config_manager.UTA_PIPE_START_TIME_UTC = datetime.now(timezone.utc) # Set pipe start time here
@@ -218,72 +505,66 @@ def _start_restream_pipe(username: str, youtube_rtmp_url: str, youtube_stream_ke
 
     if not youtube_stream_key or "YOUR_YOUTUBE_STREAM_KEY" in youtube_stream_key or not youtube_rtmp_url:
         logger.error(f"UTA Restream Service: YouTube RTMP URL ('{youtube_rtmp_url}') or Stream Key is not valid or is a placeholder. Cannot start restream pipe.")
-        return False
+        return False, None
 
     full_youtube_destination_url = f"{youtube_rtmp_url.rstrip('/')}/{youtube_stream_key}"
     logger.info(f"UTA Restream Service: Attempting to start restream pipe for {username} to {youtube_rtmp_url.rstrip('/')}/<STREAM_KEY>")
+    warm_start = has_cached_stream(username) # Before the probe below resolves (and caches) the stream
+
+    # Warm restart: the CLI streams the cached playlist URL directly, skipping Twitch's token/playlist lookups. That
+    # bypasses the Twitch plugin (and its ad filtering), so it's only done for a restart, never a session's first pipe.
+    streamlink_source, twitch_options = f"twitch.tv/{username}", ["--twitch-disable-hosting"]
+    cached_url = get_cached_stream_url(username) if warm_start and not config_manager.effective_streamlink_session_ingest() else None
+    if cached_url:
+        streamlink_source, twitch_options = f"hls://{cached_url}", [] # Twitch plugin options don't apply to hls://
 
     streamlink_command = [
         config_manager.UTA_STREAMLINK_PATH,
         "--stdout",
-        f"twitch.tv/{username}",
+        streamlink_source,
         "best",
-        "--twitch-disable-hosting",
+        *twitch_options,
         "--hls-live-restart",
         "--retry-streams", "5",
         "--retry-open", "3"
     ]
+    outputs = _build_pipe_outputs(username, full_youtube_destination_url)
+    # Probed once per stream session; later pipes (restarts, new parts) reuse the result.
+    audio_args, audio_path = choose_audio_args(username, await probe_ingest(username))
+    logger.info(f"UTA Restream Service: Audio: {audio_path}")
     ffmpeg_command = [
         config_manager.UTA_FFMPEG_PATH,
         "-hide_banner",
+        "-nostats",
+        "-progress", "pipe:2", # Structured key=value metrics, parsed by RestreamPipe
         "-i", "pipe:0",
         "-c:v", "copy",
-        "-c:a", "aac",
-        "-b:a", "160k",
-        "-map", "0:v:0?",
+        *audio_args,
+        "-map", "0:v:0?", # The tee muxer needs explicit maps
         "-map", "0:a:0?",
-        "-f", "flv",
         "-bufsize", "4000k",
-        "-flvflags", "no_duration_filesize",
         "-loglevel", "warning",
-        full_youtube_destination_url
-    ]
-
-    current_streamlink_process, current_ffmpeg_process = None, None
-    stream_pipe_successfully_started = False
+    ] # RestreamPipe appends the output arguments
+    if len(outputs) > 1:
+        logger.info(f"UTA Restream Service: Fanning out one ingest to {len(outputs)} outputs: {', '.join(f'{o.name} ({o.display_target})' for o in outputs)}")
+
+    ingest_factory = None
+    if config_manager.effective_streamlink_session_ingest():
+        ingest_factory = lambda: StreamlinkSessionIngest(username, "best")
+    elif config_manager.UTA_RESTREAM_INGEST_MODE == "session":
+        logger.warning("UTA Restream Service: UTA_RESTREAM_INGEST_MODE is 'session' but the streamlink library isn't installed. Using the streamlink CLI.")
+
+    restart_since, _last_pipe_failed_at = _last_pipe_failed_at, None
+    pipe = RestreamPipe(outputs, ingest_factory, restart_since, "warm, cached stream" if warm_start else "cold")
+    pipe_success = False
+    health_monitor_task = None
+    _active_pipe = pipe
+    _active_audio_path = audio_path
 
     try:
-        logger.info("UTA Restream Service: Starting Streamlink process...")
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = subprocess.SW_HIDE
-
-        current_streamlink_process = subprocess.Popen(
-            streamlink_command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            startupinfo=startupinfo
-        )
-        config_manager.UTA_STREAMLINK_PID = current_streamlink_process.pid
-        _streamlink_process = current_streamlink_process
-        logger.info(f"UTA Restream Service: Streamlink process started (PID: {config_manager.UTA_STREAMLINK_PID})")
-
-        logger.info("UTA Restream Service: Starting FFmpeg process...")
-        current_ffmpeg_process = subprocess.Popen(
-            ffmpeg_command,
-            stdin=current_streamlink_process.stdout,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            startupinfo=startupinfo
-        )
-        config_manager.UTA_FFMPEG_PID = current_ffmpeg_process.pid
-        _ffmpeg_process = current_ffmpeg_process
-        logger.info(f"UTA Restream Service: FFmpeg process started (PID: {config_manager.UTA_FFMPEG_PID})")
-
-        if current_streamlink_process.stdout:
-            current_streamlink_process.stdout.close()
+        await pipe.start(streamlink_command, ffmpeg_command)
+        config_manager.UTA_STREAMLINK_PID = pipe.streamlink_process.pid
+        config_manager.UTA_FFMPEG_PID = pipe.ffmpeg_process.pid
 
         config_manager.uta_is_restreaming_active = True
         logger.info(f"UTA Restream Service: Restreaming for {username} is now active. Monitoring FFmpeg/Streamlink processes...")
@@ -293,625 +574,569 @@ def _start_restream_pipe(username: str, youtube_rtmp_url: str, youtube_stream_ke
         if config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_ENABLED and \
            config_manager.effective_youtube_api_enabled() and config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING:
 
-            if shutdown_event.wait(timeout=config_manager.UTA_FFMPEG_STARTUP_WAIT_SECONDS):
-                logger.info("UTA Restream Service: Shutdown detected during FFmpeg startup wait (before playability check).")
-                return False
+            health_mode = config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_MODE == "health"
+            if not health_mode:
+                await service_supervisor.sleep(config_manager.UTA_FFMPEG_STARTUP_WAIT_SECONDS)
 
-            playability_future = asyncio.run_coroutine_threadsafe(
-                _check_youtube_playability(config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, bot_loop), bot_loop
-            )
             try:
                 overall_timeout = (config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_RETRIES *
                                    (config_manager.UTA_YOUTUBE_PLAYABILITY_CHECK_DELAY_SECONDS + 5)) + 10
-                is_playable = playability_future.result(timeout=overall_timeout)
+                if health_mode:
+                    overall_timeout += config_manager.UTA_YOUTUBE_HEALTH_CHECK_TIMEOUT_SECONDS + HEALTH_CHECK_MAX_INTERVAL_SECONDS + 30
+                    playability_check = _wait_for_youtube_stream_active(config_manager.uta_current_youtube_live_stream_id,
+                                                                        config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING)
+                else:
+                    playability_check = _check_youtube_playability(config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING)
+                is_playable = await asyncio.wait_for(playability_check, timeout=overall_timeout)
                 if not is_playable:
                     logger.error(f"UTA Restream Service: YouTube stream {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING} reported as not playable after FFmpeg start. Terminating current pipe attempt.")
-                    return False
+                    return False, None
             except asyncio.TimeoutError:
                 logger.error(f"UTA Restream Service: YouTube playability check for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING} timed out overall.")
                 config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = f"Timeout for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}"
                 config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
-                return False
+                return False, None
             except Exception as e_play_check:
                 logger.error(f"UTA Restream Service: Error during YouTube playability check orchestration: {e_play_check}", exc_info=True)
                 config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = f"Error for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}"
                 config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
-                return False
+                return False, None
+
+            if health_mode and config_manager.UTA_YOUTUBE_HEALTH_MONITOR_INTERVAL_SECONDS > 0 and config_manager.uta_current_youtube_live_stream_id:
+                health_monitor_task = service_supervisor.spawn(_monitor_youtube_stream_health(config_manager.uta_current_youtube_live_stream_id),
+                                                               name="UTA-YouTubeStreamHealth")
 
-        stream_pipe_successfully_started = True
         config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Active_Streaming")
 
-        ffmpeg_stderr_output_full = ""
-        if current_ffmpeg_process.stderr:
-            for line_bytes in iter(current_ffmpeg_process.stderr.readline, b''):
-                if shutdown_event.is_set():
-                    logger.info("UTA Restream Service: Shutdown signal received, stopping FFmpeg log reading.")
-                    break
-                decoded_line = line_bytes.decode('utf-8', errors='ignore').strip()
-                logger.debug(f"UTA_FFMPEG_LOG: {decoded_line}")
-                ffmpeg_stderr_output_full += decoded_line + "\n"
-
-                if current_streamlink_process and current_streamlink_process.poll() is not None:
-                    logger.warning(f"UTA Restream Service: Streamlink (PID: {config_manager.UTA_STREAMLINK_PID}) exited unexpectedly (Code: {current_streamlink_process.returncode}) while FFmpeg was running.")
-                    stream_pipe_successfully_started = False
-                    break
-                if current_ffmpeg_process.poll() is not None:
-                    break
-            if not current_ffmpeg_process.stderr.closed:
-                current_ffmpeg_process.stderr.close()
-
-        current_ffmpeg_process.wait()
-        ffmpeg_exit_code = current_ffmpeg_process.poll()
-        logger.info(f"UTA Restream Service: FFmpeg (PID: {config_manager.UTA_FFMPEG_PID if config_manager.UTA_FFMPEG_PID else 'N/A'}) exited with code: {ffmpeg_exit_code}")
-        if ffmpeg_exit_code != 0 and ffmpeg_exit_code is not None:
-            stream_pipe_successfully_started = False
-            logger.error("UTA Restream Service: --- FFmpeg Error Log (Last 20 lines) ---")
-            for err_line in ffmpeg_stderr_output_full.strip().splitlines()[-20:]:
-                if err_line.strip(): logger.error(err_line)
-            logger.error("UTA Restream Service: --- End FFmpeg Error Log ---")
-
-        if current_streamlink_process:
-            streamlink_exit_code = current_streamlink_process.poll()
-            if streamlink_exit_code is None:
-                logger.warning("UTA Restream Service: FFmpeg exited, but Streamlink is still running. Terminating Streamlink...")
-                _terminate_process(current_streamlink_process, "Streamlink (post-ffmpeg cleanup)")
-                streamlink_exit_code = current_streamlink_process.poll()
-
-            logger.info(f"UTA Restream Service: Streamlink (PID: {config_manager.UTA_STREAMLINK_PID if config_manager.UTA_STREAMLINK_PID else 'N/A'}) exited with code: {streamlink_exit_code}")
-            if streamlink_exit_code != 0 and streamlink_exit_code is not None :
-                stream_pipe_successfully_started = False
-
-            if current_streamlink_process.stderr:
-                try:
-                    sl_stderr_output_bytes = current_streamlink_process.stderr.read()
-                finally:
-                    if not current_streamlink_process.stderr.closed:
-                        current_streamlink_process.stderr.close()
-                if sl_stderr_output_bytes:
-                    logger.info(f"UTA Restream Service: --- Streamlink Stderr Log ---\n{sl_stderr_output_bytes.decode('utf-8', errors='ignore').strip()}\n--- End Streamlink Stderr Log ---")
-
-        return stream_pipe_successfully_started
+        # Process exits, stderr, control wake-ups and the stop_check timers are all multiplexed on this task.
+        pipe_success = await pipe.supervise(stop_check)
+        if not pipe_success and audio_args is COPY_AUDIO_ARGS and config_manager.UTA_RESTREAM_AUDIO_MODE == "auto" and \
+           pipe.ffmpeg_process.returncode not in (0, None):
+            logger.warning("UTA Restream Service: FFmpeg failed while copying audio. Transcoding audio for the rest of this stream session.")
+            mark_audio_copy_failed(username)
+        return pipe_success, pipe.stop_reason
 
     except FileNotFoundError as e:
         logger.critical(f"UTA Restream Service: ERROR - Command not found (Streamlink or FFmpeg). Ensure paths are correct in config and executables are installed: {e}.")
-        return False
+        return False, None
     except Exception as e:
         logger.error(f"UTA Restream Service: Critical error during restreaming setup or monitoring: {e}", exc_info=True)
-        return False
+        return False, None
     finally:
-        if not shutdown_event.is_set():
-            temp_slp_to_clear, temp_ffp_to_clear = _streamlink_process, _ffmpeg_process
-            if current_streamlink_process == temp_slp_to_clear: _streamlink_process = None
-            if current_ffmpeg_process == temp_ffp_to_clear: _ffmpeg_process = None
-
-            _terminate_process(current_ffmpeg_process, "FFmpeg (pipe_start finally)")
-            _terminate_process(current_streamlink_process, "Streamlink (pipe_start finally)")
-
+        # Also runs when the restreamer task is cancelled.
+        if _active_pipe is pipe: _active_pipe = None
+        if health_monitor_task: health_monitor_task.cancel()
+        if not pipe_success and not pipe.stop_reason:
+            _last_pipe_failed_at = time.monotonic()
+            if pipe.streamlink_process and pipe.streamlink_process.returncode not in (0, None, -15):
+                forget_resolved_stream(username) # Streamlink itself failed; the cached URL may be why
+        ffmpeg_cpu = pipe.average_cpu_percent("FFmpeg")
+        if ffmpeg_cpu is not None:
+            logger.info(f"UTA Restream Service: FFmpeg averaged {ffmpeg_cpu:.1f}% CPU over this pipe (audio {audio_path}).")
+        if pipe.stop_reason == PIPE_STOP_OVERLAPPED_ROLLOVER and not shutdown_event.is_set():
+            # Keeps streaming into the old part until _retire_overlapped_part sees the new part's pipe up.
+            if _retiring_pipe: await _retiring_pipe.stop()
+            _retiring_pipe = pipe
+        else:
+            await pipe.stop()
+
+        config_manager.UTA_FFMPEG_PID, config_manager.UTA_STREAMLINK_PID = None, None
         config_manager.uta_is_restreaming_active = False
         config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_EndedAttempt")
+        config_manager.logger.info("UTA_GUI_LOG: RestreamOutputs=N/A")
+        config_manager.logger.info("UTA_GUI_LOG: RestreamMetrics=N/A")
 
 
-def restreamer_monitor_loop(bot_instance): # bot_instance is passed here for bot.loop
-    logger.info(f"UTA Restreamer Service thread ({threading.current_thread().name}) started.")
+async def restreamer_monitor_task(bot_instance):
+    logger.info(f"UTA Restreamer Service task ({asyncio.current_task().get_name()}) started.")
 
     _twitch_session_active_local = False
     _youtube_api_session_active_local = False
+    _legacy_quota_fallback_local = False # API mode session streaming to the legacy stream key because of the quota
     _twitch_session_start_time_utc = None
     _twitch_session_stream_data = None
 
     yt_service_instance = None
     if config_manager.effective_youtube_api_enabled():
-        yt_service_instance = get_youtube_service()
+        yt_service_instance = await asyncio.to_thread(get_youtube_service)
         if not yt_service_instance:
-             logger.warning("UTA Restreamer: Failed to initialize YouTube service on thread start. API mode features will be impaired until successful initialization.")
+             logger.warning("UTA Restreamer: Failed to initialize YouTube service on task start. API mode features will be impaired until successful initialization.")
+
+    _next_part_task = None # Overlapped rollover: creates the next part's broadcast while the current one streams
+
+    def _prepared_next_part() -> dict:
+        if not _next_part_task or not _next_part_task.done() or _next_part_task.cancelled() or _next_part_task.exception():
+            return None
+        return _next_part_task.result()
+
+    def _discard_next_part():
+        nonlocal _next_part_task
+        if _next_part_task and not _next_part_task.done():
+            _next_part_task.cancel()
+        elif _prepared_next_part():
+            logger.warning(f"UTA YouTube: Prepared broadcast {_prepared_next_part()['broadcast_id']} was never used (session ended before the rollover).")
+        _next_part_task = None
+
+    def _pipe_stop_reason():
+        # Evaluated by the pipe supervisor on every tick/wake-up; anything returned here ends the pipe so the loop below handles it.
+        nonlocal _next_part_task
+        if shutdown_event.is_set():
+            return "shutdown"
+        if config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED:
+            return "manual restart"
+        if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local:
+            now_utc = datetime.now(timezone.utc)
+            _defer_rollover_for_quota(now_utc)
+            next_rollover = config_manager.uta_youtube_next_rollover_time_utc
+            rollover_due = config_manager.UTA_MANUAL_NEW_PART_REQUESTED or bool(next_rollover and now_utc >= next_rollover)
+            if config_manager.UTA_YOUTUBE_OVERLAPPED_ROLLOVER_ENABLED and yt_service_instance:
+                if _next_part_task is None and (rollover_due or (next_rollover and now_utc >= next_rollover - timedelta(seconds=config_manager.UTA_YOUTUBE_ROLLOVER_PREPARE_SECONDS))):
+                    snapshot = stream_state_hub.get_snapshot()
+                    _next_part_task = service_supervisor.spawn(
+                        _prepare_next_youtube_part(yt_service_instance, config_manager.uta_current_restream_part_number + 1, snapshot.stream_data if snapshot else None),
+                        name="UTA-YouTubePrepareNextPart"
+                    )
+                if rollover_due and _next_part_task is not None and not _next_part_task.done():
+                    return None # Keep streaming into the current part until the next one exists
+                if rollover_due and _prepared_next_part():
+                    return PIPE_STOP_OVERLAPPED_ROLLOVER
+            if config_manager.UTA_MANUAL_NEW_PART_REQUESTED:
+                return "manual new part"
+            if rollover_due:
+                return "scheduled rollover"
+        snapshot = stream_state_hub.get_snapshot()
+        if snapshot and not snapshot.is_live:
+            return "channel offline"
+        return None
 
-    while not shutdown_event.is_set():
-        config_manager.twitch_session_active_global = _twitch_session_active_local
-        config_manager.youtube_api_session_active_global = _youtube_api_session_active_local
+    try:
+        while not shutdown_event.is_set():
+            service_supervisor.heartbeat()
+            config_manager.twitch_session_active_global = _twitch_session_active_local
+            config_manager.youtube_api_session_active_global = _youtube_api_session_active_local
 
-        try:
-            if not config_manager.UTA_TWITCH_CHANNEL_NAME:
-                logger.warning("UTA Restreamer: UTA_TWITCH_CHANNEL_NAME not set in config. Skipping cycle.")
-                if shutdown_event.wait(timeout=config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER): break
-                continue
-
-            stream_api_data = make_uta_twitch_api_request("streams", params={"user_login": config_manager.UTA_TWITCH_CHANNEL_NAME})
-            is_twitch_live_now = False
-            current_twitch_stream_data_from_api = None
-            if stream_api_data and stream_api_data.get("data") and len(stream_api_data["data"]) > 0 and stream_api_data["data"][0].get("type") == "live":
-                is_twitch_live_now = True
-                current_twitch_stream_data_from_api = stream_api_data["data"][0]
+            try:
+                if not config_manager.UTA_TWITCH_CHANNEL_NAME:
+                    logger.warning("UTA Restreamer: UTA_TWITCH_CHANNEL_NAME not set in config. Skipping cycle.")
+                    await service_supervisor.sleep(config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER, interval=True)
+                    continue
+
+                hub_snapshot = stream_state_hub.get_snapshot()
+                seen_snapshot_version = hub_snapshot.version if hub_snapshot else 0
+                is_twitch_live_now = bool(hub_snapshot and hub_snapshot.is_live)
+                current_twitch_stream_data_from_api = hub_snapshot.stream_data if is_twitch_live_now else None
+
+                now_utc = datetime.now(timezone.utc)
+
+                manual_ffmpeg_restart_triggered_this_cycle = False
+                if config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED and _twitch_session_active_local and is_twitch_live_now:
+                    logger.info("UTA Restreamer: Manual FFmpeg/Streamlink restart triggered by command.")
+                    if config_manager.uta_is_restreaming_active: await cleanup_restream_processes()
+                    config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED = False
+                    manual_ffmpeg_restart_triggered_this_cycle = True
+                    config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                    config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures={config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}")
 
-            now_utc = datetime.now(timezone.utc)
 
-            manual_ffmpeg_restart_triggered_this_cycle = False
-            if config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED and _twitch_session_active_local and is_twitch_live_now:
-                logger.info("UTA Restreamer: Manual FFmpeg/Streamlink restart triggered by command.")
-                if config_manager.uta_is_restreaming_active: cleanup_restream_processes()
-                config_manager.UTA_MANUAL_FFMPEG_RESTART_REQUESTED = False
-                manual_ffmpeg_restart_triggered_this_cycle = True
-                config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
-                config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures={config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}")
-
-
-            manual_new_part_triggered_this_cycle = False
-            if config_manager.UTA_MANUAL_NEW_PART_REQUESTED and _twitch_session_active_local and is_twitch_live_now and \
-               config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local:
-                logger.info("UTA Restreamer: Manual new YouTube part triggered by command.")
-                config_manager.UTA_MANUAL_NEW_PART_REQUESTED = False
-                manual_new_part_triggered_this_cycle = True
-
-            if is_twitch_live_now and not _twitch_session_active_local:
-                logger.info(f"UTA Restreamer: Twitch channel {config_manager.UTA_TWITCH_CHANNEL_NAME} is LIVE! Preparing restream session...")
-                _twitch_session_active_local = True
-                _twitch_session_start_time_utc = now_utc
-                _twitch_session_stream_data = current_twitch_stream_data_from_api
-                config_manager.last_known_title_for_ended_part = _twitch_session_stream_data.get("title","N/A") # For initial part
-                config_manager.last_known_game_for_ended_part = _twitch_session_stream_data.get("game_name","N/A") # For initial part
-
-
-                config_manager.uta_current_restream_part_number = 1
-                config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
-                config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = None
-                _youtube_api_session_active_local = False
-                config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = "N/A"
-                config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
-                config_manager.UTA_FFMPEG_PID, config_manager.UTA_STREAMLINK_PID, config_manager.UTA_PIPE_START_TIME_UTC = None, None, None # Reset pipe start time
-                config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive")
-                config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
-                config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+                manual_new_part_triggered_this_cycle = False
+                if config_manager.UTA_MANUAL_NEW_PART_REQUESTED and _twitch_session_active_local and is_twitch_live_now and \
+                   config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local:
+                    logger.info("UTA Restreamer: Manual new YouTube part triggered by command.")
+                    config_manager.UTA_MANUAL_NEW_PART_REQUESTED = False
+                    manual_new_part_triggered_this_cycle = True
 
-                if config_manager.effective_youtube_api_enabled():
-                    if not yt_service_instance: yt_service_instance = get_youtube_service()
+                if is_twitch_live_now and not _twitch_session_active_local:
+                    logger.info(f"UTA Restreamer: Twitch channel {config_manager.UTA_TWITCH_CHANNEL_NAME} is LIVE! Preparing restream session...")
+                    _twitch_session_active_local = True
+                    _twitch_session_start_time_utc = now_utc
+                    _twitch_session_stream_data = current_twitch_stream_data_from_api
+                    forget_ingest_probe(config_manager.UTA_TWITCH_CHANNEL_NAME) # Encoder settings may differ from the last session
+                    config_manager.last_known_title_for_ended_part = _twitch_session_stream_data.get("title","N/A") # For initial part
+                    config_manager.last_known_game_for_ended_part = _twitch_session_stream_data.get("game_name","N/A") # For initial part
 
-                    if yt_service_instance:
-                        future_ls = asyncio.run_coroutine_threadsafe(
-                            create_youtube_live_stream_resource(yt_service_instance, config_manager.UTA_TWITCH_CHANNEL_NAME),
-                            bot_instance.loop
-                        )
-                        try:
-                            new_ls_id, new_rtmp, new_key = future_ls.result(timeout=30)
-                            if new_ls_id and new_rtmp and new_key:
-                                config_manager.uta_current_youtube_live_stream_id = new_ls_id
-                                config_manager.uta_current_youtube_rtmp_url = new_rtmp
-                                config_manager.uta_current_youtube_stream_key = new_key
 
-                                title = config_manager.UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE.format(
+                    config_manager.uta_current_restream_part_number = 1
+                    config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                    config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = None
+                    _youtube_api_session_active_local = False
+                    config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS = "N/A"
+                    config_manager.logger.info(f"UTA_GUI_LOG: PlayabilityCheckStatus={config_manager.UTA_LAST_PLAYABILITY_CHECK_STATUS}")
+                    config_manager.UTA_LAST_YT_STREAM_HEALTH = "N/A"
+                    config_manager.UTA_FFMPEG_PID, config_manager.UTA_STREAMLINK_PID, config_manager.UTA_PIPE_START_TIME_UTC = None, None, None # Reset pipe start time
+                    config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive")
+                    config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
+                    config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+
+                    _legacy_quota_fallback_local = config_manager.effective_youtube_api_enabled() and _use_legacy_rtmp_for_quota()
+                    if config_manager.effective_youtube_api_enabled() and not _legacy_quota_fallback_local:
+                        if not yt_service_instance: yt_service_instance = await asyncio.to_thread(get_youtube_service)
+
+                        if yt_service_instance:
+                            try:
+                                new_ls_id, new_rtmp, new_key = await asyncio.wait_for(
+                                    create_youtube_live_stream_resource(yt_service_instance, config_manager.UTA_TWITCH_CHANNEL_NAME), timeout=30
+                                )
+                                if new_ls_id and new_rtmp and new_key:
+                                    config_manager.uta_current_youtube_live_stream_id = new_ls_id
+                                    config_manager.uta_current_youtube_rtmp_url = new_rtmp
+                                    config_manager.uta_current_youtube_stream_key = new_key
+
+                                    title = config_manager.UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE.format(
+                                        twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
+                                        twitch_title=_twitch_session_stream_data.get("title","N/A"),
+                                        game_name=_twitch_session_stream_data.get("game_name","N/A"),
+                                        part_num=config_manager.uta_current_restream_part_number,
+                                        date=now_utc.strftime("%Y-%m-%d"),
+                                        time=now_utc.strftime("%H:%M:%S UTC")
+                                    )
+                                    description = await asyncio.to_thread(
+                                        _generate_enhanced_youtube_description,
+                                        twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
+                                        twitch_title=_twitch_session_stream_data.get("title","N/A"),
+                                        current_game_name=_twitch_session_stream_data.get("game_name","N/A"),
+                                        part_num=config_manager.uta_current_restream_part_number,
+                                        vod_part_start_utc=now_utc # Start of this new part
+                                    )
+
+                                    privacy = config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY
+                                
+                                    start_iso = now_utc.isoformat()
+
+                                    new_bcast_id = await asyncio.wait_for(
+                                        create_youtube_broadcast(yt_service_instance, config_manager.uta_current_youtube_live_stream_id, title, description, privacy, start_iso),
+                                        timeout=30
+                                    )
+
+                                    if new_bcast_id:
+                                        config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING = new_bcast_id
+                                        config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = new_bcast_id
+                                        _youtube_api_session_active_local = True
+                                        logger.info(f"UTA YouTube: Successfully created broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING} (Video ID: {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}) for Part {config_manager.uta_current_restream_part_number}. Watch: https://www.youtube.com/watch?v={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
+                                        if config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING:
+                                            config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
+                                            config_manager.logger.info(f"UTA_GUI_LOG: YouTubePartNum={config_manager.uta_current_restream_part_number}")
+
+                                        if config_manager.UTA_YOUTUBE_PLAYLIST_ID:
+                                            service_supervisor.spawn(
+                                                add_video_to_youtube_playlist(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, config_manager.UTA_YOUTUBE_PLAYLIST_ID),
+                                                name="UTA-YouTubePlaylistAdd"
+                                            )
+
+                                        if config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS > 0:
+                                            config_manager.uta_youtube_next_rollover_time_utc = now_utc + timedelta(hours=config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS)
+                                        else:
+                                            config_manager.uta_youtube_next_rollover_time_utc = None
+                                    else:
+                                        logger.error("UTA YouTube: Failed to create broadcast. Will fallback to legacy RTMP if configured, or fail.")
+                                        config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING = None
+                                        _youtube_api_session_active_local = False
+                                else:
+                                    logger.error("UTA YouTube: Failed to create liveStream resource. Will fallback to legacy RTMP if configured, or fail.")
+                                    _youtube_api_session_active_local = False
+                            except asyncio.TimeoutError:
+                                logger.error("UTA YouTube: Timeout creating liveStream resource or broadcast.")
+                                _youtube_api_session_active_local = False
+                            except Exception as e_yt_setup:
+                                logger.error(f"UTA YouTube: Exception during initial YouTube setup: {e_yt_setup}", exc_info=True)
+                                _youtube_api_session_active_local = False
+                        else:
+                             logger.error("UTA YouTube: YouTube service not available. Will fallback to legacy RTMP if configured, or fail.")
+                             _youtube_api_session_active_local = False
+                        if not _youtube_api_session_active_local:
+                            _legacy_quota_fallback_local = _use_legacy_rtmp_for_quota() # Setup may have failed on quotaExceeded
+
+                    await asyncio.to_thread(_send_discord_restream_status, "start", config_manager.UTA_TWITCH_CHANNEL_NAME, _twitch_session_stream_data)
+
+                if _twitch_session_active_local and is_twitch_live_now:
+                    time_for_youtube_rollover = manual_new_part_triggered_this_cycle
+                    if not time_for_youtube_rollover and config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local:
+                        _defer_rollover_for_quota(now_utc)
+                    if not time_for_youtube_rollover and \
+                       config_manager.effective_youtube_api_enabled() and \
+                       _youtube_api_session_active_local and \
+                       config_manager.uta_youtube_next_rollover_time_utc and now_utc >= config_manager.uta_youtube_next_rollover_time_utc:
+                        logger.info(f"UTA YouTube: Scheduled rollover time for broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING}.")
+                        time_for_youtube_rollover = True
+
+                    prepared_part = _prepared_next_part() if time_for_youtube_rollover else None
+                    if prepared_part and yt_service_instance:
+                        # Overlapped rollover: the old pipe is normally still streaming into the old part (_retiring_pipe). Switch to
+                        # the prepared part now; the new pipe starts below and the old part is completed once the new one is up.
+                        ending_part = {
+                            "part_num": config_manager.uta_current_restream_part_number,
+                            "broadcast_id": config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING,
+                            "video_id": config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING,
+                            "part_start_utc": config_manager.UTA_PIPE_START_TIME_UTC,
+                            "title": current_twitch_stream_data_from_api.get("title","N/A") if current_twitch_stream_data_from_api else "N/A",
+                            "game": current_twitch_stream_data_from_api.get("game_name","N/A") if current_twitch_stream_data_from_api else "N/A",
+                        }
+                        logger.info(f"UTA YouTube: Overlapped rollover from Part {ending_part['part_num']} to Part {prepared_part['part_num']}.")
+                        config_manager.uta_current_restream_part_number = prepared_part["part_num"]
+                        config_manager.uta_current_youtube_live_stream_id = prepared_part["live_stream_id"]
+                        config_manager.uta_current_youtube_rtmp_url = prepared_part["rtmp_url"]
+                        config_manager.uta_current_youtube_stream_key = prepared_part["stream_key"]
+                        config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = prepared_part["broadcast_id"], prepared_part["broadcast_id"]
+                        _next_part_task = None
+                        config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                        config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
+                        config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
+                        config_manager.logger.info(f"UTA_GUI_LOG: YouTubePartNum={config_manager.uta_current_restream_part_number}")
+                        if config_manager.UTA_YOUTUBE_PLAYLIST_ID:
+                            service_supervisor.spawn(add_video_to_youtube_playlist(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, config_manager.UTA_YOUTUBE_PLAYLIST_ID), name="UTA-YouTubePlaylistAdd")
+                        if config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS > 0:
+                            config_manager.uta_youtube_next_rollover_time_utc = now_utc + timedelta(hours=config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS)
+                        service_supervisor.spawn(_retire_overlapped_part(yt_service_instance, _retiring_pipe, ending_part), name="UTA-YouTubeRetirePart")
+
+                    elif time_for_youtube_rollover and yt_service_instance:
+                        _discard_next_part()
+                        logger.info(f"UTA YouTube: Initiating stream rollover from Part {config_manager.uta_current_restream_part_number}.")
+                        if config_manager.uta_is_restreaming_active: await cleanup_restream_processes()
+                    
+                        # Store info about the part that's ending, for its final description update
+                        config_manager.last_known_title_for_ended_part = current_twitch_stream_data_from_api.get("title","N/A") if current_twitch_stream_data_from_api else "N/A"
+                        config_manager.last_known_game_for_ended_part = current_twitch_stream_data_from_api.get("game_name","N/A") if current_twitch_stream_data_from_api else "N/A"
+
+
+                        ending_part = {
+                            "part_num": config_manager.uta_current_restream_part_number,
+                            "broadcast_id": config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING,
+                            "video_id": config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING,
+                            "part_start_utc": config_manager.UTA_PIPE_START_TIME_UTC, # Pipe start time of current (now ending) part
+                            "title": config_manager.last_known_title_for_ended_part,
+                            "game": config_manager.last_known_game_for_ended_part,
+                        }
+                        service_supervisor.spawn(_finalize_youtube_part(yt_service_instance, ending_part, now_utc, "Rollover Part"), name="UTA-YouTubeFinalizePart")
+
+                        config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
+
+                        config_manager.uta_current_restream_part_number += 1
+                        config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                        config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
+                        logger.info(f"UTA YouTube: Preparing for Part {config_manager.uta_current_restream_part_number}.")
+                        config_manager.UTA_PIPE_START_TIME_UTC = None # Clear before new part pipe starts
+
+                        try:
+                            new_ls_id_r, new_rtmp_r, new_key_r = await asyncio.wait_for(create_youtube_live_stream_resource(yt_service_instance, config_manager.UTA_TWITCH_CHANNEL_NAME), timeout=30)
+                            if new_ls_id_r and new_rtmp_r and new_key_r:
+                                config_manager.uta_current_youtube_live_stream_id, config_manager.uta_current_youtube_rtmp_url, config_manager.uta_current_youtube_stream_key = new_ls_id_r, new_rtmp_r, new_key_r
+                                title_r = config_manager.UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE.format(
                                     twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
-                                    twitch_title=_twitch_session_stream_data.get("title","N/A"),
-                                    game_name=_twitch_session_stream_data.get("game_name","N/A"),
+                                    twitch_title=current_twitch_stream_data_from_api.get("title","N/A"),
+                                    game_name=current_twitch_stream_data_from_api.get("game_name","N/A"),
                                     part_num=config_manager.uta_current_restream_part_number,
                                     date=now_utc.strftime("%Y-%m-%d"),
                                     time=now_utc.strftime("%H:%M:%S UTC")
                                 )
-                                description = _generate_enhanced_youtube_description(
+                                desc_r = await asyncio.to_thread(
+                                    _generate_enhanced_youtube_description,
                                     twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
-                                    twitch_title=_twitch_session_stream_data.get("title","N/A"),
-                                    current_game_name=_twitch_session_stream_data.get("game_name","N/A"),
+                                    twitch_title=current_twitch_stream_data_from_api.get("title","N/A"),
+                                    current_game_name=current_twitch_stream_data_from_api.get("game_name","N/A"),
                                     part_num=config_manager.uta_current_restream_part_number,
-                                    vod_part_start_utc=now_utc # Start of this new part
-                                )
-
-                                privacy = config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY
-                                
-                                start_iso = now_utc.isoformat()
-
-                                future_bcast = asyncio.run_coroutine_threadsafe(
-                                    create_youtube_broadcast(yt_service_instance, config_manager.uta_current_youtube_live_stream_id, title, description, privacy, start_iso),
-                                    bot_instance.loop
+                                    vod_part_start_utc=now_utc # For this new part
                                 )
-                                new_bcast_id = future_bcast.result(timeout=30)
+                                new_bcast_id_r = await asyncio.wait_for(create_youtube_broadcast(yt_service_instance, config_manager.uta_current_youtube_live_stream_id, title_r, desc_r, config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY, now_utc.isoformat()), timeout=30)
 
-                                if new_bcast_id:
-                                    config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING = new_bcast_id
-                                    config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = new_bcast_id
+                                if new_bcast_id_r:
+                                    config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = new_bcast_id_r, new_bcast_id_r
                                     _youtube_api_session_active_local = True
-                                    logger.info(f"UTA YouTube: Successfully created broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING} (Video ID: {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}) for Part {config_manager.uta_current_restream_part_number}. Watch: https://www.youtube.com/watch?v={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
+                                    logger.info(f"UTA YouTube: Rollover successful. New broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING} (Video ID: {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}) for Part {config_manager.uta_current_restream_part_number}. Watch: https://www.youtube.com/watch?v={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
                                     if config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING:
                                         config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
                                         config_manager.logger.info(f"UTA_GUI_LOG: YouTubePartNum={config_manager.uta_current_restream_part_number}")
 
                                     if config_manager.UTA_YOUTUBE_PLAYLIST_ID:
-                                        asyncio.run_coroutine_threadsafe(
-                                            add_video_to_youtube_playlist(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, config_manager.UTA_YOUTUBE_PLAYLIST_ID),
-                                            bot_instance.loop
-                                        )
-
+                                        service_supervisor.spawn(add_video_to_youtube_playlist(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, config_manager.UTA_YOUTUBE_PLAYLIST_ID), name="UTA-YouTubePlaylistAdd")
                                     if config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS > 0:
                                         config_manager.uta_youtube_next_rollover_time_utc = now_utc + timedelta(hours=config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS)
-                                    else:
-                                        config_manager.uta_youtube_next_rollover_time_utc = None
                                 else:
-                                    logger.error("UTA YouTube: Failed to create broadcast. Will fallback to legacy RTMP if configured, or fail.")
-                                    config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING = None
-                                    _youtube_api_session_active_local = False
+                                    logger.error("UTA YouTube: Rollover failed to create new broadcast. Aborting restream session.")
+                                    _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
                             else:
-                                logger.error("UTA YouTube: Failed to create liveStream resource. Will fallback to legacy RTMP if configured, or fail.")
-                                _youtube_api_session_active_local = False
-                        except TimeoutError:
-                            logger.error("UTA YouTube: Timeout creating liveStream resource or broadcast.")
-                            _youtube_api_session_active_local = False
-                        except Exception as e_yt_setup:
-                            logger.error(f"UTA YouTube: Exception during initial YouTube setup: {e_yt_setup}", exc_info=True)
-                            _youtube_api_session_active_local = False
-                    else:
-                         logger.error("UTA YouTube: YouTube service not available. Will fallback to legacy RTMP if configured, or fail.")
-                         _youtube_api_session_active_local = False
-
-                _send_discord_restream_status("start", config_manager.UTA_TWITCH_CHANNEL_NAME, _twitch_session_stream_data)
-
-            if _twitch_session_active_local and is_twitch_live_now:
-                time_for_youtube_rollover = manual_new_part_triggered_this_cycle
-                if not time_for_youtube_rollover and \
-                   config_manager.effective_youtube_api_enabled() and \
-                   _youtube_api_session_active_local and \
-                   config_manager.uta_youtube_next_rollover_time_utc and now_utc >= config_manager.uta_youtube_next_rollover_time_utc:
-                    logger.info(f"UTA YouTube: Scheduled rollover time for broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING}.")
-                    time_for_youtube_rollover = True
-
-                if time_for_youtube_rollover and yt_service_instance:
-                    logger.info(f"UTA YouTube: Initiating stream rollover from Part {config_manager.uta_current_restream_part_number}.")
-                    if config_manager.uta_is_restreaming_active: cleanup_restream_processes()
-                    
-                    # Store info about the part that's ending, for its final description update
-                    config_manager.last_known_title_for_ended_part = current_twitch_stream_data_from_api.get("title","N/A") if current_twitch_stream_data_from_api else "N/A"
-                    config_manager.last_known_game_for_ended_part = current_twitch_stream_data_from_api.get("game_name","N/A") if current_twitch_stream_data_from_api else "N/A"
-
-
-                    # --- START Auto Chapter Generation for Rollover Part ---
-                    if config_manager.UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED and \
-                       config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING and \
-                       config_manager.UTA_PIPE_START_TIME_UTC: # Use pipe start time of current (now ending) part
-
-                        vod_part_start_unix_chapters_rollover = int(config_manager.UTA_PIPE_START_TIME_UTC.timestamp())
-                        vod_part_end_unix_chapters_rollover = int(now_utc.timestamp()) # Current time is end of this part
-
-                        logger.info(f"Chapter Gen (Rollover Part): VOD Part Time Window: {datetime.fromtimestamp(vod_part_start_unix_chapters_rollover, tz=timezone.utc)} to {datetime.fromtimestamp(vod_part_end_unix_chapters_rollover, tz=timezone.utc)}")
-
-                        game_segments_for_chapters_rollover = parse_stream_activity_for_game_segments(
-                            config_manager.UTA_STREAM_ACTIVITY_LOG_FILE,
-                            vod_part_start_unix_chapters_rollover,
-                            vod_part_end_unix_chapters_rollover
-                        )
-                        if game_segments_for_chapters_rollover:
-                            chapter_str_rollover = generate_chapter_text(game_segments_for_chapters_rollover, vod_part_start_unix_chapters_rollover)
-                            if chapter_str_rollover:
-                                future_video_details_rollover = asyncio.run_coroutine_threadsafe(
-                                    get_youtube_video_details(
-                                        yt_service_instance,
-                                        config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING
-                                    ),
-                                    bot_instance.loop
-                                )
-                                try:
-                                    video_details_resp_rollover = future_video_details_rollover.result(timeout=20)
-                                    if video_details_resp_rollover:
-                                        existing_desc_rollover = video_details_resp_rollover['snippet']['description'] if 'snippet' in video_details_resp_rollover and 'description' in video_details_resp_rollover['snippet'] else ""
-                                        chapter_marker = config_manager.UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER
-
-                                        # Preserve content before the chapter marker if it exists
-                                        if chapter_marker in existing_desc_rollover:
-                                            base_description_content = existing_desc_rollover.split(chapter_marker, 1)[0].rstrip()
-                                        else: # No marker, use the whole existing description as base
-                                            base_description_content = existing_desc_rollover.rstrip()
-
-                                        # Regenerate enhanced part with game list (for the part just ended)
-                                        enhanced_desc_for_ended_part = _generate_enhanced_youtube_description(
-                                            twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
-                                            twitch_title=config_manager.last_known_title_for_ended_part,
-                                            current_game_name=config_manager.last_known_game_for_ended_part,
-                                            part_num=config_manager.uta_current_restream_part_number, # Part number that just ended
-                                            vod_part_start_utc=datetime.fromtimestamp(vod_part_start_unix_chapters_rollover, tz=timezone.utc),
-                                            vod_part_end_utc=datetime.fromtimestamp(vod_part_end_unix_chapters_rollover, tz=timezone.utc)
-                                        )
-                                        final_description_rollover = f"{enhanced_desc_for_ended_part}\n\n{chapter_marker}\n{chapter_str_rollover}"
-
-                                        logger.info(f"Chapter Gen (Rollover Part): Updating YouTube video {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING} with description and chapters.")
-                                        
-                                        future_update_rollover = asyncio.run_coroutine_threadsafe(
-                                            update_youtube_broadcast_metadata(
-                                                yt_service_instance,
-                                                config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING,
-                                                new_description=final_description_rollover
-                                            ),
-                                            bot_instance.loop
-                                        )
-                                        future_update_rollover.result(timeout=20)
-                                    else:
-                                        logger.warning(f"Chapter Gen (Rollover Part): Could not retrieve video details for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}.")
-                                except TimeoutError:
-                                    logger.error(f"Chapter Gen (Rollover Part): Timeout getting video details or updating metadata for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}.")
-                                except Exception as e_chap_api_roll:
-                                    logger.error(f"Chapter Gen (Rollover Part): Error during YouTube API call for chapters: {e_chap_api_roll}", exc_info=True)
-                            else: logger.info("Chapter Gen (Rollover Part): No valid chapter string generated.")
-                        else: logger.info("Chapter Gen (Rollover Part): No game segments for this part.")
-                    # --- END Auto Chapter Generation for Rollover Part ---
-
-                    asyncio.run_coroutine_threadsafe(transition_youtube_broadcast(yt_service_instance, config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, "complete"), bot_instance.loop).result(timeout=30)
-                    if config_manager.UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM and config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY != "public":
-                        asyncio.run_coroutine_threadsafe(set_youtube_video_privacy(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, "public"), bot_instance.loop)
-
-                    config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
+                                logger.error("UTA YouTube: Rollover failed to create new liveStream resource. Aborting restream session.")
+                                _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
+                        except asyncio.TimeoutError:
+                            logger.error("UTA YouTube: Timeout during rollover YouTube setup.")
+                            _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
+                        except Exception as e_yt_rollover:
+                            logger.error(f"UTA YouTube: Exception during rollover YouTube setup: {e_yt_rollover}", exc_info=True)
+                            _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
 
-                    config_manager.uta_current_restream_part_number += 1
-                    config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
-                    config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
-                    logger.info(f"UTA YouTube: Preparing for Part {config_manager.uta_current_restream_part_number}.")
-                    config_manager.UTA_PIPE_START_TIME_UTC = None # Clear before new part pipe starts
 
-                    future_ls_r = asyncio.run_coroutine_threadsafe(create_youtube_live_stream_resource(yt_service_instance, config_manager.UTA_TWITCH_CHANNEL_NAME), bot_instance.loop)
-                    try:
-                        new_ls_id_r, new_rtmp_r, new_key_r = future_ls_r.result(timeout=30)
-                        if new_ls_id_r and new_rtmp_r and new_key_r:
-                            config_manager.uta_current_youtube_live_stream_id, config_manager.uta_current_youtube_rtmp_url, config_manager.uta_current_youtube_stream_key = new_ls_id_r, new_rtmp_r, new_key_r
-                            title_r = config_manager.UTA_YOUTUBE_DYNAMIC_TITLE_TEMPLATE.format(
-                                twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
-                                twitch_title=current_twitch_stream_data_from_api.get("title","N/A"),
-                                game_name=current_twitch_stream_data_from_api.get("game_name","N/A"),
-                                part_num=config_manager.uta_current_restream_part_number,
-                                date=now_utc.strftime("%Y-%m-%d"),
-                                time=now_utc.strftime("%H:%M:%S UTC")
-                            )
-                            desc_r = _generate_enhanced_youtube_description(
-                                twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
-                                twitch_title=current_twitch_stream_data_from_api.get("title","N/A"),
-                                current_game_name=current_twitch_stream_data_from_api.get("game_name","N/A"),
-                                part_num=config_manager.uta_current_restream_part_number,
-                                vod_part_start_utc=now_utc # For this new part
-                            )
-                            future_bcast_r = asyncio.run_coroutine_threadsafe(create_youtube_broadcast(yt_service_instance, config_manager.uta_current_youtube_live_stream_id, title_r, desc_r, config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY, now_utc.isoformat()), bot_instance.loop)
-                            new_bcast_id_r = future_bcast_r.result(timeout=30)
-
-                            if new_bcast_id_r:
-                                config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = new_bcast_id_r, new_bcast_id_r
-                                _youtube_api_session_active_local = True
-                                logger.info(f"UTA YouTube: Rollover successful. New broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING} (Video ID: {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}) for Part {config_manager.uta_current_restream_part_number}. Watch: https://www.youtube.com/watch?v={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
-                                if config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING:
-                                    config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID={config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}")
-                                    config_manager.logger.info(f"UTA_GUI_LOG: YouTubePartNum={config_manager.uta_current_restream_part_number}")
-
-                                if config_manager.UTA_YOUTUBE_PLAYLIST_ID:
-                                    asyncio.run_coroutine_threadsafe(add_video_to_youtube_playlist(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, config_manager.UTA_YOUTUBE_PLAYLIST_ID), bot_instance.loop)
-                                if config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS > 0:
-                                    config_manager.uta_youtube_next_rollover_time_utc = now_utc + timedelta(hours=config_manager.UTA_YOUTUBE_SCHEDULED_ROLLOVER_HOURS)
-                            else:
-                                logger.error("UTA YouTube: Rollover failed to create new broadcast. Aborting restream session.")
-                                _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
+                    rtmp_url_to_use, stream_key_to_use = None, None
+                    can_start_pipe = False
+                    if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local:
+                        rtmp_url_to_use = config_manager.uta_current_youtube_rtmp_url
+                        stream_key_to_use = config_manager.uta_current_youtube_stream_key
+                        can_start_pipe = bool(rtmp_url_to_use and stream_key_to_use)
+                    elif _legacy_quota_fallback_local:
+                        rtmp_url_to_use = config_manager.UTA_YOUTUBE_RTMP_URL_BASE
+                        stream_key_to_use = config_manager.UTA_YOUTUBE_STREAM_KEY
+                        can_start_pipe = True
+                    elif not config_manager.UTA_YOUTUBE_API_ENABLED:
+                        rtmp_url_to_use = config_manager.UTA_YOUTUBE_RTMP_URL_BASE
+                        stream_key_to_use = config_manager.UTA_YOUTUBE_STREAM_KEY
+                        can_start_pipe = bool(rtmp_url_to_use and stream_key_to_use and "YOUR_YOUTUBE_STREAM_KEY" not in stream_key_to_use)
+
+                    if not config_manager.uta_is_restreaming_active and can_start_pipe:
+                        if not manual_ffmpeg_restart_triggered_this_cycle and config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES >= config_manager.UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES :
+                            logger.critical(f"UTA Restreamer: Max consecutive pipe failures ({config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}) reached. Entering long cooldown: {config_manager.UTA_RESTREAM_LONG_COOLDOWN_SECONDS}s.")
+                            await asyncio.to_thread(_send_discord_restream_status, "stop", config_manager.UTA_TWITCH_CHANNEL_NAME, stream_duration_seconds=0)
+                            config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures={config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}")
+                            config_manager.logger.info(f"UTA_GUI_LOG: CooldownStatus=LongCooldownActive_{config_manager.UTA_RESTREAM_LONG_COOLDOWN_SECONDS}s")
+                            await service_supervisor.sleep(config_manager.UTA_RESTREAM_LONG_COOLDOWN_SECONDS)
+                            config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+                            config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                            config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
+                            continue
+
+                        streamlink_ok = config_manager.effective_streamlink_session_ingest() or shutil.which(config_manager.UTA_STREAMLINK_PATH)
+                        if not (streamlink_ok and shutil.which(config_manager.UTA_FFMPEG_PATH)):
+                            logger.error("UTA Restreamer: Streamlink or FFmpeg path is invalid or executables not found. Aborting restream session.")
+                            _twitch_session_active_local = False
+                            if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local and yt_service_instance:
+                                service_supervisor.spawn(transition_youtube_broadcast(yt_service_instance, config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, "complete"), name="UTA-YouTubeTransition")
+                            _youtube_api_session_active_local = False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING = None
+                            continue
+
+                        part_num_log = config_manager.uta_current_restream_part_number if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local else 'N/A (Legacy)'
+                        logger.info(f"UTA Restreamer: Starting FFmpeg/Streamlink pipe for {config_manager.UTA_TWITCH_CHANNEL_NAME} (Part {part_num_log}). Attempt {config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES + 1}.")
+
+                        pipe_success, pipe_stop_reason = await _start_restream_pipe(config_manager.UTA_TWITCH_CHANNEL_NAME, rtmp_url_to_use, stream_key_to_use,
+                                                                                    stop_check=_pipe_stop_reason)
+
+                        logger.info(f"UTA Restreamer: FFmpeg/Streamlink pipe for Part {part_num_log} has ended{f' ({pipe_stop_reason})' if pipe_stop_reason else ''}.")
+                        if pipe_success: # Includes pipes stopped on purpose; the next pass handles that restart/rollover/offline edge
+                            config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                            config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
                         else:
-                            logger.error("UTA YouTube: Rollover failed to create new liveStream resource. Aborting restream session.")
-                            _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
-                    except TimeoutError:
-                        logger.error("UTA YouTube: Timeout during rollover YouTube setup.")
-                        _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
-                    except Exception as e_yt_rollover:
-                        logger.error(f"UTA YouTube: Exception during rollover YouTube setup: {e_yt_rollover}", exc_info=True)
-                        _twitch_session_active_local=False; _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None
-
-
-                rtmp_url_to_use, stream_key_to_use = None, None
-                can_start_pipe = False
-                if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local:
-                    rtmp_url_to_use = config_manager.uta_current_youtube_rtmp_url
-                    stream_key_to_use = config_manager.uta_current_youtube_stream_key
-                    can_start_pipe = bool(rtmp_url_to_use and stream_key_to_use)
-                elif not config_manager.UTA_YOUTUBE_API_ENABLED:
-                    rtmp_url_to_use = config_manager.UTA_YOUTUBE_RTMP_URL_BASE
-                    stream_key_to_use = config_manager.UTA_YOUTUBE_STREAM_KEY
-                    can_start_pipe = bool(rtmp_url_to_use and stream_key_to_use and "YOUR_YOUTUBE_STREAM_KEY" not in stream_key_to_use)
-
-                if not config_manager.uta_is_restreaming_active and can_start_pipe:
-                    if not manual_ffmpeg_restart_triggered_this_cycle and config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES >= config_manager.UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES :
-                        logger.critical(f"UTA Restreamer: Max consecutive pipe failures ({config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}) reached. Entering long cooldown: {config_manager.UTA_RESTREAM_LONG_COOLDOWN_SECONDS}s.")
-                        _send_discord_restream_status("stop", config_manager.UTA_TWITCH_CHANNEL_NAME, stream_duration_seconds=0)
-                        config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures={config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}")
-                        config_manager.logger.info(f"UTA_GUI_LOG: CooldownStatus=LongCooldownActive_{config_manager.UTA_RESTREAM_LONG_COOLDOWN_SECONDS}s")
-                        if shutdown_event.wait(timeout=config_manager.UTA_RESTREAM_LONG_COOLDOWN_SECONDS): break
-                        config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
-                        config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
-                        config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
-                        continue
+                            config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES += 1
+                            logger.error(f"UTA Restreamer: Pipe attempt failed. Consecutive failures: {config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}.")
+                            config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures={config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}")
+                            config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=FailedRetry")
+
+                        if not manual_ffmpeg_restart_triggered_this_cycle and not pipe_stop_reason and \
+                           config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES < config_manager.UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES:
+                            if config_manager.UTA_RESTREAM_WARM_RESTART_ENABLED and config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES == 1:
+                                logger.info("UTA Restreamer: First failure in a row; restarting the pipe right away (warm restart).")
+                            else:
+                                config_manager.logger.info(f"UTA_GUI_LOG: CooldownStatus=ShortRetryCooldown_{config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS}s")
+                                await service_supervisor.sleep(config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS)
+                                config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+
+                    elif config_manager.uta_is_restreaming_active:
+                        if not manual_ffmpeg_restart_triggered_this_cycle:
+                            logger.info(f"UTA Restreamer: {config_manager.UTA_TWITCH_CHANNEL_NAME} is live. Restream pipe is active. Check interval: {config_manager.UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE}s.")
+                            config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Active_Monitoring")
+                            if await _wait_for_stream_state(seen_snapshot_version, config_manager.UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE): break
+                    else:
+                        logger.warning(f"UTA Restreamer: {config_manager.UTA_TWITCH_CHANNEL_NAME} is live, but not currently restreaming (conditions not met for pipe start). Check interval: {config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER}s.")
+                        config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_WaitingCanStart")
+                        if await _wait_for_stream_state(seen_snapshot_version, config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER): break
 
-                    if not (shutil.which(config_manager.UTA_STREAMLINK_PATH) and shutil.which(config_manager.UTA_FFMPEG_PATH)):
-                        logger.error("UTA Restreamer: Streamlink or FFmpeg path is invalid or executables not found. Aborting restream session.")
-                        _twitch_session_active_local = False
-                        if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local and yt_service_instance:
-                            asyncio.run_coroutine_threadsafe(transition_youtube_broadcast(yt_service_instance, config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, "complete"), bot_instance.loop)
-                        _youtube_api_session_active_local = False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING = None
-                        continue
+                elif not is_twitch_live_now and _twitch_session_active_local:
+                    logger.info(f"UTA Restreamer: Twitch channel {config_manager.UTA_TWITCH_CHANNEL_NAME} is now OFFLINE. Ending restream session.")
+                    if config_manager.uta_is_restreaming_active or _retiring_pipe: await cleanup_restream_processes()
+                    _discard_next_part()
 
-                    part_num_log = config_manager.uta_current_restream_part_number if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local else 'N/A (Legacy)'
-                    logger.info(f"UTA Restreamer: Starting FFmpeg/Streamlink pipe for {config_manager.UTA_TWITCH_CHANNEL_NAME} (Part {part_num_log}). Attempt {config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES + 1}.")
+                    current_vod_part_end_time_utc = now_utc # End time for this VOD part
+                
+                    # Store title/game of the part that just ended for description generation
+                    config_manager.last_known_title_for_ended_part = _twitch_session_stream_data.get("title","N/A") if _twitch_session_stream_data else "N/A"
+                    config_manager.last_known_game_for_ended_part = _twitch_session_stream_data.get("game_name","N/A") if _twitch_session_stream_data else "N/A"
+
+                    if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local and yt_service_instance:
+                        # Chapters, broadcast completion and privacy run beside the restreamer, so the next stream isn't held up.
+                        final_part = {
+                            "part_num": config_manager.uta_current_restream_part_number, # current part number is the final one
+                            "broadcast_id": config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING,
+                            "video_id": config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING,
+                            "part_start_utc": config_manager.UTA_PIPE_START_TIME_UTC,
+                            "title": config_manager.last_known_title_for_ended_part,
+                            "game": config_manager.last_known_game_for_ended_part,
+                        }
+                        service_supervisor.spawn(_finalize_youtube_part(yt_service_instance, final_part, current_vod_part_end_time_utc, "Final Part"),
+                                                 name="UTA-YouTubeFinalizePart")
+
+                    config_manager.UTA_PIPE_START_TIME_UTC = None # Clear pipe start time after VOD part processing
+
+                    config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None; config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING=None;
+                    config_manager.uta_current_youtube_live_stream_id=None; config_manager.uta_current_youtube_rtmp_url=None; config_manager.uta_current_youtube_stream_key=None
+                    config_manager.uta_youtube_next_rollover_time_utc=None
+                    _youtube_api_session_active_local = False
+                    config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
 
-                    pipe_success = _start_restream_pipe(config_manager.UTA_TWITCH_CHANNEL_NAME, rtmp_url_to_use, stream_key_to_use, bot_instance.loop)
 
-                    logger.info(f"UTA Restreamer: FFmpeg/Streamlink pipe for Part {part_num_log} has ended.")
-                    if pipe_success:
-                        config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
-                        config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
-                    else:
-                        config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES += 1
-                        logger.error(f"UTA Restreamer: Pipe attempt failed. Consecutive failures: {config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}.")
-                        config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures={config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES}")
-                        config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=FailedRetry")
-
-                    if not manual_ffmpeg_restart_triggered_this_cycle and config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES < config_manager.UTA_RESTREAM_MAX_CONSECUTIVE_FAILURES:
-                            config_manager.logger.info(f"UTA_GUI_LOG: CooldownStatus=ShortRetryCooldown_{config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS}s")
-                            if shutdown_event.wait(timeout=config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS): break
-                            config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+                    overall_session_duration_sec = (now_utc - _twitch_session_start_time_utc).total_seconds() if _twitch_session_start_time_utc else 0
+                    if overall_session_duration_sec > 15 and _twitch_session_start_time_utc:
+                        await log_stream_duration_binary(int(_twitch_session_start_time_utc.timestamp()), int(now_utc.timestamp()))
 
-                elif config_manager.uta_is_restreaming_active:
-                    if not manual_ffmpeg_restart_triggered_this_cycle:
-                        logger.info(f"UTA Restreamer: {config_manager.UTA_TWITCH_CHANNEL_NAME} is live. Restream pipe is active. Check interval: {config_manager.UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE}s.")
-                        config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Active_Monitoring")
-                        if shutdown_event.wait(timeout=config_manager.UTA_RESTREAM_CHECK_INTERVAL_WHEN_LIVE): break
-                else:
-                    logger.warning(f"UTA Restreamer: {config_manager.UTA_TWITCH_CHANNEL_NAME} is live, but not currently restreaming (conditions not met for pipe start). Check interval: {config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER}s.")
-                    config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_WaitingCanStart")
-                    if shutdown_event.wait(timeout=config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER): break
+                    await asyncio.to_thread(_send_discord_restream_status, "stop", config_manager.UTA_TWITCH_CHANNEL_NAME, stream_duration_seconds=overall_session_duration_sec)
 
-            elif not is_twitch_live_now and _twitch_session_active_local:
-                logger.info(f"UTA Restreamer: Twitch channel {config_manager.UTA_TWITCH_CHANNEL_NAME} is now OFFLINE. Ending restream session.")
-                if config_manager.uta_is_restreaming_active: cleanup_restream_processes()
+                    _twitch_session_active_local = False
+                    _twitch_session_start_time_utc = None
+                    _twitch_session_stream_data = None
+                    config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                    config_manager.last_known_title_for_ended_part = None # Reset
+                    config_manager.last_known_game_for_ended_part = None  # Reset
 
-                current_vod_part_end_time_utc = now_utc # End time for this VOD part
-                
-                # Store title/game of the part that just ended for description generation
-                config_manager.last_known_title_for_ended_part = _twitch_session_stream_data.get("title","N/A") if _twitch_session_stream_data else "N/A"
-                config_manager.last_known_game_for_ended_part = _twitch_session_stream_data.get("game_name","N/A") if _twitch_session_stream_data else "N/A"
-
-                if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local and yt_service_instance:
-                    # --- START Auto Chapter Generation for final part ---
-                    if config_manager.UTA_YOUTUBE_AUTO_CHAPTERS_ENABLED and \
-                       config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING and \
-                       config_manager.UTA_PIPE_START_TIME_UTC:
-
-                        vod_part_start_unix_chapters = int(config_manager.UTA_PIPE_START_TIME_UTC.timestamp())
-                        vod_part_end_unix_chapters = int(current_vod_part_end_time_utc.timestamp())
-
-                        logger.info(f"Chapter Gen (Final Part): VOD Part Time Window: {datetime.fromtimestamp(vod_part_start_unix_chapters, tz=timezone.utc)} to {datetime.fromtimestamp(vod_part_end_unix_chapters, tz=timezone.utc)}")
-
-                        # CORRECTED CALL: No await asyncio.to_thread
-                        game_segments_for_chapters = parse_stream_activity_for_game_segments(
-                            config_manager.UTA_STREAM_ACTIVITY_LOG_FILE,
-                            vod_part_start_unix_chapters,
-                            vod_part_end_unix_chapters
-                        )
-                        if game_segments_for_chapters:
-                            chapter_str = generate_chapter_text(game_segments_for_chapters, vod_part_start_unix_chapters)
-                            if chapter_str:
-                                future_video_details = asyncio.run_coroutine_threadsafe(
-                                    get_youtube_video_details(
-                                        yt_service_instance,
-                                        config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING
-                                    ),
-                                    bot_instance.loop
-                                )
-                                try:
-                                    video_details_resp = future_video_details.result(timeout=20)
-                                    if video_details_resp:
-                                        existing_desc = video_details_resp['snippet']['description'] if 'snippet' in video_details_resp and 'description' in video_details_resp['snippet'] else ""
-                                        chapter_marker = config_manager.UTA_YOUTUBE_DESCRIPTION_CHAPTER_MARKER
-
-                                        if chapter_marker in existing_desc:
-                                            base_description_content = existing_desc.split(chapter_marker, 1)[0].rstrip()
-                                        else:
-                                            base_description_content = existing_desc.rstrip()
-                                        
-                                        enhanced_desc_for_final_part = _generate_enhanced_youtube_description(
-                                            twitch_username=config_manager.UTA_TWITCH_CHANNEL_NAME,
-                                            twitch_title=config_manager.last_known_title_for_ended_part,
-                                            current_game_name=config_manager.last_known_game_for_ended_part,
-                                            part_num=config_manager.uta_current_restream_part_number, # current part number is the final one
-                                            vod_part_start_utc=datetime.fromtimestamp(vod_part_start_unix_chapters, tz=timezone.utc),
-                                            vod_part_end_utc=current_vod_part_end_time_utc
-                                        )
-                                        
-                                        # Combine: Original (if any before marker) + Enhanced Dynamic Part + Chapter Marker + Chapters
-                                        final_description = f"{enhanced_desc_for_final_part}\n\n{chapter_marker}\n{chapter_str}"
-                                        
-                                        logger.info(f"Chapter Gen (Final Part): Updating YouTube video {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING} with description and chapters.")
-                                        future_update = asyncio.run_coroutine_threadsafe(
-                                            update_youtube_broadcast_metadata(
-                                                yt_service_instance,
-                                                config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING,
-                                                new_description=final_description
-                                            ),
-                                            bot_instance.loop
-                                        )
-                                        future_update.result(timeout=20)
-                                    else:
-                                        logger.warning(f"Chapter Gen (Final Part): Could not retrieve video details for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}.")
-                                except TimeoutError:
-                                    logger.error(f"Chapter Gen (Final Part): Timeout getting video details or updating metadata for {config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING}.")
-                                except Exception as e_chap_api:
-                                    logger.error(f"Chapter Gen (Final Part): Error during YouTube API call for chapters: {e_chap_api}", exc_info=True)
-                            else: logger.info("Chapter Gen (Final Part): No valid chapter string generated.")
-                        else: logger.info("Chapter Gen (Final Part): No game segments for this part.")
-                    # --- END Auto Chapter Generation ---
-
-                    logger.info(f"UTA YouTube: Finalizing YouTube broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING}.")
-                    asyncio.run_coroutine_threadsafe(transition_youtube_broadcast(yt_service_instance, config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, "complete"), bot_instance.loop).result(timeout=30)
-                    if config_manager.UTA_YOUTUBE_MAKE_PUBLIC_AFTER_STREAM and config_manager.UTA_YOUTUBE_DEFAULT_PRIVACY!="public":
-                        asyncio.run_coroutine_threadsafe(set_youtube_video_privacy(yt_service_instance, config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING, "public"), bot_instance.loop)
-
-                config_manager.UTA_PIPE_START_TIME_UTC = None # Clear pipe start time after VOD part processing
-
-                config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None; config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING=None;
-                config_manager.uta_current_youtube_live_stream_id=None; config_manager.uta_current_youtube_rtmp_url=None; config_manager.uta_current_youtube_stream_key=None
-                config_manager.uta_youtube_next_rollover_time_utc=None
-                _youtube_api_session_active_local = False
-                config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
+                    config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
+                    config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+                    config_manager.logger.info("UTA_GUI_LOG: PlayabilityCheckStatus=N/A")
+                    config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_SessionEnded")
+
+                    logger.info(f"UTA Restreamer: Post-session cooldown for {config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS}s.")
+                    await service_supervisor.sleep(config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS)
+
+                elif not is_twitch_live_now and not _twitch_session_active_local:
+                    config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                    config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = None
+                    _youtube_api_session_active_local = False
+                    config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
+                    config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
+                    config_manager.logger.info("UTA_GUI_LOG: PlayabilityCheckStatus=N/A")
+                    config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_Offline")
+                    config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
 
+                    offline_wait_seconds = await get_adaptive_wait_seconds_async(config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER)
+                    logger.debug(f"UTA Restreamer: {config_manager.UTA_TWITCH_CHANNEL_NAME} is offline. Waiting up to {offline_wait_seconds}s for the next stream state snapshot...")
+                    if await _wait_for_stream_state(seen_snapshot_version, offline_wait_seconds): break
 
-                overall_session_duration_sec = (now_utc - _twitch_session_start_time_utc).total_seconds() if _twitch_session_start_time_utc else 0
-                if overall_session_duration_sec > 15 and _twitch_session_start_time_utc and bot_instance.loop:
-                    asyncio.run_coroutine_threadsafe(log_stream_duration_binary(int(_twitch_session_start_time_utc.timestamp()), int(now_utc.timestamp())), bot_instance.loop)
+                if shutdown_event.is_set(): break
 
-                _send_discord_restream_status("stop", config_manager.UTA_TWITCH_CHANNEL_NAME, stream_duration_seconds=overall_session_duration_sec)
+            except Exception as e:
+                logger.error(f"UTA Restreamer Service: Unexpected error in monitor loop: {e}", exc_info=True)
+                await cleanup_restream_processes()
+                _discard_next_part()
 
-                _twitch_session_active_local = False
-                _twitch_session_start_time_utc = None
-                _twitch_session_stream_data = None
-                config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
+                if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local and config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING and yt_service_instance:
+                    logger.error(f"UTA YouTube: Attempting to finalize YouTube broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING} due to an error in restreamer loop.")
+                    try:
+                        await asyncio.wait_for(transition_youtube_broadcast(yt_service_instance, config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, "complete"), timeout=30)
+                    except Exception as yt_err_cleanup:
+                        logger.error(f"UTA YouTube: Failed to finalize broadcast during error handling: {yt_err_cleanup}")
+
+                _twitch_session_active_local = False; _twitch_session_start_time_utc = None; _twitch_session_stream_data = None
+                _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None; config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING=None
+                config_manager.uta_current_youtube_live_stream_id=None; config_manager.uta_current_youtube_rtmp_url=None; config_manager.uta_current_youtube_stream_key=None; config_manager.uta_youtube_next_rollover_time_utc=None
+                config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES=0
                 config_manager.last_known_title_for_ended_part = None # Reset
                 config_manager.last_known_game_for_ended_part = None  # Reset
+                config_manager.UTA_PIPE_START_TIME_UTC = None
 
-                config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
-                config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
-                config_manager.logger.info("UTA_GUI_LOG: PlayabilityCheckStatus=N/A")
-                config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_SessionEnded")
-
-                logger.info(f"UTA Restreamer: Post-session cooldown for {config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS}s.")
-                if shutdown_event.wait(timeout=config_manager.UTA_POST_RESTREAM_COOLDOWN_SECONDS): break
 
-            elif not is_twitch_live_now and not _twitch_session_active_local:
-                config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES = 0
-                config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING = None
-                _youtube_api_session_active_local = False
                 config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
                 config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
                 config_manager.logger.info("UTA_GUI_LOG: PlayabilityCheckStatus=N/A")
-                config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Inactive_Offline")
+                config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=ErrorState")
                 config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
 
-                logger.debug(f"UTA Restreamer: {config_manager.UTA_TWITCH_CHANNEL_NAME} is offline. Waiting {config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER}s for next check...")
-                if shutdown_event.wait(timeout=config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER): break
-
-            if shutdown_event.is_set(): break
+                await asyncio.to_thread(_send_discord_restream_status, "stop", config_manager.UTA_TWITCH_CHANNEL_NAME, stream_duration_seconds=0)
 
-        except Exception as e:
-            logger.error(f"UTA Restreamer Service: Unexpected error in monitor loop: {e}", exc_info=True)
-            cleanup_restream_processes()
-
-            if config_manager.effective_youtube_api_enabled() and _youtube_api_session_active_local and config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING and yt_service_instance:
-                logger.error(f"UTA YouTube: Attempting to finalize YouTube broadcast {config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING} due to an error in restreamer loop.")
-                try:
-                    asyncio.run_coroutine_threadsafe(transition_youtube_broadcast(yt_service_instance, config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING, "complete"), bot_instance.loop).result(timeout=30)
-                except Exception as yt_err_cleanup:
-                    logger.error(f"UTA YouTube: Failed to finalize broadcast during error handling: {yt_err_cleanup}")
-
-            _twitch_session_active_local = False; _twitch_session_start_time_utc = None; _twitch_session_stream_data = None
-            _youtube_api_session_active_local=False; config_manager.UTA_CURRENT_YT_BROADCAST_ID_FOR_LOGGING=None; config_manager.UTA_CURRENT_YT_VIDEO_ID_FOR_LOGGING=None
-            config_manager.uta_current_youtube_live_stream_id=None; config_manager.uta_current_youtube_rtmp_url=None; config_manager.uta_current_youtube_stream_key=None; config_manager.uta_youtube_next_rollover_time_utc=None
-            config_manager.UTA_RESTREAM_CONSECUTIVE_FAILURES=0
-            config_manager.last_known_title_for_ended_part = None # Reset
-            config_manager.last_known_game_for_ended_part = None  # Reset
-            config_manager.UTA_PIPE_START_TIME_UTC = None
-
-
-            config_manager.logger.info(f"UTA_GUI_LOG: ConsecutiveFailures=0")
-            config_manager.logger.info("UTA_GUI_LOG: CooldownStatus=Inactive")
-            config_manager.logger.info("UTA_GUI_LOG: PlayabilityCheckStatus=N/A")
-            config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=ErrorState")
-            config_manager.logger.info(f"UTA_GUI_LOG: YouTubeVideoID=N/A")
-
-            _send_discord_restream_status("stop", config_manager.UTA_TWITCH_CHANNEL_NAME, stream_duration_seconds=0)
-
-            if shutdown_event.wait(timeout=60): break
-
-    config_manager.twitch_session_active_global = False
-    config_manager.youtube_api_session_active_global = False
-    if bot_instance.loop and not bot_instance.loop.is_closed():
+                await service_supervisor.sleep(60)
+    finally:
+        config_manager.twitch_session_active_global = False
+        config_manager.youtube_api_session_active_global = False
         config_manager.logger.info("UTA_GUI_LOG: RestreamPipeStatus=Stopped")
 
-    logger.info(f"UTA Restreamer Service thread ({threading.current_thread().name}) has finished.")
\ No newline at end of file
+        logger.info(f"UTA Restreamer Service task ({asyncio.current_task().get_name()}) has finished.")
\ No newline at end of file
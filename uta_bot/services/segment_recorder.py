@@ -0,0 +1,186 @@
+"""Local segmented recorder for the restream pipe.
+
+One more pipe output: FFmpeg's segment muxer cuts the ingest into fixed-length MPEG-TS or fragmented MP4 files, so the
+footage survives a YouTube part being rejected or a failed playability check. Every finished segment is appended to the
+channel's segment_index.bin (wall-clock start, duration, size), which is what cut_local_vod() and the alignment with
+stream_activity.bin read. Retention deletes the oldest segment files by total size and/or age."""
+import logging
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+
+from uta_bot import config_manager
+from .restream_pipe import PipeOutput, _hidden_window_kwargs
+from uta_bot.utils.constants import SEGMENT_FORMAT_MPEGTS, SEGMENT_FORMAT_FMP4, EVENT_TYPE_STREAM_START, EVENT_TYPE_STREAM_END
+from uta_bot.utils.segment_index import (
+    segment_filename, append_segment_record, read_segment_index, select_segments_for_window,
+    enforce_segment_retention, SEGMENT_FILE_EXTENSIONS
+)
+from uta_bot.utils.data_logging import read_stream_activity_event_times
+from uta_bot.utils.formatters import format_duration_human
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FORMATS = {"mpegts": SEGMENT_FORMAT_MPEGTS, "fmp4": SEGMENT_FORMAT_FMP4}
+SEGMENT_GAP_TOLERANCE_SECONDS = 2 # Segment boundaries come from file mtimes, so adjacent segments can be this far apart
+
+
+def get_recorder_channel_dir(channel: str) -> str:
+    return os.path.join(config_manager.UTA_RECORDER_DIR, channel.lower())
+
+
+class SegmentRecorder(PipeOutput):
+    """The pipe's segment output. Segment N is indexed once FFmpeg has opened N+1 (or the pipe stopped); its start is
+    the previous segment's last write, so no per-segment bookkeeping from FFmpeg is needed."""
+
+    def __init__(self, channel: str, segment_seconds: int, segment_format_name: str):
+        self.channel = channel.lower()
+        self.channel_dir = get_recorder_channel_dir(channel)
+        self.pipe_id = int(time.time() * 1000) # Unique per pipe, also across a quick restart
+        self.segment_format = SEGMENT_FORMATS.get(segment_format_name, SEGMENT_FORMAT_MPEGTS)
+        self.segment_seconds = segment_seconds
+        super().__init__("Recorder", os.path.join(self.channel_dir, segment_filename(self.channel, self.pipe_id, None, self.segment_format)),
+                         kind="segments")
+        self._next_seq = 0 # First segment not indexed yet
+        self._first_seen_at = None
+        self._previous_end = None
+        self._indexed_bytes = 0
+
+    @property
+    def display_target(self) -> str:
+        return f"{self.channel_dir} ({self.segment_seconds}s {'fMP4' if self.segment_format == SEGMENT_FORMAT_FMP4 else 'MPEG-TS'} segments)"
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.channel_dir, segment_filename(self.channel, self.pipe_id, seq, self.segment_format))
+
+    def tee_options(self) -> str:
+        options = f"f=segment:segment_time={self.segment_seconds}:reset_timestamps=1"
+        if self.segment_format == SEGMENT_FORMAT_FMP4:
+            # Self-contained fragments, so a segment is playable even if FFmpeg dies while writing it.
+            return options + ":segment_format=mp4:segment_format_options=movflags=+frag_keyframe+empty_moov+default_base_moof"
+        return options + ":segment_format=mpegts"
+
+    def bytes_written(self):
+        try:
+            open_segment_bytes = os.path.getsize(self._segment_path(self._next_seq))
+        except OSError:
+            open_segment_bytes = 0
+        return self._indexed_bytes + open_segment_bytes
+
+    async def poll(self):
+        if self._first_seen_at is None and os.path.exists(self._segment_path(0)):
+            self._first_seen_at = time.time()
+        while os.path.exists(self._segment_path(self._next_seq + 1)):
+            await self._index_segment(self._next_seq)
+
+    async def reopen(self):
+        # A new FFmpeg starts the segment pattern over at 000000, which would overwrite indexed segments: it gets a new pipe_id.
+        await self.close() # Indexes what the replaced FFmpeg wrote, its last segment included
+        await super().reopen()
+        self.pipe_id = max(int(time.time() * 1000), self.pipe_id + 1)
+        self.url = os.path.join(self.channel_dir, segment_filename(self.channel, self.pipe_id, None, self.segment_format))
+        self._next_seq, self._first_seen_at, self._previous_end = 0, None, None # There's a gap before the first new segment
+
+    async def close(self):
+        # Also catches up on segments written while nobody polled (a retiring pipe during an overlapped rollover).
+        await self.poll()
+        if os.path.exists(self._segment_path(self._next_seq)):
+            await self._index_segment(self._next_seq)
+
+    async def _index_segment(self, seq: int):
+        path = self._segment_path(seq)
+        self._next_seq = seq + 1
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return # Already gone (retention, or removed by hand)
+        end_ts = stat_result.st_mtime
+        if self._previous_end is not None:
+            start_ts = self._previous_end
+        elif self._first_seen_at is not None:
+            start_ts = min(self._first_seen_at, end_ts)
+        else:
+            start_ts = max(0, end_ts - self.segment_seconds) # Never polled while open; assume the nominal length
+        self._previous_end = end_ts
+        self._indexed_bytes += stat_result.st_size
+
+        start_ts_unix = int(start_ts)
+        await asyncio.to_thread(append_segment_record, self.channel_dir, start_ts_unix, int((end_ts - start_ts_unix) * 1000),
+                                stat_result.st_size, self.pipe_id, seq, self.segment_format)
+
+        max_bytes = int(config_manager.UTA_RECORDER_RETENTION_MAX_GB * 1024 ** 3)
+        max_age_seconds = config_manager.UTA_RECORDER_RETENTION_MAX_HOURS * 3600
+        # The mtime window also covers a retiring or newer pipe's open segment, which sorts among the oldest by pipe_id.
+        freed_files, freed_bytes = await asyncio.to_thread(enforce_segment_retention, self.channel_dir, max_bytes, max_age_seconds,
+                                                           {self._segment_path(self._next_seq)}, self.segment_seconds)
+        if freed_files:
+            logger.info(f"UTA Recorder: Retention deleted {freed_files} old segment(s) ({freed_bytes / 1024 ** 2:.0f} MB) in {self.channel_dir}.")
+
+
+def find_stream_session_window(sessions_back: int = 0):
+    """(start_unix, end_unix) of a stream session from UTA_STREAM_ACTIVITY_LOG_FILE, 0 = the latest. A session that
+    is still live ends now. None if there aren't that many sessions."""
+    events = read_stream_activity_event_times(config_manager.UTA_STREAM_ACTIVITY_LOG_FILE)
+    sessions = []
+    for event_type, unix_ts in events:
+        if event_type == EVENT_TYPE_STREAM_START:
+            sessions.append([unix_ts, None])
+        elif event_type == EVENT_TYPE_STREAM_END and sessions and sessions[-1][1] is None:
+            sessions[-1][1] = unix_ts
+    if sessions_back >= len(sessions):
+        return None
+    start_ts, end_ts = sessions[-1 - sessions_back]
+    return start_ts, end_ts if end_ts is not None else int(time.time())
+
+async def cut_local_vod(channel: str, start_unix: int, end_unix: int) -> tuple:
+    """Joins the recorded segments covering [start_unix, end_unix] into one file with stream copy (the concat demuxer
+    trims the first/last segment). Returns (output_path or None, message)."""
+    channel_dir = get_recorder_channel_dir(channel)
+    records = await asyncio.to_thread(read_segment_index, channel_dir, start_unix, end_unix)
+    segments = select_segments_for_window(records, start_unix, end_unix)
+    if not segments:
+        return None, f"No recorded segments for {channel} cover that window (index: {len(records)} record(s), possibly expired by retention)."
+
+    vod_dir = os.path.join(config_manager.UTA_RECORDER_DIR, "vods")
+    os.makedirs(vod_dir, exist_ok=True)
+    extension = SEGMENT_FILE_EXTENSIONS[segments[0]["format"]]
+    output_path = os.path.join(vod_dir, f"{channel.lower()}_{start_unix}_{end_unix}.{extension}")
+    list_path = output_path + ".concat.txt"
+
+    concat_lines = []
+    for position, segment in enumerate(segments):
+        escaped_path = os.path.abspath(segment["path"]).replace("'", "'\\''")
+        concat_lines.append(f"file '{escaped_path}'")
+        # reset_timestamps=1 starts every segment at 0, so the trim points are offsets into the segment.
+        if position == 0 and start_unix > segment["start"]:
+            concat_lines.append(f"inpoint {start_unix - segment['start']:.3f}")
+        if position == len(segments) - 1 and end_unix < segment["end"]:
+            concat_lines.append(f"outpoint {end_unix - segment['start']:.3f}")
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(concat_lines) + "\n")
+
+    ffmpeg_command = [config_manager.UTA_FFMPEG_PATH, "-hide_banner", "-loglevel", "error", "-y",
+                      "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path]
+    try:
+        process = await asyncio.create_subprocess_exec(*ffmpeg_command, stdout=asyncio.subprocess.DEVNULL,
+                                                       stderr=asyncio.subprocess.PIPE, **_hidden_window_kwargs())
+        _, stderr_bytes = await process.communicate()
+    except FileNotFoundError:
+        return None, f"FFmpeg not found at `{config_manager.UTA_FFMPEG_PATH}`."
+    finally:
+        try:
+            os.remove(list_path)
+        except OSError:
+            pass
+    if process.returncode != 0:
+        error_tail = stderr_bytes.decode('utf-8', errors='ignore').strip()[-300:]
+        return None, f"FFmpeg failed to join the segments (code {process.returncode}): {error_tail}"
+
+    gaps = [(a["end"], b["start"]) for a, b in zip(segments, segments[1:]) if b["start"] - a["end"] > SEGMENT_GAP_TOLERANCE_SECONDS]
+    covered_seconds = min(end_unix, segments[-1]["end"]) - max(start_unix, segments[0]["start"])
+    message = f"Joined {len(segments)} segment(s) covering {format_duration_human(int(covered_seconds))} into `{output_path}`."
+    if gaps:
+        first_gap = datetime.fromtimestamp(gaps[0][0], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+        message += f" ⚠️ {len(gaps)} gap(s) in the recording (first at {first_gap})."
+    return output_path, message
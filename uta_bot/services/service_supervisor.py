@@ -0,0 +1,322 @@
+import logging
+import time
+import asyncio
+import requests
+from datetime import datetime, timezone
+
+from uta_bot import config_manager
+from uta_bot.utils.circuit_breaker import LatencyHistogram, post_discord_webhook
+
+logger = logging.getLogger(__name__)
+
+
+RESTART_BACKOFF_MIN_SECONDS = 5
+RESTART_BACKOFF_MAX_SECONDS = 300
+HEALTHY_RUN_SECONDS = 300 # A service that ran this long before crashing gets its restart backoff reset
+SIDE_TASK_GRACE_SECONDS = 5 # Pending notifications/log writes get this long to finish on stop before being cancelled
+WATCHDOG_CHECK_INTERVAL_SECONDS = 10
+
+
+class SupervisedService:
+    def __init__(self, name: str, coro_factory, args: tuple):
+        self.name = name
+        self.coro_factory = coro_factory
+        self.args = args
+        self.task: asyncio.Task = None
+        self.state = "pending" # pending, running, backoff, finished, cancelled
+        self.started_at = None
+        self.restart_count = 0
+        self.stall_count = 0
+        self.last_error = None
+        self.inner_task: asyncio.Task = None # The service coroutine itself; the watchdog cancels only this on a stall
+        self.stalled = False
+        self.iteration_histogram = LatencyHistogram() # Busy time per loop iteration, idle waits excluded
+        self.last_heartbeat_at = None # time.time(), for display
+        self.last_alert_at = None
+        self.reset_run_markers()
+
+    def reset_run_markers(self):
+        self.stalled = False
+        self.iteration_started = None # monotonic time of the last heartbeat
+        self.iteration_idle_seconds = 0.0
+        self.idle_since = None # Set while the service is inside service_supervisor.idle()
+        self.idle_expected_seconds = None
+        self.last_activity = time.monotonic()
+
+
+class ServiceSupervisor:
+    """Runs the UTA services as asyncio tasks on the bot loop, restarts any that crash or stop heartbeating and cancels them all together on stop."""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop = None
+        self._services = {} # name -> SupervisedService
+        self._side_tasks = set() # Fire-and-forget work spawned by services (webhooks, privacy changes, ...)
+        self._watchdog_task: asyncio.Task = None
+        self._last_gui_summary = None
+        self._interval_wake_event = asyncio.Event() # Set by wake_interval_sleeps() after a live config change
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def start(self, name: str, coro_factory, *args):
+        existing = self._services.get(name)
+        if existing and existing.task and not existing.task.done():
+            logger.warning(f"UTA Supervisor: Service {name} is already running. Not starting it twice.")
+            return
+        loop = self._loop or asyncio.get_running_loop()
+        service = SupervisedService(name, coro_factory, args)
+        service.task = loop.create_task(self._run_service(service), name=f"UTA-{name}-Supervisor")
+        self._services[name] = service
+        if not self._watchdog_task or self._watchdog_task.done():
+            self._watchdog_task = loop.create_task(self._watchdog_loop(), name="UTA-ServiceWatchdog")
+        logger.info(f"UTA Supervisor: Started service task {name}.")
+
+    async def _run_service(self, service: SupervisedService):
+        backoff_seconds = RESTART_BACKOFF_MIN_SECONDS
+        while True:
+            service.state = "running"
+            service.started_at = time.time()
+            service.reset_run_markers()
+            service.inner_task = asyncio.get_running_loop().create_task(service.coro_factory(*service.args), name=f"UTA-{service.name}")
+            try:
+                # asyncio.wait doesn't raise when the inner task is cancelled, so a watchdog cancel and a stop() cancel can be told apart.
+                await asyncio.wait({service.inner_task})
+            except asyncio.CancelledError:
+                service.state = "cancelled"
+                service.inner_task.cancel()
+                await asyncio.wait({service.inner_task})
+                raise
+
+            if service.inner_task.cancelled() and not service.stalled:
+                service.state = "cancelled"
+                logger.info(f"UTA Supervisor: Service {service.name} was cancelled.")
+                return
+            crash_error = None if service.inner_task.cancelled() else service.inner_task.exception()
+            if not service.stalled and crash_error is None:
+                service.state = "finished"
+                logger.info(f"UTA Supervisor: Service {service.name} finished.")
+                return
+
+            if time.time() - service.started_at >= HEALTHY_RUN_SECONDS:
+                backoff_seconds = RESTART_BACKOFF_MIN_SECONDS
+            service.restart_count += 1
+            if crash_error is not None:
+                service.last_error = f"{type(crash_error).__name__}: {crash_error}"
+            service.state = "backoff"
+            logger.error(f"UTA Supervisor: Service {service.name} {'stalled' if service.stalled else 'crashed'} ({service.last_error}). Restarting in {backoff_seconds}s (restart #{service.restart_count}).",
+                         exc_info=crash_error)
+            self._send_watchdog_alert(service, f"Service **{service.name}** {'stalled' if service.stalled else 'crashed'}: {service.last_error}\nRestarting in {backoff_seconds}s (restart #{service.restart_count}).")
+            await asyncio.sleep(backoff_seconds)
+            backoff_seconds = min(backoff_seconds * 2, RESTART_BACKOFF_MAX_SECONDS)
+
+    def _current_service(self) -> SupervisedService:
+        current_task = asyncio.current_task()
+        for service in self._services.values():
+            if service.inner_task is current_task:
+                return service
+        return None
+
+    def heartbeat(self):
+        """Called by a service at the top of every loop iteration. Closes the previous iteration's timing and resets the stall clock."""
+        service = self._current_service()
+        if not service:
+            return
+        now = time.monotonic()
+        if service.iteration_started is not None:
+            busy_seconds = max(0.0, now - service.iteration_started - service.iteration_idle_seconds)
+            service.iteration_histogram.record(busy_seconds * 1000)
+        service.iteration_started = now
+        service.iteration_idle_seconds = 0.0
+        service.last_activity = now
+        service.last_heartbeat_at = time.time()
+
+    async def idle(self, awaitable, expected_seconds: float = None):
+        """Awaits something the service is *supposed* to wait on. The stall clock allows expected_seconds on top of the
+        usual budget; expected_seconds=None means unbounded (e.g. the restreamer watching a running pipe)."""
+        service = self._current_service()
+        if not service or service.idle_since is not None:
+            return await awaitable
+        service.idle_since = time.monotonic()
+        service.idle_expected_seconds = expected_seconds
+        try:
+            return await awaitable
+        finally:
+            now = time.monotonic()
+            service.iteration_idle_seconds += now - service.idle_since
+            service.idle_since = None
+            service.last_activity = now
+
+    async def sleep(self, seconds: float, interval: bool = False):
+        """interval=True marks a plain poll-interval wait, which wake_interval_sleeps() cuts short so a reloaded
+        interval applies now instead of after the old one runs out. Cooldowns and error backoffs should leave it False."""
+        if not interval:
+            await self.idle(asyncio.sleep(seconds), seconds)
+            return
+        try:
+            await self.idle(asyncio.wait_for(self._interval_wake_event.wait(), seconds), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def wake_interval_sleeps(self):
+        # Swap the event first so services that go straight back to sleep wait on a fresh one.
+        wake_event, self._interval_wake_event = self._interval_wake_event, asyncio.Event()
+        wake_event.set()
+
+    def _stalled_for_seconds(self, service: SupervisedService, now: float) -> float:
+        # Seconds past the service's allowance, or None if it is keeping up.
+        if service.state != "running" or not service.inner_task or service.inner_task.done():
+            return None
+        if service.idle_since is not None:
+            if service.idle_expected_seconds is None:
+                return None
+            silent_seconds = now - service.idle_since - service.idle_expected_seconds
+        else:
+            silent_seconds = now - service.last_activity
+        return silent_seconds if silent_seconds > config_manager.UTA_WATCHDOG_STALL_SECONDS else None
+
+    async def _watchdog_loop(self):
+        while True:
+            await asyncio.sleep(WATCHDOG_CHECK_INTERVAL_SECONDS)
+            try:
+                if config_manager.UTA_WATCHDOG_ENABLED and config_manager.UTA_WATCHDOG_STALL_SECONDS > 0:
+                    now = time.monotonic()
+                    for service in list(self._services.values()):
+                        stalled_seconds = self._stalled_for_seconds(service, now)
+                        if stalled_seconds is None:
+                            continue
+                        service.stalled = True
+                        service.stall_count += 1
+                        service.last_error = f"Unresponsive for {int(stalled_seconds)}s"
+                        logger.error(f"UTA Watchdog: Service {service.name} looks stalled ({service.last_error}). Cancelling it for a restart.")
+                        service.inner_task.cancel()
+                self.report_states_to_gui()
+            except Exception as e:
+                logger.error(f"UTA Watchdog: Error during service check: {e}", exc_info=True)
+
+    def _send_watchdog_alert(self, service: SupervisedService, description: str):
+        webhook_url = config_manager.UTA_DISCORD_WEBHOOK_URL_RESTREAMER
+        if not webhook_url or "YOUR_DISCORD_WEBHOOK_URL" in webhook_url:
+            return
+        now = time.monotonic()
+        if service.last_alert_at is not None and now - service.last_alert_at < config_manager.UTA_WATCHDOG_ALERT_COOLDOWN_SECONDS:
+            return
+        service.last_alert_at = now
+        payload = {
+            "content": f":warning: UTA service watchdog: **{service.name}**",
+            "embeds": [{
+                "title": ":warning: UTA Service Restart",
+                "description": description,
+                "color": 15105570,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "footer": {"text": "UTA Bot - Service Watchdog"}
+            }]
+        }
+        self.spawn(asyncio.to_thread(_post_watchdog_alert, webhook_url, payload), name=f"UTA-WatchdogAlert-{service.name}")
+
+    def report_states_to_gui(self):
+        services = list(self._services.values())
+        if not services:
+            summary = "N/A"
+        else:
+            running = sum(1 for s in services if s.state == "running")
+            summary = f"{running}/{len(services)} running"
+            total_restarts = sum(s.restart_count for s in services)
+            if total_restarts:
+                summary += f", {total_restarts} restart(s)"
+            troubled = [f"{s.name}: {s.state}" for s in services if s.state not in ("running", "finished")]
+            if troubled:
+                summary += " | " + ", ".join(troubled)
+        if summary != self._last_gui_summary:
+            self._last_gui_summary = summary
+            config_manager.logger.info(f"UTA_GUI_LOG: ServiceWatchdog={summary}")
+
+    def spawn(self, coro, name: str = None) -> asyncio.Task:
+        # Called from service tasks, so the running loop is the bot loop.
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        self._side_tasks.add(task)
+        task.add_done_callback(self._on_side_task_done)
+        return task
+
+    def _on_side_task_done(self, task: asyncio.Task):
+        self._side_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"UTA Supervisor: Background task {task.get_name()} failed: {task.exception()}", exc_info=task.exception())
+
+    def is_running(self, name: str) -> bool:
+        service = self._services.get(name)
+        return bool(service and service.task and not service.task.done())
+
+    def has_active_tasks(self) -> bool:
+        return any(s.task and not s.task.done() for s in self._services.values()) or any(not t.done() for t in self._side_tasks)
+
+    def get_service_states(self) -> list:
+        now = time.monotonic()
+        return [{"name": s.name, "state": s.state, "started_at": s.started_at,
+                 "restart_count": s.restart_count, "stall_count": s.stall_count, "last_error": s.last_error,
+                 "idle": s.idle_since is not None,
+                 "heartbeat_age_seconds": time.time() - s.last_heartbeat_at if s.last_heartbeat_at else None,
+                 "silent_seconds": now - s.last_activity if s.idle_since is None else None,
+                 "iterations": s.iteration_histogram.count,
+                 "p50_ms": s.iteration_histogram.percentile(0.50), "p95_ms": s.iteration_histogram.percentile(0.95),
+                 "max_ms": s.iteration_histogram.max_ms}
+                for s in self._services.values()]
+
+    async def stop_service(self, name: str, timeout: float) -> bool:
+        """Cancels one service and forgets it, e.g. when a coordinator-mode worker loses a channel lease."""
+        service = self._services.pop(name, None)
+        if not service or not service.task or service.task.done():
+            return True
+        return await self._cancel_and_wait([service.task], timeout)
+
+    async def stop(self, timeout: float) -> bool:
+        """Cancels every service task, then gives leftover side tasks a short grace. False if anything outlived its timeout."""
+        service_tasks = [s.task for s in self._services.values() if s.task and not s.task.done()]
+        if self._watchdog_task and not self._watchdog_task.done():
+            service_tasks.append(self._watchdog_task)
+        clean = await self._cancel_and_wait(service_tasks, timeout)
+        self._watchdog_task = None
+
+        side_tasks = [t for t in self._side_tasks if not t.done()]
+        if side_tasks:
+            current_loop = asyncio.get_running_loop()
+            waitable = [t for t in side_tasks if t.get_loop() is current_loop]
+            if waitable:
+                await asyncio.wait(waitable, timeout=SIDE_TASK_GRACE_SECONDS)
+            clean = await self._cancel_and_wait([t for t in side_tasks if not t.done()], timeout) and clean
+
+        self._services.clear()
+        self._side_tasks.clear()
+        self.report_states_to_gui()
+        return clean
+
+    async def _cancel_and_wait(self, tasks: list, timeout: float) -> bool:
+        if not tasks:
+            return True
+        current_loop = asyncio.get_running_loop()
+        waitable = []
+        for task in tasks:
+            try:
+                task.cancel()
+            except RuntimeError: # Owning loop already closed
+                continue
+            if task.get_loop() is current_loop:
+                waitable.append(task)
+            else:
+                logger.warning(f"UTA Supervisor: Task {task.get_name()} belongs to a loop that is no longer running. Cancelled without waiting.")
+        if not waitable:
+            return True
+        _, pending = await asyncio.wait(waitable, timeout=timeout)
+        for task in pending:
+            logger.warning(f"UTA Supervisor: Task {task.get_name()} did not finish within {timeout}s of cancellation.")
+        return not pending
+
+
+def _post_watchdog_alert(webhook_url: str, payload: dict):
+    try:
+        response = post_discord_webhook(webhook_url, json=payload, timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"UTA Watchdog: Error sending service alert to Discord: {e}")
+
+
+service_supervisor = ServiceSupervisor()
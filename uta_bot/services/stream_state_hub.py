@@ -0,0 +1,314 @@
+import logging
+import time
+import queue
+import asyncio
+import threading # For the snapshot condition and the poll-request flag
+
+from uta_bot import config_manager
+from uta_bot.services.twitch_api_handler import uta_helix_batcher
+from uta_bot.services.poll_scheduler import adaptive_poll_scheduler
+from .threading_manager import shutdown_event
+from .service_supervisor import service_supervisor
+
+logger = logging.getLogger(__name__)
+
+
+PUSH_AUTHORITY_SECONDS = 180 # After an EventSub event, /streams can lag behind it; polls that disagree are ignored this long
+
+
+class StreamSnapshot:
+    def __init__(self, channel_name: str, stream_data: dict, fetched_at: float, version: int, source: str = "poll"):
+        self.channel_name = channel_name
+        self.stream_data = stream_data # Raw Helix /streams entry (or one built from EventSub), None while offline
+        self.is_live = bool(stream_data) and stream_data.get("type") == "live"
+        self.fetched_at = fetched_at # time.time() of the poll/event that produced this snapshot
+        self.version = version
+        self.source = source # "poll" or "eventsub"
+
+    def age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def _offer_to_queue(target_queue, item):
+    # Subscribers only care about the latest state, so a full queue drops its oldest entry.
+    try:
+        target_queue.put_nowait(item)
+    except (queue.Full, asyncio.QueueFull):
+        try:
+            target_queue.get_nowait()
+        except (queue.Empty, asyncio.QueueEmpty):
+            pass
+        try:
+            target_queue.put_nowait(item)
+        except (queue.Full, asyncio.QueueFull):
+            pass
+
+
+class StreamStateHub:
+    """Owns the /streams poll for every monitored channel and fans snapshots out to subscribers."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._snapshots = {} # lowercased channel name -> latest StreamSnapshot
+        self._version = 0
+        self._callbacks = []
+        self._queues = []
+        self._async_queues = [] # (loop, asyncio.Queue) pairs
+        self._async_waiters = [] # (loop, asyncio.Event) pairs, one per coroutine parked in an *_async wait
+        self._push_authority_until = {} # lowercased channel name -> time.time() until which push events win over polls
+        self._poll_requested = threading.Event()
+        self._last_stream_end_at = {} # lowercased channel name -> time.time() of the last live->offline edge
+        self.push_transport_healthy = False # Set by the EventSub client while its subscriptions are live
+
+    @staticmethod
+    def _key(channel_name: str) -> str:
+        channel_name = channel_name or config_manager.UTA_TWITCH_CHANNEL_NAME
+        return channel_name.lower() if channel_name else None
+
+    def get_snapshot(self, channel_name: str = None) -> StreamSnapshot:
+        # No channel means UTA_TWITCH_CHANNEL_NAME, which is what the restreamer and chat cog follow.
+        with self._condition:
+            return self._snapshots.get(self._key(channel_name))
+
+    def get_all_snapshots(self) -> dict:
+        with self._condition:
+            return dict(self._snapshots)
+
+    def get_fresh_snapshot(self, channel_name: str, max_age_seconds: float) -> StreamSnapshot:
+        if not channel_name:
+            return None
+        snapshot = self.get_snapshot(channel_name)
+        if not snapshot:
+            return None
+        return snapshot if snapshot.age_seconds() <= max_age_seconds else None
+
+    def subscribe(self, callback):
+        # callback(new_snapshot, previous_snapshot) runs on whatever publishes (the hub task on the bot loop, usually), keep it short.
+        with self._condition:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._condition:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def subscribe_queue(self, maxsize: int = 10) -> queue.Queue:
+        q = queue.Queue(maxsize=maxsize)
+        with self._condition:
+            self._queues.append(q)
+        return q
+
+    def subscribe_async_queue(self, loop, maxsize: int = 10) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=maxsize)
+        with self._condition:
+            self._async_queues.append((loop, q))
+        return q
+
+    def unsubscribe_queue(self, q):
+        with self._condition:
+            if q in self._queues:
+                self._queues.remove(q)
+            self._async_queues = [(loop, aq) for loop, aq in self._async_queues if aq is not q]
+
+    def publish(self, channel_name: str, stream_data: dict, source: str = "poll") -> StreamSnapshot:
+        with self._condition:
+            previous_snapshot = self._snapshots.get(channel_name.lower())
+            if source == "poll" and previous_snapshot is not None and \
+               time.time() < self._push_authority_until.get(channel_name.lower(), 0) and \
+               previous_snapshot.is_live != (bool(stream_data) and stream_data.get("type") == "live"):
+                logger.debug(f"UTA StreamStateHub: Ignoring poll for {channel_name} that contradicts a recent EventSub event.")
+                return previous_snapshot
+            if source != "poll":
+                self._push_authority_until[channel_name.lower()] = time.time() + PUSH_AUTHORITY_SECONDS
+            self._version += 1
+            snapshot = StreamSnapshot(channel_name, stream_data, time.time(), self._version, source)
+            self._snapshots[channel_name.lower()] = snapshot
+            callbacks = list(self._callbacks)
+            queues = list(self._queues)
+            async_queues = list(self._async_queues)
+            self._condition.notify_all()
+        self._wake_async_waiters()
+
+        if previous_snapshot is not None and previous_snapshot.is_live and not snapshot.is_live:
+            self._last_stream_end_at[channel_name.lower()] = snapshot.fetched_at
+        if previous_snapshot is None or previous_snapshot.is_live != snapshot.is_live:
+            logger.info(f"UTA StreamStateHub: {channel_name} is now {'LIVE' if snapshot.is_live else 'OFFLINE'} (snapshot v{snapshot.version}, via {source}).")
+            if config_manager.is_primary_uta_channel(channel_name):
+                config_manager.logger.info(f"UTA_GUI_LOG: TwitchLiveStatus={'Live' if snapshot.is_live else 'Offline'}")
+
+        for callback in callbacks:
+            try:
+                callback(snapshot, previous_snapshot)
+            except Exception as e:
+                logger.error(f"UTA StreamStateHub: Subscriber callback {getattr(callback, '__name__', callback)} raised: {e}", exc_info=True)
+        for q in queues:
+            _offer_to_queue(q, snapshot)
+        for loop, aq in async_queues:
+            if loop.is_closed(): continue
+            try:
+                loop.call_soon_threadsafe(_offer_to_queue, aq, snapshot)
+            except RuntimeError: # Loop closed between the check and the call
+                pass
+        return snapshot
+
+    def wait_for_update(self, last_version: int, timeout: float, channel_name: str = None) -> StreamSnapshot:
+        """Blocks until channel_name has a snapshot newer than last_version, the hub is woken for shutdown, or timeout elapses."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (self._snapshots.get(self._key(channel_name)) is not None and
+                         self._snapshots[self._key(channel_name)].version > last_version) or shutdown_event.is_set(),
+                timeout=timeout
+            )
+            return self._snapshots.get(self._key(channel_name))
+
+    async def wait_for_update_async(self, last_version: int, timeout: float, channel_name: str = None) -> StreamSnapshot:
+        """wait_for_update for service tasks on the bot loop; parks the coroutine instead of a thread."""
+        await self._wait_async(
+            lambda: (self._snapshots.get(self._key(channel_name)) is not None and
+                     self._snapshots[self._key(channel_name)].version > last_version) or shutdown_event.is_set(),
+            timeout
+        )
+        return self.get_snapshot(channel_name)
+
+    async def _wait_async(self, predicate, timeout: float) -> bool:
+        # Registered before the first check, so a publish landing between check and await still wakes us.
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._condition:
+            self._async_waiters.append(waiter)
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                event.clear()
+                with self._condition:
+                    if predicate():
+                        return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                self._async_waiters.remove(waiter)
+
+    def _wake_async_waiters(self):
+        with self._condition:
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            if loop.is_closed(): continue
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError: # Loop closed between the check and the call
+                pass
+
+    def get_last_stream_end(self, channel_name: str = None) -> float:
+        return self._last_stream_end_at.get(self._key(channel_name), 0)
+
+    def request_poll(self):
+        # Lets push events (e.g. EventSub stream.online) pull full /streams data without waiting out the interval.
+        self._poll_requested.set()
+        self._wake_async_waiters()
+
+    async def wait_for_poll_request_async(self, timeout: float) -> bool:
+        requested = await self._wait_async(self._poll_requested.is_set, timeout)
+        self._poll_requested.clear()
+        return requested
+
+    def wake_all(self):
+        with self._condition:
+            self._condition.notify_all()
+        self._poll_requested.set()
+        self._wake_async_waiters()
+
+    def reset(self):
+        # Version keeps counting so waiters never mistake a post-reset snapshot for one they've seen.
+        with self._condition:
+            self._snapshots.clear()
+            self._push_authority_until.clear()
+            self._last_stream_end_at.clear()
+        self._poll_requested.clear()
+        self.push_transport_healthy = False
+
+
+stream_state_hub = StreamStateHub()
+
+
+def get_adaptive_wait_seconds(base_interval: float, channel_name: str = None) -> int:
+    """base_interval adjusted by the adaptive poll scheduler for channel_name's current state (primary channel by default)."""
+    channel_name = channel_name or config_manager.UTA_TWITCH_CHANNEL_NAME
+    snapshot = stream_state_hub.get_snapshot(channel_name)
+    return adaptive_poll_scheduler.get_interval(channel_name, base_interval, is_live=bool(snapshot and snapshot.is_live),
+                                                last_end_ts=stream_state_hub.get_last_stream_end(channel_name))
+
+
+async def get_adaptive_wait_seconds_async(base_interval: float, channel_name: str = None) -> int:
+    # get_adaptive_wait_seconds() for callers on the event loop: a stale start-time profile is rebuilt in a worker thread.
+    channel_name = channel_name or config_manager.UTA_TWITCH_CHANNEL_NAME
+    snapshot = stream_state_hub.get_snapshot(channel_name)
+    return await adaptive_poll_scheduler.get_interval_async(channel_name, base_interval, is_live=bool(snapshot and snapshot.is_live),
+                                                            last_end_ts=stream_state_hub.get_last_stream_end(channel_name))
+
+
+def get_hub_poll_interval() -> int:
+    # Poll as often as the most demanding consumer used to poll on its own.
+    candidate_intervals = []
+    if config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED:
+        candidate_intervals.append(config_manager.UTA_STREAM_STATUS_POLL_INTERVAL_SECONDS)
+    if config_manager.UTA_RESTREAMER_ENABLED:
+        candidate_intervals.append(config_manager.UTA_CHECK_INTERVAL_SECONDS_RESTREAMER)
+    poll_interval = max(5, min(candidate_intervals)) if candidate_intervals else 60
+    if config_manager.UTA_ADAPTIVE_POLLING_ENABLED:
+        # One /streams batch covers every channel, so the most urgent channel sets the pace.
+        channel_intervals = [get_adaptive_wait_seconds(poll_interval, name) for name in config_manager.get_uta_monitored_channels()]
+        poll_interval = min(channel_intervals) if channel_intervals else poll_interval
+    if stream_state_hub.push_transport_healthy:
+        # EventSub delivers the edges; polling only refreshes viewer counts and covers missed events.
+        poll_interval = max(poll_interval, config_manager.UTA_EVENTSUB_HEALTHY_POLL_INTERVAL_SECONDS)
+    return poll_interval
+
+
+async def get_hub_poll_interval_async() -> int:
+    for channel_name in config_manager.get_uta_monitored_channels():
+        await adaptive_poll_scheduler.ensure_profile_async(channel_name)
+    return get_hub_poll_interval()
+
+
+async def stream_state_hub_task(bot_instance):
+    logger.info(f"UTA StreamStateHub task ({asyncio.current_task().get_name()}) started.")
+
+    try:
+        while not shutdown_event.is_set():
+            service_supervisor.heartbeat()
+            try:
+                channel_names = config_manager.get_uta_monitored_channels()
+                if not channel_names:
+                    logger.debug("UTA StreamStateHub: UTA_TWITCH_CHANNEL_NAME not configured. Skipping poll.")
+                    await service_supervisor.sleep(await get_hub_poll_interval_async(), interval=True)
+                    continue
+
+                # One /streams call per 100 channels, however many channels are monitored.
+                responses = await asyncio.to_thread(uta_helix_batcher.lookup_many, "streams", "user_login", channel_names)
+                for channel_name in channel_names:
+                    stream_api_data = responses.get(channel_name)
+                    if stream_api_data is None:
+                        # A failed poll is not an offline edge; keep the last snapshot and let consumers wait it out.
+                        logger.warning(f"UTA StreamStateHub: /streams poll for {channel_name} failed. Keeping last known snapshot.")
+                        continue
+                    live_stream_data = None
+                    if stream_api_data.get("data") and stream_api_data["data"][0].get("type") == "live":
+                        live_stream_data = stream_api_data["data"][0]
+                    stream_state_hub.publish(channel_name, live_stream_data)
+
+                poll_interval = await get_hub_poll_interval_async()
+                await service_supervisor.idle(stream_state_hub.wait_for_poll_request_async(poll_interval), poll_interval)
+
+            except Exception as e:
+                logger.error(f"UTA StreamStateHub: Unexpected error in poll loop: {e}", exc_info=True)
+                await service_supervisor.sleep(60)
+    finally:
+        stream_state_hub.wake_all()
+        logger.info(f"UTA StreamStateHub task ({asyncio.current_task().get_name()}) has finished.")
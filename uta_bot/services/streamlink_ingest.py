@@ -0,0 +1,296 @@
+"""In-process Streamlink ingest for the restream pipe (UTA_RESTREAM_INGEST_MODE = "session").
+
+Instead of a streamlink CLI process writing straight into the OS pipe, the Twitch stream is opened through the
+streamlink session API. A reader thread fills a JitterBuffer holding a few seconds of video, and a writer thread feeds
+FFmpeg's stdin from it. HLS segments arrive in bursts; the buffer smooths them out, and after an underrun it refills
+to the prebuffer level before feeding FFmpeg again.
+
+Resolved streams (and, for the CLI, their HLS playlist URLs) are cached until the access token in the URL runs out,
+so a restart within that window skips Twitch's token and playlist lookups (UTA_RESTREAM_WARM_RESTART_ENABLED)."""
+import json
+import logging
+import os
+import time
+import urllib.parse
+import asyncio
+import threading
+import collections
+
+from uta_bot import config_manager
+
+logger = logging.getLogger(__name__)
+
+INGEST_BUFFER_BYTES_PER_SECOND = 1_000_000 # Buffer sizes assume 8 Mbps, above Twitch's usual source bitrate
+INGEST_READ_CHUNK_BYTES = 64 * 1024
+RESOLVED_STREAM_REUSE_SECONDS = 300 # For URLs without a readable token expiry
+STREAM_URL_EXPIRY_MARGIN_SECONDS = 60 # Stop reusing a URL this long before its token expires
+STREAM_OPEN_ATTEMPTS = 3 # Like the CLI's --retry-open 3
+STREAM_OPEN_RETRY_DELAY_SECONDS = 5
+
+_session = None
+_resolved_streams = {} # (channel, quality) -> (expires_at unix, stream), for the session ingest
+_resolved_urls = {} # channel -> (expires_at unix, HLS playlist URL), for the CLI (started on hls://<url>)
+
+
+class JitterBuffer:
+    """Bounded FIFO of byte chunks between a producer and a consumer thread. get() holds back until prebuffer_bytes
+    are queued, at the start and again after every underrun."""
+
+    def __init__(self, capacity_bytes: int, prebuffer_bytes: int):
+        self.capacity_bytes = capacity_bytes
+        self.prebuffer_bytes = min(prebuffer_bytes, capacity_bytes)
+        self.fill_bytes = 0
+        self.peak_fill_bytes = 0
+        self.bytes_in = 0
+        self.underruns = 0
+        self.overflow_waits = 0 # Times the producer had to wait for room (FFmpeg not keeping up)
+        self.closed = False
+        self._chunks = collections.deque()
+        self._buffering = True
+        self._condition = threading.Condition()
+
+    def _is_full_for(self, size: int) -> bool:
+        # A chunk bigger than the whole buffer still goes into an empty one.
+        return self.fill_bytes > 0 and self.fill_bytes + size > self.capacity_bytes
+
+    def put(self, data: bytes) -> bool:
+        # Blocks while the buffer is full. False once the buffer was closed.
+        with self._condition:
+            if self._is_full_for(len(data)) and not self.closed:
+                self.overflow_waits += 1
+            while self._is_full_for(len(data)) and not self.closed:
+                self._condition.wait()
+            if self.closed:
+                return False
+            self._chunks.append(data)
+            self.fill_bytes += len(data)
+            self.bytes_in += len(data)
+            self.peak_fill_bytes = max(self.peak_fill_bytes, self.fill_bytes)
+            self._condition.notify_all()
+            return True
+
+    def get(self):
+        # Next chunk, or None once the buffer is closed and drained.
+        with self._condition:
+            while True:
+                if self._buffering:
+                    if self.fill_bytes >= self.prebuffer_bytes or (self.closed and self._chunks):
+                        self._buffering = False
+                    elif self.closed:
+                        return None
+                    else:
+                        self._condition.wait()
+                        continue
+                if self._chunks:
+                    chunk = self._chunks.popleft()
+                    self.fill_bytes -= len(chunk)
+                    self._condition.notify_all()
+                    return chunk
+                if self.closed:
+                    return None
+                self.underruns += 1
+                self._buffering = True
+
+    def close(self, discard: bool = False):
+        # discard=False lets the consumer drain what's queued (stream ended); True drops it (teardown).
+        with self._condition:
+            self.closed = True
+            if discard:
+                self._chunks.clear()
+                self.fill_bytes = 0
+            self._condition.notify_all()
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = config_manager.streamlink.Streamlink()
+        _session.set_option("hls-live-restart", True) # Same as the CLI's --hls-live-restart
+    return _session
+
+def stream_url_expiry(url: str) -> float:
+    """Unix time the playlist URL's access token runs out. Twitch's usher URLs carry it as "expires" in the JSON token
+    parameter; for anything else RESOLVED_STREAM_REUSE_SECONDS from now is assumed."""
+    try:
+        token = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get("token", [None])[0]
+        if token:
+            return float(json.loads(token)["expires"])
+    except (ValueError, KeyError, TypeError):
+        pass
+    return time.time() + RESOLVED_STREAM_REUSE_SECONDS
+
+def _is_fresh(expires_at: float) -> bool:
+    return config_manager.UTA_RESTREAM_WARM_RESTART_ENABLED and time.time() < expires_at - STREAM_URL_EXPIRY_MARGIN_SECONDS
+
+def remember_stream_url(channel: str, url: str):
+    _resolved_urls[channel.lower()] = (stream_url_expiry(url), url)
+
+def get_cached_stream_url(channel: str):
+    # The channel's HLS playlist URL while its token is still good, else None.
+    cached = _resolved_urls.get(channel.lower())
+    return cached[1] if cached and _is_fresh(cached[0]) else None
+
+def has_cached_stream(channel: str) -> bool:
+    channel = channel.lower()
+    return get_cached_stream_url(channel) is not None or \
+        any(key[0] == channel and _is_fresh(expires_at) for key, (expires_at, _) in _resolved_streams.items())
+
+def forget_resolved_stream(channel: str):
+    # After a pipe failure: the cached URL may be what failed.
+    channel = channel.lower()
+    _resolved_urls.pop(channel, None)
+    for key in [key for key in _resolved_streams if key[0] == channel]:
+        _resolved_streams.pop(key, None)
+
+def _resolve_stream(channel: str, quality: str):
+    # Blocking. Served from _resolved_streams while the token is good.
+    key = (channel, quality)
+    cached = _resolved_streams.get(key)
+    if cached and _is_fresh(cached[0]):
+        logger.info(f"UTA Streamlink Ingest: Reusing the resolved stream for {channel} (token valid for another {cached[0] - time.time():.0f}s).")
+        return cached[1]
+    streams = _get_session().streams(f"https://twitch.tv/{channel}")
+    if quality not in streams:
+        raise LookupError(f"no '{quality}' stream (offline?), available: {', '.join(streams) or 'none'}")
+    stream = streams[quality]
+    try:
+        expires_at = stream_url_expiry(stream.to_url())
+    except TypeError: # Stream type without a plain URL
+        expires_at = time.time() + RESOLVED_STREAM_REUSE_SECONDS
+    _resolved_streams[key] = (expires_at, stream)
+    return stream
+
+def resolve_stream_url(channel: str, quality: str = "best") -> str:
+    # Blocking. The HLS playlist URL (e.g. for ffprobe); also primes the cache for the ingest itself.
+    return _resolve_stream(channel.lower(), quality).to_url()
+
+def _open_stream(channel: str, quality: str):
+    # Blocking; run in a thread. Returns an open stream file object.
+    key = (channel, quality)
+    last_error = None
+    for attempt in range(1, STREAM_OPEN_ATTEMPTS + 1):
+        try:
+            return _resolve_stream(channel, quality).open()
+        except Exception as e:
+            last_error = e
+            _resolved_streams.pop(key, None) # Token may have expired; resolve fresh next time
+            logger.warning(f"UTA Streamlink Ingest: Opening twitch.tv/{channel} failed (attempt {attempt}/{STREAM_OPEN_ATTEMPTS}): {e}")
+            if attempt < STREAM_OPEN_ATTEMPTS:
+                time.sleep(STREAM_OPEN_RETRY_DELAY_SECONDS)
+    raise last_error
+
+
+class StreamlinkSessionIngest:
+    """Takes the Streamlink process's place in RestreamPipe (returncode, wait(), terminate(), kill()), so supervision,
+    stall restarts and teardown work unchanged. pid is None, there is no separate process."""
+
+    pid = None
+
+    def __init__(self, channel: str, quality: str = "best"):
+        self.channel = channel.lower()
+        self.quality = quality
+        self.buffer = JitterBuffer(int(config_manager.UTA_RESTREAM_INGEST_BUFFER_SECONDS * INGEST_BUFFER_BYTES_PER_SECOND),
+                                   int(config_manager.UTA_RESTREAM_INGEST_PREBUFFER_SECONDS * INGEST_BUFFER_BYTES_PER_SECOND))
+        self.returncode = None
+        self.started_at = None
+        self._stream_fd = None
+        self._out_fd = None
+        self._error = None
+        self._stopping = False
+        self._exited = asyncio.Event()
+        self._loop = None
+
+    async def start(self, pipe_write_fd: int):
+        # Never raises for stream problems: like a failing CLI, it just exits with a non-zero returncode.
+        self._loop = asyncio.get_running_loop()
+        self._out_fd = os.dup(pipe_write_fd) # Our own copy, closed when we're done, like a child's stdout
+        logger.info(f"UTA Streamlink Ingest: Opening twitch.tv/{self.channel} ({self.quality}) in-process...")
+        try:
+            self._stream_fd = await asyncio.to_thread(_open_stream, self.channel, self.quality)
+        except Exception as e:
+            logger.error(f"UTA Streamlink Ingest: Could not open twitch.tv/{self.channel}: {e}")
+            self._error = str(e)
+            self._finish(1)
+            return
+        self.started_at = time.monotonic()
+        threading.Thread(target=self._read_loop, name="UTA-IngestReader", daemon=True).start()
+        threading.Thread(target=self._write_loop, name="UTA-IngestWriter", daemon=True).start()
+        logger.info(f"UTA Streamlink Ingest: Streaming twitch.tv/{self.channel} through a {self.buffer.capacity_bytes / 1024 ** 2:.1f} MB jitter buffer.")
+
+    def _read_loop(self):
+        try:
+            while not self._stopping:
+                data = self._stream_fd.read(INGEST_READ_CHUNK_BYTES)
+                if not data:
+                    logger.info(f"UTA Streamlink Ingest: Stream twitch.tv/{self.channel} ended.")
+                    break
+                if not self.buffer.put(data):
+                    break
+        except Exception as e:
+            if not self._stopping:
+                self._error = f"read failed: {e}"
+                logger.warning(f"UTA Streamlink Ingest: Reading twitch.tv/{self.channel} failed: {e}")
+        finally:
+            self.buffer.close()
+            try:
+                self._stream_fd.close()
+            except Exception:
+                pass
+
+    def _write_loop(self):
+        try:
+            while True:
+                chunk = self.buffer.get()
+                if chunk is None:
+                    break
+                view = memoryview(chunk)
+                while view:
+                    view = view[os.write(self._out_fd, view):]
+        except OSError as e: # BrokenPipeError once nothing reads the pipe any more
+            if not self._stopping:
+                self._error = f"write to FFmpeg failed: {e}"
+                logger.warning(f"UTA Streamlink Ingest: Writing to FFmpeg failed: {e}")
+        finally:
+            self.buffer.close(discard=True)
+            self._finish(-15 if self._stopping else (1 if self._error else 0))
+
+    def _finish(self, returncode: int):
+        if self._out_fd is not None:
+            try:
+                os.close(self._out_fd)
+            except OSError:
+                pass
+            self._out_fd = None
+        self._set_exited(returncode)
+
+    def _set_exited(self, returncode: int):
+        if self.returncode is None:
+            self.returncode = returncode
+        try:
+            self._loop.call_soon_threadsafe(self._exited.set)
+        except RuntimeError:
+            pass # Loop already closed (shutdown)
+
+    async def wait(self) -> int:
+        await self._exited.wait()
+        return self.returncode
+
+    def terminate(self):
+        # Counts as exited right away, like a signalled process. The writer stops once its current write returns, which
+        # on a full pipe is only when the pipe's read end is closed (RestreamPipe drops the pipe after terminating us);
+        # it closes _out_fd itself, since closing it from here could hand its number to another file mid-write.
+        # The reader closes the stream after its current read returns.
+        self._stopping = True
+        self.buffer.close(discard=True)
+        self._set_exited(-15) # Like a terminated CLI
+
+    def kill(self):
+        self.terminate()
+
+    def describe(self) -> str:
+        buffer = self.buffer
+        elapsed_seconds = time.monotonic() - self.started_at if self.started_at else 0
+        bytes_per_second = buffer.bytes_in / elapsed_seconds if elapsed_seconds > 0 else 0
+        fill_text = f"{buffer.fill_bytes / bytes_per_second:.1f}s, " if bytes_per_second else ""
+        return (f"buffer {fill_text}{buffer.fill_bytes / 1024 ** 2:.1f}/{buffer.capacity_bytes / 1024 ** 2:.1f} MB "
+                f"(peak {buffer.peak_fill_bytes / 1024 ** 2:.1f} MB), {buffer.underruns} underrun(s), {buffer.overflow_waits} full wait(s)")
@@ -2,9 +2,9 @@ import logging
 import threading
 import shutil
 import os
-import asyncio
 
 from uta_bot import config_manager # This top-level import should be fine
+from .service_supervisor import service_supervisor
 
 # --- Remove problematic top-level imports that depend on twitch_api_handler ---
 # from .twitch_api_handler import get_uta_twitch_access_token, get_uta_broadcaster_id # Keep this commented out
@@ -13,32 +13,101 @@ from uta_bot import config_manager # This top-level import should be fine
 
 logger = logging.getLogger(__name__)
 
+# Still a threading.Event: the restreamer's process-watcher thread and a few sync helpers check it.
 shutdown_event = threading.Event()
 
-_uta_clip_thread: threading.Thread = None
-_uta_restreamer_thread: threading.Thread = None
-_uta_stream_status_thread: threading.Thread = None
+SERVICE_STOP_TIMEOUT_SECONDS = 25 # Covers the restreamer terminating FFmpeg/Streamlink (10s each at worst)
 
 _are_uta_threads_active = False # Internal state for this manager
 
+def _restreamer_prerequisites_met() -> bool:
+    restreamer_prereqs_ok = False
+    if config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED and config_manager.UTA_TWITCH_CHANNEL_NAME:
+        if not config_manager.effective_streamlink_session_ingest() and not shutil.which(config_manager.UTA_STREAMLINK_PATH):
+            logger.critical(f"UTA ThreadingManager: Streamlink executable ('{config_manager.UTA_STREAMLINK_PATH}') not found. Restreamer service cannot start.")
+        elif not shutil.which(config_manager.UTA_FFMPEG_PATH):
+            logger.critical(f"UTA ThreadingManager: FFmpeg executable ('{config_manager.UTA_FFMPEG_PATH}') not found. Restreamer service cannot start.")
+        else:
+            if config_manager.effective_youtube_api_enabled():
+                if not os.path.exists(config_manager.UTA_YOUTUBE_CLIENT_SECRET_FILE):
+                     logger.critical(f"UTA ThreadingManager: YouTube API client secret file ('{config_manager.UTA_YOUTUBE_CLIENT_SECRET_FILE}') not found. Restreamer (API mode) cannot start.")
+                else:
+                    restreamer_prereqs_ok = True
+                    logger.info("UTA ThreadingManager: Restreamer (YouTube API Mode) prerequisites met.")
+            elif not config_manager.UTA_YOUTUBE_API_ENABLED:
+                if config_manager.UTA_YOUTUBE_RTMP_URL_BASE and config_manager.UTA_YOUTUBE_STREAM_KEY and \
+                   "YOUR_YOUTUBE_STREAM_KEY" not in config_manager.UTA_YOUTUBE_STREAM_KEY:
+                    restreamer_prereqs_ok = True
+                    logger.info("UTA ThreadingManager: Restreamer (Legacy RTMP Mode) prerequisites met.")
+                else:
+                    logger.warning("UTA ThreadingManager: Restreamer (Legacy RTMP Mode) selected, but YouTube RTMP URL or Stream Key is incomplete or placeholder. Restreamer cannot start.")
+            else:
+                 logger.warning("UTA ThreadingManager: Restreamer (YouTube API Mode) selected, but Google API libraries are missing. Restreamer cannot start in API mode.")
+    return restreamer_prereqs_ok
+
+def _holds_primary_channel() -> bool:
+    # False in a coordinator-mode worker that doesn't hold the UTA_TWITCH_CHANNEL_NAME lease
+    return any(config_manager.is_primary_uta_channel(name) for name in config_manager.get_uta_monitored_channels())
+
+def start_channel_services(bot_instance, channel_name: str):
+    # The primary channel carries the restreamer too. Coordinator-mode workers also call this when they gain a channel lease.
+    from .status_service import stream_status_monitor_task
+    from .restream_service import restreamer_monitor_task
+
+    if not config_manager.UTA_ENABLED:
+        return
+    if config_manager.is_primary_uta_channel(channel_name):
+        if config_manager.UTA_RESTREAMER_ENABLED:
+            if _restreamer_prerequisites_met():
+                logger.info("UTA ThreadingManager: Starting Restreamer Monitor service task...")
+                service_supervisor.start("Restreamer", restreamer_monitor_task, bot_instance)
+            else:
+                logger.error("UTA ThreadingManager: Restreamer service is enabled in config, but prerequisites were not met. Service not started.")
+        if config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED:
+            logger.info("UTA ThreadingManager: Starting Stream Status Monitor service task...")
+            service_supervisor.start("StatusMonitor", stream_status_monitor_task, bot_instance)
+    elif config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED:
+        logger.info(f"UTA ThreadingManager: Starting Stream Status Monitor service task for additional channel {channel_name}...")
+        service_supervisor.start(f"StatusMonitor-{channel_name}", stream_status_monitor_task, bot_instance, channel_name)
+
+async def stop_channel_services(channel_name: str):
+    from .restream_service import cleanup_restream_processes as cleanup_restream_processes_ext
+
+    is_primary = config_manager.is_primary_uta_channel(channel_name)
+    service_names = ["Restreamer", "StatusMonitor"] if is_primary else [f"StatusMonitor-{channel_name}"]
+    for service_name in service_names:
+        if not await service_supervisor.stop_service(service_name, timeout=SERVICE_STOP_TIMEOUT_SECONDS):
+            logger.warning(f"UTA ThreadingManager: {service_name} was still finishing after {SERVICE_STOP_TIMEOUT_SECONDS}s.")
+    if is_primary and config_manager.UTA_RESTREAMER_ENABLED:
+        await cleanup_restream_processes_ext()
+    logger.info(f"UTA ThreadingManager: Stopped services for channel {channel_name}.")
+
 def start_all_services(bot_instance):
-    global _uta_clip_thread, _uta_restreamer_thread, _uta_stream_status_thread, _are_uta_threads_active
+    # Called from the bot loop (on_ready, !reloadconfig); every service becomes a supervised task on it.
+    global _are_uta_threads_active
     
     # --- Deferred imports ---
-    from .twitch_api_handler import get_uta_twitch_access_token, get_uta_broadcaster_id
+    from .twitch_api_handler import get_uta_twitch_access_token, prime_uta_broadcaster_ids
+    from .channel_state import reset_channel_states
     from .youtube_api_handler import get_youtube_service # Import get_youtube_service here
-    from .clip_service import clip_monitor_loop, _uta_sent_clip_ids as clip_service_sent_ids # Import specific loop and sent_ids
-    from .status_service import stream_status_monitor_loop
-    from .restream_service import restreamer_monitor_loop
+    from .clip_service import clip_monitor_task, _uta_sent_clip_ids as clip_service_sent_ids # Import specific task and sent_ids
+    from .stream_state_hub import stream_state_hub, stream_state_hub_task
+    from .chapter_builder import session_chapter_builder
+    from .youtube_quota import youtube_quota_ledger
+    from .poll_scheduler import adaptive_poll_scheduler
+    from uta_bot.utils.circuit_breaker import api_breakers
+    from .eventsub_service import eventsub_listener_task
 
     if _are_uta_threads_active:
         logger.warning("UTA ThreadingManager: Attempted to start services, but they appear to be active already. Call stop_all_services first.")
         return
 
     shutdown_event.clear()
-    logger.info("UTA ThreadingManager: Cleared shutdown event, preparing to start service threads.")
+    service_supervisor.attach(bot_instance.loop)
+    logger.info("UTA ThreadingManager: Cleared shutdown event, preparing to start service tasks.")
 
     config_manager.uta_broadcaster_id_cache = None
+    reset_channel_states()
     
     # Access and clear _uta_sent_clip_ids from the imported clip_service module
     clip_service_sent_ids.clear()
@@ -48,10 +117,42 @@ def start_all_services(bot_instance):
         if not get_uta_twitch_access_token():
             logger.critical("UTA ThreadingManager: Failed to get/refresh Twitch token for UTA services. Functionality will be impaired.")
         
-        get_uta_broadcaster_id(config_manager.UTA_TWITCH_CHANNEL_NAME)
+        prime_uta_broadcaster_ids(config_manager.get_uta_monitored_channels())
+
+    # The hub owns the /streams poll; restreamer, status monitor and cogs read its snapshots instead of polling.
+    stream_state_hub.reset()
+    session_chapter_builder.configure(config_manager.UTA_CHAPTER_CHECKPOINT_FILE)
+    stream_state_hub.subscribe(session_chapter_builder.on_snapshot) # Game/title changes feed the chapters as they happen
+    youtube_quota_ledger.configure(config_manager.UTA_YOUTUBE_QUOTA_LEDGER_FILE)
+    adaptive_poll_scheduler.reset() # Log paths or history settings may have changed with the config
+    api_breakers.report_states_to_gui()
+
+    if config_manager.UTA_ENABLED and config_manager.UTA_WORKER_PROCESSES > 0 and not config_manager.UTA_WORKER_ID:
+        # Coordinator mode: the channel services run in worker processes; this process keeps the commands and cogs.
+        from .worker_pool import worker_pool_coordinator_task
+        logger.info(f"UTA ThreadingManager: Coordinator mode. Starting {config_manager.UTA_WORKER_PROCESSES} worker process(es)...")
+        service_supervisor.start("WorkerPool", worker_pool_coordinator_task, bot_instance)
+        _are_uta_threads_active = True
+        config_manager._are_uta_threads_active = True
+        return
+
+    if config_manager.UTA_ENABLED and config_manager.UTA_TWITCH_CHANNEL_NAME and \
+       (config_manager.UTA_RESTREAMER_ENABLED or config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED):
+        logger.info("UTA ThreadingManager: Starting StreamStateHub poller task...")
+        service_supervisor.start("StreamStateHub", stream_state_hub_task, bot_instance)
+
+        # EventSub pushes edges into the hub; the poller above keeps running as the fallback.
+        if config_manager.UTA_EVENTSUB_ENABLED:
+            if not config_manager.AIOHTTP_AVAILABLE:
+                logger.error("UTA ThreadingManager: EventSub is enabled in config, but aiohttp is not installed. Using /streams polling only.")
+            else:
+                logger.info("UTA ThreadingManager: Starting EventSub WebSocket listener task...")
+                service_supervisor.start("EventSub", eventsub_listener_task, bot_instance)
+    else:
+        logger.info("UTA ThreadingManager: StreamStateHub not needed (no restreamer/status consumers enabled).")
 
     if config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED and \
-       config_manager.effective_youtube_api_enabled():
+       config_manager.effective_youtube_api_enabled() and _holds_primary_channel():
         logger.info("UTA ThreadingManager: Attempting to initialize YouTube API service for UTA...")
         # Use the get_youtube_service imported inside this function
         if not get_youtube_service(force_reinitialize=True):
@@ -61,98 +162,46 @@ def start_all_services(bot_instance):
         logger.error("UTA ThreadingManager: YouTube API is enabled in config, but Google libraries are not installed. YouTube API features for restreamer will be disabled.")
 
     if config_manager.UTA_ENABLED and config_manager.UTA_CLIP_MONITOR_ENABLED and config_manager.UTA_TWITCH_CHANNEL_NAME:
-        logger.info("UTA ThreadingManager: Starting Clip Monitor service thread...")
-        _uta_clip_thread = threading.Thread(target=clip_monitor_loop, args=(bot_instance,), name="UTAClipMonitorThread", daemon=True)
-        _uta_clip_thread.start()
+        logger.info("UTA ThreadingManager: Starting Clip Monitor service task...")
+        service_supervisor.start("ClipMonitor", clip_monitor_task, bot_instance)
     else:
         logger.info("UTA ThreadingManager: Clip Monitor service disabled or prerequisites not met.")
 
-    restreamer_prereqs_ok = False
-    if config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED and config_manager.UTA_TWITCH_CHANNEL_NAME:
-        if not shutil.which(config_manager.UTA_STREAMLINK_PATH):
-            logger.critical(f"UTA ThreadingManager: Streamlink executable ('{config_manager.UTA_STREAMLINK_PATH}') not found. Restreamer service cannot start.")
-        elif not shutil.which(config_manager.UTA_FFMPEG_PATH):
-            logger.critical(f"UTA ThreadingManager: FFmpeg executable ('{config_manager.UTA_FFMPEG_PATH}') not found. Restreamer service cannot start.")
-        else:
-            if config_manager.effective_youtube_api_enabled():
-                if not os.path.exists(config_manager.UTA_YOUTUBE_CLIENT_SECRET_FILE):
-                     logger.critical(f"UTA ThreadingManager: YouTube API client secret file ('{config_manager.UTA_YOUTUBE_CLIENT_SECRET_FILE}') not found. Restreamer (API mode) cannot start.")
-                else:
-                    restreamer_prereqs_ok = True
-                    logger.info("UTA ThreadingManager: Restreamer (YouTube API Mode) prerequisites met.")
-            elif not config_manager.UTA_YOUTUBE_API_ENABLED:
-                if config_manager.UTA_YOUTUBE_RTMP_URL_BASE and config_manager.UTA_YOUTUBE_STREAM_KEY and \
-                   "YOUR_YOUTUBE_STREAM_KEY" not in config_manager.UTA_YOUTUBE_STREAM_KEY:
-                    restreamer_prereqs_ok = True
-                    logger.info("UTA ThreadingManager: Restreamer (Legacy RTMP Mode) prerequisites met.")
-                else:
-                    logger.warning("UTA ThreadingManager: Restreamer (Legacy RTMP Mode) selected, but YouTube RTMP URL or Stream Key is incomplete or placeholder. Restreamer cannot start.")
-            else:
-                 logger.warning("UTA ThreadingManager: Restreamer (YouTube API Mode) selected, but Google API libraries are missing. Restreamer cannot start in API mode.")
-
-    if restreamer_prereqs_ok:
-        logger.info("UTA ThreadingManager: Starting Restreamer Monitor service thread...")
-        _uta_restreamer_thread = threading.Thread(target=restreamer_monitor_loop, args=(bot_instance,), name="UTARestreamerThread", daemon=True)
-        _uta_restreamer_thread.start()
-    elif config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED:
-        logger.error("UTA ThreadingManager: Restreamer service is enabled in config, but prerequisites were not met. Service not started.")
-
-    if config_manager.UTA_ENABLED and config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED and config_manager.UTA_TWITCH_CHANNEL_NAME:
-        logger.info("UTA ThreadingManager: Starting Stream Status Monitor service thread...")
-        _uta_stream_status_thread = threading.Thread(target=stream_status_monitor_loop, args=(bot_instance,), name="UTAStatusMonitorThread", daemon=True)
-        _uta_stream_status_thread.start()
-    else:
-        logger.info("UTA ThreadingManager: Stream Status Monitor service disabled or prerequisites not met.")
+    for channel_name in config_manager.get_uta_monitored_channels():
+        start_channel_services(bot_instance, channel_name)
 
     _are_uta_threads_active = True
     config_manager._are_uta_threads_active = True # Update global status in config_manager
 
 async def stop_all_services():
-    global _uta_clip_thread, _uta_restreamer_thread, _uta_stream_status_thread, _are_uta_threads_active
+    global _are_uta_threads_active
     # Deferred import for cleanup
     from .restream_service import cleanup_restream_processes as cleanup_restream_processes_ext
+    from .stream_state_hub import stream_state_hub
+    from .twitch_api_handler import uta_lookup_cache
 
-    active_threads_exist = (
-        (_uta_clip_thread and _uta_clip_thread.is_alive()) or
-        (_uta_restreamer_thread and _uta_restreamer_thread.is_alive()) or
-        (_uta_stream_status_thread and _uta_stream_status_thread.is_alive())
-    )
+    uta_lookup_cache.save(force=True) # Flush lookups gathered since the last throttled save
 
-    if not _are_uta_threads_active and not active_threads_exist:
-        logger.info("UTA ThreadingManager: No active UTA service threads to stop.")
+    if not _are_uta_threads_active and not service_supervisor.has_active_tasks():
+        logger.info("UTA ThreadingManager: No active UTA service tasks to stop.")
         _are_uta_threads_active = False
         config_manager._are_uta_threads_active = False
         return
 
-    logger.info("UTA ThreadingManager: Initiating shutdown of UTA service threads...")
+    logger.info("UTA ThreadingManager: Initiating shutdown of UTA service tasks...")
     shutdown_event.set()
+    stream_state_hub.wake_all() # Release anything still parked on the hub outside the supervised tasks
 
-    threads_to_join = []
-    if _uta_clip_thread and _uta_clip_thread.is_alive():
-        threads_to_join.append(_uta_clip_thread)
-    if _uta_restreamer_thread and _uta_restreamer_thread.is_alive():
-        threads_to_join.append(_uta_restreamer_thread)
-    if _uta_stream_status_thread and _uta_stream_status_thread.is_alive():
-        threads_to_join.append(_uta_stream_status_thread)
-
-    for t in threads_to_join:
-        logger.info(f"UTA ThreadingManager: Attempting to join thread {t.name}...")
-        try:
-            await asyncio.to_thread(t.join, timeout=10)
-            if t.is_alive():
-                logger.warning(f"UTA ThreadingManager: Thread {t.name} did not join cleanly after 10 seconds.")
-            else:
-                logger.info(f"UTA ThreadingManager: Thread {t.name} joined successfully.")
-        except Exception as e:
-            logger.error(f"UTA ThreadingManager: Exception while joining thread {t.name}: {e}")
+    # One cancellation for every task at once instead of a 10s join per thread.
+    if await service_supervisor.stop(timeout=SERVICE_STOP_TIMEOUT_SECONDS):
+        logger.info("UTA ThreadingManager: All service tasks cancelled and finished.")
+    else:
+        logger.warning(f"UTA ThreadingManager: Some service tasks were still finishing after {SERVICE_STOP_TIMEOUT_SECONDS}s.")
 
     if config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED:
         logger.info("UTA ThreadingManager: Performing final cleanup of restreamer processes (FFmpeg/Streamlink)...")
-        cleanup_restream_processes_ext()
+        await cleanup_restream_processes_ext()
 
-    _uta_clip_thread = None
-    _uta_restreamer_thread = None
-    _uta_stream_status_thread = None
     _are_uta_threads_active = False
     config_manager._are_uta_threads_active = False
-    logger.info("UTA ThreadingManager: All service threads processed for stopping.")
\ No newline at end of file
+    logger.info("UTA ThreadingManager: All service tasks processed for stopping.")
\ No newline at end of file
@@ -7,6 +7,10 @@ import time
 import threading
 
 from uta_bot import config_manager # This import is fine and necessary
+from uta_bot.services.channel_state import get_channel_state
+from uta_bot.utils.lookup_cache import PersistentLRUCache, LOOKUP_NOT_FOUND
+from uta_bot.utils.circuit_breaker import guarded_request, CircuitOpenError
+from uta_bot.services.service_supervisor import service_supervisor
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +33,7 @@ class TwitchAPIHelper:
             return self.access_token
 
         logger.info("TwitchAPIHelper: Attempting to fetch/refresh App Access Token...")
-        url = "https://id.twitch.tv/oauth2/token"
+        url = config_manager.UTA_TWITCH_AUTH_URL
         params = {
             "client_id": self.client_id,
             "client_secret": self.client_secret,
@@ -58,17 +62,20 @@ class TwitchAPIHelper:
             logger.warning("TwitchAPIHelper: Attempted to get_user_id with None or empty username.")
             return None
 
-        url = f"https://api.twitch.tv/helix/users?login={username.lower()}"
+        url = f"{config_manager.UTA_TWITCH_API_BASE_URL}/users?login={username.lower()}"
         headers = {"Client-ID": self.client_id, "Authorization": f"Bearer {token}"}
         response_obj = None
         try:
-            response_obj = await asyncio.to_thread(requests.get, url, headers=headers, timeout=10)
+            response_obj = await asyncio.to_thread(guarded_request, "twitch:/users", "GET", url, headers=headers, timeout=10)
             response_obj.raise_for_status()
             data = response_obj.json()
             if data.get('data'):
                 return data['data'][0]['id']
             logger.warning(f"TwitchAPIHelper: User '{username}' not found or API response malformed: {data}")
             return None
+        except CircuitOpenError as e:
+            logger.warning(f"TwitchAPIHelper: Skipped User ID lookup for '{username}': {e}")
+            return None
         except requests.exceptions.RequestException as e:
             self._log_api_error(e, response_obj, f"TwitchAPIHelper: Error getting User ID for '{username}'")
             return None
@@ -80,14 +87,17 @@ class TwitchAPIHelper:
         token = await self._get_app_access_token()
         if not token or not user_id: return None
 
-        url = f"https://api.twitch.tv/helix/channels/followers?broadcaster_id={user_id}"
+        url = f"{config_manager.UTA_TWITCH_API_BASE_URL}/channels/followers?broadcaster_id={user_id}"
         headers = {"Client-ID": self.client_id, "Authorization": f"Bearer {token}"}
         response_obj = None
         try:
-            response_obj = await asyncio.to_thread(requests.get, url, headers=headers, timeout=10)
+            response_obj = await asyncio.to_thread(guarded_request, "twitch:/channels/followers", "GET", url, headers=headers, timeout=10)
             response_obj.raise_for_status()
             data = response_obj.json()
             return data.get('total')
+        except CircuitOpenError as e:
+            logger.warning(f"TwitchAPIHelper: Skipped follower lookup for User ID '{user_id}': {e}")
+            return None
         except requests.exceptions.RequestException as e:
             self._log_api_error(e, response_obj, f"TwitchAPIHelper: Error getting followers for User ID '{user_id}'")
             return None
@@ -97,9 +107,6 @@ class TwitchAPIHelper:
 
 _uta_token_refresh_lock = threading.Lock()
 
-UTA_TWITCH_API_BASE_URL = "https://api.twitch.tv/helix"
-UTA_TWITCH_AUTH_URL = "https://id.twitch.tv/oauth2/token"
-
 def get_uta_twitch_access_token():
     with _uta_token_refresh_lock:
         current_time = time.time()
@@ -114,7 +121,7 @@ def get_uta_twitch_access_token():
         }
         response_obj = None
         try:
-            response_obj = requests.post(UTA_TWITCH_AUTH_URL, params=params, timeout=10)
+            response_obj = requests.post(config_manager.UTA_TWITCH_AUTH_URL, params=params, timeout=10)
             response_obj.raise_for_status()
             data = response_obj.json()
             config_manager.uta_shared_access_token = data["access_token"]
@@ -137,7 +144,8 @@ def get_uta_twitch_access_token():
             return None
 
 def make_uta_twitch_api_request(endpoint: str, params: dict = None, method: str = 'GET', max_retries: int = 1):
-    url = f"{UTA_TWITCH_API_BASE_URL}/{endpoint.lstrip('/')}"
+    url = f"{config_manager.UTA_TWITCH_API_BASE_URL}/{endpoint.lstrip('/')}"
+    breaker_name = f"twitch:/{endpoint.strip('/')}" # One breaker per Helix endpoint, e.g. twitch:/streams
 
     for attempt in range(max_retries + 1):
         access_token = get_uta_twitch_access_token()
@@ -153,9 +161,9 @@ def make_uta_twitch_api_request(endpoint: str, params: dict = None, method: str
         response_obj = None
         try:
             if method.upper() == 'GET':
-                response_obj = requests.get(url, headers=headers, params=params, timeout=10)
+                response_obj = guarded_request(breaker_name, 'GET', url, headers=headers, params=params, timeout=10)
             elif method.upper() == 'POST':
-                response_obj = requests.post(url, headers=headers, json=params, timeout=10)
+                response_obj = guarded_request(breaker_name, 'POST', url, headers=headers, json=params, timeout=10)
             else:
                 logger.error(f"UTA TwitchAPI: Unsupported HTTP method: {method}")
                 return None
@@ -170,6 +178,9 @@ def make_uta_twitch_api_request(endpoint: str, params: dict = None, method: str
             response_obj.raise_for_status()
             return response_obj.json()
 
+        except CircuitOpenError as open_err:
+            logger.debug(f"UTA TwitchAPI: {open_err}")
+            return None
         except requests.exceptions.HTTPError as http_err:
             logger.error(f"UTA TwitchAPI: HTTP error on API request to {url} (Attempt {attempt + 1}): {http_err}")
             if hasattr(http_err, 'response') and http_err.response is not None:
@@ -197,14 +208,248 @@ def get_uta_broadcaster_id(channel_name: str):
     if not channel_name:
         logger.warning("UTA: Attempted to get broadcaster ID with no channel name specified.")
         return None
-    if config_manager.uta_broadcaster_id_cache:
-        return config_manager.uta_broadcaster_id_cache
+    channel_state = get_channel_state(channel_name)
+    if channel_state.broadcaster_id:
+        return channel_state.broadcaster_id
 
-    data = make_uta_twitch_api_request("/users", params={"login": channel_name})
-    if data and data.get("data"):
-        config_manager.uta_broadcaster_id_cache = data["data"][0]["id"]
-        logger.info(f"UTA: Found and cached broadcaster ID for {channel_name}: {config_manager.uta_broadcaster_id_cache}")
-        return config_manager.uta_broadcaster_id_cache
+    broadcaster_id = get_cached_twitch_user_id(channel_name)
+    if broadcaster_id:
+        channel_state.broadcaster_id = broadcaster_id
+        logger.info(f"UTA: Found and cached broadcaster ID for {channel_name}: {channel_state.broadcaster_id}")
+        return channel_state.broadcaster_id
 
     logger.error(f"UTA: Could not find broadcaster ID for: {channel_name}")
-    return None
\ No newline at end of file
+    return None
+
+def prime_uta_broadcaster_ids(channel_names: list):
+    # Resolves every uncached channel in as few /users calls as possible (100 logins each).
+    missing_channels = [name for name in channel_names if name and not get_channel_state(name).broadcaster_id]
+    if not missing_channels:
+        return
+    _ensure_lookup_cache_configured()
+    uncached_channels = []
+    for channel_name in missing_channels:
+        if uta_lookup_cache.get("login_to_id", channel_name.lower()) is not None:
+            get_channel_state(channel_name).broadcaster_id = get_cached_twitch_user_id(channel_name) # Warm from disk
+        else:
+            uncached_channels.append(channel_name)
+
+    responses = uta_helix_batcher.lookup_many("users", "login", uncached_channels) if uncached_channels else {}
+    for channel_name in uncached_channels:
+        data = responses.get(channel_name)
+        if data and data.get("data"):
+            _store_twitch_user(data["data"][0])
+            get_channel_state(channel_name).broadcaster_id = data["data"][0]["id"]
+        else:
+            logger.error(f"UTA: Could not find broadcaster ID for: {channel_name}")
+    logger.info(f"UTA: Primed broadcaster IDs for {len(missing_channels)} channel(s) ({len(missing_channels) - len(uncached_channels)} from the lookup cache).")
+
+UTA_HELIX_BATCH_WINDOW_SECONDS = 0.05
+UTA_HELIX_MAX_BATCH_SIZE = 100 # Helix limit for id/login filters on /streams, /users and /channels
+
+# (endpoint, query param) -> field in each response entry that echoes the requested value back
+_HELIX_BATCHABLE_LOOKUPS = {
+    ("streams", "user_login"): "user_login",
+    ("streams", "user_id"): "user_id",
+    ("users", "login"): "login",
+    ("users", "id"): "id",
+    ("channels", "broadcaster_id"): "broadcaster_id",
+}
+
+
+class _HelixBatch:
+    def __init__(self, endpoint: str, param: str):
+        self.endpoint = endpoint
+        self.param = param
+        self.values = [] # Normalized values in arrival order, de-duplicated
+        self.done_event = threading.Event()
+        self.entries_by_value = {}
+        self.failed = False
+
+
+class HelixRequestBatcher:
+    """Coalesces single-value Helix lookups made within a short window into one request of up to 100 values."""
+
+    def __init__(self, window_seconds: float = UTA_HELIX_BATCH_WINDOW_SECONDS, max_batch_size: int = UTA_HELIX_MAX_BATCH_SIZE):
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._open_batches = {} # (endpoint, param) -> _HelixBatch still accepting values
+
+    @staticmethod
+    def _normalize(param: str, value) -> str:
+        value = str(value)
+        return value.lower() if param in ("user_login", "login") else value
+
+    def lookup(self, endpoint: str, param: str, value, timeout: float = 30):
+        """Returns a Helix-shaped response ({"data": [entry]} or {"data": []}) for one value, or None on failure."""
+        endpoint = endpoint.strip('/')
+        key = (endpoint, param)
+        if key not in _HELIX_BATCHABLE_LOOKUPS:
+            return make_uta_twitch_api_request(endpoint, params={param: value})
+
+        normalized_value = self._normalize(param, value)
+        is_leader = False
+        with self._lock:
+            batch = self._open_batches.get(key)
+            if batch is None:
+                batch = _HelixBatch(endpoint, param)
+                self._open_batches[key] = batch
+                is_leader = True
+            if normalized_value not in batch.values:
+                batch.values.append(normalized_value)
+            if len(batch.values) >= self.max_batch_size and self._open_batches.get(key) is batch:
+                del self._open_batches[key] # Full; the next caller starts a fresh batch
+
+        if is_leader:
+            # The caller that opened the batch waits out the window, then sends it for everyone.
+            time.sleep(self.window_seconds)
+            with self._lock:
+                if self._open_batches.get(key) is batch:
+                    del self._open_batches[key]
+            self._execute(batch)
+        elif not batch.done_event.wait(timeout=timeout):
+            logger.error(f"UTA TwitchAPI: Timed out waiting for batched Helix lookup {endpoint}?{param}={value}.")
+            return None
+
+        if batch.failed:
+            return None
+        entry = batch.entries_by_value.get(normalized_value)
+        return {"data": [entry]} if entry else {"data": []}
+
+    def _execute(self, batch: _HelixBatch):
+        match_field = _HELIX_BATCHABLE_LOOKUPS[(batch.endpoint, batch.param)]
+        try:
+            logger.debug(f"UTA TwitchAPI: Sending batched Helix request /{batch.endpoint} with {len(batch.values)} {batch.param} value(s).")
+            request_params = {batch.param: list(batch.values)} # requests encodes a list as repeated query params
+            if batch.endpoint == "streams":
+                request_params["first"] = self.max_batch_size # /streams pages at 20 by default
+            response_data = make_uta_twitch_api_request(batch.endpoint, params=request_params)
+            if response_data is None:
+                batch.failed = True
+                return
+            for entry in response_data.get("data", []):
+                entry_value = entry.get(match_field)
+                if entry_value is not None:
+                    batch.entries_by_value[self._normalize(batch.param, entry_value)] = entry
+        except Exception as e:
+            logger.error(f"UTA TwitchAPI: Unexpected error executing batched Helix request /{batch.endpoint}: {e}", exc_info=True)
+            batch.failed = True
+        finally:
+            batch.done_event.set()
+
+    def lookup_many(self, endpoint: str, param: str, values: list) -> dict:
+        """Looks up many values in chunks of max_batch_size; returns {original value: lookup()-shaped response or None}."""
+        endpoint = endpoint.strip('/')
+        key = (endpoint, param)
+        if key not in _HELIX_BATCHABLE_LOOKUPS:
+            return {value: make_uta_twitch_api_request(endpoint, params={param: value}) for value in values}
+
+        normalized_by_value = {value: self._normalize(param, value) for value in values}
+        unique_values = list(dict.fromkeys(normalized_by_value.values()))
+        batches = []
+        for i in range(0, len(unique_values), self.max_batch_size):
+            batch = _HelixBatch(endpoint, param)
+            batch.values = unique_values[i:i + self.max_batch_size]
+            self._execute(batch) # Already a full batch, no window to wait out
+            batches.append(batch)
+
+        batch_by_normalized = {v: b for b in batches for v in b.values}
+        results = {}
+        for value, normalized_value in normalized_by_value.items():
+            batch = batch_by_normalized[normalized_value]
+            if batch.failed:
+                results[value] = None
+            else:
+                entry = batch.entries_by_value.get(normalized_value)
+                results[value] = {"data": [entry]} if entry else {"data": []}
+        return results
+
+    async def lookup_async(self, endpoint: str, param: str, value, timeout: float = 30):
+        return await asyncio.to_thread(self.lookup, endpoint, param, value, timeout)
+
+
+uta_helix_batcher = HelixRequestBatcher()
+
+
+# --- Persistent login/id/channel lookup cache ---
+# Helix ignores If-None-Match/If-Modified-Since, so freshness is handled with TTLs plus stale-while-revalidate instead.
+uta_lookup_cache = PersistentLRUCache()
+
+def _ensure_lookup_cache_configured():
+    uta_lookup_cache.configure(config_manager.UTA_LOOKUP_CACHE_FILE, config_manager.UTA_LOOKUP_CACHE_MAX_ENTRIES)
+
+def _store_twitch_user(user_entry: dict):
+    login = user_entry.get("login", "").lower()
+    if login and user_entry.get("id"):
+        uta_lookup_cache.set("login_to_id", login, user_entry["id"], config_manager.UTA_LOOKUP_CACHE_ID_TTL_SECONDS)
+        uta_lookup_cache.set("users", login, user_entry, config_manager.UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS)
+
+def _fetch_twitch_user(login: str):
+    data = uta_helix_batcher.lookup("users", "login", login)
+    if data is None:
+        return None
+    if not data.get("data"):
+        return LOOKUP_NOT_FOUND
+    _store_twitch_user(data["data"][0])
+    return data["data"][0]
+
+def get_cached_twitch_user(login: str):
+    """Full /users entry for login: dict, LOOKUP_NOT_FOUND if Twitch has no such user, or None if the lookup failed."""
+    if not login:
+        return None
+    _ensure_lookup_cache_configured()
+    return uta_lookup_cache.get_or_fetch("users", login.lower(), config_manager.UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS,
+                                         lambda: _fetch_twitch_user(login))
+
+def get_cached_twitch_user_id(login: str):
+    if not login:
+        return None
+    _ensure_lookup_cache_configured()
+
+    def _fetch_id():
+        user_entry = _fetch_twitch_user(login)
+        return user_entry["id"] if isinstance(user_entry, dict) else user_entry
+
+    user_id = uta_lookup_cache.get_or_fetch("login_to_id", login.lower(), config_manager.UTA_LOOKUP_CACHE_ID_TTL_SECONDS, _fetch_id)
+    return None if user_id is LOOKUP_NOT_FOUND else user_id
+
+def get_cached_twitch_channel(broadcaster_id: str):
+    """/channels entry for broadcaster_id: dict, LOOKUP_NOT_FOUND, or None if the lookup failed."""
+    if not broadcaster_id:
+        return None
+    _ensure_lookup_cache_configured()
+
+    def _fetch_channel():
+        data = uta_helix_batcher.lookup("channels", "broadcaster_id", broadcaster_id)
+        if data is None:
+            return None
+        return data["data"][0] if data.get("data") else LOOKUP_NOT_FOUND
+
+    return uta_lookup_cache.get_or_fetch("channels", str(broadcaster_id), config_manager.UTA_LOOKUP_CACHE_METADATA_TTL_SECONDS, _fetch_channel)
+
+async def get_cached_twitch_user_async(login: str):
+    return await asyncio.to_thread(get_cached_twitch_user, login)
+
+async def get_cached_twitch_channel_async(broadcaster_id: str):
+    return await asyncio.to_thread(get_cached_twitch_channel, broadcaster_id)
+
+async def get_fctd_user_id_cached(username: str):
+    # on_ready runs on every reconnect; serve the id from the lookup cache and only ask Twitch when it's missing or stale.
+    if not username or not config_manager.fctd_twitch_api:
+        return None
+    _ensure_lookup_cache_configured()
+    cache_key = username.lower()
+    cached_entry = uta_lookup_cache.get("login_to_id", cache_key)
+
+    async def _refresh_user_id():
+        user_id = await config_manager.fctd_twitch_api.get_user_id(username)
+        if user_id:
+            await asyncio.to_thread(uta_lookup_cache.set, "login_to_id", cache_key, user_id, config_manager.UTA_LOOKUP_CACHE_ID_TTL_SECONDS)
+        return user_id
+
+    if cached_entry is None:
+        return await _refresh_user_id()
+    if not cached_entry.is_fresh():
+        service_supervisor.spawn(_refresh_user_id(), name="UTA-FCTDUserIdRefresh")
+    return cached_entry.value
@@ -0,0 +1,276 @@
+"""Coordinator mode: UTA channel services spread over N worker processes that claim channels through a SQLite lease table.
+
+The bot process runs worker_pool_coordinator_task (spawns, watches and respawns workers) and keeps serving commands.
+Each worker is `python -m uta_bot.services.worker_pool --worker-id worker-N`, running the normal services for the
+channels it holds leases on. A dead or hung worker's leases expire (or are freed by the coordinator) and the
+surviving workers pick those channels up on their next heartbeat."""
+import logging
+import os
+import sys
+import time
+import signal
+import asyncio
+import argparse
+import sqlite3
+import subprocess
+
+from uta_bot import config_manager
+from uta_bot.utils.channel_leases import ChannelLeaseTable
+from .threading_manager import shutdown_event, start_all_services, stop_all_services, start_channel_services, stop_channel_services
+from .service_supervisor import service_supervisor, RESTART_BACKOFF_MIN_SECONDS, RESTART_BACKOFF_MAX_SECONDS, HEALTHY_RUN_SECONDS
+from .live_reconfig import plan_reconfiguration, apply_live_changes, RECONFIG_SERVICE_RESTART
+
+logger = logging.getLogger(__name__)
+
+
+WORKER_CHECK_INTERVAL_SECONDS = 5
+WORKER_STOP_TIMEOUT_SECONDS = 20 # A worker holding the primary channel may need to stop FFmpeg/Streamlink first; stays under SERVICE_STOP_TIMEOUT_SECONDS
+WORKER_HUNG_LEASE_FACTOR = 2 # A live process that hasn't heartbeated for lease * this is killed and respawned
+
+_lease_table: ChannelLeaseTable = None
+
+def get_lease_table() -> ChannelLeaseTable:
+    global _lease_table
+    if _lease_table is None or _lease_table.db_path != config_manager.UTA_WORKER_LEASE_DB_FILE:
+        if _lease_table is not None:
+            _lease_table.close()
+        _lease_table = ChannelLeaseTable(config_manager.UTA_WORKER_LEASE_DB_FILE)
+    return _lease_table
+
+
+class WorkerProcess:
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        self.process: subprocess.Popen = None
+        self.started_at = None
+        self.next_start_at = 0.0 # monotonic
+        self.backoff_seconds = RESTART_BACKOFF_MIN_SECONDS
+        self.restart_count = 0
+
+
+def _spawn_worker_process(worker_id: str) -> subprocess.Popen:
+    # Same interpreter and working directory (config.json, log paths); stdout/stderr are inherited so the GUI sees worker logs.
+    package_parent = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = package_parent + (os.pathsep + env["PYTHONPATH"] if env.get("PYTHONPATH") else "")
+    creationflags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    return subprocess.Popen([sys.executable, "-u", "-m", "uta_bot.services.worker_pool", "--worker-id", worker_id],
+                            env=env, creationflags=creationflags)
+
+def _stop_worker_process(worker: WorkerProcess):
+    process = worker.process
+    if process and process.poll() is None:
+        logger.info(f"UTA WorkerPool: Stopping {worker.worker_id} (PID: {process.pid})...")
+        try:
+            process.terminate()
+            process.wait(timeout=WORKER_STOP_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"UTA WorkerPool: {worker.worker_id} (PID: {process.pid}) did not stop after {WORKER_STOP_TIMEOUT_SECONDS}s, killing...")
+            process.kill()
+            process.wait()
+        except Exception as e:
+            logger.error(f"UTA WorkerPool: Error stopping {worker.worker_id} (PID: {process.pid}): {e}")
+    worker.process = None
+
+def _stop_worker_processes(workers: list):
+    # Signal everyone first so the workers shut down in parallel, then wait on each.
+    for worker in workers:
+        if worker.process and worker.process.poll() is None:
+            try:
+                worker.process.terminate()
+            except Exception as e:
+                logger.error(f"UTA WorkerPool: Error signalling {worker.worker_id}: {e}")
+    for worker in workers:
+        _stop_worker_process(worker)
+
+
+async def worker_pool_coordinator_task(bot_instance):
+    logger.info(f"UTA WorkerPool task ({asyncio.current_task().get_name()}) started.")
+    lease_table = get_lease_table()
+    await asyncio.to_thread(lease_table.reset) # Leases left by a previous run would otherwise block channels until they expire
+    workers = [WorkerProcess(f"worker-{i + 1}") for i in range(config_manager.UTA_WORKER_PROCESSES)]
+    last_summary = None
+
+    try:
+        while not shutdown_event.is_set():
+            service_supervisor.heartbeat()
+            try:
+                heartbeats = {w["worker_id"]: w["heartbeat_at"] for w in await asyncio.to_thread(lease_table.get_workers)}
+                now = time.monotonic()
+                for worker in workers:
+                    if worker.process is not None:
+                        exit_code = worker.process.poll()
+                        last_heartbeat_age = time.time() - heartbeats.get(worker.worker_id, time.time())
+                        hung = exit_code is None and time.monotonic() - worker.started_at > config_manager.UTA_WORKER_LEASE_SECONDS * WORKER_HUNG_LEASE_FACTOR and \
+                               last_heartbeat_age > config_manager.UTA_WORKER_LEASE_SECONDS * WORKER_HUNG_LEASE_FACTOR
+                        if exit_code is None and not hung:
+                            continue
+                        if hung:
+                            logger.error(f"UTA WorkerPool: {worker.worker_id} (PID: {worker.process.pid}) has not heartbeated for {int(last_heartbeat_age)}s. Restarting it.")
+                            await asyncio.to_thread(_stop_worker_process, worker)
+                        else:
+                            logger.error(f"UTA WorkerPool: {worker.worker_id} (PID: {worker.process.pid}) exited with code {exit_code}.")
+                            worker.process = None
+                        # Free its channels now instead of waiting out the lease, so failover takes one worker heartbeat.
+                        freed = await asyncio.to_thread(lease_table.release_worker, worker.worker_id)
+                        if freed:
+                            logger.warning(f"UTA WorkerPool: Released {freed} channel lease(s) held by {worker.worker_id} for failover.")
+                        if time.monotonic() - worker.started_at >= HEALTHY_RUN_SECONDS:
+                            worker.backoff_seconds = RESTART_BACKOFF_MIN_SECONDS
+                        worker.restart_count += 1
+                        worker.next_start_at = time.monotonic() + worker.backoff_seconds
+                        logger.info(f"UTA WorkerPool: Respawning {worker.worker_id} in {worker.backoff_seconds}s (restart #{worker.restart_count}).")
+                        worker.backoff_seconds = min(worker.backoff_seconds * 2, RESTART_BACKOFF_MAX_SECONDS)
+
+                    if worker.process is None and now >= worker.next_start_at:
+                        # Registered before it boots so the running workers already count it when sizing their share.
+                        await asyncio.to_thread(lease_table.register_worker, worker.worker_id)
+                        worker.process = await asyncio.to_thread(_spawn_worker_process, worker.worker_id)
+                        worker.started_at = time.monotonic()
+                        logger.info(f"UTA WorkerPool: Started {worker.worker_id} (PID: {worker.process.pid}).")
+
+                leases = await asyncio.to_thread(lease_table.get_leases)
+                running = sum(1 for w in workers if w.process is not None and w.process.poll() is None)
+                summary = f"{running}/{len(workers)} workers up, {len(leases)}/{len(config_manager.get_uta_configured_channels())} channels leased"
+                if summary != last_summary:
+                    last_summary = summary
+                    logger.info(f"UTA WorkerPool: {summary}.")
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"UTA WorkerPool: Error while checking workers: {e}", exc_info=True)
+
+            await service_supervisor.sleep(WORKER_CHECK_INTERVAL_SECONDS)
+    finally:
+        await asyncio.to_thread(_stop_worker_processes, workers)
+        try:
+            await asyncio.to_thread(lease_table.reset)
+        except sqlite3.Error as e:
+            logger.error(f"UTA WorkerPool: Could not clear the lease table on shutdown: {e}")
+        logger.info(f"UTA WorkerPool task ({asyncio.current_task().get_name()}) has finished.")
+
+
+def get_worker_pool_status() -> dict:
+    """Lease table contents for !utastatus in the bot process: worker_id -> {"heartbeat_at", "pid", "channels"}."""
+    lease_table = get_lease_table()
+    status = {w["worker_id"]: {"heartbeat_at": w["heartbeat_at"], "pid": w["pid"], "channels": []} for w in lease_table.get_workers()}
+    for lease in lease_table.get_leases():
+        status.setdefault(lease["worker_id"], {"heartbeat_at": None, "pid": None, "channels": []})["channels"].append(lease["channel"])
+    return status
+
+
+class HeadlessBotContext:
+    """What the services need from the bot inside a worker: the loop. Workers have no Discord connection, so
+    status notifications go out through the webhooks only."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+
+    def is_ready(self) -> bool:
+        return True
+
+    def get_channel(self, channel_id):
+        return None
+
+
+async def channel_lease_task(bot_instance):
+    # Runs inside a worker: renews its leases, claims free ones and starts/stops channel services as the set changes.
+    logger.info(f"UTA ChannelLeases task ({asyncio.current_task().get_name()}) started.")
+    lease_table = get_lease_table()
+    last_renewed_at = time.time()
+    config_mtime = _get_config_mtime()
+
+    while not shutdown_event.is_set():
+        service_supervisor.heartbeat()
+        if _get_config_mtime() != config_mtime:
+            config_mtime = _get_config_mtime()
+            await _reload_worker_config()
+        try:
+            held = await asyncio.to_thread(lease_table.claim_and_renew, config_manager.UTA_WORKER_ID, config_manager.get_uta_configured_channels(),
+                                           config_manager.UTA_WORKER_LEASE_SECONDS, config_manager.UTA_WORKER_MAX_CHANNELS)
+            last_renewed_at = time.time()
+            await _apply_channel_scope(bot_instance, held)
+        except sqlite3.Error as e:
+            logger.error(f"UTA ChannelLeases: Lease renewal failed: {e}")
+            if time.time() - last_renewed_at > config_manager.UTA_WORKER_LEASE_SECONDS and config_manager.uta_worker_channel_scope:
+                # Our leases have expired by now and another worker may already be running these channels.
+                logger.critical("UTA ChannelLeases: Leases expired without renewal. Stopping this worker's channel services.")
+                await _apply_channel_scope(bot_instance, [])
+        await service_supervisor.sleep(max(1, config_manager.UTA_WORKER_LEASE_SECONDS / 3))
+
+def _get_config_mtime() -> float:
+    try:
+        return os.path.getmtime(config_manager.CONFIG_FILE)
+    except OSError:
+        return None
+
+async def _reload_worker_config():
+    # !reloadconfig runs in the bot process; workers follow config.json themselves for everything that applies live.
+    old_config = config_manager.config_data.copy()
+    success, new_config = config_manager.load_config(initial_load=False)
+    if not success:
+        logger.error(f"UTA Worker {config_manager.UTA_WORKER_ID}: Ignoring config.json change: {new_config}")
+        return
+    plan = plan_reconfiguration(old_config, new_config)
+    config_manager.config_data = new_config
+    config_manager.apply_config_globally(new_config)
+    if plan[RECONFIG_SERVICE_RESTART]:
+        logger.warning(f"UTA Worker {config_manager.UTA_WORKER_ID}: {', '.join(plan[RECONFIG_SERVICE_RESTART])} changed; "
+                       "these apply when the coordinator restarts the workers on !reloadconfig.")
+    await apply_live_changes(plan)
+
+async def _apply_channel_scope(bot_instance, held_channels: list):
+    from .stream_state_hub import stream_state_hub
+    old_scope = config_manager.uta_worker_channel_scope or set()
+    new_scope = {c.lower() for c in held_channels}
+    if new_scope == old_scope:
+        return
+    lost = [c for c in config_manager.get_uta_configured_channels() if c.lower() in old_scope - new_scope]
+    gained = [c for c in held_channels if c.lower() not in old_scope]
+    config_manager.uta_worker_channel_scope = new_scope
+    for channel_name in lost:
+        await stop_channel_services(channel_name)
+    for channel_name in gained:
+        start_channel_services(bot_instance, channel_name)
+    if gained:
+        stream_state_hub.request_poll() # The hub picks up the new scope on its next poll; don't make the new channels wait for it
+    logger.info(f"UTA ChannelLeases: {config_manager.UTA_WORKER_ID} now holds {sorted(new_scope) or 'no channels'}"
+                f"{f' (gained {gained})' if gained else ''}{f' (lost {lost})' if lost else ''}.")
+
+
+async def _run_worker(worker_id: str):
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    if os.name != 'nt': # On Windows the coordinator's terminate() is a hard kill anyway
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_requested.set)
+
+    bot_context = HeadlessBotContext(loop)
+    lease_table = get_lease_table()
+    held = await asyncio.to_thread(lease_table.claim_and_renew, worker_id, config_manager.get_uta_configured_channels(),
+                                   config_manager.UTA_WORKER_LEASE_SECONDS, config_manager.UTA_WORKER_MAX_CHANNELS)
+    config_manager.uta_worker_channel_scope = {c.lower() for c in held}
+    logger.info(f"UTA Worker {worker_id}: Starting with {held or 'no channels yet'}.")
+
+    start_all_services(bot_context)
+    service_supervisor.start("ChannelLeases", channel_lease_task, bot_context)
+    try:
+        await stop_requested.wait()
+    finally:
+        logger.info(f"UTA Worker {worker_id}: Stopping.")
+        await stop_all_services()
+        try:
+            await asyncio.to_thread(lease_table.release_worker, worker_id)
+        except sqlite3.Error as e:
+            logger.error(f"UTA Worker {worker_id}: Could not release leases on exit: {e}")
+
+def run_worker(worker_id: str):
+    config_manager.UTA_WORKER_ID = worker_id
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(f'%(asctime)s:%(levelname)s:%(name)s:[{worker_id}]: %(message)s'))
+    asyncio.run(_run_worker(worker_id))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UTA coordinator-mode worker process.")
+    parser.add_argument("--worker-id", required=True)
+    args = parser.parse_args()
+    run_worker(args.worker_id)
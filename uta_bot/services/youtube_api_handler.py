@@ -5,6 +5,8 @@ import time
 import random
 
 from uta_bot import config_manager
+from uta_bot.utils.circuit_breaker import api_breakers, CircuitOpenError, is_http_failure_status
+from .youtube_quota import youtube_quota_ledger, quota_cost
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,11 @@ def get_youtube_service(force_reinitialize=False):
             logger.error(f"UTA YouTube: Error loading token file '{config_manager.UTA_YOUTUBE_TOKEN_FILE}': {e}. Will attempt re-auth.")
             creds = None
 
+    if not creds and config_manager.UTA_YOUTUBE_API_ROOT_URL and not os.path.exists(config_manager.UTA_YOUTUBE_CLIENT_SECRET_FILE):
+        # Pointed at a local stand-in with no OAuth client set up; the stand-in accepts any bearer token.
+        logger.warning(f"UTA YouTube: No credentials; using a placeholder token against {config_manager.UTA_YOUTUBE_API_ROOT_URL}.")
+        creds = config_manager.GoogleCredentials(token="uta-standin-token")
+
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             logger.info("UTA YouTube: Refreshing expired YouTube API token.")
@@ -66,7 +73,9 @@ def get_youtube_service(force_reinitialize=False):
 
     if creds and creds.valid:
         try:
-            config_manager.uta_yt_service = config_manager.google_build('youtube', 'v3', credentials=creds, cache_discovery=False)
+            client_options = {"api_endpoint": config_manager.UTA_YOUTUBE_API_ROOT_URL} if config_manager.UTA_YOUTUBE_API_ROOT_URL else None
+            config_manager.uta_yt_service = config_manager.google_build('youtube', 'v3', credentials=creds, cache_discovery=False,
+                                                                        client_options=client_options)
             logger.info("UTA YouTube: YouTube API service initialized successfully.")
             return config_manager.uta_yt_service
         except Exception as e:
@@ -78,6 +87,88 @@ def get_youtube_service(force_reinitialize=False):
         config_manager.uta_yt_service = None
         return None
 
+_batch_unsupported = False # Set once the batch endpoint rejects a whole batch; later batches run as concurrent single calls
+
+def _quota_method(request) -> str:
+    # googleapiclient's methodId is e.g. "youtube.liveBroadcasts.insert"
+    return (getattr(request, 'methodId', None) or "unknown").split(".", 1)[-1]
+
+def _record_youtube_outcome(breaker, latency_seconds: float, error: Exception = None):
+    # Quota/permission errors (4xx) don't count as outages.
+    status_code = getattr(getattr(error, 'resp', None), 'status', None)
+    if error is not None and b"quotaExceeded" in (getattr(error, 'content', None) or b""):
+        youtube_quota_ledger.mark_exhausted()
+    if error is None or (status_code is not None and not is_http_failure_status(int(status_code))):
+        breaker.record_success(latency_seconds)
+    else:
+        breaker.record_failure(latency_seconds, f"HTTP {status_code}" if status_code else type(error).__name__)
+
+async def _execute_youtube_request(request, breaker_name: str, http=None):
+    # Runs a googleapiclient request through the endpoint's circuit breaker.
+    breaker = api_breakers.get(breaker_name)
+    if not breaker.allow_request():
+        raise CircuitOpenError(breaker_name, breaker.retry_in_seconds())
+    youtube_quota_ledger.record(_quota_method(request))
+    started_at = time.monotonic()
+    try:
+        response = await asyncio.to_thread(request.execute, http=http)
+    except Exception as e:
+        _record_youtube_outcome(breaker, time.monotonic() - started_at, e)
+        raise
+    _record_youtube_outcome(breaker, time.monotonic() - started_at)
+    return response
+
+def _own_http(request):
+    # httplib2.Http isn't thread-safe, and every request of a service shares one; concurrent calls each get a fresh connection.
+    if isinstance(request.http, config_manager.GoogleAuthorizedHttp):
+        return config_manager.GoogleAuthorizedHttp(request.http.credentials, http=config_manager.google_build_http())
+    return config_manager.google_build_http()
+
+async def _execute_timed(request, breaker_name: str, http=None) -> tuple:
+    started_at = time.monotonic()
+    try:
+        return await _execute_youtube_request(request, breaker_name, http), None, time.monotonic() - started_at
+    except Exception as e:
+        return None, e, time.monotonic() - started_at
+
+async def _execute_youtube_calls(service, calls: dict) -> dict:
+    """Runs independent requests, {name: (request, breaker_name)}, and returns {name: (response, error, latency_seconds)}.
+    With UTA_YOUTUBE_BATCH_REQUESTS_ENABLED they go out as one BatchHttpRequest (every call then reports the batch's
+    round trip as its latency); otherwise, or if the batch endpoint refuses, they run concurrently."""
+    global _batch_unsupported
+    names = list(calls)
+    if len(calls) > 1 and config_manager.UTA_YOUTUBE_BATCH_REQUESTS_ENABLED and not _batch_unsupported:
+        results = {}
+        if config_manager.UTA_YOUTUBE_API_ROOT_URL: # The discovery document's batch URI ignores the api_endpoint override
+            batch = config_manager.GoogleBatchHttpRequest(batch_uri=f"{config_manager.UTA_YOUTUBE_API_ROOT_URL.rstrip('/')}/batch")
+        else:
+            batch = service.new_batch_http_request()
+        for name, (request, breaker_name) in calls.items():
+            breaker = api_breakers.get(breaker_name)
+            if not breaker.allow_request():
+                results[name] = (None, CircuitOpenError(breaker_name, breaker.retry_in_seconds()), 0.0)
+                continue
+            batch.add(request, callback=lambda request_id, response, exception, name=name: results.__setitem__(name, (response, exception, None)),
+                      request_id=name)
+        started_at = time.monotonic()
+        try:
+            await asyncio.to_thread(batch.execute)
+        except Exception as e:
+            logger.warning(f"UTA YouTube: Batch request failed as a whole ({e}); sending calls individually from now on.")
+            _batch_unsupported = True
+        else:
+            latency_seconds = time.monotonic() - started_at
+            for name in names:
+                response, error, latency = results.get(name, (None, None, 0.0))
+                if latency is None: # Went out in the batch
+                    youtube_quota_ledger.record(_quota_method(calls[name][0])) # Charged as if sent alone
+                    _record_youtube_outcome(api_breakers.get(calls[name][1]), latency_seconds, error)
+                    results[name] = (response, error, latency_seconds)
+            return results
+    outcomes = await asyncio.gather(*(_execute_timed(request, breaker_name, _own_http(request) if len(calls) > 1 else None)
+                                      for request, breaker_name in calls.values()))
+    return dict(zip(names, outcomes))
+
 async def create_youtube_live_stream_resource(service, twitch_username: str):
     if not service: return None, None, None
 
@@ -97,7 +188,7 @@ async def create_youtube_live_stream_resource(service, twitch_username: str):
             "status": {"streamStatus": "ready"}
         }
         request = service.liveStreams().insert(part="snippet,cdn,status", body=request_body)
-        response = await asyncio.to_thread(request.execute)
+        response = await _execute_youtube_request(request, "youtube:liveStreams")
 
         stream_id = response['id']
         ingestion_info = response['cdn']['ingestionInfo']
@@ -106,6 +197,8 @@ async def create_youtube_live_stream_resource(service, twitch_username: str):
 
         logger.info(f"UTA YouTube: Successfully created liveStream resource ID: {stream_id} for {twitch_username}")
         return stream_id, rtmp_url, stream_key
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         logger.error(f"UTA YouTube: API error creating liveStream resource: {e.content.decode() if e.content else e}", exc_info=True)
     except Exception as e:
@@ -135,7 +228,7 @@ async def create_youtube_broadcast(service, bound_live_stream_id: str, title: st
             }
         }
         insert_request = service.liveBroadcasts().insert(part="snippet,status,contentDetails", body=request_body)
-        response = await asyncio.to_thread(insert_request.execute)
+        response = await _execute_youtube_request(insert_request, "youtube:liveBroadcasts")
         broadcast_id = response['id']
 
         bind_request = service.liveBroadcasts().bind(
@@ -143,10 +236,12 @@ async def create_youtube_broadcast(service, bound_live_stream_id: str, title: st
             part="id,snippet,contentDetails,status",
             streamId=bound_live_stream_id
         )
-        await asyncio.to_thread(bind_request.execute)
+        await _execute_youtube_request(bind_request, "youtube:liveBroadcasts")
 
         logger.info(f"UTA YouTube: Successfully created and bound liveBroadcast ID: {broadcast_id} (Title: {title}) to stream ID: {bound_live_stream_id}")
         return broadcast_id
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         logger.error(f"UTA YouTube: API error creating/binding liveBroadcast: {e.content.decode() if e.content else e}", exc_info=True)
     except Exception as e:
@@ -161,15 +256,92 @@ async def transition_youtube_broadcast(service, broadcast_id: str, status: str):
             id=broadcast_id,
             part="id,snippet,contentDetails,status"
         )
-        await asyncio.to_thread(request.execute)
+        await _execute_youtube_request(request, "youtube:liveBroadcasts")
         logger.info(f"UTA YouTube: Successfully transitioned broadcast {broadcast_id} to status '{status}'.")
         return True
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         logger.error(f"UTA YouTube: API error transitioning broadcast {broadcast_id} to '{status}': {e.content.decode() if e.content else e}", exc_info=True)
     except Exception as e:
         logger.error(f"UTA YouTube: Unexpected error transitioning broadcast {broadcast_id} to '{status}': {e}", exc_info=True)
     return False
 
+async def get_youtube_live_stream_status(service, live_stream_id: str):
+    """The liveStream's status from liveStreams.list(part=status): {"stream_status", "health_status", "issues"}, where
+    issues are (severity, type, description) tuples from the health check's configurationIssues. None on errors."""
+    if not service or not live_stream_id: return None
+    try:
+        request = service.liveStreams().list(part="status", id=live_stream_id)
+        response = await _execute_youtube_request(request, "youtube:liveStreams")
+        if not response or not response.get("items"):
+            logger.warning(f"UTA YouTube: liveStream {live_stream_id} not found when checking its status.")
+            return None
+        status = response["items"][0].get("status", {})
+        health = status.get("healthStatus", {})
+        issues = [(issue.get("severity"), issue.get("type"), issue.get("description") or issue.get("reason"))
+                  for issue in health.get("configurationIssues", [])]
+        return {"stream_status": status.get("streamStatus"), "health_status": health.get("status"), "issues": issues}
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
+    except config_manager.GoogleHttpError as e:
+        # Polled all stream long, so no traceback.
+        logger.warning(f"UTA YouTube: API error getting status of liveStream {live_stream_id}: {e.content.decode() if e.content else e}")
+    except Exception as e:
+        logger.error(f"UTA YouTube: Unexpected error getting status of liveStream {live_stream_id}: {e}", exc_info=True)
+    return None
+
+async def finalize_youtube_part(service, broadcast_id: str, video_id: str, new_description: str = None, privacy_status: str = None) -> dict:
+    """Ends a part's broadcast and applies its final description and privacy in two round trips instead of a serial
+    chain: liveBroadcasts.transition(complete) and videos.list go out together, then one videos.update carries both
+    the snippet and the status change. Returns {call: latency in ms, or None if the call failed}."""
+    timings = {}
+    if not service or not broadcast_id: return timings
+    calls = {"liveBroadcasts.transition": (service.liveBroadcasts().transition(broadcastStatus="complete", id=broadcast_id, part="id,status"),
+                                           "youtube:liveBroadcasts")}
+    if video_id and (new_description is not None or privacy_status):
+        calls["videos.list"] = (service.videos().list(part="snippet,status", id=video_id), "youtube:videos")
+    results = await _execute_youtube_calls(service, calls)
+    for name, (_, error, latency_seconds) in results.items():
+        timings[name] = None if error else latency_seconds * 1000
+
+    transition_error = results["liveBroadcasts.transition"][1]
+    if transition_error is None:
+        logger.info(f"UTA YouTube: Successfully transitioned broadcast {broadcast_id} to status 'complete'.")
+    elif isinstance(transition_error, CircuitOpenError):
+        logger.warning(f"UTA YouTube: {transition_error}")
+    else:
+        error_text = transition_error.content.decode() if getattr(transition_error, 'content', None) else transition_error
+        logger.error(f"UTA YouTube: API error transitioning broadcast {broadcast_id} to 'complete': {error_text}")
+
+    if "videos.list" not in results:
+        return timings
+    video_response, list_error, _ = results["videos.list"]
+    if list_error or not video_response or not video_response.get("items"):
+        logger.error(f"UTA YouTube: Could not fetch video {video_id} to finalize its description/privacy: {list_error or 'not found'}")
+        return timings
+    video = video_response["items"][0]
+    snippet, status = video.get("snippet", {}), video.get("status", {})
+    body, parts = {"id": video_id}, []
+    if new_description is not None and new_description != snippet.get("description", ""):
+        body["snippet"] = {"title": snippet.get("title"), "description": new_description, "tags": snippet.get("tags", []),
+                           "categoryId": snippet.get("categoryId")}
+        parts.append("snippet")
+    if privacy_status and privacy_status != status.get("privacyStatus"):
+        body["status"] = {"privacyStatus": privacy_status}
+        parts.append("status")
+    if not parts:
+        logger.info(f"UTA YouTube: Video {video_id} already has its final description/privacy.")
+        return timings
+    update_response, update_error, latency_seconds = await _execute_timed(service.videos().update(part=",".join(parts), body=body), "youtube:videos")
+    timings["videos.update"] = None if update_error else latency_seconds * 1000
+    if update_error:
+        error_text = update_error.content.decode() if getattr(update_error, 'content', None) else update_error
+        logger.error(f"UTA YouTube: API error finalizing {'/'.join(parts)} of video {video_id}: {error_text}")
+    else:
+        logger.info(f"UTA YouTube: Updated {'/'.join(parts)} of video {video_id}" + (f" (now {privacy_status})." if "status" in parts else "."))
+    return timings
+
 async def get_youtube_video_details(service, video_id: str):
     """Fetches video details, primarily for the snippet which includes title, description, categoryId."""
     if not service or not video_id: return None
@@ -178,11 +350,13 @@ async def get_youtube_video_details(service, video_id: str):
             part="snippet", # Fetch the whole snippet
             id=video_id
         )
-        response = await asyncio.to_thread(request.execute)
+        response = await _execute_youtube_request(request, "youtube:videos")
         if response and response.get("items"):
             return response["items"][0]
         logger.warning(f"UTA YouTube Get Details: Video details not found for ID {video_id}. API response: {response}")
         return None
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         logger.error(f"UTA YouTube Get Details: API error getting video details for {video_id}: {e.content.decode() if e.content else e}", exc_info=True)
     except Exception as e:
@@ -255,9 +429,11 @@ async def update_youtube_broadcast_metadata(service, broadcast_id_or_video_id: s
         logger.debug(f"UTA YouTube Update Meta: Request body for video {broadcast_id_or_video_id}: {request_body_for_log}")
 
         request = service.videos().update(part="snippet", body=request_body_for_log)
-        await asyncio.to_thread(request.execute)
+        await _execute_youtube_request(request, "youtube:videos")
         logger.info(f"UTA YouTube Update Meta: Successfully updated snippet metadata for video/broadcast {broadcast_id_or_video_id}.")
         return True
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         logger.error(f"UTA YouTube Update Meta: API error updating metadata for {broadcast_id_or_video_id}. Sent body: {request_body_for_log}. Error: {e.content.decode() if e.content else e}", exc_info=True)
     except Exception as e:
@@ -267,6 +443,9 @@ async def update_youtube_broadcast_metadata(service, broadcast_id_or_video_id: s
 
 async def add_video_to_youtube_playlist(service, video_id: str, playlist_id: str):
     if not service or not video_id or not playlist_id: return False
+    if not youtube_quota_ledger.allows_optional(quota_cost("playlistItems.insert")):
+        logger.warning(f"UTA YouTube: Skipping adding video {video_id} to playlist {playlist_id} to save API quota.")
+        return False
     try:
         request_body = {
             "snippet": {
@@ -278,9 +457,11 @@ async def add_video_to_youtube_playlist(service, video_id: str, playlist_id: str
             }
         }
         request = service.playlistItems().insert(part="snippet", body=request_body)
-        await asyncio.to_thread(request.execute)
+        await _execute_youtube_request(request, "youtube:playlistItems")
         logger.info(f"UTA YouTube: Successfully added video {video_id} to playlist {playlist_id}.")
         return True
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         if hasattr(e, 'resp') and e.resp.status == 409 and "playlistItemNotUnique" in str(e.content):
             logger.info(f"UTA YouTube: Video {video_id} is already in playlist {playlist_id}.")
@@ -305,9 +486,11 @@ async def set_youtube_video_privacy(service, video_id: str, privacy_status: str)
             }
         }
         request = service.videos().update(part="status", body=request_body)
-        await asyncio.to_thread(request.execute)
+        await _execute_youtube_request(request, "youtube:videos")
         logger.info(f"UTA YouTube: Successfully set privacy of video {video_id} to '{privacy_status}'.")
         return True
+    except CircuitOpenError as e:
+        logger.warning(f"UTA YouTube: {e}")
     except config_manager.GoogleHttpError as e:
         logger.error(f"UTA YouTube: API error setting privacy for video {video_id}: {e.content.decode() if e.content else e}", exc_info=True)
     except Exception as e:
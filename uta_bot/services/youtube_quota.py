@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from uta_bot import config_manager
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles") # YouTube's quota day starts at midnight Pacific
+except (ImportError, KeyError): # No tz database (Windows without the tzdata package)
+    _QUOTA_TZ = timezone(timedelta(hours=-8)) # PST; the reset is an hour off while DST is in effect
+
+# Units per call from YouTube's quota table. Anything not listed (the list calls) costs 1.
+QUOTA_COSTS = {
+    "liveStreams.insert": 50, "liveStreams.update": 50, "liveStreams.delete": 50,
+    "liveBroadcasts.insert": 50, "liveBroadcasts.bind": 50, "liveBroadcasts.transition": 50,
+    "liveBroadcasts.update": 50, "liveBroadcasts.delete": 50,
+    "videos.update": 50, "playlistItems.insert": 50,
+}
+PART_SETUP_COST = QUOTA_COSTS["liveStreams.insert"] + QUOTA_COSTS["liveBroadcasts.insert"] + QUOTA_COSTS["liveBroadcasts.bind"]
+PART_FINISH_COST = QUOTA_COSTS["liveBroadcasts.transition"] + 1 + QUOTA_COSTS["videos.update"] # transition, videos.list, videos.update
+NEW_PART_COST = PART_SETUP_COST + PART_FINISH_COST # A part is only started if it can also be finished
+
+
+def quota_cost(method: str) -> int:
+    return QUOTA_COSTS.get(method, 1)
+
+
+class YouTubeQuotaLedger:
+    """Units spent against the YouTube Data API's daily quota, counted per call as youtube_api_handler sends it.
+    Persisted to UTA_YOUTUBE_QUOTA_LEDGER_FILE so a restart keeps the day's total; resets with YouTube's quota day."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ledger_path = None
+        self.day = None # Quota day (Pacific date) the counts belong to
+        self.used = 0
+        self.calls = {} # method -> calls today
+        self.first_call_at = None # Unix time of the day's first call; the burn rate is averaged from here
+        self.exhausted = False # YouTube answered quotaExceeded today
+        self._forecast_warned = False
+
+    def configure(self, ledger_path: str):
+        # Loads the ledger the first time (or when the path changes). Safe to call repeatedly.
+        with self._lock:
+            if ledger_path == self._ledger_path:
+                return
+            self._ledger_path = ledger_path
+            self._reset_day(None)
+            if not ledger_path or not os.path.exists(ledger_path):
+                return
+            try:
+                with open(ledger_path, 'r', encoding='utf-8') as f:
+                    ledger = json.load(f)
+                self.day, self.used, self.calls = ledger["day"], int(ledger["used"]), dict(ledger.get("calls", {}))
+                self.first_call_at, self.exhausted = ledger.get("first_call_at"), bool(ledger.get("exhausted"))
+                logger.info(f"UTA YouTube Quota: Restored {self.used} unit(s) used on {self.day} from {ledger_path}.")
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"UTA YouTube Quota: Could not load {ledger_path}, starting from zero: {e}")
+                self._reset_day(None)
+
+    def _reset_day(self, day):
+        self.day, self.used, self.calls, self.first_call_at, self.exhausted = day, 0, {}, None, False
+        self._forecast_warned = False
+
+    def _roll_day(self):
+        # Caller holds the lock.
+        today = datetime.now(_QUOTA_TZ).date().isoformat()
+        if self.day != today:
+            if self.day and self.used:
+                logger.info(f"UTA YouTube Quota: New quota day; {self.used} unit(s) were used on {self.day}.")
+            self._reset_day(today)
+
+    def _save(self):
+        # Caller holds the lock. A few hundred bytes per API call, which is at most a few a minute.
+        if not self._ledger_path:
+            return
+        temp_path = f"{self._ledger_path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"day": self.day, "used": self.used, "calls": self.calls,
+                           "first_call_at": self.first_call_at, "exhausted": self.exhausted}, f)
+            os.replace(temp_path, self._ledger_path)
+        except OSError as e:
+            logger.error(f"UTA YouTube Quota: Failed to write {self._ledger_path}: {e}")
+
+    def record(self, method: str):
+        # YouTube charges a call whether or not it succeeds, so this runs for every request sent.
+        with self._lock:
+            self._roll_day()
+            self.used += quota_cost(method)
+            self.calls[method] = self.calls.get(method, 0) + 1
+            if self.first_call_at is None:
+                self.first_call_at = time.time()
+            self._save()
+            forecast = self._forecast_locked()
+            warn = forecast is not None and not self._forecast_warned
+            self._forecast_warned = self._forecast_warned or warn
+            summary = self._summary_locked()
+        if warn:
+            logger.warning(f"UTA YouTube Quota: At today's rate the quota runs out around {forecast.strftime('%H:%M UTC')}, "
+                           f"before it resets. Optional calls (chapter-only updates, playlist adds, health monitoring) are skipped while that holds.")
+        config_manager.logger.info(f"UTA_GUI_LOG: YouTubeQuota={summary}")
+
+    def mark_exhausted(self):
+        with self._lock:
+            self._roll_day()
+            if self.exhausted:
+                return
+            self.exhausted = True
+            self._save()
+        logger.error("UTA YouTube Quota: YouTube reports the daily quota as exceeded. API calls will fail until it resets.")
+        config_manager.logger.info("UTA_GUI_LOG: YouTubeQuota=Exhausted")
+
+    def _remaining_locked(self) -> int:
+        return 0 if self.exhausted else max(0, config_manager.UTA_YOUTUBE_QUOTA_DAILY_LIMIT - self.used)
+
+    def remaining(self) -> int:
+        with self._lock:
+            self._roll_day()
+            return self._remaining_locked()
+
+    def can_afford(self, units: int) -> bool:
+        """True if spending units still leaves UTA_YOUTUBE_QUOTA_RESERVE_UNITS for finishing the parts already started."""
+        with self._lock:
+            self._roll_day()
+            return self._remaining_locked() - units >= config_manager.UTA_YOUTUBE_QUOTA_RESERVE_UNITS
+
+    def allows_optional(self, units: int) -> bool:
+        # Optional calls also stop once the forecast says the quota won't last until the reset.
+        with self._lock:
+            self._roll_day()
+            if self._remaining_locked() - units < config_manager.UTA_YOUTUBE_QUOTA_RESERVE_UNITS:
+                return False
+            return self._forecast_locked() is None
+
+    def _next_reset_locked(self) -> datetime:
+        now_local = datetime.now(_QUOTA_TZ)
+        midnight = datetime.combine(now_local.date() + timedelta(days=1), datetime.min.time(), tzinfo=_QUOTA_TZ)
+        return midnight.astimezone(timezone.utc)
+
+    def _forecast_locked(self):
+        if self.exhausted:
+            return datetime.now(timezone.utc)
+        if not self.used or not self.first_call_at:
+            return None
+        # At least an hour's window, so one rollover's burst of inserts isn't read as the day's rate.
+        burn_per_second = self.used / max(time.time() - self.first_call_at, 3600)
+        runs_out_at = datetime.fromtimestamp(time.time() + self._remaining_locked() / burn_per_second, tz=timezone.utc)
+        return runs_out_at if runs_out_at < self._next_reset_locked() else None
+
+    def forecast_exhaustion(self):
+        """When today's quota runs out at the day's average rate so far, or None if it lasts until the reset."""
+        with self._lock:
+            self._roll_day()
+            return self._forecast_locked()
+
+    def next_reset(self) -> datetime:
+        with self._lock:
+            return self._next_reset_locked()
+
+    def _summary_locked(self) -> str:
+        return f"{self.used}/{config_manager.UTA_YOUTUBE_QUOTA_DAILY_LIMIT} units ({self._remaining_locked()} left)"
+
+    def describe(self) -> str:
+        """Multi-line summary for !utaytstatus: usage, the priciest calls, the forecast and whether anything is being skipped."""
+        with self._lock:
+            self._roll_day()
+            lines = [f"Used today: {self._summary_locked()}"]
+            if self.calls:
+                by_cost = sorted(self.calls.items(), key=lambda item: quota_cost(item[0]) * item[1], reverse=True)
+                lines.append("Top calls: " + ", ".join(f"{method} x{count} ({quota_cost(method) * count})" for method, count in by_cost[:4]))
+            forecast = self._forecast_locked()
+            if self.exhausted:
+                lines.append("Quota exceeded (reported by YouTube).")
+            elif forecast:
+                lines.append(f"Forecast: runs out around {forecast.strftime('%H:%M UTC')} at today's rate.")
+            else:
+                lines.append("Forecast: lasts until the reset at today's rate.")
+            lines.append(f"Resets: {self._next_reset_locked().strftime('%Y-%m-%d %H:%M UTC')}")
+            remaining = self._remaining_locked()
+            reserve = config_manager.UTA_YOUTUBE_QUOTA_RESERVE_UNITS
+            if remaining - NEW_PART_COST < reserve:
+                lines.append("New parts: not affordable (scheduled rollovers wait for the reset" +
+                             (", new sessions use legacy RTMP)." if config_manager.UTA_YOUTUBE_QUOTA_LEGACY_FALLBACK_ENABLED else ")."))
+            elif forecast:
+                lines.append("Optional calls: skipped to stretch the quota.")
+            return "\n".join(lines)
+
+
+youtube_quota_ledger = YouTubeQuotaLedger()
@@ -23,6 +23,10 @@ from .data_logging import (
     get_total_chat_messages_from_log,
     get_peak_unique_chatters_from_log,
     count_records_in_file,
-    count_distinct_games_from_activity
+    count_distinct_games_from_activity,
+    read_stream_activity_event_times
 )
-from .chapter_utils import generate_chapter_text, format_seconds_to_hhmmss
\ No newline at end of file
+from .chapter_utils import generate_chapter_text, format_seconds_to_hhmmss
+from .lookup_cache import PersistentLRUCache, LOOKUP_NOT_FOUND
+from .circuit_breaker import api_breakers, CircuitOpenError, guarded_request, post_discord_webhook
+from .segment_index import append_segment_record, read_segment_index, select_segments_for_window, enforce_segment_retention
\ No newline at end of file
@@ -0,0 +1,131 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelLeaseTable:
+    """Channel -> worker leases in a small SQLite file shared by the coordinator and its worker processes.
+
+    A lease is only valid until expires_at; a worker that stops renewing loses its channels to whoever claims next."""
+
+    def __init__(self, db_path: str, busy_timeout_seconds: float = 10):
+        self.db_path = db_path
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self._lock = threading.Lock() # One connection per table object, used from worker threads via asyncio.to_thread
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            # isolation_level=None: transactions are opened explicitly with BEGIN IMMEDIATE so claims can't interleave.
+            self._conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_seconds, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS channel_leases (
+                                      channel TEXT PRIMARY KEY,
+                                      worker_id TEXT NOT NULL,
+                                      acquired_at REAL NOT NULL,
+                                      renewed_at REAL NOT NULL,
+                                      expires_at REAL NOT NULL)""")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS workers (
+                                      worker_id TEXT PRIMARY KEY,
+                                      pid INTEGER,
+                                      started_at REAL NOT NULL,
+                                      heartbeat_at REAL NOT NULL)""")
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def register_worker(self, worker_id: str, pid: int = None):
+        now = time.time()
+        with self._lock:
+            self._connect().execute("INSERT OR REPLACE INTO workers (worker_id, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?)",
+                                    (worker_id, pid, now, now))
+
+    def release_worker(self, worker_id: str) -> int:
+        """Drops a worker and all its leases (the coordinator calls this as soon as a worker process exits). Returns leases freed."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                freed = conn.execute("DELETE FROM channel_leases WHERE worker_id = ?", (worker_id,)).rowcount
+                conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return freed
+
+    def reset(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM channel_leases")
+            conn.execute("DELETE FROM workers")
+
+    def claim_and_renew(self, worker_id: str, channels: list, lease_seconds: float, max_channels: int = 0) -> list:
+        """One heartbeat round for a worker: renews what it holds, claims free/expired channels up to its fair share
+        and gives back any surplus so a restarted worker gets channels again. Returns the channels now held, in config order."""
+        now = time.time()
+        wanted = {c.lower(): c for c in channels}
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("UPDATE workers SET heartbeat_at = ?, pid = ? WHERE worker_id = ?", (now, os.getpid(), worker_id))
+                if conn.execute("SELECT changes()").fetchone()[0] == 0:
+                    conn.execute("INSERT INTO workers (worker_id, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?)",
+                                 (worker_id, os.getpid(), now, now))
+                live_workers = conn.execute("SELECT COUNT(*) FROM workers WHERE heartbeat_at >= ?", (now - lease_seconds,)).fetchone()[0]
+                share = max_channels if max_channels > 0 else math.ceil(len(wanted) / max(1, live_workers))
+
+                leases = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT channel, worker_id, expires_at FROM channel_leases")}
+                held = [key for key in wanted if key in leases and leases[key][0] == worker_id and leases[key][1] >= now]
+                # Channels removed from the config, or leases that expired under us, are dropped.
+                conn.execute(f"DELETE FROM channel_leases WHERE worker_id = ? AND channel NOT IN ({','.join('?' * len(held))})",
+                             (worker_id, *held))
+
+                while len(held) > share:
+                    surplus = held.pop() # Config order puts the primary channel first, so it is the last one given away
+                    conn.execute("DELETE FROM channel_leases WHERE channel = ? AND worker_id = ?", (surplus, worker_id))
+                    logger.info(f"UTA Leases: {worker_id} released {surplus} to rebalance ({live_workers} live worker(s), share {share}).")
+
+                for key in wanted:
+                    if len(held) >= share:
+                        break
+                    if key in held:
+                        continue
+                    holder = leases.get(key)
+                    if holder and holder[1] >= now:
+                        continue
+                    conn.execute("INSERT OR REPLACE INTO channel_leases (channel, worker_id, acquired_at, renewed_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                                 (key, worker_id, now, now, now + lease_seconds))
+                    held.append(key)
+                    if holder:
+                        logger.warning(f"UTA Leases: {worker_id} took over {key} from {holder[0]} (lease expired).")
+
+                conn.execute("UPDATE channel_leases SET renewed_at = ?, expires_at = ? WHERE worker_id = ?", (now, now + lease_seconds, worker_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return [wanted[key] for key in wanted if key in held]
+
+    def get_leases(self) -> list:
+        with self._lock:
+            rows = self._connect().execute("SELECT channel, worker_id, acquired_at, renewed_at, expires_at FROM channel_leases ORDER BY worker_id, channel").fetchall()
+        return [{"channel": r[0], "worker_id": r[1], "acquired_at": r[2], "renewed_at": r[3], "expires_at": r[4]} for r in rows]
+
+    def get_workers(self) -> list:
+        with self._lock:
+            rows = self._connect().execute("SELECT worker_id, pid, started_at, heartbeat_at FROM workers ORDER BY worker_id").fetchall()
+        return [{"worker_id": r[0], "pid": r[1], "started_at": r[2], "heartbeat_at": r[3]} for r in rows]
@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import requests
+
+from uta_bot import config_manager
+
+logger = logging.getLogger(__name__)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000) # Upper bounds; anything slower lands in the overflow bucket
+OUTCOME_WINDOW_SIZE = 100 # Error rate is over the last N calls, not all time
+
+# Endpoints shown even before their first call, so !deephealthcheck and the GUI always list the ones that matter
+WATCHED_ENDPOINTS = ("twitch:/streams", "twitch:/clips", "twitch:/channels/followers", "youtube:liveBroadcasts", "discord:webhook")
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an endpoint whose breaker is open. A RequestException so existing handlers already cover it."""
+
+    def __init__(self, breaker_name: str, retry_in_seconds: float):
+        super().__init__(f"Circuit breaker for {breaker_name} is open; retrying in {retry_in_seconds:.0f}s.")
+        self.breaker_name = breaker_name
+        self.retry_in_seconds = retry_in_seconds
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float):
+        for index, upper_bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= upper_bound:
+                self.bucket_counts[index] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> float:
+        # Bucket upper bound containing the percentile; coarse, but enough to tell 80ms from 8s.
+        if not self.count:
+            return None
+        target_rank = fraction * self.count
+        running_count = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            running_count += bucket_count
+            if running_count >= target_rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else None
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open after the recovery timeout -> closed on a successful probe."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.last_error = None
+        self._probe_in_flight = False
+        self.histogram = LatencyHistogram()
+        self._recent_outcomes = deque(maxlen=OUTCOME_WINDOW_SIZE) # True = success
+        self.total_calls = 0
+        self.total_failures = 0
+        self.short_circuited_calls = 0
+
+    @staticmethod
+    def _failure_threshold() -> int:
+        return config_manager.UTA_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+
+    @staticmethod
+    def _recovery_seconds() -> float:
+        return config_manager.UTA_CIRCUIT_BREAKER_RECOVERY_SECONDS
+
+    def allow_request(self) -> bool:
+        if self._failure_threshold() <= 0: # Breakers disabled; still collect metrics
+            return True
+        with self._lock:
+            if self.state == BREAKER_CLOSED:
+                return True
+            if self.state == BREAKER_OPEN and time.time() - self.opened_at >= self._recovery_seconds():
+                self._transition(BREAKER_HALF_OPEN)
+            if self.state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True # Exactly one caller gets to test the endpoint
+                return True
+            self.short_circuited_calls += 1
+            return False
+
+    def retry_in_seconds(self) -> float:
+        return max(0.0, self.opened_at + self._recovery_seconds() - time.time())
+
+    def record_success(self, latency_seconds: float):
+        with self._lock:
+            self._record_call(latency_seconds, True)
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self.state != BREAKER_CLOSED:
+                self._transition(BREAKER_CLOSED)
+
+    def record_failure(self, latency_seconds: float, error: str = None):
+        with self._lock:
+            self._record_call(latency_seconds, False)
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            self._probe_in_flight = False
+            threshold = self._failure_threshold()
+            if self.state == BREAKER_HALF_OPEN or (threshold > 0 and self.state == BREAKER_CLOSED and self.consecutive_failures >= threshold):
+                self.opened_at = time.time()
+                self._transition(BREAKER_OPEN)
+
+    def _record_call(self, latency_seconds: float, succeeded: bool):
+        self.total_calls += 1
+        self._recent_outcomes.append(succeeded)
+        if latency_seconds is not None:
+            self.histogram.record(latency_seconds * 1000)
+
+    def _transition(self, new_state: str):
+        # Called with self._lock held.
+        old_state, self.state = self.state, new_state
+        if new_state == BREAKER_OPEN:
+            logger.warning(f"CircuitBreaker: {self.name} {old_state} -> OPEN after {self.consecutive_failures} failure(s) ({self.last_error}). "
+                           f"Short-circuiting calls for {self._recovery_seconds()}s.")
+        else:
+            logger.info(f"CircuitBreaker: {self.name} {old_state} -> {new_state}.")
+        api_breakers.report_states_to_gui()
+
+    def error_rate(self) -> float:
+        with self._lock:
+            outcomes = list(self._recent_outcomes)
+        return (outcomes.count(False) / len(outcomes)) if outcomes else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent_outcomes = list(self._recent_outcomes)
+            return {
+                "name": self.name, "state": self.state, "consecutive_failures": self.consecutive_failures,
+                "total_calls": self.total_calls, "total_failures": self.total_failures,
+                "short_circuited_calls": self.short_circuited_calls, "last_error": self.last_error,
+                "retry_in_seconds": self.retry_in_seconds() if self.state == BREAKER_OPEN else 0,
+                "p50_ms": self.histogram.percentile(0.5), "p95_ms": self.histogram.percentile(0.95),
+                "mean_ms": self.histogram.mean(), "max_ms": self.histogram.max_ms,
+                "latency_buckets": list(self.histogram.bucket_counts),
+                "error_rate": (recent_outcomes.count(False) / len(recent_outcomes)) if recent_outcomes else 0.0,
+            }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name)
+                self._breakers[name] = breaker
+            return breaker
+
+    def all(self) -> list:
+        for name in WATCHED_ENDPOINTS:
+            self.get(name)
+        with self._lock:
+            return sorted(self._breakers.values(), key=lambda b: b.name)
+
+    def report_states_to_gui(self):
+        with self._lock:
+            unhealthy = [f"{b.name}:{b.state}" for b in self._breakers.values() if b.state != BREAKER_CLOSED]
+        config_manager.logger.info(f"UTA_GUI_LOG: CircuitBreakers={', '.join(sorted(unhealthy)) if unhealthy else 'All closed'}")
+
+
+api_breakers = CircuitBreakerRegistry()
+
+
+def is_http_failure_status(status_code: int) -> bool:
+    # 4xx (other than rate limiting) means the endpoint is up and answering; only outages should trip a breaker.
+    return status_code >= 500 or status_code == 429
+
+
+def guarded_request(breaker_name: str, method: str, url: str, **kwargs) -> requests.Response:
+    """requests.request() through the named breaker. Raises CircuitOpenError while it's open."""
+    breaker = api_breakers.get(breaker_name)
+    if not breaker.allow_request():
+        raise CircuitOpenError(breaker_name, breaker.retry_in_seconds())
+    started_at = time.monotonic()
+    try:
+        response = requests.request(method, url, **kwargs)
+    except Exception as e: # Not just RequestException: a half-open probe must always report back
+        breaker.record_failure(time.monotonic() - started_at, type(e).__name__)
+        raise
+    if is_http_failure_status(response.status_code):
+        breaker.record_failure(time.monotonic() - started_at, f"HTTP {response.status_code}")
+    else:
+        breaker.record_success(time.monotonic() - started_at)
+    return response
+
+
+def resolve_discord_webhook_url(url: str) -> str:
+    # https://discord.com/api[/v10]/webhooks/<id>/<token> -> <UTA_DISCORD_WEBHOOK_BASE_URL>[/v10]/webhooks/<id>/<token>
+    base_url = config_manager.UTA_DISCORD_WEBHOOK_BASE_URL
+    if not base_url or "/api/" not in url:
+        return url
+    return base_url.rstrip('/') + url[url.index("/api/") + len("/api"):]
+
+
+def post_discord_webhook(url: str, **kwargs) -> requests.Response:
+    return guarded_request("discord:webhook", "POST", resolve_discord_webhook_url(url), **kwargs)
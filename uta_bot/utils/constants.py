@@ -43,4 +43,19 @@ BOT_EVENT_STOP = 2
 
 # Bot Session Record: EventType (Unsigned Byte), Timestamp (Unsigned Int)
 BOT_SESSION_RECORD_FORMAT = '>BI'
-BOT_SESSION_RECORD_SIZE = struct.calcsize(BOT_SESSION_RECORD_FORMAT)
\ No newline at end of file
+BOT_SESSION_RECORD_SIZE = struct.calcsize(BOT_SESSION_RECORD_FORMAT)
+
+# --- Restream Metrics Log Binary Format ---
+# Timestamp (Unix Int), Bitrate kbps (Float), FPS (Float), Speed x (Float), Frame (Unsigned Int),
+# Dropped Frames (Unsigned Int), Duplicated Frames (Unsigned Int), Output Time s (Float). NaN where FFmpeg reported N/A.
+RESTREAM_METRICS_RECORD_FORMAT = '>IfffIIIf'
+RESTREAM_METRICS_RECORD_SIZE = struct.calcsize(RESTREAM_METRICS_RECORD_FORMAT)
+
+# --- Recorder Segment Index Format ---
+# Start (Unix Int), Duration ms (Unsigned Int), Size Bytes (Unsigned Long Long), Pipe ID (Unix ms of pipe start, Unsigned Long Long),
+# Segment Number (Unsigned Int), Segment Format (Unsigned Byte). The segment's file name is derived from the channel, pipe ID and number.
+SEGMENT_INDEX_RECORD_FORMAT = '>IIQQIB'
+SEGMENT_INDEX_RECORD_SIZE = struct.calcsize(SEGMENT_INDEX_RECORD_FORMAT)
+
+SEGMENT_FORMAT_MPEGTS = 0
+SEGMENT_FORMAT_FMP4 = 1
\ No newline at end of file
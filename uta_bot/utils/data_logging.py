@@ -18,7 +18,8 @@ from .constants import (
     SA_LIST_HEADER_FORMAT, SA_LIST_HEADER_SIZE,
     SA_INT_FORMAT, SA_INT_SIZE,
     BOT_EVENT_START, BOT_EVENT_STOP,
-    BOT_SESSION_RECORD_FORMAT, BOT_SESSION_RECORD_SIZE
+    BOT_SESSION_RECORD_FORMAT, BOT_SESSION_RECORD_SIZE,
+    RESTREAM_METRICS_RECORD_FORMAT
 )
 
 logger = logging.getLogger(__name__)
@@ -39,14 +40,15 @@ async def log_follower_data_binary(timestamp_dt: datetime, count: int):
         except Exception as e:
             logger.error(f"Failed to log follower data to {config_manager.FCTD_FOLLOWER_DATA_FILE}: {e}", exc_info=True)
 
-async def log_viewer_data_binary(timestamp_dt: datetime, count: int):
-    if config_manager.UTA_VIEWER_COUNT_LOGGING_ENABLED and config_manager.UTA_VIEWER_COUNT_LOG_FILE:
+async def log_viewer_data_binary(timestamp_dt: datetime, count: int, log_filepath: str = None):
+    log_filepath = log_filepath or config_manager.UTA_VIEWER_COUNT_LOG_FILE # Per-channel path for additional channels
+    if config_manager.UTA_VIEWER_COUNT_LOGGING_ENABLED and log_filepath:
         try:
             packed_data = struct.pack(BINARY_RECORD_FORMAT, int(timestamp_dt.timestamp()), int(count))
-            await asyncio.to_thread(_write_binary_data_sync, config_manager.UTA_VIEWER_COUNT_LOG_FILE, packed_data)
-            logger.debug(f"UTA: Logged viewer count {count} at {timestamp_dt.isoformat()} to {config_manager.UTA_VIEWER_COUNT_LOG_FILE}")
+            await asyncio.to_thread(_write_binary_data_sync, log_filepath, packed_data)
+            logger.debug(f"UTA: Logged viewer count {count} at {timestamp_dt.isoformat()} to {log_filepath}")
         except Exception as e:
-            logger.error(f"UTA: Failed to log viewer count to {config_manager.UTA_VIEWER_COUNT_LOG_FILE}: {e}", exc_info=True)
+            logger.error(f"UTA: Failed to log viewer count to {log_filepath}: {e}", exc_info=True)
 
 async def log_stream_duration_binary(start_ts_unix: int, end_ts_unix: int):
     if config_manager.UTA_STREAM_DURATION_LOG_FILE and config_manager.UTA_ENABLED and config_manager.UTA_RESTREAMER_ENABLED:
@@ -79,6 +81,21 @@ async def log_chat_activity_binary(timestamp_dt: datetime, message_count: int, u
     except Exception as e:
         logger.error(f"UTA Chat: Failed to log chat activity to {config_manager.TWITCH_CHAT_ACTIVITY_LOG_FILE}: {e}", exc_info=True)
 
+async def log_restream_metrics_binary(timestamp_dt: datetime, metrics: dict):
+    """Logs one snapshot of the restream FFmpeg's -progress metrics (see RestreamPipe.progress)."""
+    if not config_manager.UTA_RESTREAM_METRICS_LOG_FILE:
+        return
+    def _float_or_nan(value):
+        return float('nan') if value is None else float(value)
+    try:
+        packed_data = struct.pack(RESTREAM_METRICS_RECORD_FORMAT, int(timestamp_dt.timestamp()),
+                                  _float_or_nan(metrics.get("bitrate_kbps")), _float_or_nan(metrics.get("fps")), _float_or_nan(metrics.get("speed")),
+                                  min(metrics.get("frame") or 0, 0xFFFFFFFF), min(metrics.get("drop_frames") or 0, 0xFFFFFFFF),
+                                  min(metrics.get("dup_frames") or 0, 0xFFFFFFFF), _float_or_nan(metrics.get("out_time_seconds")))
+        await asyncio.to_thread(_write_binary_data_sync, config_manager.UTA_RESTREAM_METRICS_LOG_FILE, packed_data)
+    except Exception as e:
+        logger.error(f"UTA: Failed to log restream metrics to {config_manager.UTA_RESTREAM_METRICS_LOG_FILE}: {e}", exc_info=True)
+
 
 def _pack_string_for_binary_log(s: str) -> bytes:
     s_bytes = s.encode('utf-8')
@@ -95,8 +112,9 @@ def _pack_tag_list_for_binary_log(tags: list[str] = None) -> bytes:
         tag_bytes_list.append(_pack_string_for_binary_log(tag_str))
     return b"".join(tag_bytes_list)
 
-async def log_stream_activity_binary(event_type: int, timestamp_dt: datetime, **kwargs):
-    if not (config_manager.UTA_STREAM_ACTIVITY_LOG_FILE and config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED):
+async def log_stream_activity_binary(event_type: int, timestamp_dt: datetime, log_filepath: str = None, **kwargs):
+    log_filepath = log_filepath or config_manager.UTA_STREAM_ACTIVITY_LOG_FILE # Per-channel path for additional channels
+    if not (log_filepath and config_manager.UTA_STREAM_STATUS_NOTIFICATIONS_ENABLED):
         return
 
     try:
@@ -146,11 +164,11 @@ async def log_stream_activity_binary(event_type: int, timestamp_dt: datetime, **
             return
 
         final_log_bytes = b"".join(log_entry_bytes_list)
-        await asyncio.to_thread(_write_binary_data_sync, config_manager.UTA_STREAM_ACTIVITY_LOG_FILE, final_log_bytes)
-        logger.info(f"UTA: Logged stream activity (binary): event type {event_type} at {timestamp_dt.isoformat()}")
+        await asyncio.to_thread(_write_binary_data_sync, log_filepath, final_log_bytes)
+        logger.info(f"UTA: Logged stream activity (binary): event type {event_type} at {timestamp_dt.isoformat()} to {log_filepath}")
 
     except Exception as e:
-        logger.error(f"UTA: Failed to log stream activity (binary) to {config_manager.UTA_STREAM_ACTIVITY_LOG_FILE}: {e}", exc_info=True)
+        logger.error(f"UTA: Failed to log stream activity (binary) to {log_filepath}: {e}", exc_info=True)
 
 
 async def log_bot_session_event(event_type: int, timestamp_dt: datetime):
@@ -867,4 +885,25 @@ def count_distinct_games_from_activity(filepath: str) -> int:
     if not game_segments:
         return 0
     distinct_games = set(seg['game'] for seg in game_segments if seg.get('game'))
-    return len(distinct_games)
\ No newline at end of file
+    return len(distinct_games)
+
+def read_stream_activity_event_times(filepath: str, event_types: tuple = (EVENT_TYPE_STREAM_START, EVENT_TYPE_STREAM_END), since_unix: int = 0) -> list[tuple[int, int]]:
+    """Returns [(event_type, unix_ts)] for the given event types, skipping event bodies instead of decoding them."""
+    if not filepath or not os.path.exists(filepath) or os.path.getsize(filepath) < SA_BASE_HEADER_SIZE:
+        return []
+    event_times = []
+    try:
+        with open(filepath, 'rb') as f:
+            while True:
+                header_chunk = f.read(SA_BASE_HEADER_SIZE)
+                if len(header_chunk) < SA_BASE_HEADER_SIZE: break
+                event_type, unix_ts = struct.unpack(SA_BASE_HEADER_FORMAT, header_chunk)
+                if consume_activity_event_body(f, event_type):
+                    logger.warning(f"DataLog Read: Incomplete activity event (type {event_type}) at ts {unix_ts} in {filepath}. Stopping.")
+                    break
+                if event_type in event_types and unix_ts >= since_unix:
+                    event_times.append((event_type, unix_ts))
+    except Exception as e:
+        logger.error(f"DataLog Read: Error reading event times from {filepath}: {e}", exc_info=True)
+    return event_times
+
@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Returned by fetch functions (and passed through get_or_fetch) when the upstream confirmed the key doesn't exist,
+# as opposed to None, which means the fetch itself failed and a stale value is still the best answer.
+LOOKUP_NOT_FOUND = object()
+
+MAX_STALE_FACTOR = 10 # Entries older than ttl * this are dropped instead of served stale
+
+
+class CacheEntry:
+    __slots__ = ("value", "stored_at", "ttl_seconds")
+
+    def __init__(self, value, stored_at: float, ttl_seconds: float):
+        self.value = value
+        self.stored_at = stored_at # time.time(), so ages survive a restart
+        self.ttl_seconds = ttl_seconds
+
+    def age_seconds(self) -> float:
+        return time.time() - self.stored_at
+
+    def is_fresh(self) -> bool:
+        return self.age_seconds() <= self.ttl_seconds
+
+    def is_servable(self) -> bool:
+        return self.age_seconds() <= self.ttl_seconds * MAX_STALE_FACTOR
+
+
+class PersistentLRUCache:
+    """Namespaced LRU cache with per-entry TTLs and stale-while-revalidate, persisted to a small JSON file."""
+
+    def __init__(self, max_entries: int = 500, save_interval_seconds: float = 60):
+        self.max_entries = max_entries # Per namespace
+        self.save_interval_seconds = save_interval_seconds
+        self._lock = threading.RLock()
+        self._namespaces = {} # namespace -> OrderedDict(key -> CacheEntry), least recently used first
+        self._filepath = None
+        self._dirty = False
+        self._last_save_time = 0.0
+        self._refreshing = set() # (namespace, key) revalidations currently in flight
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def configure(self, filepath: str, max_entries: int = None):
+        """Points the cache at its file, loading it the first time (or when the path changes). Safe to call repeatedly."""
+        with self._lock:
+            if max_entries:
+                self.max_entries = max_entries
+            if filepath == self._filepath:
+                return
+            if self._filepath and self._dirty:
+                self.save(force=True) # Don't lose entries gathered under the old path
+            self._filepath = filepath
+            self._namespaces = {}
+            self._load()
+
+    def _load(self):
+        if not self._filepath or not os.path.exists(self._filepath):
+            return
+        try:
+            with open(self._filepath, 'r', encoding='utf-8') as f:
+                raw_data = json.load(f)
+            loaded_count = 0
+            for namespace, rows in raw_data.get("namespaces", {}).items():
+                entries = self._namespaces.setdefault(namespace, OrderedDict())
+                for key, value, stored_at, ttl_seconds in rows:
+                    entry = CacheEntry(value, stored_at, ttl_seconds)
+                    if entry.is_servable():
+                        entries[key] = entry
+                        loaded_count += 1
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+            logger.info(f"LookupCache: Loaded {loaded_count} cached lookup(s) from {self._filepath}.")
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"LookupCache: Could not load {self._filepath}, starting cold: {e}")
+            self._namespaces = {}
+
+    def save(self, force: bool = False):
+        with self._lock:
+            if not self._filepath or not self._dirty:
+                return
+            if not force and time.time() - self._last_save_time < self.save_interval_seconds:
+                return
+            payload = {
+                "version": 1,
+                "namespaces": {
+                    namespace: [[key, e.value, e.stored_at, e.ttl_seconds] for key, e in entries.items()]
+                    for namespace, entries in self._namespaces.items()
+                }
+            }
+            temp_path = f"{self._filepath}.tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f)
+                os.replace(temp_path, self._filepath) # Atomic, so a crash mid-write can't corrupt the cache
+                self._dirty = False
+                self._last_save_time = time.time()
+            except OSError as e:
+                logger.error(f"LookupCache: Failed to save cache to {self._filepath}: {e}")
+
+    def get(self, namespace: str, key: str) -> CacheEntry:
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            entry = entries.get(key) if entries else None
+            if entry is None:
+                return None
+            if not entry.is_servable():
+                del entries[key]
+                self._dirty = True
+                return None
+            entries.move_to_end(key)
+            return entry
+
+    def set(self, namespace: str, key: str, value, ttl_seconds: float):
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entries[key] = CacheEntry(value, time.time(), ttl_seconds)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            self._dirty = True
+        self.save()
+
+    def invalidate(self, namespace: str, key: str):
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if entries and entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._namespaces = {}
+            self._dirty = True
+        self.save(force=True)
+
+    def get_or_fetch(self, namespace: str, key: str, ttl_seconds: float, fetch_fn):
+        """
+        Fresh entry -> returned as-is. Stale entry -> returned immediately while fetch_fn refreshes it in the background.
+        No entry -> fetch_fn() is called inline. fetch_fn returns the value, None on failure, or LOOKUP_NOT_FOUND.
+        """
+        entry = self.get(namespace, key)
+        if entry is not None:
+            if entry.is_fresh():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._revalidate_in_background(namespace, key, ttl_seconds, fetch_fn)
+            return entry.value
+
+        self.misses += 1
+        return self._fetch_and_store(namespace, key, ttl_seconds, fetch_fn)
+
+    def _fetch_and_store(self, namespace: str, key: str, ttl_seconds: float, fetch_fn):
+        value = fetch_fn()
+        if value is LOOKUP_NOT_FOUND:
+            self.invalidate(namespace, key) # e.g. a renamed login; stop serving the old mapping
+        elif value is not None:
+            self.set(namespace, key, value, ttl_seconds)
+        return value
+
+    def _revalidate_in_background(self, namespace: str, key: str, ttl_seconds: float, fetch_fn):
+        with self._lock:
+            if (namespace, key) in self._refreshing:
+                return
+            self._refreshing.add((namespace, key))
+
+        def _refresh():
+            try:
+                self._fetch_and_store(namespace, key, ttl_seconds, fetch_fn)
+            except Exception as e:
+                logger.warning(f"LookupCache: Background refresh of {namespace}/{key} failed, keeping stale value: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((namespace, key))
+
+        threading.Thread(target=_refresh, name=f"LookupCacheRefresh-{namespace}", daemon=True).start()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": {namespace: len(entries) for namespace, entries in self._namespaces.items()},
+                "hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                "file": self._filepath
+            }
@@ -0,0 +1,123 @@
+import logging
+import os
+import re
+import struct
+import time
+
+from .constants import (
+    SEGMENT_INDEX_RECORD_FORMAT, SEGMENT_INDEX_RECORD_SIZE,
+    SEGMENT_FORMAT_MPEGTS, SEGMENT_FORMAT_FMP4
+)
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_INDEX_FILENAME = "segment_index.bin"
+SEGMENT_FILE_EXTENSIONS = {SEGMENT_FORMAT_MPEGTS: "ts", SEGMENT_FORMAT_FMP4: "mp4"}
+_SEGMENT_FILE_RE = re.compile(r"^(?P<channel>.+)_(?P<pipe_id>\d+)_(?P<seq>\d+)\.(?:ts|mp4)$")
+
+
+def segment_filename(channel: str, pipe_id: int, seq, segment_format: int) -> str:
+    # seq=None gives FFmpeg's segment muxer pattern for the pipe instead of one file's name.
+    seq_part = "%06d" if seq is None else f"{seq:06d}"
+    return f"{channel.lower()}_{pipe_id}_{seq_part}.{SEGMENT_FILE_EXTENSIONS[segment_format]}"
+
+def append_segment_record(channel_dir: str, start_ts_unix: int, duration_ms: int, size_bytes: int,
+                          pipe_id: int, seq: int, segment_format: int):
+    # Append-only, one fixed-size record per finished segment.
+    try:
+        with open(os.path.join(channel_dir, SEGMENT_INDEX_FILENAME), 'ab') as f:
+            f.write(struct.pack(SEGMENT_INDEX_RECORD_FORMAT, start_ts_unix, duration_ms, size_bytes, pipe_id, seq, segment_format))
+    except Exception as e:
+        logger.error(f"Segment Index: Error appending to the index in {channel_dir}: {e}", exc_info=True)
+
+def read_segment_index(channel_dir: str, query_start_unix: int = None, query_end_unix: int = None) -> list[dict]:
+    """Index records overlapping [query_start_unix, query_end_unix], ordered by start. Each dict has start/end (Unix seconds,
+    end as float), size, pipe_id, seq, format, path and exists (False once retention deleted the file)."""
+    index_path = os.path.join(channel_dir, SEGMENT_INDEX_FILENAME)
+    if not os.path.exists(index_path):
+        return []
+    channel = os.path.basename(os.path.normpath(channel_dir))
+    records = []
+    try:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+        usable_length = len(data) - len(data) % SEGMENT_INDEX_RECORD_SIZE # A torn last record (crash mid-write) is ignored
+        for start_ts, duration_ms, size_bytes, pipe_id, seq, segment_format in struct.iter_unpack(SEGMENT_INDEX_RECORD_FORMAT, data[:usable_length]):
+            end_ts = start_ts + duration_ms / 1000
+            if query_start_unix is not None and end_ts < query_start_unix: continue
+            if query_end_unix is not None and start_ts > query_end_unix: continue
+            path = os.path.join(channel_dir, segment_filename(channel, pipe_id, seq, segment_format))
+            records.append({"start": start_ts, "end": end_ts, "size": size_bytes, "pipe_id": pipe_id, "seq": seq,
+                            "format": segment_format, "path": path, "exists": os.path.exists(path)})
+    except Exception as e:
+        logger.error(f"Segment Index: Error reading {index_path}: {e}", exc_info=True)
+    # Overlapped rollovers run two pipes at once, so records from both can interleave slightly.
+    records.sort(key=lambda r: (r["start"], r["pipe_id"], r["seq"]))
+    return records
+
+def select_segments_for_window(records: list[dict], query_start_unix: int, query_end_unix: int) -> list[dict]:
+    """Existing segments covering the window once each: where two pipes overlapped, a segment that adds no new
+    time after the previous pick is skipped. A segment of another format than the first pick is skipped too."""
+    selected = []
+    covered_until = None
+    for record in records:
+        if not record["exists"] or record["end"] < query_start_unix or record["start"] > query_end_unix:
+            continue
+        if selected and record["format"] != selected[0]["format"]:
+            continue
+        if covered_until is not None and record["end"] <= covered_until + 1:
+            continue
+        selected.append(record)
+        covered_until = record["end"]
+    return selected
+
+def list_segment_files(channel_dir: str) -> list[tuple[int, int, str]]:
+    """[(pipe_id, seq, path)] for every segment file in the directory, oldest first."""
+    segment_files = []
+    try:
+        with os.scandir(channel_dir) as entries:
+            for entry in entries:
+                match = _SEGMENT_FILE_RE.match(entry.name)
+                if match and entry.is_file():
+                    segment_files.append((int(match.group("pipe_id")), int(match.group("seq")), entry.path))
+    except FileNotFoundError:
+        return []
+    segment_files.sort()
+    return segment_files
+
+def enforce_segment_retention(channel_dir: str, max_bytes: int, max_age_seconds: float, protected_paths: set = None,
+                              active_within_seconds: float = 0) -> tuple[int, int]:
+    """Deletes the oldest segment files until the directory is under max_bytes and nothing is older than max_age_seconds
+    (0 disables either limit). protected_paths, and any file written to within the last active_within_seconds (another
+    pipe's open segment during an overlapped rollover), are never deleted. Returns (files, bytes) freed."""
+    if not max_bytes and not max_age_seconds:
+        return 0, 0
+    protected_paths = protected_paths or set()
+    active_since = time.time() - active_within_seconds if active_within_seconds else None
+    candidates = []
+    total_bytes = 0
+    for _, _, path in list_segment_files(channel_dir):
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            continue
+        total_bytes += stat_result.st_size
+        if path not in protected_paths and (active_since is None or stat_result.st_mtime < active_since):
+            candidates.append((path, stat_result.st_size, stat_result.st_mtime))
+
+    cutoff_mtime = time.time() - max_age_seconds if max_age_seconds else None
+    freed_files, freed_bytes = 0, 0
+    for path, size_bytes, mtime in candidates:
+        over_size = max_bytes and total_bytes > max_bytes
+        too_old = cutoff_mtime is not None and mtime < cutoff_mtime
+        if not (over_size or too_old):
+            break # Oldest first, so nothing after this one is over either limit
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Segment Index: Could not delete expired segment {path}: {e}")
+            continue
+        total_bytes -= size_bytes
+        freed_files += 1
+        freed_bytes += size_bytes
+    return freed_files, freed_bytes